@@ -79,6 +79,22 @@ def load_bitrix_data(url, filters=None, show_logs=False, force_reload=False):
         if show_logs:
             st.info("Cache invalidado para forçar recarregamento")
     
+    return fetch_bitrix_data(url, filters, show_logs=show_logs)
+
+
+def fetch_bitrix_data(url, filters=None, show_logs=False):
+    """
+    Consulta o Bitrix24 sem cache (usada por load_bitrix_data e por atualizações incrementais,
+    como o diretório de responsáveis, que precisam sempre de dados atuais).
+    
+    Args:
+        url (str): URL da API Bitrix24
+        filters (dict, optional): Filtros para a consulta
+        show_logs (bool): Se deve exibir logs de depuração
+        
+    Returns:
+        pandas.DataFrame: DataFrame com os dados obtidos
+    """
     try:
         if show_logs:
             st.info(f"Tentando acessar: {url}")
@@ -193,7 +209,7 @@ def load_bitrix_data(url, filters=None, show_logs=False, force_reload=False):
             st.error(f"Erro ao carregar dados do Bitrix24: {str(e)}")
         return pd.DataFrame()
 
-def load_merged_data(category_id=None, date_from=None, date_to=None, deal_ids=None, debug=False, progress_bar=None, message_container=None, force_reload=False):
+def load_merged_data(category_id=None, date_from=None, date_to=None, deal_ids=None, debug=False, progress_bar=None, message_container=None, force_reload=False, columns=None):
     """
     Carrega e mescla dados das tabelas crm_deal e crm_deal_uf.
     
@@ -206,6 +222,7 @@ def load_merged_data(category_id=None, date_from=None, date_to=None, deal_ids=No
         progress_bar: Placeholder da barra de progresso (opcional)
         message_container: Placeholder da mensagem (opcional)
         force_reload (bool): Se deve ignorar o cache e forçar recarregamento completo
+        columns (list, optional): Mantém apenas estas colunas (e as chaves) antes da mesclagem
         
     Returns:
         pandas.DataFrame: DataFrame com os dados mesclados
@@ -489,6 +506,15 @@ def load_merged_data(category_id=None, date_from=None, date_to=None, deal_ids=No
                     st.warning(f"Criando coluna vazia para '{field}'")
                     df_deal_uf[field] = None
         
+        # Projetar as colunas pedidas antes da mesclagem (evita copiar colunas descartadas)
+        if columns:
+            keep = set(columns)
+            if 'ASSIGNED_BY_NAME' in keep:
+                keep.add('ASSIGNED_BY')
+            df_deal = df_deal[[c for c in df_deal.columns if c == 'ID' or c in keep]]
+            df_deal_uf = df_deal_uf[[c for c in df_deal_uf.columns
+                                     if c == 'DEAL_ID' or (c in keep and c not in df_deal.columns)]]
+        
         # Realizar a mesclagem
         merged_df = pd.merge(df_deal, df_deal_uf, left_on="ID", right_on="DEAL_ID", how="left")
         
@@ -0,0 +1,132 @@
+"""
+Descoberta do nome de tabela do BI Connector do Bitrix24, com sondagem paralela e cache persistente.
+
+Algumas entidades (ex.: Reclamações, entidade 1086) aparecem com nomes de tabela diferentes
+conforme o portal. O carregador tentava cada nome em sequência com load_bitrix_data
+(3 tentativas, timeout de 30 s e pausas de 2 s), e um nome errado custava minutos. Aqui:
+- os nomes candidatos são sondados ao mesmo tempo, com timeout curto, lendo só o início da
+  resposta (o suficiente para saber se a tabela existe e tem linhas);
+- o nome vencedor é gravado em .cache/bitrix_endpoints.json e as cargas seguintes vão
+  direto a ele, sem sondar;
+- se a tabela conhecida deixar de responder, o chamador usa invalidate() e a próxima
+  carga sonda novamente.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+# Arquivo do cache de tabelas resolvidas (ignorado pelo git)
+CACHE_FILE = Path(__file__).parents[1] / '.cache' / 'bitrix_endpoints.json'
+
+# Timeout (segundos) de conexão/primeiro byte de cada sondagem
+PROBE_TIMEOUT = float(os.getenv('BITRIX_PROBE_TIMEOUT', 8))
+
+# Bytes lidos do início da resposta para validar a tabela
+PROBE_BYTES = 512
+
+_lock = threading.Lock()
+
+
+def table_url(base_url, token, table):
+    """URL do BI Connector para uma tabela."""
+    return f"{base_url}/bitrix/tools/biconnector/pbi.php?token={token}&table={table}"
+
+
+def _cache_key(base_url, entity):
+    return f"{base_url}|{entity}"
+
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache):
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        temporary = CACHE_FILE.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(temporary, CACHE_FILE)
+    except OSError as e:
+        print(f"Erro ao gravar o cache de tabelas do Bitrix: {e}")
+
+
+def probe_table(url, timeout=PROBE_TIMEOUT):
+    """
+    Verifica se a URL responde com uma tabela não vazia, lendo apenas o início da resposta.
+
+    O BI Connector devolve uma lista JSON (cabeçalho + linhas, ou objetos); uma tabela
+    inexistente responde com erro HTTP, um objeto de erro ou uma lista vazia.
+
+    Returns:
+        bool: True se a tabela existe e tem dados
+    """
+    try:
+        with requests.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return False
+            head = b''
+            for chunk in response.iter_content(chunk_size=PROBE_BYTES):
+                head += chunk
+                if len(head.strip()) >= 2:
+                    break
+    except requests.exceptions.RequestException:
+        return False
+    head = head.lstrip()
+    return head.startswith(b'[') and not head[1:].lstrip().startswith(b']')
+
+
+def resolve_table(entity, candidates, base_url, token, timeout=PROBE_TIMEOUT, probe=probe_table):
+    """
+    Retorna o nome de tabela que responde para a entidade, usando o cache quando disponível.
+
+    Args:
+        entity (str): Identificador da entidade no cache (ex.: 'reclamacoes')
+        candidates (list): Nomes de tabela candidatos, em ordem de preferência
+        base_url (str): URL do portal Bitrix24
+        token (str): Token do BI Connector
+        timeout (float): Timeout de cada sondagem
+        probe (callable): probe(url, timeout) -> bool
+
+    Returns:
+        str | None: Nome da tabela (o primeiro candidato que respondeu, na ordem de
+        preferência) ou None se nenhum respondeu
+    """
+    key = _cache_key(base_url, entity)
+    with _lock:
+        cached = _read_cache().get(key)
+    if cached and cached.get('table') in candidates:
+        return cached['table']
+
+    with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+        results = list(executor.map(
+            lambda table: probe(table_url(base_url, token, table), timeout), candidates
+        ))
+    table = next((t for t, ok in zip(candidates, results) if ok), None)
+    if table is None:
+        print(f"Nenhuma tabela do Bitrix respondeu para '{entity}': {candidates}")
+        return None
+
+    with _lock:
+        cache = _read_cache()
+        cache[key] = {'table': table, 'resolved_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        _write_cache(cache)
+    return table
+
+
+def invalidate(entity, base_url):
+    """Descarta a tabela conhecida da entidade (a próxima resolução sonda novamente)."""
+    key = _cache_key(base_url, entity)
+    with _lock:
+        cache = _read_cache()
+        if cache.pop(key, None) is not None:
+            _write_cache(cache)
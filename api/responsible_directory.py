@@ -0,0 +1,221 @@
+"""
+Diretório de responsáveis (dimensão leve: responsável, primeira e última atividade, negócios).
+
+A página de Conclusões chamava load_merged_data(category_id=32) sem filtro de data apenas para
+listar os responsáveis e obter o total de negócios da categoria, baixando crm_deal e crm_deal_uf
+inteiras a cada rerun. O diretório:
+- guarda em memória (compartilhada entre sessões) só ID, responsável e datas de cada negócio;
+- faz a carga completa apenas da tabela crm_deal (sem crm_deal_uf) na primeira consulta e,
+  depois, uma vez por FULL_RESYNC_INTERVAL (para refletir negócios removidos ou movidos);
+- entre cargas completas, busca apenas os negócios alterados desde a última alteração vista
+  (DATE_MODIFY), no máximo uma vez por refresh_interval;
+- absorve os DataFrames que as páginas já carregaram (merge_frame), sem novas requisições.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from api.bitrix_connector import fetch_bitrix_data, BITRIX_CRM_DEAL_URL
+
+RESPONSIBLE_FIELD = 'ASSIGNED_BY_NAME'
+CREATED_FIELD = 'DATE_CREATE'
+MODIFIED_FIELD = 'DATE_MODIFY'
+
+# Intervalo mínimo entre atualizações incrementais e entre cargas completas (segundos)
+DEFAULT_REFRESH_INTERVAL = 600
+FULL_RESYNC_INTERVAL = 24 * 3600
+
+# Margem da janela incremental, para não perder alterações no limite do último horário visto
+INCREMENTAL_OVERLAP = timedelta(days=1)
+
+_EMPTY_DEALS = pd.DataFrame(
+    {'RESPONSAVEL': pd.Series(dtype=object),
+     'PRIMEIRA': pd.Series(dtype='datetime64[ns]'),
+     'ULTIMA': pd.Series(dtype='datetime64[ns]')},
+    index=pd.Index([], name='ID', dtype=object),
+)
+
+_directories = {}
+_directories_lock = threading.Lock()
+
+
+def _normalize_deals(df):
+    """Reduz um DataFrame de negócios às colunas do diretório (um registro por ID)."""
+    if df is None or df.empty or 'ID' not in df.columns:
+        return _EMPTY_DEALS.copy()
+    created = pd.to_datetime(df[CREATED_FIELD], errors='coerce') if CREATED_FIELD in df.columns \
+        else pd.Series(pd.NaT, index=df.index)
+    modified = pd.to_datetime(df[MODIFIED_FIELD], errors='coerce') if MODIFIED_FIELD in df.columns \
+        else pd.Series(pd.NaT, index=df.index)
+    # Mesmo fallback de load_merged_data: ASSIGNED_BY quando ASSIGNED_BY_NAME não vem na tabela
+    if RESPONSIBLE_FIELD in df.columns:
+        responsible = df[RESPONSIBLE_FIELD]
+    elif 'ASSIGNED_BY' in df.columns:
+        responsible = df['ASSIGNED_BY']
+    else:
+        responsible = pd.Series(None, index=df.index, dtype=object)
+    deals = pd.DataFrame({
+        'ID': df['ID'].astype(str).to_numpy(),
+        'RESPONSAVEL': responsible.fillna('Não atribuído').astype(str).to_numpy(),
+        'PRIMEIRA': created.to_numpy(),
+        'ULTIMA': modified.fillna(created).to_numpy(),
+    })
+    # Mantém a versão mais recente de cada negócio (linhas duplicadas vêm do merge com crm_deal_uf)
+    deals = deals.sort_values('ULTIMA', kind='mergesort', na_position='first')
+    return deals.drop_duplicates('ID', keep='last').set_index('ID')
+
+
+class ResponsibleDirectory:
+    """
+    Diretório de responsáveis de uma categoria, atualizado de forma incremental.
+
+    Args:
+        category_id (int): Categoria (funil) do Bitrix24
+        refresh_interval (int): Segundos entre consultas incrementais ao Bitrix24
+    """
+
+    def __init__(self, category_id, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        self.category_id = category_id
+        self.refresh_interval = refresh_interval
+        self.deals = _EMPTY_DEALS.copy()
+        self.refreshed_at = 0.0
+        self.full_sync_at = 0.0
+        self._summary = None
+        self._lock = threading.RLock()
+
+    # --- Atualização -------------------------------------------------------------------------
+
+    def merge_frame(self, df):
+        """
+        Incorpora negócios já carregados (ex.: resultado de load_merged_data de uma página).
+
+        O responsável de cada negócio é substituído pelo recebido; as datas preservam a menor
+        primeira atividade e a maior última atividade conhecidas.
+        """
+        incoming = _normalize_deals(df)
+        if incoming.empty:
+            return
+        with self._lock:
+            known = self.deals.reindex(incoming.index)
+            incoming['PRIMEIRA'] = pd.concat([incoming['PRIMEIRA'], known['PRIMEIRA']], axis=1).min(axis=1)
+            incoming['ULTIMA'] = pd.concat([incoming['ULTIMA'], known['ULTIMA']], axis=1).max(axis=1)
+            self.deals = pd.concat([self.deals.drop(incoming.index, errors='ignore'), incoming])
+            self._summary = None
+
+    def _watermark(self):
+        """Data/hora da alteração mais recente conhecida (None se o diretório estiver vazio)."""
+        latest = self.deals['ULTIMA'].max() if not self.deals.empty else pd.NaT
+        return None if pd.isna(latest) else latest
+
+    def _filters(self, modified_since=None):
+        """Filtros do conector BI: categoria e, na atualização incremental, janela de DATE_MODIFY."""
+        conditions = [{
+            "fieldName": "CATEGORY_ID",
+            "values": [self.category_id],
+            "type": "INCLUDE",
+            "operator": "EQUALS"
+        }]
+        if modified_since is not None:
+            conditions.append({
+                "fieldName": MODIFIED_FIELD,
+                "values": [
+                    (modified_since - INCREMENTAL_OVERLAP).strftime("%Y-%m-%d"),
+                    (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                ],
+                "type": "INCLUDE",
+                "operator": "BETWEEN"
+            })
+        return {"dimensionsFilters": [conditions]}
+
+    def refresh(self, force=False):
+        """
+        Atualiza o diretório se o intervalo de atualização tiver passado.
+
+        Args:
+            force (bool): Atualiza imediatamente (carga completa)
+
+        Returns:
+            bool: True se houve consulta ao Bitrix24
+        """
+        with self._lock:
+            agora = time.time()
+            if not force and agora - self.refreshed_at < self.refresh_interval:
+                return False
+
+            full = force or self.full_sync_at == 0 or agora - self.full_sync_at >= FULL_RESYNC_INTERVAL
+            watermark = None if full else self._watermark()
+            full = full or watermark is None
+            # Sem o cache de load_bitrix_data: a janela de DATE_MODIFY é por dia e repetiria o resultado
+            df = fetch_bitrix_data(BITRIX_CRM_DEAL_URL, self._filters(watermark))
+            self.refreshed_at = agora
+
+            if df.empty:
+                if full:
+                    print(f"Diretório de responsáveis: carga completa da categoria {self.category_id} sem dados")
+                return True
+
+            if full:
+                self.deals = _normalize_deals(df)
+                self.full_sync_at = agora
+                self._summary = None
+            else:
+                self.merge_frame(df)
+            return True
+
+    # --- Consultas ---------------------------------------------------------------------------
+
+    def summary(self):
+        """
+        Tabela de responsáveis.
+
+        Returns:
+            pandas.DataFrame: Colunas Responsável, Primeira Atividade, Última Atividade e Negócios,
+            ordenada pelo nome
+        """
+        with self._lock:
+            if self._summary is None:
+                self._summary = (
+                    self.deals.groupby('RESPONSAVEL', sort=True)
+                    .agg(**{
+                        'Primeira Atividade': ('PRIMEIRA', 'min'),
+                        'Última Atividade': ('ULTIMA', 'max'),
+                        'Negócios': ('ULTIMA', 'size'),
+                    })
+                    .rename_axis('Responsável')
+                    .reset_index()
+                )
+            return self._summary.copy()
+
+    def names(self):
+        """Lista ordenada dos responsáveis."""
+        return self.summary()['Responsável'].tolist()
+
+    def total_deals(self):
+        """Número de negócios distintos da categoria."""
+        with self._lock:
+            return len(self.deals)
+
+
+def get_responsible_directory(category_id, refresh=True):
+    """
+    Retorna o diretório de responsáveis da categoria (compartilhado entre sessões).
+
+    Args:
+        category_id (int): Categoria (funil) do Bitrix24
+        refresh (bool): Atualiza o diretório se o intervalo de atualização tiver passado
+
+    Returns:
+        ResponsibleDirectory: Diretório em memória
+    """
+    with _directories_lock:
+        directory = _directories.get(category_id)
+        if directory is None:
+            directory = _directories[category_id] = ResponsibleDirectory(category_id)
+    if refresh:
+        try:
+            directory.refresh()
+        except Exception as e:
+            print(f"Erro ao atualizar o diretório de responsáveis (categoria {category_id}): {e}")
+    return directory
@@ -0,0 +1,335 @@
+"""
+Dicionário de estágios (STAGE_ID -> nome legível -> categoria) compartilhado pelos módulos.
+
+Os nomes e categorias vêm de duas fontes:
+- a tabela crm_status do Bitrix24, carregada uma vez e mantida em cache por 24 horas; cada funil
+  usa só as linhas das suas entidades (ENTITY_ID), pois IDs sem prefixo como NEW, WON ou
+  CONVERTED se repetem entre entidades;
+- os mapeamentos locais de cada funil (cartório, comune, CRM), que têm prioridade sobre o Bitrix.
+
+O mapeamento de Series é feito sobre os códigos distintos (pandas.Categorical): cada STAGE_ID
+é resolvido uma única vez, independentemente do número de linhas.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from api.bitrix_connector import load_bitrix_data, get_credentials
+
+# Categorias de estágio
+CATEGORIA_SUCESSO = 'Sucesso'
+CATEGORIA_EM_ANDAMENTO = 'Em Andamento'
+CATEGORIA_FALHA = 'Falha'
+CATEGORIA_DESCONHECIDA = 'Desconhecido'
+
+# Semântica dos estágios na tabela crm_status (S = sucesso, F = falha, vazio = em andamento)
+SEMANTICA_CATEGORIA = {'S': CATEGORIA_SUCESSO, 'F': CATEGORIA_FALHA}
+
+# Entidades de estágio da crm_status: DEAL_STAGE, DEAL_STAGE_<categoria> e DYNAMIC_<tipo>_STAGE_<categoria>
+PADRAO_ENTIDADE_ESTAGIO = re.compile(r'^(DEAL_STAGE(_\d+)?|DYNAMIC_\d+_STAGE_\d+)$')
+
+# Entidades da crm_status de cada funil
+ENTIDADES_FUNIL = {
+    'cartorio': ['DYNAMIC_1052_STAGE_16', 'DYNAMIC_1052_STAGE_34'],
+    'comune': ['DYNAMIC_1052_STAGE_22'],
+    'crm': ['DEAL_STAGE_1052', 'DYNAMIC_1052_STAGE_16', 'DYNAMIC_1052_STAGE_34'],
+}
+
+# --- Funil de emissões de cartório (DT1052_16 / DT1052_34) ---
+CARTORIO_EM_ANDAMENTO = {
+    'DT1052_16:NEW': 'Aguardando Certidão',
+    'DT1052_34:NEW': 'Aguardando Certidão',
+    'DT1052_16:UC_QRZ6JG': 'Busca CRC',
+    'DT1052_34:UC_68BLQ7': 'Busca CRC',
+    'DT1052_16:UC_7F0WK2': 'Apenas Ass. Req. Cliente P/ Montagem',
+    'DT1052_34:UC_HN9GMI': 'Apenas Ass. Req. Cliente P/ Montagem',
+    'DT1052_16:PREPARATION': 'Montagem Requerimento Cartório',
+    'DT1052_34:PREPARATION': 'Montagem Requerimento Cartório',
+    'DT1052_16:UC_IWZBMO': 'Solicitar Cart. Origem',
+    'DT1052_34:CLIENT': 'Certidão Emitida',
+    'DT1052_34:UC_8L5JUS': 'Solicitar Cart. Origem',
+    'DT1052_16:UC_8EGMU7': 'Cart. Origem Prioridade',
+    'DT1052_16:UC_KXHDOQ': 'Aguard. Cart. Origem',
+    'DT1052_34:UC_6KOYL5': 'Aguard. Cart. Origem',
+    'DT1052_16:CLIENT': 'Certidão Emitida',
+    'DT1052_34:UC_D0RG5P': 'Certidão Emitida',
+    'DT1052_16:UC_JRGCW3': 'Certidão Física',
+    'DT1052_34:UC_84B1S2': 'Certidão Física',
+    # Versões curtas dos nomes (sem prefixo)
+    'NEW': 'Aguard. Certidão',
+    'PREPARATION': 'Mont. Requerim.',
+    'CLIENT': 'Certidão Emitida',
+    'UC_QRZ6JG': 'Busca CRC',
+    'UC_68BLQ7': 'Busca CRC',
+    'UC_7F0WK2': 'Solic. Requerim.',
+    'UC_HN9GMI': 'Solic. Requerim.',
+    'UC_IWZBMO': 'Solic. C. Origem',
+    'UC_8L5JUS': 'Solic. C. Origem',
+    'UC_8EGMU7': 'C. Origem Prior.',
+    'UC_KXHDOQ': 'Aguard. C. Origem',
+    'UC_6KOYL5': 'Aguard. C. Origem',
+    'UC_D0RG5P': 'Certidão Emitida',
+    'UC_JRGCW3': 'Certidão Física',
+    'UC_84B1S2': 'Certidão Física'
+}
+
+CARTORIO_SUCESSO = {
+    'DT1052_16:SUCCESS': 'Certidão Entregue',
+    'DT1052_34:SUCCESS': 'Certidão Entregue',
+    'SUCCESS': 'Certidão Entregue'
+}
+
+CARTORIO_FALHA = {
+    'DT1052_16:FAIL': 'Devolução ADM',
+    'DT1052_34:FAIL': 'Devolução ADM',
+    'DT1052_16:UC_R5UEXF': 'Dev. ADM Verificado',
+    'DT1052_34:UC_Z3J98J': 'Dev. ADM Verificado',
+    'DT1052_16:UC_HYO7L2': 'Devolutiva Busca',
+    'DT1052_34:UC_5LAJNY': 'Devolutiva Busca',
+    'DT1052_16:UC_UG0UDZ': 'Solicitação Duplicada',
+    'DT1052_34:UC_LF04SU': 'Solicitação Duplicada',
+    'DT1052_16:UC_P61ZVH': 'Devolvido Requerimento',
+    'DT1052_34:UC_2BAINE': 'Devolvido Requerimento',
+    # Versões curtas dos nomes (sem prefixo)
+    'FAIL': 'Devolução ADM',
+    'UC_R5UEXF': 'Dev. ADM Verif.',
+    'UC_Z3J98J': 'Dev. ADM Verif.',
+    'UC_HYO7L2': 'Dev. Busca',
+    'UC_5LAJNY': 'Dev. Busca',
+    'UC_UG0UDZ': 'Solic. Duplicada',
+    'UC_LF04SU': 'Solic. Duplicada',
+    'UC_P61ZVH': 'Dev. Requerim.',
+    'UC_2BAINE': 'Dev. Requerim.'
+}
+
+# --- Funil COMUNE (DT1052_22) ---
+COMUNE_EM_ANDAMENTO = {
+    "DT1052_22:UC_2QZ8S2": "PENDENTE",
+    "DT1052_22:UC_E1VKYT": "PESQUISA NÃO FINALIZADA",
+    "DT1052_22:UC_MVS02R": "DEVOLUTIVA EMISSOR",
+    "DT1052_22:NEW": "SOLICITAR",
+    "DT1052_22:UC_4RQBZV": "URGENTE",
+    "DT1052_22:UC_F0IRDH": "SOLICITAR - TEM INFO",
+    "DT1052_22:PREPARATION": "AGUARDANDO COMUNE/PARÓQUIA",
+    "DT1052_22:UC_S4DFU2": "AGUARDANDO COMUNE/PARÓQUIA - TEM INFO",
+    "DT1052_22:UC_1RC076": "AGUARDANDO PDF",
+}
+
+COMUNE_SUCESSO = {
+    "DT1052_22:CLIENT": "ENTREGUE PDF",
+    "DT1052_22:SUCCESS": "DOCUMENTO FISICO ENTREGUE",
+}
+
+COMUNE_FALHA = {
+    "DT1052_22:UC_A9UEMO": "NEGATIVA COMUNE",
+    "DT1052_22:FAIL": "CANCELADO",
+}
+
+# --- Negócios do CRM (C1052) usados na análise de tempo ---
+CRM_SUCESSO = {
+    'C1052:WON': 'Certidão Entregue',
+    'C1052:SUCCESS': 'Certidão Entregue',
+    'DT1052_16:SUCCESS': 'Certidão Entregue',
+    'DT1052_34:SUCCESS': 'Certidão Entregue',
+    'DT1052_16:CLIENT': 'Certidão Entregue',
+    'DT1052_34:CLIENT': 'Certidão Entregue',
+    'CLIENT': 'Certidão Entregue',
+    'UF_CRM_DATA_CERTIDAO_FISICA_ENVIADA': 'Certidão Física Enviada',
+    'UF_CRM_DATA_CERTIDAO_EMITIDA': 'Certidão Emitida',
+    'DT1052_16:UC_JRGCW3': 'Certidão Pronta',
+    'DT1052_34:UC_84B1S2': 'Certidão Pronta',
+}
+
+CRM_EM_ANDAMENTO = {
+    'C1052:UC_LNHG7G': 'Apenas Ass. Req. Cliente P/ Montagem',
+    'C1052:PREPARATION': 'Aguardando Certidão',
+    'C1052:FINAL_INVOICE': 'Devolutiva Busca',
+    'C1052:UC_3LJ0KG': 'NÃO TRABALHAR(DESPRIORIZADA)',
+    'C1052:UC_52V88J': 'Solicitar Cart. Origem',
+    'C1052:EXECUTING': 'Aguard. Cart. Origem',
+    'C1052:UC_RJC2DD': 'PRIO2 - FAZER BUSCA CRC',
+    'C1052:UC_XM32IE': 'SEM DADOS SUFICIENTES PARA BUSCA',
+    'C1052:UC_6T0J0A': 'Busca CRC',
+    'C1052:UC_T71A6N': 'Montagem Requerimento Cartório',
+    'C1052:UC_K85YX7': 'PRIO2 - FAZER BUSCA CRC',
+}
+
+CRM_FALHA = {
+    'C1052:LOSE': 'Devolução ADM',
+    'C1052:APOLOGY': 'Dev. ADM Verificado',
+    'C1052:UC_O1L97N': 'Solicitação Duplicada',
+    'C1052:UC_Q448V8': 'Devolvido Requerimento',
+    'C1052:UC_7L6CGJ': 'CANCELADO',
+}
+
+
+def _combinar(em_andamento, sucesso, falha):
+    """Combina os mapeamentos de um funil em {STAGE_ID: (nome, categoria)}."""
+    estagios = {}
+    for mapeamento, categoria in (
+        (em_andamento, CATEGORIA_EM_ANDAMENTO),
+        (sucesso, CATEGORIA_SUCESSO),
+        (falha, CATEGORIA_FALHA),
+    ):
+        for stage_id, nome in mapeamento.items():
+            estagios[stage_id] = (nome, categoria)
+    return estagios
+
+
+# Mapeamentos locais por funil (têm prioridade sobre a tabela crm_status)
+LOCAL_STAGES = {
+    'cartorio': _combinar(CARTORIO_EM_ANDAMENTO, CARTORIO_SUCESSO, CARTORIO_FALHA),
+    'comune': _combinar(COMUNE_EM_ANDAMENTO, COMUNE_SUCESSO, COMUNE_FALHA),
+    'crm': _combinar(CRM_EM_ANDAMENTO, CRM_SUCESSO, CRM_FALHA),
+}
+
+
+@st.cache_data(ttl=86400, show_spinner=False)  # Estágios mudam raramente: cache de 24 horas
+def load_crm_status():
+    """
+    Carrega os estágios da tabela crm_status do Bitrix24 (ENTITY_ID, STATUS_ID, NAME, SEMANTICS).
+
+    Apenas entidades de estágio (DEAL_STAGE, DEAL_STAGE_<categoria>, DYNAMIC_<tipo>_STAGE_<categoria>)
+    são mantidas, sem duplicatas por (ENTITY_ID, STATUS_ID).
+
+    Returns:
+        pandas.DataFrame: Estágios do Bitrix; vazio se a tabela não puder ser carregada
+    """
+    colunas = ['ENTITY_ID', 'STATUS_ID', 'NAME', 'SEMANTICS']
+    try:
+        token, url = get_credentials()
+        df_status = load_bitrix_data(f"{url}/bitrix/tools/biconnector/pbi.php?token={token}&table=crm_status")
+    except Exception as e:
+        print(f"Não foi possível carregar crm_status: {e}")
+        return pd.DataFrame(columns=colunas)
+
+    if df_status is None or df_status.empty or 'STATUS_ID' not in df_status.columns:
+        return pd.DataFrame(columns=colunas)
+    return _estagios_crm_status(df_status)
+
+
+def _estagios_crm_status(df_status):
+    """Linhas de entidades de estágio da crm_status, deduplicadas por entidade."""
+    colunas = ['ENTITY_ID', 'STATUS_ID', 'NAME', 'SEMANTICS']
+    for coluna in colunas:
+        if coluna not in df_status.columns:
+            df_status[coluna] = None
+    df_status = df_status[colunas].dropna(subset=['ENTITY_ID', 'STATUS_ID'])
+    df_status['ENTITY_ID'] = df_status['ENTITY_ID'].astype(str).str.strip()
+    df_status['STATUS_ID'] = df_status['STATUS_ID'].astype(str).str.strip()
+    df_status = df_status[df_status['ENTITY_ID'].str.match(PADRAO_ENTIDADE_ESTAGIO)]
+    return df_status.drop_duplicates(['ENTITY_ID', 'STATUS_ID'], keep='last').reset_index(drop=True)
+
+
+def _remapear(serie, resolver, padrao, as_categorical=True):
+    """
+    Aplica `resolver` uma vez por código distinto e remonta a Series a partir dos códigos.
+
+    Códigos nulos permanecem nulos; códigos sem resolução recebem `padrao`
+    (ou o próprio código, quando padrao é None).
+    """
+    codigos = pd.Categorical(serie)
+    categorias = pd.Index(codigos.categories)
+    destinos = pd.Index([
+        destino if destino is not None else (codigo if padrao is None else padrao)
+        for codigo, destino in zip(categorias, (resolver(codigo) for codigo in categorias))
+    ], dtype=object)
+
+    novas_categorias = pd.Index(destinos.dropna().unique())
+    if len(categorias) == 0:
+        novos_codigos = np.full(len(codigos), -1)
+    else:
+        posicoes = novas_categorias.get_indexer(destinos)
+        novos_codigos = np.where(codigos.codes >= 0, posicoes[codigos.codes], -1)
+    resultado = pd.Categorical.from_codes(novos_codigos, categories=novas_categorias)
+    if not as_categorical:
+        resultado = resultado.astype(object)
+
+    index = serie.index if isinstance(serie, pd.Series) else None
+    nome = serie.name if isinstance(serie, pd.Series) else None
+    return pd.Series(resultado, index=index, name=nome)
+
+
+class StageDictionary:
+    """
+    Dicionário de estágios de um funil: STAGE_ID -> nome -> categoria.
+
+    Os mapeamentos locais têm prioridade; IDs não mapeados localmente são resolvidos
+    pela tabela crm_status (nome e semântica), quando disponível, restrita às entidades
+    do funil (`entities`, lista de ENTITY_ID; None usa todas as linhas recebidas).
+    """
+
+    def __init__(self, local_stages, crm_status=None, entities=None):
+        self._local = dict(local_stages)
+        self._crm_names = {}
+        self._crm_categories = {}
+        if crm_status is not None and entities is not None:
+            crm_status = crm_status[crm_status['ENTITY_ID'].isin(entities)]
+        if crm_status is not None and not crm_status.empty:
+            self._crm_names = dict(zip(crm_status['STATUS_ID'], crm_status['NAME']))
+            self._crm_categories = {
+                stage_id: SEMANTICA_CATEGORIA.get(semantica, CATEGORIA_EM_ANDAMENTO)
+                for stage_id, semantica in zip(crm_status['STATUS_ID'], crm_status['SEMANTICS'])
+            }
+
+    @property
+    def names(self):
+        """Mapeamento local STAGE_ID -> nome (na ordem em que os estágios foram definidos)."""
+        return {stage_id: nome for stage_id, (nome, _) in self._local.items()}
+
+    @property
+    def categories(self):
+        """Mapeamento local STAGE_ID -> categoria."""
+        return {stage_id: categoria for stage_id, (_, categoria) in self._local.items()}
+
+    def ids_by_category(self, categoria):
+        """Mapeamento STAGE_ID -> nome restrito a uma categoria (ex.: CATEGORIA_SUCESSO)."""
+        return {stage_id: nome for stage_id, (nome, cat) in self._local.items() if cat == categoria}
+
+    def name_of(self, stage_id):
+        """Nome do estágio ou None se desconhecido."""
+        chave = str(stage_id).strip()
+        if chave in self._local:
+            return self._local[chave][0]
+        return self._crm_names.get(chave)
+
+    def category_of(self, stage_id):
+        """Categoria do estágio ou None se desconhecido."""
+        chave = str(stage_id).strip()
+        if chave in self._local:
+            return self._local[chave][1]
+        return self._crm_categories.get(chave)
+
+    def map_names(self, serie, default=None, as_categorical=True):
+        """
+        Mapeia uma Series de STAGE_IDs para nomes.
+
+        Args:
+            serie (pandas.Series): STAGE_IDs
+            default (str, optional): Valor para IDs desconhecidos; None mantém o próprio ID
+                e np.nan deixa o valor nulo
+            as_categorical (bool): Se False, retorna dtype object (útil antes de groupby com várias chaves)
+        """
+        return _remapear(serie, self.name_of, default, as_categorical)
+
+    def map_categories(self, serie, default=CATEGORIA_DESCONHECIDA, as_categorical=True):
+        """Mapeia uma Series de STAGE_IDs para categorias (Sucesso/Em Andamento/Falha)."""
+        return _remapear(serie, self.category_of, default, as_categorical)
+
+
+def get_stage_dictionary(funil='cartorio', use_crm_status=True):
+    """
+    Retorna o dicionário de estágios de um funil.
+
+    Args:
+        funil (str): 'cartorio', 'comune' ou 'crm'
+        use_crm_status (bool): Se True, complementa os mapeamentos locais com os estágios das
+            entidades do funil na tabela crm_status (ENTIDADES_FUNIL)
+
+    Returns:
+        StageDictionary: Dicionário pronto para mapear Series inteiras
+    """
+    crm_status = load_crm_status() if use_crm_status else None
+    return StageDictionary(LOCAL_STAGES.get(funil, {}), crm_status, entities=ENTIDADES_FUNIL.get(funil, []))
@@ -0,0 +1,175 @@
+"""
+Snapshots locais, em formato colunar, das tabelas do BI Connector do Bitrix24.
+
+Cada tabela (crm_deal, crm_deal_uf, crm_dynamic_items_1052/1086) é baixada uma vez com
+load_bitrix_data e gravada em .cache/snapshots/<tabela>/ com um arquivo por coluna, além de
+_meta.json (colunas, linhas e data da atualização). Assim uma consulta lê só as colunas que usa
+(projeção) e as colunas de filtro (predicado), sem voltar à API. As colunas lidas ficam em
+memória enquanto o snapshot não é atualizado.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+SNAPSHOT_DIR = Path(os.getenv('BITRIX_SNAPSHOT_DIR', Path(__file__).parents[1] / '.cache' / 'snapshots'))
+
+# Apelido -> nome da tabela no BI Connector (None = resolvido com api.endpoint_resolver)
+TABLES = {
+    'deal': 'crm_deal',
+    'uf': 'crm_deal_uf',
+    'cartorio': 'crm_dynamic_items_1052',
+    'reclamacoes': None,
+}
+
+_lock = threading.Lock()
+_columns = {}
+
+
+def _table_dir(alias):
+    return SNAPSHOT_DIR / alias
+
+
+def _table_name(alias):
+    """Nome da tabela no BI Connector para o apelido."""
+    if TABLES[alias] is not None:
+        return TABLES[alias]
+    from api.bitrix_connector import get_credentials
+    from api.endpoint_resolver import resolve_table
+    from views.reclamacoes.data_loader import TABELAS_RECLAMACOES
+    token, url = get_credentials()
+    return resolve_table('reclamacoes', TABELAS_RECLAMACOES, url, token) or TABELAS_RECLAMACOES[0]
+
+
+def save_snapshot(alias, df):
+    """
+    Grava o DataFrame como snapshot colunar da tabela (substitui o anterior de forma atômica).
+
+    Returns:
+        dict: Metadados gravados
+    """
+    target = _table_dir(alias)
+    temporary = target.with_name(f".{alias}.tmp")
+    shutil.rmtree(temporary, ignore_errors=True)
+    temporary.mkdir(parents=True)
+    df = df.reset_index(drop=True)
+    for position, column in enumerate(df.columns):
+        df[column].to_pickle(temporary / f"{position}.pkl")
+    meta = {
+        'tabela': alias,
+        'colunas': [str(c) for c in df.columns],
+        'linhas': len(df),
+        'atualizado_em': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    with open(temporary / '_meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    with _lock:
+        previous = target.with_name(f".{alias}.old")
+        shutil.rmtree(previous, ignore_errors=True)
+        if target.exists():
+            os.replace(target, previous)
+        os.replace(temporary, target)
+        shutil.rmtree(previous, ignore_errors=True)
+        for key in [k for k in _columns if k[0] == alias]:
+            del _columns[key]
+    return meta
+
+
+def refresh_snapshot(alias):
+    """
+    Baixa a tabela do Bitrix24 e atualiza o snapshot local.
+
+    Returns:
+        dict: Metadados do snapshot gravado
+
+    Raises:
+        RuntimeError: Se a API não retornar dados
+    """
+    from api.bitrix_connector import get_credentials, load_bitrix_data
+    from api.endpoint_resolver import table_url
+    token, url = get_credentials()
+    df = load_bitrix_data(table_url(url, token, _table_name(alias)), force_reload=True)
+    if df is None or df.empty:
+        raise RuntimeError(f"A tabela '{alias}' não retornou dados do Bitrix24")
+    return save_snapshot(alias, df)
+
+
+def snapshot_meta(alias):
+    """Metadados do snapshot (colunas, linhas, atualizado_em) ou None se não existir."""
+    try:
+        with open(_table_dir(alias) / '_meta.json', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def available_tables():
+    """Apelidos das tabelas com snapshot gravado."""
+    return [alias for alias in TABLES if snapshot_meta(alias) is not None]
+
+
+def read_columns(alias, columns):
+    """
+    Lê colunas do snapshot (apenas as pedidas), com cache em memória por versão do snapshot.
+
+    Returns:
+        pandas.DataFrame: Colunas na ordem pedida
+    """
+    meta = snapshot_meta(alias)
+    if meta is None:
+        raise FileNotFoundError(f"Não há snapshot local da tabela '{alias}'")
+    positions = {name: i for i, name in enumerate(meta['colunas'])}
+    data = {}
+    for column in columns:
+        if column not in positions:
+            raise KeyError(f"Coluna '{column}' não existe na tabela '{alias}'")
+        key = (alias, meta['atualizado_em'], column)
+        with _lock:
+            series = _columns.get(key)
+        if series is None:
+            series = pd.read_pickle(_table_dir(alias) / f"{positions[column]}.pkl")
+            with _lock:
+                _columns[key] = series
+        data[column] = series
+    return pd.DataFrame(data, index=pd.RangeIndex(meta['linhas']))
+
+
+def convert_column(series, kind):
+    """
+    Converte a coluna para 'string', 'numeric', 'datetime' ou 'key' (valores inválidos viram nulos).
+
+    'key' é o texto normalizado usado nas junções: sem espaços e sem o sufixo '.0' que IDs
+    numéricos ganham quando a coluna vem como float.
+    """
+    if kind == 'string':
+        return series.astype('string')
+    if kind == 'key':
+        return series.astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    if kind == 'numeric':
+        return pd.to_numeric(series, errors='coerce')
+    stamps = pd.to_datetime(series, errors='coerce', format='mixed')
+    if getattr(stamps.dt, 'tz', None) is not None:
+        stamps = stamps.dt.tz_localize(None)
+    return stamps
+
+
+def read_typed_column(alias, column, kind):
+    """
+    Coluna do snapshot convertida (ver convert_column), com cache em memória
+    (a conversão é feita uma vez por versão do snapshot, não a cada consulta).
+    """
+    meta = snapshot_meta(alias)
+    if meta is None:
+        raise FileNotFoundError(f"Não há snapshot local da tabela '{alias}'")
+    key = (alias, meta['atualizado_em'], column, kind)
+    with _lock:
+        series = _columns.get(key)
+    if series is None:
+        series = convert_column(read_columns(alias, [column])[column], kind)
+        with _lock:
+            _columns[key] = series
+    return series
@@ -0,0 +1,682 @@
+"""
+Camada de dados dos tickets de suporte (MySQL) com pool de conexões e sincronização incremental.
+
+A página de Tickets abria uma conexão nova a cada renderização e lia o histórico inteiro
+(SELECT ... ORDER BY createdAt DESC + fetchall), derivando as partes da data em pandas. Aqui
+as conexões vêm de um mysql.connector.pooling.MySQLConnectionPool (criado uma vez por processo)
+e TicketQueries evita trazer o histórico para o pandas:
+- os agregados dos gráficos (departamento, dia, hora, e daí dia da semana e mês) do histórico
+  inteiro ficam num snapshot local (TicketStore: memória + .cache/tickets, sobrevive a reinícios
+  do app); cada sincronização busca apenas os tickets após a marca d'água (createdAt, id), no
+  máximo uma vez por sync_interval, e soma ao snapshot só as linhas de agregado deles; uma carga
+  completa por FULL_RESYNC_INTERVAL reflete alterações de clientes e remoções;
+- agregados de uma janela de tempo são calculados no banco com GROUP BY restrito à janela e
+  guardados em cache (cache_ttl);
+- o texto das mensagens só é buscado quando a tabela de detalhes é aberta, em páginas com
+  paginação por chave (keyset) em (createdAt, id), sem OFFSET.
+
+Com TICKETS_SQLITE_PATH definido, um banco SQLite com o mesmo esquema substitui o MySQL
+(testes e desenvolvimento local); veja sqlite_connection_factory.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+# Diretório do snapshot em disco (ignorado pelo git)
+SNAPSHOT_DIR = Path(__file__).parents[1] / '.cache' / 'tickets'
+
+DEFAULT_POOL_SIZE = 5
+POOL_NAME = 'tickets'
+
+# Intervalo mínimo entre sincronizações incrementais e entre cargas completas (segundos)
+DEFAULT_SYNC_INTERVAL = 60
+FULL_RESYNC_INTERVAL = 24 * 3600
+
+# Segundos de validade dos agregados por janela em cache
+DEFAULT_CACHE_TTL = 60
+
+TICKET_COLUMNS = ['id', 'message', 'createdAt', 'departament', 'nome', 'email', 'telefone', 'idfamilia']
+
+# Esquema mínimo usado pelo substituto SQLite (mesmos nomes de tabelas e colunas do MySQL)
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    nome TEXT, email TEXT, telefone TEXT, idfamilia TEXT
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    id INTEGER PRIMARY KEY,
+    message TEXT,
+    createdAt TEXT,
+    departament TEXT,
+    customerId INTEGER REFERENCES customers(id)
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (createdAt, id);
+"""
+
+_pool = None
+_pool_lock = threading.Lock()
+_store = None
+_store_lock = threading.Lock()
+_queries = None
+_queries_lock = threading.Lock()
+
+# Expressões de data por banco: dia (DATE) e hora (0-23) de t.createdAt
+DIALECTS = {
+    'mysql': {
+        'placeholder': '%s',
+        'day': "DATE(t.createdAt)",
+        'hour': "HOUR(t.createdAt)",
+    },
+    'sqlite': {
+        'placeholder': '?',
+        'day': "date(t.createdAt)",
+        'hour': "CAST(strftime('%H', t.createdAt) AS INTEGER)",
+    },
+}
+
+# Tamanho padrão da página da tabela de detalhes
+DEFAULT_PAGE_SIZE = 50
+
+# Dias da semana na ordem de dayofweek (segunda = 0), como em Series.dt.day_name()
+DIAS_SEMANA = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _parameter(value, placeholder):
+    """Converte datas para o driver (SQLite guarda texto 'AAAA-MM-DD HH:MM:SS')."""
+    value = pd.Timestamp(value).to_pydatetime()
+    return str(value) if placeholder == '?' else value
+
+
+def _execute(connect, query, params=()):
+    """Executa a consulta numa conexão de `connect` e devolve o resultado como DataFrame."""
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, tuple(params))
+        columns = [column[0] for column in cursor.description]
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def _grain_query(dialect, where):
+    """GROUP BY (departamento, dia, hora) dos tickets que atendem a `where`."""
+    day, hour = dialect['day'], dialect['hour']
+    return f"""
+    SELECT t.departament AS departament, {day} AS dia, {hour} AS hora, COUNT(*) AS tickets
+    FROM tickets t
+    {where}
+    GROUP BY t.departament, {day}, {hour}
+    """
+
+
+def _typed_grain(grain):
+    """Tipos da tabela grain: dia como data, hora e tickets inteiros."""
+    grain['dia'] = pd.to_datetime(grain['dia'])
+    grain['hora'] = grain['hora'].astype(int)
+    grain['tickets'] = grain['tickets'].astype(int)
+    return grain
+
+
+def get_connection_pool():
+    """
+    Retorna o pool de conexões MySQL (criado na primeira chamada, com as credenciais de st.secrets).
+
+    Returns:
+        mysql.connector.pooling.MySQLConnectionPool: Pool compartilhado pelo processo
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import streamlit as st
+            from mysql.connector import pooling
+            _pool = pooling.MySQLConnectionPool(
+                pool_name=POOL_NAME,
+                pool_size=int(os.getenv('TICKETS_POOL_SIZE', DEFAULT_POOL_SIZE)),
+                pool_reset_session=True,
+                host=st.secrets["DB_HOST"],
+                port=int(st.secrets["DB_PORT"]),
+                user=st.secrets["DB_USER"],
+                password=st.secrets["DB_PASSWORD"],
+                database=st.secrets["DB_NAME"]
+            )
+        return _pool
+
+
+def mysql_connection_factory():
+    """Fábrica de conexões do pool MySQL (close() devolve a conexão ao pool)."""
+    return get_connection_pool().get_connection()
+
+
+def sqlite_connection_factory(path):
+    """
+    Fábrica de conexões para um banco SQLite com o esquema de tickets (criado se não existir).
+
+    Args:
+        path (str): Caminho do arquivo SQLite (ou ':memory:' para uma conexão por chamada)
+    """
+    def connect():
+        conn = sqlite3.connect(path)
+        conn.executescript(SQLITE_SCHEMA)
+        return conn
+    return connect
+
+
+class TicketStore:
+    """
+    Snapshot local dos agregados do histórico de tickets, sincronizado de forma incremental.
+
+    Guarda a tabela `grain` de TicketAggregates, os nomes distintos de clientes e o createdAt dos
+    tickets dos últimos 7 dias. A carga completa calcula o snapshot no banco (GROUP BY); as
+    sincronizações seguintes buscam só os tickets após a marca d'água (createdAt, id) e somam as
+    linhas de grain deles, de modo que o custo por sincronização não cresce com o histórico.
+
+    Args:
+        connect (callable): Retorna uma conexão DB-API (ex.: mysql_connection_factory)
+        dialect (str): 'mysql' ou 'sqlite' (expressões de data e marcador de parâmetro)
+        snapshot_path (Path, optional): Arquivo do snapshot em disco (None = apenas memória)
+        sync_interval (int): Segundos entre sincronizações incrementais
+    """
+
+    def __init__(self, connect, dialect='mysql', snapshot_path=None, sync_interval=DEFAULT_SYNC_INTERVAL):
+        self.connect = connect
+        self.dialect = DIALECTS[dialect]
+        self.placeholder = self.dialect['placeholder']
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.sync_interval = sync_interval
+        self.synced_at = 0.0
+        self.full_sync_at = 0.0
+        self.grain = None
+        self.clientes = set()
+        self.recentes = pd.Series(dtype='datetime64[ns]')
+        self.watermark = None
+        self._lock = threading.RLock()
+        self._load_snapshot()
+
+    # --- Snapshot em disco -------------------------------------------------------------------
+
+    def _load_snapshot(self):
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return
+        try:
+            saved = pd.read_pickle(self.snapshot_path)
+            self.grain = saved['grain']
+            self.clientes = saved['clientes']
+            self.recentes = saved['recentes']
+            self.watermark = saved['watermark']
+            self.full_sync_at = saved.get('full_sync_at', 0.0)
+        except Exception as e:
+            print(f"Snapshot de tickets ignorado ({self.snapshot_path}): {e}")
+
+    def _save_snapshot(self):
+        if self.snapshot_path is None:
+            return
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.snapshot_path.with_suffix('.tmp')
+            pd.to_pickle({
+                'grain': self.grain, 'clientes': self.clientes, 'recentes': self.recentes,
+                'watermark': self.watermark, 'full_sync_at': self.full_sync_at,
+            }, temporary)
+            os.replace(temporary, self.snapshot_path)
+        except Exception as e:
+            print(f"Erro ao gravar o snapshot de tickets: {e}")
+
+    # --- Sincronização -----------------------------------------------------------------------
+
+    def _watermark_where(self, watermark, after):
+        """Tickets depois da marca d'água (after=True) ou até ela, inclusive (after=False)."""
+        p = self.placeholder
+        created, ticket_id = watermark
+        created = _parameter(created, p)
+        if after:
+            condition = f"(t.createdAt > {p} OR (t.createdAt = {p} AND t.id > {p}))"
+        else:
+            condition = f"(t.createdAt < {p} OR (t.createdAt = {p} AND t.id <= {p}))"
+        return condition, [created, created, int(ticket_id)]
+
+    def _full_load(self, corte):
+        """Refaz o snapshot no banco, limitado ao ticket mais recente no início da carga."""
+        latest = _execute(self.connect, "SELECT t.createdAt, t.id FROM tickets t ORDER BY t.createdAt DESC, t.id DESC LIMIT 1")
+        if latest.empty:
+            self.grain = _typed_grain(pd.DataFrame(columns=['departament', 'dia', 'hora', 'tickets']))
+            self.clientes = set()
+            self.recentes = pd.Series(dtype='datetime64[ns]')
+            self.watermark = None
+            return
+        watermark = (pd.Timestamp(latest['createdAt'].iloc[0]), int(latest['id'].iloc[0]))
+        condition, params = self._watermark_where(watermark, after=False)
+        where = f"WHERE {condition}"
+
+        grain = _typed_grain(_execute(self.connect, _grain_query(self.dialect, where), params))
+        clientes = _execute(self.connect, f"""
+        SELECT DISTINCT c.nome AS nome
+        FROM tickets t
+        JOIN customers c ON t.customerId = c.id
+        {where}
+        """, params)
+        recentes = _execute(
+            self.connect,
+            f"SELECT t.createdAt FROM tickets t {where} AND t.createdAt >= {self.placeholder}",
+            params + [_parameter(corte, self.placeholder)]
+        )
+        self.grain = grain
+        self.clientes = set(clientes['nome'].dropna())
+        self.recentes = pd.to_datetime(recentes['createdAt']).reset_index(drop=True)
+        self.watermark = watermark
+
+    def _incremental(self, corte):
+        """Soma ao snapshot os tickets posteriores à marca d'água; retorna quantos eram novos."""
+        if self.watermark is None:
+            where, params = "", []
+        else:
+            condition, params = self._watermark_where(self.watermark, after=True)
+            where = f"WHERE {condition}"
+        novos = _execute(self.connect, f"""
+        SELECT t.id, t.createdAt, t.departament, c.nome
+        FROM tickets t
+        LEFT JOIN customers c ON t.customerId = c.id
+        {where}
+        ORDER BY t.createdAt, t.id
+        """, params)
+        self.recentes = self.recentes[self.recentes >= corte].reset_index(drop=True)
+        if novos.empty:
+            return 0
+
+        created = pd.to_datetime(novos['createdAt'])
+        linhas = (
+            pd.DataFrame({'departament': novos['departament'], 'dia': created.dt.normalize(),
+                          'hora': created.dt.hour, 'tickets': 1})
+            .groupby(['departament', 'dia', 'hora'], dropna=False)['tickets'].sum().reset_index()
+        )
+        self.grain = (
+            pd.concat([self.grain, linhas], ignore_index=True)
+            .groupby(['departament', 'dia', 'hora'], dropna=False)['tickets'].sum().reset_index()
+        )
+        self.clientes |= set(novos['nome'].dropna())
+        self.recentes = pd.concat([self.recentes, created[created >= corte]], ignore_index=True)
+        self.watermark = (created.iloc[-1], int(novos['id'].iloc[-1]))
+        return len(novos)
+
+    def sync(self, force=False):
+        """
+        Sincroniza o snapshot se o intervalo tiver passado.
+
+        Args:
+            force (bool): Sincroniza imediatamente com carga completa
+
+        Returns:
+            int: Número de tickets novos (ou -1 na carga completa); 0 se não houve consulta
+        """
+        with self._lock:
+            agora = time.time()
+            if not force and self.grain is not None and agora - self.synced_at < self.sync_interval:
+                return 0
+
+            corte = pd.Timestamp(datetime.now() - timedelta(days=7))
+            if force or self.grain is None or agora - self.full_sync_at >= FULL_RESYNC_INTERVAL:
+                self._full_load(corte)
+                self.full_sync_at = agora
+                novos = -1
+            else:
+                novos = self._incremental(corte)
+            self.synced_at = agora
+            if novos:
+                self._save_snapshot()
+            return novos
+
+    def aggregates(self):
+        """
+        Agregados do histórico inteiro a partir do snapshot (sincronizado se o intervalo tiver passado).
+
+        Returns:
+            TicketAggregates: Contagens por (departamento, dia, hora) e totais
+        """
+        try:
+            self.sync()
+        except Exception as e:
+            # Sem banco, mantém o último snapshot válido
+            if self.grain is None:
+                raise
+            print(f"Erro ao sincronizar tickets; usando o snapshot local: {e}")
+        with self._lock:
+            corte = pd.Timestamp(datetime.now() - timedelta(days=7))
+            return TicketAggregates(
+                self.grain.copy(),
+                total=int(self.grain['tickets'].sum()),
+                clientes_unicos=len(self.clientes),
+                ultimos_7_dias=int((self.recentes >= corte).sum()),
+            )
+
+
+def get_ticket_store():
+    """
+    Retorna o snapshot de tickets compartilhado entre sessões (MySQL ou, com TICKETS_SQLITE_PATH, SQLite).
+
+    Returns:
+        TicketStore: Snapshot sincronizado sob demanda
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            sqlite_path = os.getenv('TICKETS_SQLITE_PATH')
+            if sqlite_path:
+                _store = TicketStore(sqlite_connection_factory(sqlite_path), dialect='sqlite')
+            else:
+                _store = TicketStore(mysql_connection_factory, snapshot_path=SNAPSHOT_DIR / 'tickets.pkl')
+        return _store
+
+
+class TicketAggregates:
+    """
+    Agregados dos tickets calculados no banco: contagens por (departamento, dia, hora) e totais.
+
+    Todas as visões dos gráficos (departamento, dia da semana, hora, mês, mapa de calor) derivam
+    da tabela `grain`, que tem no máximo departamentos × dias × 24 linhas.
+    """
+
+    def __init__(self, grain, total, clientes_unicos, ultimos_7_dias):
+        self.grain = grain
+        self.total = total
+        self.clientes_unicos = clientes_unicos
+        self.ultimos_7_dias = ultimos_7_dias
+
+    def by_department(self):
+        """Tickets por departamento (colunas Departamento e Quantidade, em ordem decrescente)."""
+        counts = self.grain.groupby('departament')['tickets'].sum()
+        counts = counts.sort_values(ascending=False, kind='mergesort')
+        return pd.DataFrame({'Departamento': counts.index, 'Quantidade': counts.to_numpy()})
+
+    def departments(self):
+        """Departamentos distintos (sem nulos), em ordem alfabética."""
+        return sorted(self.grain['departament'].dropna().unique().tolist())
+
+    def on_day(self, day):
+        """Tickets criados no dia."""
+        return int(self.grain.loc[self.grain['dia'] == pd.Timestamp(day).normalize(), 'tickets'].sum())
+
+    def days_of_month(self):
+        """Número de dias do mês distintos com tickets (como df['dia'].nunique())."""
+        return int(self.grain['dia'].dt.day.nunique())
+
+    def by_weekday(self):
+        """Tickets por dia da semana (índice em inglês, de segunda a domingo)."""
+        counts = self.grain.groupby(self.grain['dia'].dt.dayofweek)['tickets'].sum()
+        return pd.Series(counts.reindex(range(7), fill_value=0).to_numpy(), index=DIAS_SEMANA)
+
+    def by_hour(self):
+        """Tickets por hora do dia (0-23, horas sem tickets com 0)."""
+        return self.grain.groupby('hora')['tickets'].sum().reindex(range(24), fill_value=0)
+
+    def by_month(self):
+        """Tickets por mês (colunas ano, mes e tickets, em ordem cronológica)."""
+        dia = self.grain['dia']
+        return (
+            self.grain.groupby([dia.dt.year.rename('ano'), dia.dt.month.rename('mes')])['tickets']
+            .sum().reset_index()
+        )
+
+    def heatmap(self):
+        """Tabela dia da semana (linhas, segunda a domingo) × hora (colunas com tickets)."""
+        table = self.grain.pivot_table(
+            values='tickets', index=self.grain['dia'].dt.dayofweek, columns='hora',
+            aggfunc='sum', fill_value=0
+        )
+        table = table.reindex(range(7), fill_value=0)
+        table.index = DIAS_SEMANA
+        return table
+
+
+class TicketQueries:
+    """
+    Consultas agregadas e paginadas dos tickets, executadas no banco.
+
+    Args:
+        connect (callable): Retorna uma conexão DB-API (ex.: mysql_connection_factory)
+        dialect (str): 'mysql' ou 'sqlite' (expressões de data e marcador de parâmetro)
+        cache_ttl (int): Segundos de validade dos agregados por janela em cache
+        store (TicketStore, optional): Snapshot incremental que responde pelos agregados sem janela
+    """
+
+    def __init__(self, connect, dialect='mysql', cache_ttl=DEFAULT_CACHE_TTL, store=None):
+        self.connect = connect
+        self.dialect = DIALECTS[dialect]
+        self.placeholder = self.dialect['placeholder']
+        self.cache_ttl = cache_ttl
+        self.store = store
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _parameter(self, value):
+        return _parameter(value, self.placeholder)
+
+    def _execute(self, query, params=()):
+        return _execute(self.connect, query, params)
+
+    def _where(self, start=None, end=None, departament=None, before=None):
+        """Cláusula WHERE e parâmetros para janela de tempo, departamento e cursor (createdAt, id)."""
+        p = self.placeholder
+        conditions, params = [], []
+        if start is not None:
+            conditions.append(f"t.createdAt >= {p}")
+            params.append(self._parameter(start))
+        if end is not None:
+            conditions.append(f"t.createdAt < {p}")
+            params.append(self._parameter(end))
+        if departament is not None:
+            conditions.append(f"t.departament = {p}")
+            params.append(departament)
+        if before is not None:
+            created, ticket_id = before
+            created = self._parameter(created)
+            conditions.append(f"(t.createdAt < {p} OR (t.createdAt = {p} AND t.id < {p}))")
+            params.extend([created, created, int(ticket_id)])
+        return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    # --- Agregados ---------------------------------------------------------------------------
+
+    def aggregates(self, start=None, end=None):
+        """
+        Agregados da janela [start, end) (None = sem limite).
+
+        Sem janela e com `store`, vêm do snapshot incremental; com janela, são calculados no banco
+        (custo limitado à janela) e guardados em cache por cache_ttl.
+
+        Returns:
+            TicketAggregates: Contagens por (departamento, dia, hora) e totais
+        """
+        if start is None and end is None and self.store is not None:
+            return self.store.aggregates()
+
+        key = (start, end)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.time() - cached[0] < self.cache_ttl:
+                return cached[1]
+
+        where, params = self._where(start, end)
+        grain = _typed_grain(self._execute(_grain_query(self.dialect, where), params))
+
+        p = self.placeholder
+        semana_passada = self._parameter(datetime.now() - timedelta(days=7))
+        totals = self._execute(f"""
+        SELECT COUNT(*) AS total,
+               COUNT(DISTINCT c.nome) AS clientes_unicos,
+               SUM(CASE WHEN t.createdAt >= {p} THEN 1 ELSE 0 END) AS ultimos_7_dias
+        FROM tickets t
+        LEFT JOIN customers c ON t.customerId = c.id
+        {where}
+        """, [semana_passada] + params).iloc[0]
+
+        result = TicketAggregates(
+            grain,
+            total=int(totals['total']),
+            clientes_unicos=int(totals['clientes_unicos']),
+            ultimos_7_dias=int(totals['ultimos_7_dias'] or 0),
+        )
+        with self._lock:
+            self._cache[key] = (time.time(), result)
+        return result
+
+    def count(self, start=None, departament=None):
+        """
+        Número de tickets e período (primeiro e último createdAt) de um filtro da tabela de detalhes.
+
+        Returns:
+            tuple: (quantidade, primeiro createdAt, último createdAt)
+        """
+        where, params = self._where(start=start, departament=departament)
+        row = self._execute(
+            f"SELECT COUNT(*) AS n, MIN(t.createdAt) AS inicio, MAX(t.createdAt) AS fim FROM tickets t {where}",
+            params
+        ).iloc[0]
+        return int(row['n']), pd.to_datetime(row['inicio']), pd.to_datetime(row['fim'])
+
+    # --- Detalhes (mensagens) ----------------------------------------------------------------
+
+    def page(self, start=None, departament=None, before=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Página de tickets com mensagem, do mais recente para o mais antigo (paginação por chave).
+
+        Args:
+            start (datetime, optional): Apenas tickets criados a partir desta data
+            departament (str, optional): Apenas tickets do departamento
+            before (tuple, optional): Cursor (createdAt, id) do último ticket da página anterior
+            limit (int): Tamanho da página
+
+        Returns:
+            tuple: (DataFrame da página, cursor da próxima página ou None se for a última)
+        """
+        where, params = self._where(start=start, departament=departament, before=before)
+        df = self._execute(f"""
+        SELECT t.id, t.message, t.createdAt, t.departament,
+               c.nome, c.email, c.telefone, c.idfamilia
+        FROM tickets t
+        LEFT JOIN customers c ON t.customerId = c.id
+        {where}
+        ORDER BY t.createdAt DESC, t.id DESC
+        LIMIT {int(limit) + 1}
+        """, params)
+        if not df.empty:
+            df['createdAt'] = pd.to_datetime(df['createdAt'])
+        has_next = len(df) > limit
+        df = df.iloc[:limit]
+        cursor = (df['createdAt'].iloc[-1], df['id'].iloc[-1]) if has_next else None
+        return df, cursor
+
+    def by_ids(self, ids, start=None, departament=None):
+        """
+        Tickets com mensagem pelos IDs (ex.: resultados da busca), respeitando os filtros.
+
+        Returns:
+            pandas.DataFrame: Tickets encontrados, na ordem de `ids`
+        """
+        ids = [int(i) for i in ids]
+        if not ids:
+            return pd.DataFrame(columns=TICKET_COLUMNS)
+        where, params = self._where(start=start, departament=departament)
+        marks = ', '.join([self.placeholder] * len(ids))
+        where = f"{where} AND t.id IN ({marks})" if where else f"WHERE t.id IN ({marks})"
+        df = self._execute(f"""
+        SELECT t.id, t.message, t.createdAt, t.departament,
+               c.nome, c.email, c.telefone, c.idfamilia
+        FROM tickets t
+        LEFT JOIN customers c ON t.customerId = c.id
+        {where}
+        """, params + ids)
+        if df.empty:
+            return df
+        df['createdAt'] = pd.to_datetime(df['createdAt'])
+        order = {ticket_id: position for position, ticket_id in enumerate(ids)}
+        return df.sort_values('id', key=lambda s: s.map(order)).reset_index(drop=True)
+
+    @staticmethod
+    def _index_date(value):
+        """createdAt como texto comparável no índice de busca ('AAAA-MM-DD HH:MM:SS')."""
+        return str(pd.Timestamp(value).to_pydatetime())
+
+    def search(self, index, text, start=None, departament=None, limit=200):
+        """
+        Busca tickets pela mensagem no índice de texto, com a janela e o departamento aplicados
+        dentro da consulta ao índice (o limite vale para os tickets que atendem aos filtros).
+
+        Returns:
+            pandas.DataFrame: Tickets encontrados, do mais relevante para o menos relevante
+        """
+        results = index.search(
+            text, limit=limit,
+            since=self._index_date(start) if start is not None else None,
+            category=departament
+        )
+        return self.by_ids([key for key, _ in results], start=start, departament=departament)
+
+    def sync_search_index(self, index, batch=5000):
+        """
+        Envia ao índice de texto (utils.text_index.TextIndex) as mensagens criadas após a marca
+        d'água (createdAt, id) salva no próprio índice, em lotes em ordem crescente, com
+        createdAt e departamento para os filtros da busca.
+
+        Returns:
+            int: Número de mensagens indexadas
+        """
+        p = self.placeholder
+        watermark = index.get_meta('tickets_watermark')
+        total = 0
+        while True:
+            where, params = "", []
+            if watermark:
+                created, ticket_id = watermark.rsplit('|', 1)
+                created = self._parameter(created)
+                where = f"WHERE t.createdAt > {p} OR (t.createdAt = {p} AND t.id > {p})"
+                params = [created, created, int(ticket_id)]
+            df = self._execute(f"""
+            SELECT t.id, t.createdAt, t.departament, t.message
+            FROM tickets t
+            {where}
+            ORDER BY t.createdAt, t.id
+            LIMIT {int(batch)}
+            """, params)
+            if df.empty:
+                return total
+            total += index.upsert(zip(df['id'], df['message'], df['createdAt'].map(self._index_date),
+                                      df['departament']))
+            last = df.iloc[-1]
+            watermark = f"{pd.Timestamp(last['createdAt'])}|{int(last['id'])}"
+            index.set_meta('tickets_watermark', watermark)
+            if len(df) < batch:
+                return total
+
+    def iter_pages(self, start=None, departament=None, limit=500):
+        """Percorre todas as páginas de um filtro (ex.: exportação CSV)."""
+        before = None
+        while True:
+            df, before = self.page(start=start, departament=departament, before=before, limit=limit)
+            yield df
+            if before is None:
+                return
+
+
+def get_ticket_queries():
+    """
+    Retorna a camada de consultas dos tickets compartilhada entre sessões (MySQL ou SQLite).
+
+    Returns:
+        TicketQueries: Consultas agregadas e paginadas
+    """
+    global _queries
+    with _queries_lock:
+        if _queries is None:
+            sqlite_path = os.getenv('TICKETS_SQLITE_PATH')
+            if sqlite_path:
+                _queries = TicketQueries(sqlite_connection_factory(sqlite_path), dialect='sqlite',
+                                         store=get_ticket_store())
+            else:
+                _queries = TicketQueries(mysql_connection_factory, dialect='mysql', store=get_ticket_store())
+        return _queries
@@ -11,7 +11,8 @@ utils_path = os.path.join(Path(__file__).parents[1], 'utils')
 sys.path.insert(0, str(utils_path))
 
 # Agora importa diretamente do arquivo data_processor
-from data_processor import format_status_text
+from data_processor import format_status_text, status_codes
+from utils.status_cube import get_status_cube
 
 def render_styled_table(df, height=None):
     """
@@ -31,21 +32,16 @@ def render_styled_table(df, height=None):
     
     # Verificar se o campo de status existe
     if 'UF_CRM_HIGILIZACAO_STATUS' in styled_df.columns:
-        # Transformar o campo de status em HTML colorido
-        def criar_status_formatado(status):
-            if pd.isna(status) or status == '':
-                return '<span style="background-color: #ef5350; color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.85em;">PENDÊNCIA</span>'
-            
-            status = str(status).upper()
-            if status == 'COMPLETO':
-                return '<span style="background-color: #4caf50; color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.85em;">COMPLETO</span>'
-            elif status == 'INCOMPLETO':
-                return '<span style="background-color: #ff9800; color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.85em;">INCOMPLETO</span>'
-            else:
-                return '<span style="background-color: #ef5350; color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.85em;">PENDÊNCIA</span>'
-        
-        # Aplicar a função para criar os status formatados
-        styled_df['UF_CRM_HIGILIZACAO_STATUS'] = styled_df['UF_CRM_HIGILIZACAO_STATUS'].apply(criar_status_formatado)
+        # Transformar o campo de status em HTML colorido (um rótulo por código de status_codes;
+        # vazio, nulo e valores não reconhecidos aparecem como PENDÊNCIA)
+        estilo = 'color: white; padding: 3px 8px; border-radius: 4px; font-size: 0.85em;'
+        status_formatados = np.array([
+            f'<span style="background-color: #4caf50; {estilo}">COMPLETO</span>',
+            f'<span style="background-color: #ff9800; {estilo}">INCOMPLETO</span>',
+            f'<span style="background-color: #ef5350; {estilo}">PENDÊNCIA</span>',
+        ], dtype=object)
+        codigos = np.minimum(status_codes(styled_df['UF_CRM_HIGILIZACAO_STATUS']), 2)
+        styled_df['UF_CRM_HIGILIZACAO_STATUS'] = status_formatados[codigos]
     
     # Usar dataframe nativo do Streamlit com configuração de altura
     st.dataframe(
@@ -63,12 +59,13 @@ def render_styled_table(df, height=None):
         }
     )
 
-def create_responsible_status_table(df):
+def create_responsible_status_table(df, data_version=None):
     """
     Cria tabela de status por responsável
     
     Args:
         df (pandas.DataFrame): DataFrame com os dados
+        data_version (hashable, optional): Versão dos dados (ver utils.status_cube.get_status_cube)
         
     Returns:
         pandas.DataFrame: Tabela cruzada de responsáveis por status
@@ -80,28 +77,10 @@ def create_responsible_status_table(df):
     if 'ASSIGNED_BY_NAME' not in df.columns or 'UF_CRM_HIGILIZACAO_STATUS' not in df.columns:
         return pd.DataFrame()
     
-    # Preencher valores nulos no status como PENDENCIA
-    df['UF_CRM_HIGILIZACAO_STATUS'] = df['UF_CRM_HIGILIZACAO_STATUS'].fillna('PENDENCIA')
-    
-    # Criar tabela cruzada sem margens (sem linha e coluna de total)
-    cross_tab = pd.crosstab(
-        index=df['ASSIGNED_BY_NAME'],
-        columns=df['UF_CRM_HIGILIZACAO_STATUS'],
-        margins=False
-    )
-    
-    # Garantir que todas as colunas existem
-    for status in ['COMPLETO', 'INCOMPLETO', 'PENDENCIA']:
-        if status not in cross_tab.columns:
-            cross_tab[status] = 0
-    
-    # Reordenar as colunas
-    ordered_columns = ['PENDENCIA', 'INCOMPLETO', 'COMPLETO']
-    cross_tab = cross_tab[ordered_columns]
-    
-    return cross_tab
+    # Fatia do cubo de status (status nulos contam como PENDENCIA; colunas PENDENCIA, INCOMPLETO, COMPLETO)
+    return get_status_cube(df, data_version=data_version).status_by_responsible()
 
-def create_pendencias_table(df):
+def create_pendencias_table(df, data_version=None):
     """
     Cria uma tabela de pendências por responsável, contando todas as ocorrências de 'NÃO', 
     'NÃO SELECIONADO' ou campos vazios em cada coluna
@@ -109,82 +88,16 @@ def create_pendencias_table(df):
     if df.empty:
         return pd.DataFrame()
 
-    # Campos específicos de higienização com seus nomes e IDs
-    campos_higilizacao = {
-        'UF_CRM_1741183785848': 'Documentação',        # DOCUMENTAÇÃO PEND/INFOS
-        'UF_CRM_1741183721969': 'Cadastro',           # CADASTRO NA ARVORE HIGIELIZADO
-        'UF_CRM_1741183685327': 'Estrutura',          # ESTRUTURA ARVORE HIGIENIZA
-        'UF_CRM_1741183828129': 'Requerimento',       # REQUERIMENTO
-        'UF_CRM_1741198696': 'Emissões'               # EMISSÕES BRASILEIRAS BITRIX24
-    }
-
-    # Lista de valores que contam como pendência
-    valores_pendencia = [
-        'NÃO', 'Não', 'NAO', 'nao', 'não', 'N', 'n',
-        'NÃO SELECIONADO', 'Não Selecionado', 'NAO SELECIONADO', 
-        'Nao Selecionado', 'não selecionado', 'não selecionada',
-        'n/s', 'N/S', False, 'false', 'FALSE'
-    ]
-
-    # Inicializar dicionário para armazenar contagens
-    contagens = {}
-
-    # Para cada responsável
-    for responsavel in df['ASSIGNED_BY_NAME'].unique():
-        # Filtrar dados do responsável
-        df_resp = df[df['ASSIGNED_BY_NAME'] == responsavel]
-        
-        contagens_resp = {}
-        total_pendencias = 0
-        
-        # Para cada campo específico
-        for campo_id, nome_campo in campos_higilizacao.items():
-            # Verificar se o campo existe no DataFrame
-            if campo_id in df_resp.columns:
-                # Criar máscara para identificar registros que são 'NÃO', 'NÃO SELECIONADO' ou equivalentes
-                mascara_nao = df_resp[campo_id].astype(str).str.upper().isin([str(v).upper() for v in valores_pendencia])
-                
-                # Máscara para valores vazios ou nulos
-                mascara_vazio = (
-                    df_resp[campo_id].isna() | 
-                    (df_resp[campo_id].astype(str).str.strip() == '') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NAN') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NONE') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NULL')
-                )
-                
-                # Contar todas as ocorrências de pendências
-                pendencias = (mascara_nao | mascara_vazio).sum()
-                contagens_resp[nome_campo] = pendencias
-                total_pendencias += pendencias
-            else:
-                contagens_resp[nome_campo] = 0
-        
-        # Adicionar ao dicionário principal
-        contagens[responsavel] = {**contagens_resp, 'Total': total_pendencias}
-
-    # Converter para DataFrame
-    result_df = pd.DataFrame.from_dict(contagens, orient='index')
-    
-    # Reordenar as colunas para ter Total por último
-    cols = [col for col in result_df.columns if col != 'Total'] + ['Total']
-    result_df = result_df[cols]
-    
-    # Ordenar por Total em ordem decrescente
-    result_df = result_df.sort_values('Total', ascending=False)
-    
-    # Resetar o índice e renomear a coluna do índice
-    result_df = result_df.reset_index()
-    result_df = result_df.rename(columns={'index': 'Responsável'})
-
-    return result_df
+    # Contagens pré-agregadas por responsável e campo de higienização (ordenadas pelo Total)
+    return get_status_cube(df, data_version=data_version).field_counts('PENDENCIAS')
 
-def create_production_table(df):
+def create_production_table(df, data_version=None):
     """
     Cria tabela de produção geral, contando todas as ocorrências de 'SIM' em cada campo
     
     Args:
         df (pandas.DataFrame): DataFrame com os dados
+        data_version (hashable, optional): Versão dos dados (ver utils.status_cube.get_status_cube)
         
     Returns:
         pandas.DataFrame: Tabela com produção por responsável
@@ -192,58 +105,5 @@ def create_production_table(df):
     if df.empty:
         return pd.DataFrame()
 
-    # Campos específicos de higienização com seus nomes e IDs
-    campos_higilizacao = {
-        'UF_CRM_1741183785848': 'Documentação',        # DOCUMENTAÇÃO PEND/INFOS
-        'UF_CRM_1741183721969': 'Cadastro',           # CADASTRO NA ARVORE HIGIELIZADO
-        'UF_CRM_1741183685327': 'Estrutura',          # ESTRUTURA ARVORE HIGIENIZA
-        'UF_CRM_1741183828129': 'Requerimento',       # REQUERIMENTO
-        'UF_CRM_1741198696': 'Emissões'               # EMISSÕES BRASILEIRAS BITRIX24
-    }
-
-    # Lista de valores que contam como concluído
-    valores_sim = ['SIM', 'Sim', 'sim', 'S', 's', True, 'true', 'TRUE']
-
-    # Inicializar dicionário para armazenar contagens
-    contagens = {}
-
-    # Para cada responsável
-    for responsavel in df['ASSIGNED_BY_NAME'].unique():
-        # Filtrar dados do responsável
-        df_resp = df[df['ASSIGNED_BY_NAME'] == responsavel]
-        
-        contagens_resp = {}
-        total_concluidos = 0
-        
-        # Para cada campo específico
-        for campo_id, nome_campo in campos_higilizacao.items():
-            # Verificar se o campo existe no DataFrame
-            if campo_id in df_resp.columns:
-                # Criar máscara para identificar registros que são 'SIM' ou equivalentes
-                mascara_sim = df_resp[campo_id].astype(str).str.upper().isin([str(v).upper() for v in valores_sim])
-                
-                # Contar todas as ocorrências de SIM
-                concluidos = mascara_sim.sum()
-                contagens_resp[nome_campo] = concluidos
-                total_concluidos += concluidos
-            else:
-                contagens_resp[nome_campo] = 0
-        
-        # Adicionar ao dicionário principal
-        contagens[responsavel] = {**contagens_resp, 'Total': total_concluidos}
-
-    # Converter para DataFrame
-    result_df = pd.DataFrame.from_dict(contagens, orient='index')
-    
-    # Reordenar as colunas para ter Total por último
-    cols = [col for col in result_df.columns if col != 'Total'] + ['Total']
-    result_df = result_df[cols]
-    
-    # Ordenar por Total em ordem decrescente
-    result_df = result_df.sort_values('Total', ascending=False)
-    
-    # Resetar o índice e renomear a coluna do índice
-    result_df = result_df.reset_index()
-    result_df = result_df.rename(columns={'index': 'Responsável'})
-
-    return result_df 
\ No newline at end of file
+    # Contagens pré-agregadas por responsável e campo de higienização (ordenadas pelo Total)
+    return get_status_cube(df, data_version=data_version).field_counts('SIM')
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Permite importar os pacotes do projeto (api, utils, views) ao rodar o pytest da raiz ou de tests/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,20 @@
+"""Status de conclusão por negócio calculado sobre a matriz do checklist."""
+import pandas as pd
+
+from utils.checklist_score import HIGIENIZACAO_FIELDS, ChecklistMatrix
+from utils.data_processor import get_completion_status
+
+DOCUMENTACAO, CADASTRO = list(HIGIENIZACAO_FIELDS)[:2]
+
+
+def test_status_por_negocio():
+    df = pd.DataFrame({
+        DOCUMENTACAO: ['SIM', 'sim', None, 'NÃO'],
+        CADASTRO: ['SIM', 'NÃO', 'Não selecionado', None],
+    }, index=[10, 11, 12, 13])
+    matrix = ChecklistMatrix(df)
+    assert matrix.completed_per_deal().tolist() == [2, 1, 0, 0]
+    assert matrix.completion_status(rows=[10, 11]).tolist() == ['COMPLETO', 'INCOMPLETO']
+
+    status = get_completion_status(df, [DOCUMENTACAO, CADASTRO, 'UF_CRM_HIGILIZACAO_STATUS'])
+    assert status.to_dict() == {10: 'COMPLETO', 11: 'INCOMPLETO', 12: 'PENDENCIA', 13: 'PENDENCIA'}
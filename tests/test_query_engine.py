@@ -0,0 +1,35 @@
+"""Junções do motor de consultas sobre snapshots locais."""
+import pandas as pd
+import pytest
+
+import api.table_snapshots as snapshots
+from utils.query_engine import Query, run_query
+
+FAMILIA_UF = 'UF_CRM_1722605592778'
+FAMILIA_CARTORIO = 'UF_CRM_12_1723552666'
+
+
+@pytest.fixture
+def tabelas(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, 'SNAPSHOT_DIR', tmp_path)
+    snapshots.save_snapshot('uf', pd.DataFrame({
+        'DEAL_ID': ['1', '2', '3', '4'],
+        FAMILIA_UF: ['F1', None, '', '  '],
+    }))
+    snapshots.save_snapshot('cartorio', pd.DataFrame({
+        'ID': ['10', '11', '12'],
+        FAMILIA_CARTORIO: ['F1', None, ''],
+    }))
+
+
+def test_chaves_nulas_ou_vazias_nao_casam_na_juncao_interna(tabelas):
+    result = run_query(Query('uf', columns=['DEAL_ID', 'cartorio.ID'], joins=[('cartorio', 'inner')]))
+    assert result.to_dict('records') == [{'DEAL_ID': '1', 'cartorio.ID': '10'}]
+
+
+def test_chaves_nulas_ou_vazias_ficam_sem_par_na_juncao_a_esquerda(tabelas):
+    result = run_query(Query('uf', columns=['DEAL_ID', 'cartorio.ID'], joins=[('cartorio', 'left')]))
+    assert len(result) == 4
+    assert result.set_index('DEAL_ID')['cartorio.ID'].isna().to_dict() == {
+        '1': False, '2': True, '3': True, '4': True,
+    }
@@ -0,0 +1,104 @@
+"""Regressão do motor de ranking contra o cálculo original da página de Conclusões."""
+import pandas as pd
+import pytest
+
+from utils.ranking_engine import RankingEngine
+
+
+def ranking_original(df_todos, date_from, date_to):
+    """Cálculo de TOTAL_ATRIBUIDOS/CONCLUSOES/PENDENTES/TAXA da versão anterior de conclusoes.py."""
+    datas = pd.to_datetime(df_todos['UF_CRM_1741206763'], errors='coerce')
+    fim = pd.to_datetime(date_to) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    df = df_todos[datas.notna() & (datas >= pd.to_datetime(date_from)) & (datas <= fim)]
+    df = df[df['UF_CRM_HIGILIZACAO_STATUS'] == 'COMPLETO']
+    conclusoes = df.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_CONCLUSOES')
+    total = df_todos.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_ATRIBUIDOS')
+    ranking = pd.merge(total, conclusoes, on='ASSIGNED_BY_NAME', how='left')
+    ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].fillna(0).astype(int)
+    ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
+    ranking['TAXA_CONCLUSAO'] = (ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'] * 100).round(1)
+    return ranking.set_index('ASSIGNED_BY_NAME').sort_index()
+
+
+def carga(ids, responsaveis, datas, status):
+    return pd.DataFrame({
+        'ID': ids,
+        'ASSIGNED_BY_NAME': responsaveis,
+        'UF_CRM_1741206763': datas,
+        'UF_CRM_HIGILIZACAO_STATUS': status,
+    })
+
+
+COLUNAS = ['TOTAL_ATRIBUIDOS', 'TOTAL_CONCLUSOES', 'PENDENTES', 'TAXA_CONCLUSAO']
+
+
+def comparar(motor, df_todos, date_from, date_to):
+    esperado = ranking_original(df_todos, date_from, date_to)[COLUNAS]
+    obtido = motor.ranking(start=date_from, end=date_to).set_index('ASSIGNED_BY_NAME').sort_index()[COLUNAS]
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False, check_names=False)
+
+
+def test_pendentes_sem_data_de_conclusao_contam_na_janela():
+    # 3 concluídos na janela e 7 pendentes (sem data de conclusão)
+    df_todos = carga(
+        [str(i) for i in range(10)],
+        ['Ana'] * 6 + ['Bruno'] * 4,
+        ['2024-05-02 10:00', '2024-05-03 11:00', None, None, None, None, '2024-05-06 09:00', None, None, None],
+        ['COMPLETO', 'COMPLETO', 'PENDENCIA', '', None, 'INCOMPLETO', 'COMPLETO', None, None, 'PENDENCIA'],
+    )
+    motor = RankingEngine()
+    motor.update(df_todos, start='2024-05-01', end='2024-05-31')
+    comparar(motor, df_todos, '2024-05-01', '2024-05-31')
+
+    ranking = motor.ranking(start='2024-05-01', end='2024-05-31')
+    assert ranking['TOTAL_ATRIBUIDOS'].sum() == 10
+    assert ranking['PENDENTES'].sum() == 7
+    assert ranking['TOTAL_CONCLUSOES'].sum() == 3
+
+
+def test_cargas_sucessivas_nao_acumulam_negocios_sem_data():
+    maio = carga(
+        [str(i) for i in range(10)],
+        ['Ana'] * 5 + ['Bruno'] * 5,
+        ['2024-05-02'] * 3 + [None] * 7,
+        ['COMPLETO'] * 3 + [None] * 7,
+    )
+    # Junho: os mesmos pendentes (agora com outros IDs, como uma nova carga do Bitrix) e 2 conclusões
+    junho = carga(
+        [str(i) for i in range(20, 30)],
+        ['Ana'] * 5 + ['Bruno'] * 5,
+        ['2024-06-03'] * 2 + [None] * 8,
+        ['COMPLETO'] * 2 + [None] * 8,
+    )
+    motor = RankingEngine()
+    motor.update(maio, start='2024-05-01', end='2024-05-31')
+    motor.update(junho, start='2024-06-01', end='2024-06-30')
+    comparar(motor, junho, '2024-06-01', '2024-06-30')
+
+    # Os sem data de maio foram substituídos pelos da carga de junho; as conclusões de maio permanecem
+    sem_janela = motor.ranking()
+    assert sem_janela['TOTAL_ATRIBUIDOS'].sum() == 3 + 10
+    assert sem_janela['TOTAL_CONCLUSOES'].sum() == 3 + 2
+
+    # Voltar para maio: a janela carregada antes continua com os números da sua carga
+    motor.update(maio, start='2024-05-01', end='2024-05-31')
+    comparar(motor, maio, '2024-05-01', '2024-05-31')
+
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_dados_aleatorios_como_o_calculo_original(semente):
+    import numpy as np
+    rng = np.random.default_rng(semente)
+    n = 500
+    datas = pd.Series(pd.Timestamp('2024-03-01') + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit='h'))
+    datas[rng.random(n) < 0.4] = pd.NaT
+    status = np.where(datas.notna() & (rng.random(n) < 0.8), 'COMPLETO', 'PENDENCIA')
+    df_todos = carga(
+        [str(i) for i in range(n)],
+        rng.choice(['Ana', 'Bruno', 'Carla', 'Davi'], n),
+        datas.dt.strftime('%Y-%m-%d %H:%M:%S').where(datas.notna(), None),
+        status,
+    )
+    motor = RankingEngine()
+    motor.update(df_todos, start='2024-04-01', end='2024-04-30')
+    comparar(motor, df_todos, '2024-04-01', '2024-04-30')
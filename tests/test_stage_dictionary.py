@@ -0,0 +1,27 @@
+"""Estágios da crm_status resolvidos por entidade do funil."""
+import pandas as pd
+
+from api.stage_dictionary import (
+    CATEGORIA_FALHA, CATEGORIA_SUCESSO, ENTIDADES_FUNIL, StageDictionary, _estagios_crm_status,
+)
+
+
+def test_ids_sem_prefixo_nao_colidem_entre_entidades():
+    crm_status = _estagios_crm_status(pd.DataFrame({
+        'ENTITY_ID': ['DEAL_STAGE', 'STATUS', 'DYNAMIC_1052_STAGE_22', 'DYNAMIC_1052_STAGE_22',
+                      'DEAL_STAGE_1052', 'SOURCE'],
+        'STATUS_ID': ['WON', 'CONVERTED', 'DT1052_22:UC_X', 'DT1052_22:UC_X', 'C1052:WON', 'WON'],
+        'NAME': ['Ganho', 'Convertido', 'Antigo', 'Novo', 'Entregue', 'Origem'],
+        'SEMANTICS': ['S', 'S', None, 'F', 'S', None],
+    }))
+    # Só entidades de estágio, sem duplicatas por (ENTITY_ID, STATUS_ID)
+    assert crm_status['ENTITY_ID'].tolist() == ['DEAL_STAGE', 'DYNAMIC_1052_STAGE_22', 'DEAL_STAGE_1052']
+
+    comune = StageDictionary({}, crm_status, entities=ENTIDADES_FUNIL['comune'])
+    assert comune.name_of('DT1052_22:UC_X') == 'Novo'
+    assert comune.category_of('DT1052_22:UC_X') == CATEGORIA_FALHA
+    assert comune.name_of('WON') is None
+
+    crm = StageDictionary({}, crm_status, entities=ENTIDADES_FUNIL['crm'])
+    assert crm.map_names(pd.Series(['C1052:WON', 'WON']), as_categorical=False).tolist() == ['Entregue', 'WON']
+    assert crm.category_of('C1052:WON') == CATEGORIA_SUCESSO
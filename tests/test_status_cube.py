@@ -0,0 +1,38 @@
+"""Tabelas por responsável do cubo de status, calculadas sobre as matrizes do checklist."""
+import pandas as pd
+import pytest
+
+from utils.checklist_score import HIGIENIZACAO_FIELDS
+from utils.status_cube import StatusCube
+
+DOCUMENTACAO, CADASTRO = list(HIGIENIZACAO_FIELDS)[:2]
+
+
+@pytest.fixture
+def dados():
+    return pd.DataFrame({
+        'ID': ['1', '2', '3', '4', '5'],
+        'ASSIGNED_BY_NAME': ['Ana', 'Ana', 'Bia', None, 'Bia'],
+        'UF_CRM_HIGILIZACAO_STATUS': ['COMPLETO', 'PENDENCIA', 'COMPLETO', 'INCOMPLETO', 'PENDENCIA'],
+        'UF_CRM_1741206763': ['2024-03-01', None, '2024-04-10', None, None],
+        DOCUMENTACAO: ['SIM', 'NÃO', 'SIM', None, 'SIM'],
+        CADASTRO: ['SIM', None, 'NÃO', 'SIM', 'Não selecionado'],
+    })
+
+
+def test_producao_por_responsavel_respeita_os_filtros(dados):
+    cube = StatusCube(dados)
+    tabela = cube.field_counts('SIM', start=pd.Timestamp('2024-03-01'), end=pd.Timestamp('2024-03-31'))
+    # Bia (COMPLETO fora do período) mantém só o negócio pendente; campos ausentes entram zerados
+    assert tabela.set_index('Responsável')[['Documentação', 'Cadastro', 'Emissões', 'Total']].to_dict('index') == {
+        'Ana': {'Documentação': 1, 'Cadastro': 1, 'Emissões': 0, 'Total': 2},
+        'Bia': {'Documentação': 1, 'Cadastro': 0, 'Emissões': 0, 'Total': 1},
+        'Não atribuído': {'Documentação': 0, 'Cadastro': 1, 'Emissões': 0, 'Total': 1},
+    }
+    assert tabela['Responsável'].tolist()[0] == 'Ana'
+
+
+def test_pendencias_sem_linhas_retorna_tabela_vazia(dados):
+    tabela = StatusCube(dados).field_counts('PENDENCIAS', responsibles=['Ninguém'])
+    assert tabela.empty
+    assert tabela.columns.tolist() == ['Responsável'] + list(HIGIENIZACAO_FIELDS.values()) + ['Total']
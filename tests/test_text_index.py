@@ -0,0 +1,50 @@
+"""Busca de tickets no índice de texto local com os filtros da página."""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.tickets_store import TicketQueries
+from utils.text_index import TextIndex
+
+
+@pytest.fixture
+def queries(tmp_path):
+    path = tmp_path / 'tickets.sqlite'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, nome TEXT, email TEXT, telefone TEXT, idfamilia TEXT);
+        CREATE TABLE tickets (id INTEGER PRIMARY KEY, customerId INTEGER, message TEXT,
+                              createdAt TEXT, departament TEXT);
+        INSERT INTO customers VALUES (1, 'Cliente', 'c@x', '0', 'F1');
+    """)
+    agora = datetime(2024, 6, 30, 12)
+    antigos = [(i, 1, f'certidão atrasada {i}', str(agora - timedelta(days=200, minutes=i)), 'Suporte')
+               for i in range(1, 501)]
+    recentes = [(1000 + i, 1, 'certidão atrasada de novo', str(agora - timedelta(days=i)), 'Suporte')
+                for i in range(5)]
+    outro_depto = [(2000, 1, 'certidão atrasada', str(agora - timedelta(days=1)), 'Financeiro')]
+    conn.executemany('INSERT INTO tickets VALUES (?, ?, ?, ?, ?)', antigos + recentes + outro_depto)
+    conn.commit()
+    conn.close()
+    return TicketQueries(lambda: sqlite3.connect(path), dialect='sqlite'), agora
+
+
+def test_filtros_aplicados_antes_do_limite(queries, tmp_path):
+    queries, agora = queries
+    indice = TextIndex(tmp_path / 'indice.sqlite')
+    assert not indice.sync_in_background(queries.sync_search_index, wait=30)
+    assert len(indice) == 506
+
+    encontrados = queries.search(indice, 'certidao', start=agora - timedelta(days=7), departament='Suporte')
+    assert sorted(encontrados['id']) == [1000, 1001, 1002, 1003, 1004]
+
+    # Sem filtros, o limite continua valendo para todo o histórico
+    assert len(queries.search(indice, 'certidao', limit=50)) == 50
+
+
+def test_busca_restrita_a_chaves(tmp_path):
+    indice = TextIndex(tmp_path / 'indice.sqlite')
+    indice.upsert([(str(i), 'cobrança duplicada') for i in range(300)])
+    resultados = indice.search('cobranca', limit=10, keys=['5', '250', '999'])
+    assert sorted(chave for chave, _ in resultados) == ['250', '5']
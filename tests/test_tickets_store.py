@@ -0,0 +1,58 @@
+"""Snapshot incremental dos agregados de tickets comparado ao GROUP BY no banco."""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.tickets_store import TicketQueries, TicketStore
+
+
+def _inserir(path, tickets):
+    conn = sqlite3.connect(path)
+    conn.executemany('INSERT INTO tickets VALUES (?, ?, ?, ?, ?)', tickets)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def banco(tmp_path):
+    path = tmp_path / 'tickets.sqlite'
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, nome TEXT, email TEXT, telefone TEXT, idfamilia TEXT);
+        CREATE TABLE tickets (id INTEGER PRIMARY KEY, customerId INTEGER, message TEXT,
+                              createdAt TEXT, departament TEXT);
+        INSERT INTO customers VALUES (1, 'Ana', 'a@x', '0', 'F1'), (2, 'Bia', 'b@x', '0', 'F2');
+    """)
+    conn.close()
+    agora = datetime.now().replace(microsecond=0)
+    _inserir(path, [(i, 1 + i % 2, 'm', str(agora - timedelta(days=i, hours=i)), ['Suporte', 'Financeiro', None][i % 3])
+                    for i in range(1, 40)])
+    return path, agora
+
+
+def _resumo(agregados):
+    grain = agregados.grain.fillna({'departament': '-'}).sort_values(['departament', 'dia', 'hora'])
+    return (grain.reset_index(drop=True).to_dict('list'), agregados.total,
+            agregados.clientes_unicos, agregados.ultimos_7_dias)
+
+
+def test_snapshot_incremental_igual_ao_group_by(banco, tmp_path):
+    path, agora = banco
+    connect = lambda: sqlite3.connect(path)
+    consultas = TicketQueries(connect, dialect='sqlite')
+    store = TicketStore(connect, dialect='sqlite', snapshot_path=tmp_path / 'snapshot.pkl', sync_interval=0)
+
+    assert _resumo(store.aggregates()) == _resumo(consultas.aggregates(start=datetime(2000, 1, 1)))
+
+    # Só os tickets novos são buscados e somados ao snapshot
+    _inserir(path, [(100, 2, 'm', str(agora), 'Suporte'), (101, 3, 'm', str(agora), 'Jurídico')])
+    assert store.sync() == 2
+    assert store.sync() == 0
+    assert _resumo(store.aggregates()) == _resumo(consultas.aggregates(start=datetime(2000, 1, 2)))
+
+    # O snapshot em disco é reaproveitado por uma nova instância, sem banco disponível
+    def sem_banco():
+        raise sqlite3.OperationalError('banco indisponível')
+    offline = TicketStore(sem_banco, dialect='sqlite', snapshot_path=tmp_path / 'snapshot.pkl')
+    assert offline.aggregates().total == 41
@@ -0,0 +1,164 @@
+"""
+Calendário de dias úteis compartilhado pelas páginas (médias diárias, ranking, SLA).
+
+Baseado em numpy.busday_count, aceita datas escalares ou arrays inteiros (Series, listas,
+arrays datetime64) e conta os dias úteis de forma vetorizada.
+
+Convenções:
+- a semana útil padrão é de segunda a sábado (DEFAULT_WEEKMASK), como nas métricas de conclusões;
+- os intervalos são inclusivos: início e fim contam como dias;
+- por padrão são descontados os feriados nacionais e os de São Paulo (estado e capital).
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Segunda a sábado (formato numpy: seg, ter, qua, qui, sex, sáb, dom)
+DEFAULT_WEEKMASK = '1111110'
+
+# Horas úteis por dia da semana (seg-sex 7h-19h, sábado 9h-12h, domingo fechado)
+WORKDAY_HOURS = (12, 12, 12, 12, 12, 3, 0)
+
+# Feriados nacionais de data fixa (mês, dia)
+FERIADOS_NACIONAIS_FIXOS = [
+    (1, 1),    # Confraternização Universal
+    (4, 21),   # Tiradentes
+    (5, 1),    # Dia do Trabalho
+    (9, 7),    # Independência
+    (10, 12),  # Nossa Senhora Aparecida
+    (11, 2),   # Finados
+    (11, 15),  # Proclamação da República
+    (12, 25),  # Natal
+]
+
+# Feriados de São Paulo (estado e capital) de data fixa (mês, dia)
+FERIADOS_SP_FIXOS = [
+    (1, 25),   # Aniversário da cidade de São Paulo
+    (7, 9),    # Revolução Constitucionalista
+    (11, 20),  # Consciência Negra (municipal em SP; nacional a partir de 2024)
+]
+
+
+def _easter(year):
+    """Data da Páscoa (algoritmo de Meeus/Jones/Butcher para o calendário gregoriano)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def brazilian_holidays(first_year, last_year, include_sao_paulo=True):
+    """
+    Lista de feriados entre first_year e last_year (inclusive).
+
+    Inclui os feriados nacionais fixos, Carnaval (segunda e terça), Sexta-feira Santa e
+    Corpus Christi e, opcionalmente, os feriados fixos de São Paulo.
+
+    Returns:
+        numpy.ndarray: Datas (datetime64[D]) ordenadas e sem repetição
+    """
+    fixos = FERIADOS_NACIONAIS_FIXOS + (FERIADOS_SP_FIXOS if include_sao_paulo else [])
+    feriados = []
+    for year in range(first_year, last_year + 1):
+        feriados.extend(date(year, month, day) for month, day in fixos)
+        pascoa = _easter(year)
+        feriados.extend([
+            pascoa - timedelta(days=48),  # Segunda de Carnaval
+            pascoa - timedelta(days=47),  # Terça de Carnaval
+            pascoa - timedelta(days=2),   # Sexta-feira Santa
+            pascoa + timedelta(days=60),  # Corpus Christi
+        ])
+    return np.unique(np.array(feriados, dtype='datetime64[D]'))
+
+
+@lru_cache(maxsize=32)
+def _calendar(weekmask, first_year, last_year, include_sao_paulo):
+    """busdaycalendar reaproveitado entre chamadas com a mesma configuração."""
+    return np.busdaycalendar(
+        weekmask=weekmask,
+        holidays=brazilian_holidays(first_year, last_year, include_sao_paulo),
+    )
+
+
+def _to_days(values):
+    """Converte escalar/array de datas para datetime64[D] (NaT para valores inválidos)."""
+    if np.isscalar(values) or isinstance(values, (date, pd.Timestamp)):
+        values = [values]
+    converted = pd.to_datetime(pd.Series(values), errors='coerce')
+    if getattr(converted.dt, 'tz', None) is not None:
+        converted = converted.dt.tz_localize(None)
+    return converted.to_numpy(dtype='datetime64[D]')
+
+
+def business_day_count(start, end, weekmask=DEFAULT_WEEKMASK, holidays=True, include_sao_paulo=True):
+    """
+    Conta os dias úteis entre start e end (inclusive), de forma vetorizada.
+
+    Args:
+        start: Data inicial (escalar ou array-like)
+        end: Data final (escalar ou array-like, mesmo tamanho de start ou escalar)
+        weekmask (str): Dias úteis da semana no formato do numpy ('1111110' = seg-sáb)
+        holidays (bool | array-like): True usa os feriados brasileiros padrão, False/None ignora
+            feriados e um array-like usa a lista informada
+        include_sao_paulo (bool): Inclui os feriados de São Paulo quando holidays=True
+
+    Returns:
+        int | numpy.ndarray: Número de dias úteis; para arrays, float com NaN onde alguma das
+        datas é inválida. Intervalos invertidos (end < start) retornam 0.
+    """
+    escalar = np.ndim(start) == 0 and np.ndim(end) == 0
+    inicio = _to_days(start)
+    fim = _to_days(end)
+    inicio, fim = np.broadcast_arrays(inicio, fim)
+
+    validos = ~(np.isnat(inicio) | np.isnat(fim))
+    resultado = np.full(inicio.shape, np.nan)
+
+    if validos.any():
+        ini_validos = inicio[validos]
+        fim_validos = fim[validos]
+        if holidays is True:
+            anos = np.concatenate([ini_validos, fim_validos]).astype('datetime64[Y]').astype(int) + 1970
+            calendario = _calendar(weekmask, int(anos.min()), int(anos.max()), include_sao_paulo)
+        elif holidays is None or holidays is False:
+            calendario = np.busdaycalendar(weekmask=weekmask)
+        else:
+            calendario = np.busdaycalendar(weekmask=weekmask, holidays=_to_days(holidays))
+
+        # busday_count conta [início, fim); somar um dia torna o fim inclusivo
+        contagem = np.busday_count(ini_validos, fim_validos + np.timedelta64(1, 'D'), busdaycal=calendario)
+        resultado[validos] = np.maximum(contagem, 0)
+
+    if escalar:
+        return int(resultado[0]) if validos[0] else 0
+    return resultado
+
+
+def business_hours(start, end, hours_per_weekday=WORKDAY_HOURS, holidays=True, include_sao_paulo=True):
+    """
+    Soma as horas úteis entre start e end (inclusive) segundo a carga horária de cada dia da semana.
+
+    Args:
+        start, end: Datas (escalares ou array-like), como em business_day_count
+        hours_per_weekday (tuple): Horas úteis de segunda (índice 0) a domingo (índice 6)
+
+    Returns:
+        int | numpy.ndarray: Horas úteis no intervalo
+    """
+    total = 0
+    for dia_semana, horas in enumerate(hours_per_weekday):
+        if horas:
+            mascara = ''.join('1' if i == dia_semana else '0' for i in range(7))
+            total = total + horas * business_day_count(
+                start, end, weekmask=mascara, holidays=holidays, include_sao_paulo=include_sao_paulo
+            )
+    return total
@@ -0,0 +1,135 @@
+"""
+Pontuação vetorizada do checklist de higienização (campos SIM/NÃO de get_higilizacao_fields).
+
+Os campos do checklist são convertidos uma única vez em matrizes booleanas NumPy
+(negócios × campos): "concluído" (SIM) e "pendente" (NÃO, não selecionado ou vazio).
+Cada valor distinto de um campo é classificado uma vez (pandas.Categorical), e o status por
+negócio, as taxas por campo e os agregados por responsável saem de operações matriciais,
+sem apply(axis=1).
+
+A matriz é montada junto com o cubo de status (utils.status_cube, em cube.checklist) e
+reaproveitada enquanto a versão dos dados não mudar: as tabelas por responsável de
+cube.field_counts e as taxas por campo de Produção são calculadas sobre ela.
+"""
+import numpy as np
+import pandas as pd
+
+# Campos do checklist de higienização (get_higilizacao_fields sem o status geral) e nomes de exibição
+HIGIENIZACAO_FIELDS = {
+    'UF_CRM_1741183785848': 'Documentação',   # DOCUMENTAÇÃO PEND/INFOS
+    'UF_CRM_1741183721969': 'Cadastro',       # CADASTRO NA ARVORE HIGIELIZADO
+    'UF_CRM_1741183685327': 'Estrutura',      # ESTRUTURA ARVORE HIGIENIZA
+    'UF_CRM_1741183828129': 'Requerimento',   # REQUERIMENTO
+    'UF_CRM_1741198696': 'Emissões',          # EMISSÕES BRASILEIRAS BITRIX24
+}
+
+# Valores (em maiúsculas) que contam como pendência ou como concluído em um campo
+PENDING_VALUES = {
+    'NÃO', 'NAO', 'N', 'NÃO SELECIONADO', 'NAO SELECIONADO', 'NÃO SELECIONADA', 'N/S', 'FALSE',
+    'NAN', 'NONE', 'NULL',
+}
+DONE_VALUES = {'SIM', 'S', 'TRUE'}
+
+
+def classify_checklist_values(values):
+    """
+    Classifica os valores de um campo do checklist uma vez por valor distinto.
+
+    Args:
+        values (pandas.Series): Valores do campo
+
+    Returns:
+        tuple: (pendente, concluido) como arrays booleanos alinhados às linhas
+    """
+    categorical = pd.Categorical(values)
+    labels = [str(value) for value in categorical.categories]
+    # Último elemento corresponde ao código -1 (nulo): pendente
+    pending = np.array([label.upper() in PENDING_VALUES or label.strip() == '' for label in labels] + [True])
+    done = np.array([label.upper() in DONE_VALUES for label in labels] + [False])
+    return pending[categorical.codes], done[categorical.codes]
+
+
+class ChecklistMatrix:
+    """
+    Matrizes booleanas do checklist (negócios × campos) e agregados derivados.
+
+    Os métodos aceitam `rows` para restringir o cálculo a um subconjunto dos negócios:
+    máscara booleana alinhada às linhas ou rótulos do índice original (ex.: df_filtrado.index).
+    """
+
+    def __init__(self, df, responsible_column='ASSIGNED_BY_NAME', fields=None):
+        fields = list(fields or HIGIENIZACAO_FIELDS)
+        self.fields = [field for field in fields if field in df.columns]
+        self.names = [HIGIENIZACAO_FIELDS.get(field, field) for field in self.fields]
+        self.index = df.index
+
+        n = len(df)
+        self.done = np.zeros((n, len(self.fields)), dtype=bool)
+        self.pending = np.zeros((n, len(self.fields)), dtype=bool)
+        for j, field in enumerate(self.fields):
+            self.pending[:, j], self.done[:, j] = classify_checklist_values(df[field])
+
+        if responsible_column in df.columns:
+            responsible = df[responsible_column].fillna('Não atribuído').astype(str)
+        else:
+            responsible = pd.Series('Não atribuído', index=df.index)
+        self.responsible_codes, self.responsibles = pd.factorize(responsible, sort=True)
+
+    def _mask(self, rows):
+        """Converte `rows` em máscara booleana (None = todas as linhas)."""
+        if rows is None:
+            return np.ones(len(self.index), dtype=bool)
+        rows = np.asarray(rows) if not isinstance(rows, pd.Index) else rows
+        if isinstance(rows, np.ndarray) and rows.dtype == bool:
+            return rows
+        return self.index.isin(rows)
+
+    def completed_per_deal(self, rows=None):
+        """Número de campos concluídos (SIM) por negócio."""
+        return self.done[self._mask(rows)].sum(axis=1)
+
+    def completion_status(self, rows=None):
+        """
+        Status de conclusão por negócio, como get_completion_status, de forma vetorizada.
+
+        Returns:
+            numpy.ndarray: 'PENDENCIA' (nenhum campo), 'INCOMPLETO' (parte) ou 'COMPLETO' (todos)
+        """
+        completed = self.completed_per_deal(rows)
+        return np.select([completed == 0, completed < len(self.fields)], ['PENDENCIA', 'INCOMPLETO'], default='COMPLETO')
+
+    def field_completion_rates(self, rows=None):
+        """
+        Percentual de negócios com cada campo concluído.
+
+        Returns:
+            pandas.Series: Indexada pelo nome de exibição do campo (0 a 100, uma casa decimal)
+        """
+        done = self.done[self._mask(rows)]
+        if len(done) == 0:
+            return pd.Series(0.0, index=self.names)
+        return pd.Series((done.mean(axis=0) * 100).round(1), index=self.names)
+
+    def by_responsible(self, measure='SIM', rows=None):
+        """
+        Contagens por responsável e campo (soma de colunas das matrizes, via bincount).
+
+        Args:
+            measure (str): 'SIM' (campos concluídos) ou 'PENDENCIAS' (campos pendentes)
+
+        Returns:
+            pandas.DataFrame: Colunas Responsável, um campo por coluna e Total, ordenada pelo Total
+        """
+        matrix = self.done if measure == 'SIM' else self.pending
+        mask = self._mask(rows)
+        codes = self.responsible_codes[mask]
+        present = np.bincount(codes, minlength=len(self.responsibles)) > 0
+        counts = np.column_stack([
+            np.bincount(codes, weights=matrix[mask, j], minlength=len(self.responsibles))
+            for j in range(len(self.fields))
+        ]) if self.fields else np.zeros((len(self.responsibles), 0))
+
+        table = pd.DataFrame(counts[present].astype(int), columns=self.names)
+        table.insert(0, 'Responsável', np.asarray(self.responsibles)[present])
+        table['Total'] = table[self.names].sum(axis=1)
+        return table.sort_values('Total', ascending=False, kind='mergesort').reset_index(drop=True)
@@ -0,0 +1,91 @@
+"""
+Cache dos cubos pré-agregados (utils.status_cube, utils.temporal_cube) por versão dos dados.
+
+Os cubos são montados uma vez por versão dos dados e mantidos em memória (os MAX_CUBES mais
+recentes de cada tipo). A versão é, de preferência, informada pelo carregador (ex.: horário do
+carregamento); sem ela, data_version() calcula uma chave barata, sem hashear as colunas.
+"""
+import threading
+from collections import OrderedDict
+
+# Número de cubos mantidos em memória por tipo (versões de dados diferentes)
+MAX_CUBES = 4
+
+# Coluna de última modificação do Bitrix24 (muda a cada edição do negócio)
+MODIFIED_FIELD = 'DATE_MODIFY'
+
+
+def _extremes(values):
+    """Mínimo e máximo da coluna como texto (colunas com tipos mistos são comparadas como texto)."""
+    values = values.dropna()
+    try:
+        return str(values.min()), str(values.max())
+    except TypeError:
+        values = values.astype(str)
+        return values.min(), values.max()
+
+
+def data_version(df, columns, id_fields=(), count_fields=(), extreme_fields=()):
+    """
+    Chave barata da versão dos dados, usada quando o chamador não informa data_version.
+
+    Combina o tamanho, as colunas usadas presentes, o primeiro e o último ID, a última
+    modificação (DATE_MODIFY), as contagens de valores de count_fields e os extremos de
+    extreme_fields, o que distingue recargas, edições no Bitrix e os recortes por filtro.
+
+    Args:
+        df (pandas.DataFrame): Dados do cubo
+        columns (list): Colunas usadas pelo cubo
+        id_fields (list): Colunas de ID candidatas (a primeira presente é usada)
+        count_fields (list): Colunas de poucos valores distintos (ex.: status)
+        extreme_fields (list): Colunas cujo mínimo e máximo entram na chave (ex.: datas)
+
+    Returns:
+        tuple: Chave hasheável
+    """
+    present = tuple(c for c in columns if c in df.columns)
+    if df.empty:
+        return (0, present)
+    id_field = next((c for c in id_fields if c in df.columns), None)
+    ids = (str(df[id_field].iloc[0]), str(df[id_field].iloc[-1])) if id_field else None
+    modified = _extremes(df[MODIFIED_FIELD])[1] if MODIFIED_FIELD in df.columns else None
+    counts = tuple(
+        tuple(sorted((str(value), int(count)) for value, count in df[field].value_counts(dropna=False).items()))
+        for field in count_fields if field in df.columns
+    )
+    extremes = tuple(_extremes(df[field]) for field in extreme_fields if field in df.columns)
+    return (len(df), present, ids, modified, counts, extremes)
+
+
+class CubeCache:
+    """
+    Cubos mais recentes, por chave de versão (LRU), compartilhados entre sessões.
+
+    Args:
+        max_entries (int): Número de cubos mantidos
+    """
+
+    def __init__(self, max_entries=MAX_CUBES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        """
+        Retorna o cubo da chave, montando-o com build() se ainda não estiver em cache.
+
+        Args:
+            key (hashable): Versão dos dados
+            build (callable): Monta o cubo (chamado fora do lock)
+        """
+        with self._lock:
+            cube = self._entries.get(key)
+            if cube is not None:
+                self._entries.move_to_end(key)
+                return cube
+        cube = build()
+        with self._lock:
+            self._entries[key] = cube
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cube
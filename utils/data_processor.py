@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import streamlit as st
 
+from utils.checklist_score import ChecklistMatrix
+
 def format_status_text(value):
     """
     Formata o texto de status para exibição
@@ -28,102 +30,143 @@ def format_status_text(value):
     else:
         return value
 
-def calculate_status_counts(df):
+# Campo de status de higienização e IDs usados para remover duplicatas
+STATUS_FIELD = 'UF_CRM_HIGILIZACAO_STATUS'
+DEAL_ID_FIELD = 'ID'  # ID na tabela crm_deal
+UF_DEAL_ID_FIELD = 'DEAL_ID'  # ID na tabela crm_deal_uf
+
+# Faixas de status (na ordem dos códigos) e valores normalizados reconhecidos em cada uma
+STATUS_BUCKETS = ('completo', 'incompleto', 'pendente')
+_STATUS_BUCKET_CODES = {'COMPLETO': 0, 'INCOMPLETO': 1, 'PENDENCIA': 2, '': 2}
+_UNKNOWN_CODE = 3  # Status não reconhecido (contado como pendente)
+
+
+class StatusCounts(dict):
+    """
+    Resultado de calculate_status_counts.
+
+    Continua sendo um dicionário (chaves total, pendente, pendente_pct, incompleto, incompleto_pct,
+    completo, completo_pct e nao_reconhecido), com acesso também por atributo (counts.completo).
+    """
+
+    def __init__(self, completo=0, incompleto=0, pendente=0, nao_reconhecido=0):
+        total = completo + incompleto + pendente
+        super().__init__(
+            total=total,
+            pendente=pendente,
+            pendente_pct=round(pendente / total * 100, 1) if total > 0 else 0,
+            incompleto=incompleto,
+            incompleto_pct=round(incompleto / total * 100, 1) if total > 0 else 0,
+            completo=completo,
+            completo_pct=round(completo / total * 100, 1) if total > 0 else 0,
+            nao_reconhecido=nao_reconhecido,
+        )
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def status_codes(status):
+    """
+    Normaliza uma Series de status de higienização em códigos de faixa, em uma única passada.
+
+    Cada valor distinto é normalizado (strip + upper) uma vez, via pandas.Categorical:
+    0 = completo, 1 = incompleto, 2 = pendente (PENDENCIA, vazio ou nulo) e
+    3 = não reconhecido (também tratado como pendente nas contagens).
+
+    Args:
+        status (pandas.Series): Valores de UF_CRM_HIGILIZACAO_STATUS
+
+    Returns:
+        numpy.ndarray: Códigos (int8) alinhados às linhas da Series
+    """
+    categorical = pd.Categorical(status)
+    category_codes = np.array(
+        [_STATUS_BUCKET_CODES.get(str(value).strip().upper(), _UNKNOWN_CODE) for value in categorical.categories]
+        + [_STATUS_BUCKET_CODES['']],  # Código -1 (nulo) aponta para o último elemento: pendente
+        dtype=np.int8,
+    )
+    return category_codes[categorical.codes]
+
+
+def _unique_deal_mask(df):
+    """Máscara das linhas com ID de negócio único (DEAL_ID quando disponível, senão ID)."""
+    id_field = UF_DEAL_ID_FIELD if UF_DEAL_ID_FIELD in df.columns else DEAL_ID_FIELD
+    return ~df[id_field].duplicated().to_numpy()
+
+
+def calculate_status_counts(df, by=None, verbose=False):
     """
     Calcula as contagens de status de higienização
     
+    O status é normalizado uma única vez e todas as faixas saem de uma única contagem
+    sobre os códigos. Os negócios são contados uma vez (sem duplicatas de ID).
+    
     Args:
         df (pandas.DataFrame): DataFrame com os dados
+        by (str | list | pandas.Grouper, optional): Dimensão de agrupamento (ex.: 'ASSIGNED_BY_NAME'
+            ou pd.Grouper(key='DATE_MODIFY', freq='D')); None retorna os totais gerais
+        verbose (bool): Imprime a distribuição detalhada e os status não reconhecidos
         
     Returns:
-        dict: Dicionário com as contagens
+        StatusCounts | pandas.DataFrame: Contagens gerais ou, com `by`, um DataFrame indexado pela
+        dimensão com as colunas completo, incompleto, pendente, total e os percentuais (*_pct)
     """
+    campos_presentes = not df.empty and all(field in df.columns for field in [DEAL_ID_FIELD, STATUS_FIELD])
+    
+    if by is not None:
+        if not campos_presentes:
+            return pd.DataFrame(columns=list(STATUS_BUCKETS) + ['total'] + [f'{b}_pct' for b in STATUS_BUCKETS])
+        unique_df = df[_unique_deal_mask(df)]
+        buckets = pd.Categorical.from_codes(
+            np.minimum(status_codes(unique_df[STATUS_FIELD]), 2), categories=list(STATUS_BUCKETS)
+        )
+        table = (
+            unique_df.assign(_STATUS_BUCKET=buckets)
+            .groupby(by, observed=True)['_STATUS_BUCKET']
+            .value_counts()
+            .unstack(fill_value=0)
+            .reindex(columns=list(STATUS_BUCKETS), fill_value=0)
+        )
+        table.columns = list(STATUS_BUCKETS)
+        table['total'] = table[list(STATUS_BUCKETS)].sum(axis=1)
+        for bucket in STATUS_BUCKETS:
+            table[f'{bucket}_pct'] = (table[bucket] / table['total'].where(table['total'] > 0) * 100).round(1).fillna(0)
+        return table
+    
     # Verificar se o DataFrame está vazio
     if df.empty:
-        return {
-            'total': 0,
-            'pendente': 0,
-            'pendente_pct': 0,
-            'incompleto': 0,
-            'incompleto_pct': 0,
-            'completo': 0,
-            'completo_pct': 0
-        }
-    
-    # Campos necessários
-    status_field = 'UF_CRM_HIGILIZACAO_STATUS'
-    deal_id = 'ID'  # ID na tabela crm_deal
-    uf_deal_id = 'DEAL_ID'  # ID na tabela crm_deal_uf
+        return StatusCounts()
     
     # Verificar se temos os campos necessários
-    if not all(field in df.columns for field in [deal_id, status_field]):
+    if not campos_presentes:
         print("Campos necessários não encontrados!")
         print(f"Colunas disponíveis: {df.columns.tolist()}")
-        return {
-            'total': len(df),
-            'pendente': len(df),
-            'pendente_pct': 100,
-            'incompleto': 0,
-            'incompleto_pct': 0,
-            'completo': 0,
-            'completo_pct': 0
-        }
-    
-    # Garantir que estamos usando apenas registros únicos
-    if uf_deal_id in df.columns:
-        # Se temos ambos os IDs, usar o DEAL_ID para remover duplicatas
-        df = df.drop_duplicates(subset=[uf_deal_id])
-    else:
-        # Caso contrário, usar o ID da tabela principal
-        df = df.drop_duplicates(subset=[deal_id])
-    
-    # Total de negócios é o total de IDs únicos no funil 32 (sem filtragem)
-    total = len(df)
-    
-    # Tratar valores nulos/vazios no status
-    # Consideramos valores nulos ou vazios como PENDENTE
-    pendentes = df[df[status_field].isna() | (df[status_field] == '')].shape[0]
-    pendentes += df[df[status_field].str.upper() == 'PENDENCIA'].shape[0] if not df[status_field].isna().all() else 0
-    
-    # Contagem para status explícitos
-    completos = df[df[status_field].str.upper() == 'COMPLETO'].shape[0] if not df[status_field].isna().all() else 0
-    incompletos = df[df[status_field].str.upper() == 'INCOMPLETO'].shape[0] if not df[status_field].isna().all() else 0
-    
-    # Verificar se há algum status não reconhecido
-    outros = total - (completos + incompletos + pendentes)
-    if outros > 0:
-        print(f"\nAVISO: {outros} registros com status não reconhecido")
-        outros_status = df[~df[status_field].isin(['COMPLETO', 'INCOMPLETO', 'PENDENCIA']) & ~df[status_field].isna() & (df[status_field] != '')][status_field].unique()
-        print(f"Status não reconhecidos: {outros_status}")
-        # Adicionar registros não reconhecidos aos pendentes
-        pendentes += outros
-    
-    # Calcular percentuais
-    completos_pct = (completos / total * 100) if total > 0 else 0
-    incompletos_pct = (incompletos / total * 100) if total > 0 else 0
-    pendentes_pct = (pendentes / total * 100) if total > 0 else 0
-    
-    # Debug: imprimir distribuição detalhada
-    print("\nDistribuição detalhada de status:")
-    print(f"Total de registros: {total}")
-    print(f"Pendências (PENDENCIA + vazios): {pendentes} ({pendentes_pct:.1f}%)")
-    print(f"Incompletos: {incompletos} ({incompletos_pct:.1f}%)")
-    print(f"Concluídos: {completos} ({completos_pct:.1f}%)")
-    
-    if uf_deal_id in df.columns:
-        print("\nVerificação de IDs:")
-        print(f"Total de IDs únicos em crm_deal: {df[deal_id].nunique()}")
-        print(f"Total de IDs únicos em crm_deal_uf: {df[uf_deal_id].nunique()}")
-    
-    return {
-        'total': total,
-        'pendente': pendentes,
-        'pendente_pct': round(pendentes_pct, 1),
-        'incompleto': incompletos,
-        'incompleto_pct': round(incompletos_pct, 1),
-        'completo': completos,
-        'completo_pct': round(completos_pct, 1)
-    }
+        return StatusCounts(pendente=len(df))
+    
+    # Garantir que estamos usando apenas registros únicos (sem copiar o DataFrame inteiro)
+    status = df[STATUS_FIELD][_unique_deal_mask(df)]
+    
+    # Uma única contagem sobre os códigos: completo, incompleto, pendente e não reconhecido
+    completos, incompletos, pendentes, outros = np.bincount(status_codes(status), minlength=4).tolist()
+    
+    # Registros não reconhecidos são contados como pendentes
+    counts = StatusCounts(completo=completos, incompleto=incompletos, pendente=pendentes + outros, nao_reconhecido=outros)
+    
+    if verbose:
+        print("\nDistribuição detalhada de status:")
+        print(f"Total de registros: {counts['total']}")
+        print(f"Pendências (PENDENCIA + vazios + não reconhecidos): {counts['pendente']} ({counts['pendente_pct']:.1f}%)")
+        print(f"Incompletos: {counts['incompleto']} ({counts['incompleto_pct']:.1f}%)")
+        print(f"Concluídos: {counts['completo']} ({counts['completo_pct']:.1f}%)")
+        if outros > 0:
+            outros_status = status[status_codes(status) == _UNKNOWN_CODE].unique()
+            print(f"AVISO: {outros} registros com status não reconhecido: {outros_status}")
+    
+    return counts
 
 def filter_dataframe_by_date(df, start_date, end_date, date_column='UF_CRM_1741206763'):
     """
@@ -151,30 +194,23 @@ def filter_dataframe_by_date(df, start_date, end_date, date_column='UF_CRM_17412
     # Aplicar filtro de data
     return df[(df[date_column] >= start_date) & (df[date_column] <= end_date)]
 
-def get_completion_status(row, higilizacao_fields):
+def get_completion_status(df, higilizacao_fields):
     """
-    Determina o status de conclusão com base nos campos de higienização
+    Determina o status de conclusão de cada negócio com base nos campos de higienização
     
     Args:
-        row (pandas.Series): Linha do DataFrame
+        df (pandas.DataFrame): DataFrame com os dados
         higilizacao_fields (list): Lista de campos de higienização
         
     Returns:
-        str: Status de conclusão
+        pandas.Series: Status de conclusão por negócio ('PENDENCIA', 'INCOMPLETO' ou 'COMPLETO')
     """
     # Remover UF_CRM_HIGILIZACAO_STATUS da lista de verificação
     fields_to_check = [f for f in higilizacao_fields if f != 'UF_CRM_HIGILIZACAO_STATUS']
     
-    # Contar quantos campos estão preenchidos com 'sim'
-    completed = sum(1 for field in fields_to_check if str(row.get(field, '')).upper() == 'SIM')
-    total = len(fields_to_check)
-    
-    if completed == 0:
-        return 'PENDENCIA'
-    elif completed < total:
-        return 'INCOMPLETO'
-    else:
-        return 'COMPLETO'
+    # Campos SIM contados na matriz booleana do checklist, sem percorrer as linhas
+    matrix = ChecklistMatrix(df, fields=fields_to_check)
+    return pd.Series(matrix.completion_status(), index=df.index)
 
 def create_responsible_status_table(df, responsible_column='ASSIGNED_BY_NAME'):
     """
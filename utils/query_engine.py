@@ -0,0 +1,332 @@
+"""
+Motor de consultas ad hoc sobre os snapshots locais das tabelas do Bitrix24 (pandas).
+
+Uma consulta (Query) descreve a tabela base, as junções, as colunas, os filtros e o limite.
+O planejador:
+- lê de cada tabela apenas as colunas projetadas e as de filtro; as chaves de junção são
+  normalizadas uma vez por versão do snapshot e mantidas em cache;
+- aplica os filtros de cada tabela antes das junções (na tabela base e nas junções internas;
+  numa junção à esquerda os filtros da tabela da direita são aplicados depois dela);
+- sem junções nem ordenação, lê as colunas projetadas só das linhas que cabem no limite;
+- junta as tabelas pelas relações conhecidas (ID = DEAL_ID, ID da família), comparando
+  as chaves como texto normalizado; chaves nulas ou vazias nunca casam (semântica do NULL).
+
+As colunas são referenciadas como 'COLUNA' (procurada na tabela base e depois nas junções)
+ou 'apelido.COLUNA'. No resultado, as colunas das tabelas juntadas levam o prefixo 'apelido.'.
+"""
+import re
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from api.table_snapshots import read_columns, read_typed_column, snapshot_meta, convert_column
+
+# Relações entre tabelas: (esquerda, direita) -> (chave da esquerda, chave da direita)
+RELATIONS = {
+    ('deal', 'uf'): ('ID', 'DEAL_ID'),
+    ('uf', 'cartorio'): ('UF_CRM_1722605592778', 'UF_CRM_12_1723552666'),
+}
+
+OPERATORS = ('=', '!=', '>=', '<=', '>', '<', 'in', 'not in', 'contains', 'is null', 'not null')
+
+DEFAULT_LIMIT = 1000
+
+_CONDITION = re.compile(
+    r'^\s*(?P<coluna>[\w.]+)\s+(?P<op>not in|in|contains|is null|not null|!=|>=|<=|=|>|<)\s*(?P<valor>.*?)\s*$',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class Condition:
+    column: str
+    op: str
+    value: object = None
+
+
+@dataclass
+class Query:
+    """
+    Consulta ad hoc.
+
+    Attributes:
+        table (str): Apelido da tabela base (ver api.table_snapshots.TABLES)
+        columns (list): Colunas do resultado (vazio = todas as colunas das tabelas)
+        joins (list): Pares (apelido, 'inner' | 'left'), na ordem em que são juntados
+        where (list): Condições (Condition), combinadas com E
+        order_by (str, optional): Coluna de ordenação (prefixo '-' para decrescente)
+        limit (int): Número máximo de linhas (0 = sem limite)
+    """
+    table: str
+    columns: list = field(default_factory=list)
+    joins: list = field(default_factory=list)
+    where: list = field(default_factory=list)
+    order_by: str = None
+    limit: int = DEFAULT_LIMIT
+
+
+def parse_condition(text):
+    """
+    Converte uma linha de filtro em Condition, ex.: 'STAGE_ID in C32:WON, C32:LOSE',
+    'uf.UF_CRM_1735661425423 = PROTOCOLADOS COMPLETOS', 'DATE_CREATE >= 2024-01-01'.
+
+    Raises:
+        ValueError: Se a linha não seguir o formato 'COLUNA operador valor'
+    """
+    match = _CONDITION.match(text)
+    if not match:
+        raise ValueError(f"Filtro inválido: '{text}' (use 'COLUNA operador valor')")
+    op = match['op'].lower()
+    value = match['valor']
+    if op in ('in', 'not in'):
+        value = [v.strip() for v in value.split(',') if v.strip()]
+    elif op in ('is null', 'not null'):
+        value = None
+    return Condition(match['coluna'], op, value)
+
+
+def _mask(typed, condition):
+    """
+    Máscara booleana da condição (tipagem conforme o valor comparado).
+
+    Args:
+        typed (callable): typed(tipo) -> coluna como 'string', 'numeric' ou 'datetime'
+    """
+    op, value = condition.op, condition.value
+    text = typed('string')
+    if op == 'is null':
+        return (text.isna() | (text.str.strip() == '')).fillna(True)
+    if op == 'not null':
+        return ~_mask(typed, Condition(condition.column, 'is null'))
+    if op == '=':
+        return (text == str(value)).fillna(False)
+    if op == '!=':
+        return (text != str(value)).fillna(True)
+    if op == 'in':
+        return text.isin([str(v) for v in value]).fillna(False)
+    if op == 'not in':
+        return (~text.isin([str(v) for v in value])).fillna(True)
+    if op == 'contains':
+        return text.str.contains(str(value), case=False, regex=False).fillna(False)
+    # Comparações: numéricas se o valor for número, senão de datas
+    number = pd.to_numeric(pd.Series([value]), errors='coerce').iloc[0]
+    if pd.notna(number):
+        left, right = typed('numeric'), number
+    else:
+        left, right = typed('datetime'), pd.Timestamp(value)
+    result = {'>=': left >= right, '<=': left <= right, '>': left > right, '<': left < right}[op]
+    return result.fillna(False)
+
+
+class QueryPlanner:
+    """Resolve as colunas de cada tabela, monta o plano e executa a consulta."""
+
+    def __init__(self, query):
+        self.query = query
+        self.aliases = [query.table] + [alias for alias, _ in query.joins]
+        self.how = dict(query.joins)
+        self.schemas = {}
+        for alias in self.aliases:
+            meta = snapshot_meta(alias)
+            if meta is None:
+                raise FileNotFoundError(f"Não há snapshot local da tabela '{alias}'")
+            self.schemas[alias] = meta['colunas']
+        self.relations = self._relations()
+
+    def _relations(self):
+        """
+        Para cada tabela juntada: (tabela já presente, chave dela, chave da tabela juntada).
+
+        As junções são ordenadas de modo que cada tabela se ligue a uma já presente
+        (ex.: 'cartorio' depois de 'uf', qualquer que seja a ordem pedida).
+        """
+        for alias, how in self.query.joins:
+            if how not in ('inner', 'left'):
+                raise ValueError(f"Tipo de junção inválido: {how}")
+        relations = {}
+        present = [self.query.table]
+        pending = [alias for alias, _ in self.query.joins]
+        while pending:
+            for alias in pending:
+                link = self._link(alias, present)
+                if link is not None:
+                    relations[alias] = link
+                    present.append(alias)
+                    pending.remove(alias)
+                    break
+            else:
+                raise ValueError(f"Não há relação conhecida entre {pending} e {present}")
+        self.join_order = present[1:]
+        return relations
+
+    @staticmethod
+    def _link(alias, present):
+        """Relação entre `alias` e alguma tabela já presente, ou None."""
+        for other in present:
+            if (other, alias) in RELATIONS:
+                left, right = RELATIONS[(other, alias)]
+                return other, left, right
+            if (alias, other) in RELATIONS:
+                right, left = RELATIONS[(alias, other)]
+                return other, left, right
+        return None
+
+    def resolve(self, reference):
+        """Resolve 'COLUNA' ou 'apelido.COLUNA' para (apelido, coluna)."""
+        if '.' in reference:
+            alias, column = reference.split('.', 1)
+            if alias in self.schemas:
+                if column not in self.schemas[alias]:
+                    raise KeyError(f"Coluna '{column}' não existe na tabela '{alias}'")
+                return alias, column
+        for alias in self.aliases:
+            if reference in self.schemas[alias]:
+                return alias, reference
+        raise KeyError(f"Coluna '{reference}' não encontrada em {self.aliases}")
+
+    def _output_name(self, alias, column):
+        return column if alias == self.query.table else f"{alias}.{column}"
+
+    def plan(self):
+        """
+        Plano da consulta.
+
+        Returns:
+            dict: projection (apelido -> colunas do resultado), reads (apelido -> colunas lidas),
+            pushed (apelido -> condições aplicadas antes das junções), post (condições aplicadas
+            depois das junções), order (apelido, coluna, crescente) ou None
+        """
+        q = self.query
+        projection = {alias: [] for alias in self.aliases}
+        if q.columns:
+            for reference in q.columns:
+                alias, column = self.resolve(reference)
+                if column not in projection[alias]:
+                    projection[alias].append(column)
+        else:
+            projection = {alias: list(self.schemas[alias]) for alias in self.aliases}
+
+        pushed = {alias: [] for alias in self.aliases}
+        post = []
+        for condition in q.where:
+            alias, column = self.resolve(condition.column)
+            resolved = Condition(column, condition.op, condition.value)
+            if alias == q.table or self.how.get(alias) == 'inner':
+                pushed[alias].append(resolved)
+            else:
+                post.append((alias, resolved))
+
+        order = None
+        if q.order_by:
+            descending = q.order_by.startswith('-')
+            alias, column = self.resolve(q.order_by.lstrip('-'))
+            order = (alias, column, not descending)
+
+        reads = {}
+        for alias in self.aliases:
+            columns = list(projection[alias])
+            extra = [c.column for c in pushed[alias]] + [c.column for a, c in post if a == alias]
+            if order and order[0] == alias:
+                extra.append(order[1])
+            reads[alias] = columns + [c for c in dict.fromkeys(extra) if c not in columns]
+        return {'projection': projection, 'reads': reads, 'pushed': pushed, 'post': post, 'order': order}
+
+    def explain(self):
+        """Descrição do plano em texto (colunas lidas e filtros aplicados por tabela)."""
+        plan = self.plan()
+        lines = []
+        for alias in [self.query.table] + self.join_order:
+            how = 'base' if alias == self.query.table else f"junção {self.how[alias]}"
+            lines.append(f"{alias} ({how}): lê {len(plan['reads'][alias])} de "
+                         f"{len(self.schemas[alias])} colunas: {', '.join(plan['reads'][alias])}")
+            if self._join_keys(alias):
+                lines.append(f"  chaves de junção (normalizadas, em cache): {', '.join(self._join_keys(alias))}")
+            for c in plan['pushed'][alias]:
+                lines.append(f"  filtro antes da junção: {c.column} {c.op} {c.value if c.value is not None else ''}".rstrip())
+            if alias in self.relations:
+                parent, left, right = self.relations[alias]
+                lines.append(f"  junção: {parent}.{left} = {alias}.{right}")
+        for alias, c in plan['post']:
+            lines.append(f"filtro após as junções: {alias}.{c.column} {c.op} {c.value if c.value is not None else ''}".rstrip())
+        lines.append(f"limite: {self.query.limit}")
+        return '\n'.join(lines)
+
+    def _join_keys(self, alias):
+        """Colunas de `alias` usadas como chave de junção."""
+        keys = [self.relations[alias][2]] if alias in self.relations else []
+        keys += [left for parent, left, _ in self.relations.values() if parent == alias]
+        return list(dict.fromkeys(keys))
+
+    @staticmethod
+    def _key_name(alias, column):
+        return f"__chave.{alias}.{column}"
+
+    def _scan(self, alias, plan):
+        """
+        Lê a tabela aplicando os filtros empurrados: colunas de filtro primeiro, as demais só das
+        linhas aprovadas. As chaves de junção são acrescentadas já normalizadas (em cache).
+        """
+        frame = self._filter(alias, plan)
+        for column in self._join_keys(alias):
+            key = read_typed_column(alias, column, 'key')
+            frame[self._key_name(alias, column)] = key.to_numpy()[frame.index.to_numpy()]
+        return frame
+
+    def _filter(self, alias, plan):
+        reads = plan['reads'][alias]
+        conditions = plan['pushed'][alias]
+        if not conditions:
+            return read_columns(alias, reads)
+        mask = None
+        for condition in conditions:
+            condition_mask = _mask(lambda kind: read_typed_column(alias, condition.column, kind), condition)
+            mask = condition_mask if mask is None else mask & condition_mask
+        rows = mask.to_numpy().nonzero()[0]
+        # Sem junções nem ordenação, só as linhas dentro do limite precisam ser lidas
+        if not self.query.joins and plan['order'] is None and self.query.limit:
+            rows = rows[:self.query.limit]
+        return read_columns(alias, reads).iloc[rows]
+
+    def execute(self):
+        """
+        Executa a consulta.
+
+        Returns:
+            pandas.DataFrame: Resultado com no máximo `limit` linhas
+        """
+        plan = self.plan()
+        q = self.query
+        base = self._scan(q.table, plan)
+        result = base.rename(columns=lambda c: c if c.startswith('__chave.') else self._output_name(q.table, c))
+
+        for alias in self.join_order:
+            parent, left, right = self.relations[alias]
+            how = self.how[alias]
+            other = self._scan(alias, plan).rename(
+                columns=lambda c: c if c.startswith('__chave.') else self._output_name(alias, c))
+            # Chaves nulas ou vazias não casam com nada (como NULL no SQL); o merge do pandas as
+            # casaria entre si e multiplicaria as linhas
+            right_key = other[self._key_name(alias, right)]
+            other = other[(right_key.notna() & (right_key != '')).to_numpy(dtype=bool)]
+            result = result.merge(other, left_on=self._key_name(parent, left),
+                                  right_on=self._key_name(alias, right), how=how)
+
+        for alias, condition in plan['post']:
+            name = self._output_name(alias, condition.column)
+            column = result[name]
+            mask = _mask(lambda kind: convert_column(column, kind), Condition(name, condition.op, condition.value))
+            result = result[mask.to_numpy()]
+
+        if plan['order'] is not None:
+            alias, column, ascending = plan['order']
+            result = result.sort_values(self._output_name(alias, column), ascending=ascending, kind='mergesort')
+
+        output = [self._output_name(alias, c) for alias in self.aliases for c in plan['projection'][alias]]
+        if q.limit:
+            result = result.head(q.limit)
+        return result[output].reset_index(drop=True)
+
+
+def run_query(query):
+    """Executa a consulta (atalho para QueryPlanner(query).execute())."""
+    return QueryPlanner(query).execute()
@@ -0,0 +1,273 @@
+"""
+Motor de ranking de produtividade compartilhado por Conclusões e Apresentação.
+
+O ranking era recalculado (groupby dos dados brutos, merge e um loop por responsável) em cada
+página e em cada slide. O motor mantém uma tabela materializada de contagens diárias por
+responsável (atribuídos e conclusões por dia de conclusão) e responde consultas para qualquer
+janela, dias da semana e responsáveis com operações vetorizadas sobre essa tabela.
+
+Os atribuídos (e portanto os pendentes) não dependem do dia de conclusão: como nas páginas, são
+todos os negócios da carga (df_todos) da janela consultada, guardados por janela carregada.
+
+Atualização incremental: update() recebe os negócios carregados (df_todos) e a janela que eles
+cobrem. Apenas as diferenças em relação ao que já estava registrado (negócios novos, alterados,
+que saíram da janela ou sem data de conclusão) são somadas/subtraídas da tabela diária; uma carga
+idêntica à anterior não altera nada (a repetição da última carga nem recalcula as diferenças).
+
+Colunas do ranking (mesmos nomes usados pelas páginas):
+    ASSIGNED_BY_NAME, TOTAL_ATRIBUIDOS, TOTAL_CONCLUSOES, PENDENTES, TAXA_CONCLUSAO,
+    PRIMEIRA_CONCLUSAO, ULTIMA_CONCLUSAO, DIAS_UTEIS_PERIODO, DIAS_COM_CONCLUSAO,
+    DIAS_TRABALHADOS, MEDIA_DIARIA, STATUS (🏆 na melhor média) e POSICAO
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.business_days import business_day_count
+
+RESPONSIBLE_FIELD = 'ASSIGNED_BY_NAME'
+STATUS_FIELD = 'UF_CRM_HIGILIZACAO_STATUS'
+DEAL_ID_FIELD = 'ID'
+# Data de conclusão (já convertida pelas páginas em DATA_CONCLUSAO; senão o campo bruto do Bitrix)
+COMPLETION_DATE_FIELDS = ('DATA_CONCLUSAO', 'UF_CRM_1741206763')
+
+# Dia usado na tabela diária para negócios sem data de conclusão
+UNDATED_DAY = pd.Timestamp('1900-01-01')
+
+RANKING_COLUMNS = [
+    'POSICAO', 'ASSIGNED_BY_NAME', 'TOTAL_ATRIBUIDOS', 'TOTAL_CONCLUSOES', 'PENDENTES', 'TAXA_CONCLUSAO',
+    'PRIMEIRA_CONCLUSAO', 'ULTIMA_CONCLUSAO', 'DIAS_UTEIS_PERIODO', 'DIAS_COM_CONCLUSAO',
+    'DIAS_TRABALHADOS', 'MEDIA_DIARIA', 'STATUS',
+]
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _normalize_deals(df):
+    """Reduz os negócios a ID, responsável, dia de conclusão e se estão concluídos (um registro por ID)."""
+    if df is None or df.empty or RESPONSIBLE_FIELD not in df.columns:
+        return pd.DataFrame({'RESPONSAVEL': pd.Series(dtype=object),
+                             'DIA': pd.Series(dtype='datetime64[ns]'),
+                             'COMPLETO': pd.Series(dtype=bool)},
+                            index=pd.Index([], dtype=object))
+    date_field = next((field for field in COMPLETION_DATE_FIELDS if field in df.columns), None)
+    day = pd.to_datetime(df[date_field], errors='coerce').dt.normalize() if date_field \
+        else pd.Series(pd.NaT, index=df.index)
+    completed = (df[STATUS_FIELD] == 'COMPLETO') if STATUS_FIELD in df.columns \
+        else pd.Series(False, index=df.index)
+    ids = df[DEAL_ID_FIELD].astype(str) if DEAL_ID_FIELD in df.columns else df.index.astype(str).to_series(index=df.index)
+    deals = pd.DataFrame({
+        'RESPONSAVEL': df[RESPONSIBLE_FIELD].to_numpy(),
+        'DIA': day.to_numpy(),
+        'COMPLETO': completed.to_numpy(dtype=bool),
+    }, index=pd.Index(ids.to_numpy(), dtype=object))
+    # Responsáveis vazios ficam fora do ranking (como no groupby das páginas)
+    deals = deals[deals['RESPONSAVEL'].notna()]
+    return deals[~deals.index.duplicated(keep='last')]
+
+
+def _daily_counts(deals):
+    """Contagens (ATRIBUIDOS, CONCLUSOES) por responsável e dia; negócios sem data ficam em UNDATED_DAY."""
+    if deals.empty:
+        return pd.DataFrame(columns=['ATRIBUIDOS', 'CONCLUSOES'],
+                            index=pd.MultiIndex.from_arrays([[], []], names=['RESPONSAVEL', 'DIA']))
+    dated = deals.assign(DIA=deals['DIA'].fillna(UNDATED_DAY))
+    return dated.groupby(['RESPONSAVEL', 'DIA']).agg(ATRIBUIDOS=('COMPLETO', 'size'), CONCLUSOES=('COMPLETO', 'sum'))
+
+
+class RankingEngine:
+    """
+    Tabela diária materializada (responsável × dia) com consultas de ranking por janela.
+
+    Negócios sem data de conclusão ficam no dia UNDATED_DAY: pertencem sempre à última carga e
+    contam como atribuídos (pendentes), nunca nos dias de conclusão.
+    """
+
+    def __init__(self):
+        self.deals = _normalize_deals(None)
+        self.daily = _daily_counts(self.deals)
+        # Janela carregada (start, end) -> negócios atribuídos por responsável na carga
+        self.assigned = {}
+        self.version = 0
+        self._last_update = None
+        self._memo = {}
+        self._lock = threading.RLock()
+
+    # --- Atualização -------------------------------------------------------------------------
+
+    def update(self, df_todos, start=None, end=None):
+        """
+        Incorpora uma carga de negócios que cobre a janela [start, end] (datas de conclusão).
+
+        Negócios registrados dentro da janela ou sem data de conclusão que não vieram na carga
+        são removidos; negócios novos ou alterados substituem a versão anterior. Sem janela, a
+        carga substitui tudo.
+
+        Args:
+            df_todos (pandas.DataFrame): Negócios carregados (com e sem conclusão)
+            start, end (date | str, optional): Janela coberta pela carga
+
+        Returns:
+            bool: True se a tabela diária mudou
+        """
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() if end is not None else None
+        incoming = _normalize_deals(df_todos)
+        fingerprint = (len(incoming), int(pd.util.hash_pandas_object(incoming, index=True).sum())) \
+            if not incoming.empty else (0, 0)
+
+        with self._lock:
+            if self._last_update == (start, end, fingerprint):
+                return False
+
+            if start is not None and end is not None:
+                in_window = (self.deals['DIA'].isna() | (
+                    (self.deals['DIA'] >= start) & (self.deals['DIA'] <= end)
+                )).to_numpy()
+            else:
+                in_window = np.ones(len(self.deals), dtype=bool)
+            replaced = self.deals[in_window | self.deals.index.isin(incoming.index)]
+
+            delta = _daily_counts(incoming).sub(_daily_counts(replaced), fill_value=0)
+            daily = self.daily.add(delta, fill_value=0)
+            self.daily = daily[(daily['ATRIBUIDOS'] != 0) | (daily['CONCLUSOES'] != 0)].astype(int).sort_index()
+            self.deals = pd.concat([self.deals.drop(replaced.index), incoming])
+            if start is None or end is None:
+                self.assigned = {}
+            self.assigned[(start, end)] = incoming.groupby('RESPONSAVEL').size()
+
+            self._last_update = (start, end, fingerprint)
+            self.version += 1
+            self._memo = {}
+            return True
+
+    # --- Consultas ---------------------------------------------------------------------------
+
+    def _window(self, start, end):
+        """Tabela diária (com colunas RESPONSAVEL e DIA) restrita à janela."""
+        daily = self.daily.reset_index()
+        if start is None or end is None:
+            return daily
+        return daily[(daily['DIA'] >= pd.Timestamp(start).normalize()) & (daily['DIA'] <= pd.Timestamp(end).normalize())]
+
+    def _assigned(self, start, end):
+        """
+        Negócios atribuídos por responsável na janela: os da carga dessa janela, se ela foi
+        carregada; sem janela, todos os registrados; senão, os concluídos na janela mais os
+        sem data de conclusão.
+        """
+        if start is None or end is None:
+            return self.daily.groupby(level='RESPONSAVEL')['ATRIBUIDOS'].sum()
+        key = (pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+        if key in self.assigned:
+            return self.assigned[key]
+        daily = self.daily.reset_index()
+        daily = daily[(daily['DIA'] == UNDATED_DAY) | ((daily['DIA'] >= key[0]) & (daily['DIA'] <= key[1]))]
+        return daily.groupby('RESPONSAVEL')['ATRIBUIDOS'].sum()
+
+    def ranking(self, start=None, end=None, responsibles=None, weekdays=None):
+        """
+        Ranking de produtividade, ordenado pelo total de conclusões (decrescente).
+
+        Args:
+            start, end (date, optional): Janela de datas de conclusão (inclusive)
+            responsibles (list, optional): Responsáveis a incluir
+            weekdays (list, optional): Dias da semana das conclusões (0 = segunda ... 6 = domingo)
+
+        Returns:
+            pandas.DataFrame: Colunas RANKING_COLUMNS
+        """
+        key = ('ranking', start, end, tuple(responsibles) if responsibles else None,
+               tuple(weekdays) if weekdays else None)
+        with self._lock:
+            if key not in self._memo:
+                self._memo[key] = self._compute_ranking(start, end, responsibles, weekdays)
+            return self._memo[key].copy()
+
+    def _compute_ranking(self, start, end, responsibles, weekdays):
+        daily = self._window(start, end)
+        assigned = self._assigned(start, end)
+        if responsibles:
+            daily = daily[daily['RESPONSAVEL'].isin(list(responsibles))]
+            assigned = assigned[assigned.index.isin(list(responsibles))]
+
+        completed = daily[(daily['CONCLUSOES'] > 0) & (daily['DIA'] != UNDATED_DAY)]
+        if weekdays:
+            completed = completed[completed['DIA'].dt.weekday.isin(list(weekdays))]
+        by_responsible = completed.groupby('RESPONSAVEL').agg(
+            PRIMEIRA_CONCLUSAO=('DIA', 'min'),
+            ULTIMA_CONCLUSAO=('DIA', 'max'),
+            DIAS_COM_CONCLUSAO=('DIA', 'size'),
+        )
+        # Conclusões sem data (somente sem janela) contam no total, mas não nos dias
+        conclusions = completed if weekdays else daily
+        totals = conclusions.groupby('RESPONSAVEL')['CONCLUSOES'].sum()
+
+        ranking = pd.DataFrame({'TOTAL_ATRIBUIDOS': assigned[assigned > 0]}, dtype=int)
+        ranking['TOTAL_CONCLUSOES'] = totals.reindex(ranking.index, fill_value=0).astype(int)
+        ranking = ranking.join(by_responsible)
+        ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
+        ranking['TAXA_CONCLUSAO'] = (
+            ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'].where(ranking['TOTAL_ATRIBUIDOS'] > 0) * 100
+        ).fillna(0).round(1)
+
+        # Dias úteis (seg-sáb, sem feriados) entre a primeira e a última conclusão de cada responsável
+        ranking['DIAS_UTEIS_PERIODO'] = np.nan_to_num(
+            business_day_count(ranking['PRIMEIRA_CONCLUSAO'], ranking['ULTIMA_CONCLUSAO'])
+        ).astype(int) if not ranking.empty else pd.Series(dtype=int)
+        ranking['DIAS_COM_CONCLUSAO'] = ranking['DIAS_COM_CONCLUSAO'].fillna(0).astype(int)
+        ranking['DIAS_TRABALHADOS'] = ranking['DIAS_UTEIS_PERIODO']
+        ranking['MEDIA_DIARIA'] = np.where(
+            ranking['TOTAL_CONCLUSOES'] > 0,
+            ranking['TOTAL_CONCLUSOES'] / ranking['DIAS_TRABALHADOS'].clip(lower=1),
+            0.0,
+        ).round(2)
+        ranking['PRIMEIRA_CONCLUSAO'] = ranking['PRIMEIRA_CONCLUSAO'].dt.date
+        ranking['ULTIMA_CONCLUSAO'] = ranking['ULTIMA_CONCLUSAO'].dt.date
+
+        ranking['STATUS'] = ''
+        if not ranking.empty:
+            ranking.loc[ranking['MEDIA_DIARIA'] == ranking['MEDIA_DIARIA'].max(), 'STATUS'] = '🏆'
+
+        # Desempate estável pelo nome, para que todas as páginas mostrem a mesma ordem
+        ranking = (
+            ranking.rename_axis(RESPONSIBLE_FIELD).reset_index()
+            .sort_values([RESPONSIBLE_FIELD]).sort_values('TOTAL_CONCLUSOES', ascending=False, kind='mergesort')
+            .reset_index(drop=True)
+        )
+        ranking.insert(0, 'POSICAO', ranking.index + 1)
+        return ranking[RANKING_COLUMNS]
+
+    def top(self, k, start=None, end=None, responsibles=None, weekdays=None):
+        """Os k primeiros do ranking (mesmos filtros de ranking)."""
+        return self.ranking(start, end, responsibles, weekdays).head(k)
+
+    def daily_target(self, start=None, end=None):
+        """
+        Meta diária: média de conclusões por responsável nos dias em que houve conclusão.
+
+        Returns:
+            float: Média (0 quando não há conclusões na janela)
+        """
+        daily = self._window(start, end)
+        cells = daily.loc[(daily['CONCLUSOES'] > 0) & (daily['DIA'] != UNDATED_DAY), 'CONCLUSOES']
+        return float(cells.mean()) if not cells.empty else 0.0
+
+
+def get_ranking_engine(name='conclusoes'):
+    """
+    Retorna o motor de ranking compartilhado (um por fonte de dados, mantido em memória).
+
+    Args:
+        name (str): Identificador da fonte (Conclusões e Apresentação usam a mesma)
+
+    Returns:
+        RankingEngine: Motor compartilhado
+    """
+    with _engines_lock:
+        engine = _engines.get(name)
+        if engine is None:
+            engine = _engines[name] = RankingEngine()
+        return engine
@@ -0,0 +1,144 @@
+"""
+Camada de dados de referência (arquivos estáticos versionados no repositório).
+
+Arquivos como planilhas históricas, gazetteers e o mapa de coordenadas mudam raramente,
+mas eram relidos e reprocessados a cada rerun do Streamlit. Esta camada:
+- mantém o resultado processado em memória, chaveado pelo mtime/tamanho do arquivo;
+- grava uma cópia binária (pickle) em .cache/reference_data, reaproveitada entre processos;
+- delega a leitura a um "leitor" explícito (dtypes e formatos de data definidos pelo chamador).
+
+Quando o arquivo de origem é alterado, o mtime muda e o cache é refeito automaticamente.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+# Diretório do cache binário (ignorado pelo git)
+CACHE_DIR = Path(__file__).parents[1] / '.cache' / 'reference_data'
+
+# Incrementar quando o formato do cache binário mudar
+CACHE_FORMAT_VERSION = 1
+
+_memory_cache = {}
+_lock = threading.Lock()
+
+
+def _file_signature(path):
+    """Retorna (mtime_ns, tamanho) do arquivo; levanta FileNotFoundError se não existir."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _cache_file(path, key):
+    """Caminho do cache binário para o par (arquivo, chave do leitor)."""
+    digest = hashlib.sha1(f"{Path(path).resolve()}::{key}".encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f"{Path(path).stem[:40]}_{digest}.pkl"
+
+
+def load_reference_table(path, reader, key='default'):
+    """
+    Carrega um arquivo de referência usando cache em memória e em disco.
+
+    Args:
+        path (str | Path): Caminho do arquivo de origem
+        reader (callable): Função reader(path) -> DataFrame com dtypes/formatos explícitos
+        key (str): Identifica o leitor/versão do processamento; mudar a chave invalida o cache
+
+    Returns:
+        pandas.DataFrame: Cópia do DataFrame processado
+
+    Raises:
+        FileNotFoundError: Se o arquivo de origem não existir
+    """
+    path = str(path)
+    signature = _file_signature(path)
+    memory_key = (path, key)
+
+    with _lock:
+        cached = _memory_cache.get(memory_key)
+    if cached is not None and cached[0] == signature:
+        return cached[1].copy()
+
+    df = _read_binary_cache(path, key, signature)
+    if df is None:
+        df = reader(path)
+        _write_binary_cache(path, key, signature, df)
+
+    with _lock:
+        _memory_cache[memory_key] = (signature, df)
+    return df.copy()
+
+
+def _read_binary_cache(path, key, signature):
+    """Lê o cache binário se ele corresponder à assinatura atual do arquivo."""
+    cache_file = _cache_file(path, key)
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, 'rb') as f:
+            payload = pickle.load(f)
+        if payload.get('version') != CACHE_FORMAT_VERSION or payload.get('signature') != signature:
+            return None
+        return payload['data']
+    except Exception as e:
+        print(f"Cache de referência inválido para {path}: {e}")
+        return None
+
+
+def _write_binary_cache(path, key, signature, df):
+    """Grava o cache binário; falhas de escrita (ex.: disco somente leitura) são ignoradas."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file = _cache_file(path, key)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                {'version': CACHE_FORMAT_VERSION, 'signature': signature, 'data': df},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"Não foi possível gravar o cache de referência para {path}: {e}")
+
+
+def clear_reference_cache(remove_files=False):
+    """
+    Limpa o cache em memória e, opcionalmente, os arquivos do cache binário.
+
+    Args:
+        remove_files (bool): Se True, remove também os arquivos em CACHE_DIR
+    """
+    with _lock:
+        _memory_cache.clear()
+    if remove_files and CACHE_DIR.exists():
+        for cache_file in CACHE_DIR.glob('*.pkl'):
+            try:
+                cache_file.unlink()
+            except OSError:
+                pass
+
+
+def read_csv_typed(path, dtypes=None, date_columns=None, usecols=None, encoding='utf-8'):
+    """
+    Lê um CSV com dtypes e formatos de data explícitos.
+
+    Args:
+        path (str): Caminho do CSV
+        dtypes (dict): Mapeamento coluna -> dtype (ex.: {'ID': str})
+        date_columns (dict): Mapeamento coluna -> formato strftime (ex.: {'Movido em': '%d/%m/%Y %H:%M:%S'})
+        usecols (list): Colunas a ler
+        encoding (str): Codificação do arquivo
+
+    Returns:
+        pandas.DataFrame: DataFrame com as colunas de data já convertidas (inválidas viram NaT)
+    """
+    df = pd.read_csv(path, usecols=usecols, dtype=dtypes, encoding=encoding)
+    for column, date_format in (date_columns or {}).items():
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
+    return df
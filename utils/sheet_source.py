@@ -0,0 +1,177 @@
+"""
+Fonte de planilhas exportadas em CSV (Google Sheets) com cache em disco e revalidação condicional.
+
+A exportação CSV do Google Sheets era baixada a cada interação com a página. Esta camada:
+- grava o último conteúdo válido em .cache/sheet_source, junto com ETag/Last-Modified;
+- só consulta o servidor depois do intervalo de atualização (refresh_interval);
+- revalida com If-None-Match/If-Modified-Since (resposta 304 reaproveita o conteúdo em disco);
+- usa timeout na requisição e, em caso de falha, devolve o último conteúdo válido (stale=True);
+- aceita um arquivo local no lugar da URL (caminho ou file://), útil para testes e uso offline.
+
+Cada conteúdo é identificado por um hash (sha256), que pode ser usado como chave de memoização
+dos processamentos derivados.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+# Diretório do cache em disco (ignorado pelo git)
+CACHE_DIR = Path(__file__).parents[1] / '.cache' / 'sheet_source'
+
+# Intervalo padrão entre consultas ao servidor (segundos) e timeout das requisições
+DEFAULT_REFRESH_INTERVAL = 300
+DEFAULT_TIMEOUT = (5, 30)
+
+_lock = threading.Lock()
+
+
+def _content_hash(content):
+    """Hash sha256 do conteúdo (bytes)."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def _cache_paths(url):
+    """Caminhos do conteúdo e dos metadados em cache para uma URL."""
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f"{digest}.csv", CACHE_DIR / f"{digest}.json"
+
+
+def _local_path(source):
+    """Retorna o Path se a fonte for um arquivo local (caminho ou file://), senão None."""
+    parsed = urlparse(str(source))
+    if parsed.scheme == 'file':
+        return Path(parsed.path)
+    if parsed.scheme in ('http', 'https'):
+        return None
+    return Path(source)
+
+
+def _snapshot(content, meta, source, from_cache, stale=False, error=None):
+    """Monta o dicionário retornado por fetch_sheet."""
+    return {
+        'content': content,
+        'content_hash': meta.get('content_hash') or _content_hash(content),
+        'fetched_at': meta.get('fetched_at'),
+        'source': source,
+        'from_cache': from_cache,
+        'stale': stale,
+        'error': error,
+    }
+
+
+def _read_cache(url):
+    """Lê conteúdo e metadados do cache em disco; (None, {}) se não existir ou estiver inválido."""
+    content_file, meta_file = _cache_paths(url)
+    if not content_file.exists() or not meta_file.exists():
+        return None, {}
+    try:
+        meta = json.loads(meta_file.read_text(encoding='utf-8'))
+        content = content_file.read_bytes()
+        if meta.get('content_hash') != _content_hash(content):
+            return None, {}
+        return content, meta
+    except (OSError, ValueError) as e:
+        print(f"Cache de planilha inválido para {url}: {e}")
+        return None, {}
+
+
+def _write_cache(url, content, meta):
+    """Grava conteúdo e metadados de forma atômica; falhas de escrita são ignoradas."""
+    content_file, meta_file = _cache_paths(url)
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        if content is not None:
+            tmp_content = content_file.with_suffix('.csv.tmp')
+            tmp_content.write_bytes(content)
+            os.replace(tmp_content, content_file)
+        tmp_meta = meta_file.with_suffix('.json.tmp')
+        tmp_meta.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(tmp_meta, meta_file)
+    except OSError as e:
+        print(f"Não foi possível gravar o cache da planilha {url}: {e}")
+
+
+def fetch_sheet(source, refresh_interval=DEFAULT_REFRESH_INTERVAL, timeout=DEFAULT_TIMEOUT, force=False):
+    """
+    Obtém o conteúdo de uma planilha exportada (CSV) usando o cache em disco.
+
+    Args:
+        source (str | Path): URL http(s) da exportação ou caminho de um arquivo local
+        refresh_interval (int): Segundos durante os quais o conteúdo em cache é usado sem consultar o servidor
+        timeout (float | tuple): Timeout da requisição (conexão, leitura)
+        force (bool): Se True, revalida com o servidor mesmo dentro do intervalo de atualização
+
+    Returns:
+        dict: content (bytes), content_hash, fetched_at (epoch), source, from_cache,
+        stale (True quando o servidor falhou e o último conteúdo válido foi usado) e error
+
+    Raises:
+        requests.RequestException: Se a requisição falhar e não houver conteúdo em cache
+        requests.HTTPError: Se o servidor responder com erro e não houver conteúdo em cache
+        FileNotFoundError: Se a fonte for um arquivo local inexistente
+    """
+    local_path = _local_path(source)
+    if local_path is not None:
+        content = local_path.read_bytes()
+        return _snapshot(content, {'fetched_at': local_path.stat().st_mtime}, str(local_path), from_cache=False)
+
+    url = str(source)
+    with _lock:
+        cached_content, meta = _read_cache(url)
+        agora = time.time()
+
+        if cached_content is not None and not force and agora - meta.get('fetched_at', 0) < refresh_interval:
+            return _snapshot(cached_content, meta, url, from_cache=True)
+
+        headers = {}
+        if cached_content is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        try:
+            response = requests.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and cached_content is not None:
+                meta['fetched_at'] = agora
+                _write_cache(url, None, meta)
+                return _snapshot(cached_content, meta, url, from_cache=True)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if cached_content is None:
+                raise
+            print(f"Falha ao atualizar a planilha {url}; usando a última versão válida: {e}")
+            return _snapshot(cached_content, meta, url, from_cache=True, stale=True, error=str(e))
+
+        content = response.content
+        meta = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': agora,
+            'content_hash': _content_hash(content),
+        }
+        _write_cache(url, content, meta)
+        return _snapshot(content, meta, url, from_cache=False)
+
+
+def clear_sheet_cache(source=None):
+    """
+    Remove o cache em disco de uma fonte (ou de todas, quando source é None).
+
+    Args:
+        source (str, optional): URL cuja cópia em cache deve ser removida
+    """
+    if not CACHE_DIR.exists():
+        return
+    arquivos = _cache_paths(str(source)) if source is not None else list(CACHE_DIR.glob('*'))
+    for arquivo in arquivos:
+        try:
+            arquivo.unlink()
+        except OSError:
+            pass
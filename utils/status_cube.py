@@ -0,0 +1,217 @@
+"""
+Cubo pré-agregado de status de higienização (responsável × status × campo × dia).
+
+Produção, Início e os slides de produção da Apresentação recalculavam as mesmas contagens
+(status por responsável, pendências e produção por campo, métricas macro) a partir do DataFrame
+bruto a cada mudança de filtro ou rotação de slide. O cubo é montado uma vez por versão dos dados
+e as páginas consultam fatias dele; cada fatia é memorizada pelos seus parâmetros.
+
+Dimensões:
+- RESPONSAVEL: ASSIGNED_BY_NAME
+- STATUS: UF_CRM_HIGILIZACAO_STATUS normalizado (COMPLETO, INCOMPLETO, PENDENCIA ou OUTRO)
+- DIA: dia da conclusão (UF_CRM_1741206763), NaT quando ausente
+- UNICO: primeira ocorrência do negócio (DEAL_ID/ID), usada nas métricas macro sem duplicatas
+- CAMPO: campos de higienização (contagens de "SIM" e de pendências por responsável), somadas
+  diretamente nas matrizes do checklist (utils.checklist_score, em cube.checklist) sobre as
+  linhas de row_mask
+"""
+import numpy as np
+import pandas as pd
+
+from utils.checklist_score import HIGIENIZACAO_FIELDS, ChecklistMatrix
+from utils.cube_cache import CubeCache, data_version as cheap_data_version
+from utils.data_processor import STATUS_FIELD, DEAL_ID_FIELD, UF_DEAL_ID_FIELD, StatusCounts, status_codes
+
+RESPONSIBLE_FIELD = 'ASSIGNED_BY_NAME'
+COMPLETION_DATE_FIELD = 'UF_CRM_1741206763'
+
+# Rótulos da dimensão STATUS (na ordem dos códigos de status_codes)
+STATUS_LABELS = ['COMPLETO', 'INCOMPLETO', 'PENDENCIA', 'OUTRO']
+
+_cubes = CubeCache()
+
+
+class StatusCube:
+    """
+    Cubo de contagens de higienização com consultas memorizadas.
+
+    Todas as consultas aceitam os mesmos filtros:
+        responsibles (list): Responsáveis a incluir (None = todos)
+        statuses (list): Status a incluir (ex.: ['COMPLETO', 'PENDENCIA']; None = todos)
+        start, end (datetime): Período de conclusão; aplicado apenas às linhas com status em
+            date_statuses (padrão: COMPLETO), como no filtro "Período Por Conclusão" de Produção
+    """
+
+    def __init__(self, df, date_column=COMPLETION_DATE_FIELD, responsible_column=RESPONSIBLE_FIELD):
+        n = len(df)
+        if responsible_column in df.columns:
+            responsible = df[responsible_column].fillna('Não atribuído').astype(str).to_numpy()
+        else:
+            responsible = np.full(n, 'Não atribuído', dtype=object)
+        if STATUS_FIELD in df.columns:
+            status = pd.Categorical.from_codes(status_codes(df[STATUS_FIELD]), categories=STATUS_LABELS)
+        else:
+            status = pd.Categorical.from_codes(np.full(n, 2, dtype=np.int8), categories=STATUS_LABELS)
+        if date_column in df.columns:
+            day = pd.to_datetime(df[date_column], errors='coerce').dt.normalize().to_numpy()
+        else:
+            day = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+        id_field = UF_DEAL_ID_FIELD if UF_DEAL_ID_FIELD in df.columns else DEAL_ID_FIELD
+        unique = ~df[id_field].duplicated().to_numpy() if id_field in df.columns else np.ones(n, dtype=bool)
+
+        keys = pd.DataFrame({
+            'RESPONSAVEL': pd.Categorical(responsible),
+            'STATUS': status,
+            'DIA': day,
+            'UNICO': unique,
+        })
+        dimensions = ['RESPONSAVEL', 'STATUS', 'DIA', 'UNICO']
+
+        # Tabela de status: número de linhas por combinação das dimensões
+        self.status_table = (
+            keys.groupby(dimensions, observed=True, dropna=False).size().rename('N').reset_index()
+        )
+
+        # Campos: pendências e "SIM" por negócio, nas matrizes do checklist
+        self.checklist = ChecklistMatrix(df, responsible_column=responsible_column)
+        self.fields = self.checklist.fields
+        self.responsibles = sorted(keys['RESPONSAVEL'].cat.categories.tolist())
+        # Dimensões linha a linha (alinhadas aos dados), para row_mask
+        self.rows = keys
+        self._memo = {}
+
+    # --- Filtros -----------------------------------------------------------------------------
+
+    def _slice(self, table, responsibles, statuses, start, end, date_statuses, unique_only=False):
+        """Aplica os filtros comuns a uma das tabelas do cubo."""
+        return table[self._mask(table, responsibles, statuses, start, end, date_statuses, unique_only)]
+
+    @staticmethod
+    def _mask(table, responsibles, statuses, start, end, date_statuses, unique_only=False):
+        """Máscara booleana dos filtros comuns sobre uma tabela com as dimensões do cubo."""
+        mask = np.ones(len(table), dtype=bool)
+        if responsibles is not None:
+            mask &= table['RESPONSAVEL'].isin(list(responsibles)).to_numpy()
+        if statuses is not None:
+            mask &= table['STATUS'].isin(list(statuses)).to_numpy()
+        if start is not None and end is not None:
+            in_period = (
+                (table['DIA'] >= pd.Timestamp(start).normalize()) & (table['DIA'] <= pd.Timestamp(end))
+            ).to_numpy()
+            dated = table['STATUS'].isin(list(date_statuses)).to_numpy()
+            mask &= ~dated | in_period
+        if unique_only:
+            mask &= table['UNICO'].to_numpy()
+        return mask
+
+    def _memoized(self, name, compute, *args):
+        """Retorna a fatia em cache para (name, args) ou calcula e guarda uma cópia."""
+        key = (name,) + tuple(
+            frozenset(a) if isinstance(a, set) else tuple(a) if isinstance(a, list) else a for a in args
+        )
+        if key not in self._memo:
+            self._memo[key] = compute(*args)
+        result = self._memo[key]
+        return result.copy() if isinstance(result, pd.DataFrame) else result
+
+    # --- Consultas ---------------------------------------------------------------------------
+
+    def row_mask(self, responsibles=None, statuses=None, start=None, end=None, date_statuses=('COMPLETO',)):
+        """
+        Máscara booleana, alinhada às linhas dos dados, dos negócios que passam pelos filtros
+        (os mesmos das fatias do cubo); permite recortar os dados sem refazer os filtros.
+        """
+        def compute(responsibles, statuses, start, end, date_statuses):
+            return self._mask(self.rows, responsibles, statuses, start, end, date_statuses)
+        return self._memoized('row_mask', compute, responsibles, statuses, start, end, date_statuses)
+
+    def total_rows(self, responsibles=None, statuses=None, start=None, end=None, date_statuses=('COMPLETO',)):
+        """Número de linhas (negócios, com duplicatas) após os filtros."""
+        def compute(responsibles, statuses, start, end, date_statuses):
+            return int(self._slice(self.status_table, responsibles, statuses, start, end, date_statuses)['N'].sum())
+        return self._memoized('total_rows', compute, responsibles, statuses, start, end, date_statuses)
+
+    def status_counts(self, responsibles=None, statuses=None, start=None, end=None, date_statuses=('COMPLETO',),
+                      unique=True):
+        """
+        Métricas macro (StatusCounts, como calculate_status_counts).
+
+        Args:
+            unique (bool): Conta cada negócio uma vez (padrão de calculate_status_counts)
+        """
+        def compute(responsibles, statuses, start, end, date_statuses, unique):
+            sliced = self._slice(self.status_table, responsibles, statuses, start, end, date_statuses, unique)
+            totals = sliced.groupby('STATUS', observed=False)['N'].sum().reindex(STATUS_LABELS, fill_value=0)
+            return StatusCounts(
+                completo=int(totals['COMPLETO']),
+                incompleto=int(totals['INCOMPLETO']),
+                pendente=int(totals['PENDENCIA'] + totals['OUTRO']),
+                nao_reconhecido=int(totals['OUTRO']),
+            )
+        return self._memoized('status_counts', compute, responsibles, statuses, start, end, date_statuses, unique)
+
+    def status_by_responsible(self, responsibles=None, statuses=None, start=None, end=None,
+                              date_statuses=('COMPLETO',)):
+        """
+        Tabela responsável × status (colunas PENDENCIA, INCOMPLETO e COMPLETO), sem duplicatas removidas.
+
+        Returns:
+            pandas.DataFrame: Indexada por responsável
+        """
+        def compute(responsibles, statuses, start, end, date_statuses):
+            sliced = self._slice(self.status_table, responsibles, statuses, start, end, date_statuses)
+            table = sliced.pivot_table(index='RESPONSAVEL', columns='STATUS', values='N', aggfunc='sum',
+                                       fill_value=0, observed=True)
+            table = table.reindex(columns=['PENDENCIA', 'INCOMPLETO', 'COMPLETO'], fill_value=0).astype(int)
+            table.index = table.index.astype(str)
+            table.index.name = RESPONSIBLE_FIELD
+            table.columns.name = STATUS_FIELD
+            return table
+        return self._memoized('status_by_responsible', compute, responsibles, statuses, start, end, date_statuses)
+
+    def field_counts(self, measure='PENDENCIAS', responsibles=None, statuses=None, start=None, end=None,
+                     date_statuses=('COMPLETO',)):
+        """
+        Tabela responsável × campo de higienização, com coluna Total, ordenada pelo Total (decrescente).
+
+        Args:
+            measure (str): 'PENDENCIAS' (valores NÃO/vazios) ou 'SIM' (valores concluídos)
+
+        Returns:
+            pandas.DataFrame: Colunas Responsável, um campo por coluna (nome de exibição) e Total
+        """
+        def compute(measure, responsibles, statuses, start, end, date_statuses):
+            rows = self.row_mask(responsibles, statuses, start, end, date_statuses)
+            names = list(HIGIENIZACAO_FIELDS.values())
+            if not rows.any():
+                return pd.DataFrame(columns=['Responsável'] + names + ['Total'])
+            table = self.checklist.by_responsible(measure, rows=rows)
+            # Campos ausentes dos dados entram zerados, como nas demais tabelas de campos
+            return table.reindex(columns=['Responsável'] + names + ['Total'], fill_value=0)
+        return self._memoized('field_counts', compute, measure, responsibles, statuses, start, end, date_statuses)
+
+
+def _data_version(df):
+    """Chave barata da versão dos dados (ver utils.cube_cache.data_version)."""
+    return cheap_data_version(
+        df,
+        [UF_DEAL_ID_FIELD, DEAL_ID_FIELD, RESPONSIBLE_FIELD, STATUS_FIELD, COMPLETION_DATE_FIELD] + list(HIGIENIZACAO_FIELDS),
+        id_fields=(UF_DEAL_ID_FIELD, DEAL_ID_FIELD),
+        count_fields=(STATUS_FIELD,),
+    )
+
+
+def get_status_cube(df, data_version=None):
+    """
+    Retorna o cubo de status dos dados, montando-o apenas quando a versão dos dados muda.
+
+    Args:
+        df (pandas.DataFrame): Dados de higienização (crm_deal + crm_deal_uf)
+        data_version (hashable, optional): Identificador da versão dos dados (ex.: horário do
+            carregamento, como em Produção e Início); se omitido, usa a chave barata de _data_version
+
+    Returns:
+        StatusCube: Cubo compartilhado entre as páginas
+    """
+    key = data_version if data_version is not None else _data_version(df)
+    return _cubes.get(key, lambda: StatusCube(df))
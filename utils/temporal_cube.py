@@ -0,0 +1,232 @@
+"""
+Cubo temporal de conclusões (responsável × dia × hora), base das análises por dia, semana ISO,
+dia da semana e hora.
+
+Os slides temporais da Apresentação e as análises temporais de Conclusões recalculavam as partes
+da data (dt.date, strftime('%Y-%V'), day_name, dt.hour) e reagrupavam os mesmos dados a cada
+visualização. O cubo converte a coluna de data uma única vez (NumPy datetime64), agrega as
+contagens por (responsável, dia, hora) e deriva semana ISO e dia da semana dos dias distintos.
+É montado uma vez por versão dos dados; cada consulta é memorizada pelos seus parâmetros.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cube_cache import CubeCache, data_version as cheap_data_version
+
+DATE_FIELD = 'DATA_CONCLUSAO'
+RESPONSIBLE_FIELD = 'ASSIGNED_BY_NAME'
+ID_FIELD = 'ID'
+
+# Dias da semana em português, na ordem de dayofweek (segunda = 0)
+DIAS_SEMANA_PT = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
+
+DIMENSIONS = ('DIA', 'SEMANA', 'DIA_SEMANA', 'HORA')
+
+_cubes = CubeCache()
+
+
+def _wall_clock(values):
+    """Converte a coluna para datetime64[ns] no horário local (sem fuso), NaT quando inválida."""
+    stamps = pd.to_datetime(values, errors='coerce')
+    if getattr(stamps.dt, 'tz', None) is not None:
+        stamps = stamps.dt.tz_localize(None)
+    return stamps.to_numpy(dtype='datetime64[ns]')
+
+
+def _weekday(days):
+    """Dia da semana (segunda = 0) de um array datetime64[D] (1970-01-01 foi uma quinta-feira)."""
+    return ((days.astype(np.int64) + 3) % 7).astype(np.int8)
+
+
+def _iso_week_labels(days):
+    """Rótulos 'AAAA-SS' da semana ISO (ano ISO e número da semana) de um array datetime64[D]."""
+    thursday = days + (3 - _weekday(days)).astype('timedelta64[D]')
+    iso_year = thursday.astype('datetime64[Y]')
+    week = (thursday - iso_year.astype('datetime64[D]')).astype(np.int64) // 7 + 1
+    return np.char.add(np.char.add(np.datetime_as_string(iso_year, unit='Y'), '-'),
+                       np.char.zfill(week.astype(str), 2)).astype(object)
+
+
+class TemporalCube:
+    """
+    Contagens de conclusões por responsável e dimensão temporal, com consultas memorizadas.
+
+    As consultas aceitam `responsibles` (lista de responsáveis a incluir; None = todos).
+    """
+
+    def __init__(self, df, date_column=DATE_FIELD, responsible_column=RESPONSIBLE_FIELD, id_column=ID_FIELD):
+        stamps = _wall_clock(df[date_column]) if date_column in df.columns \
+            else np.full(len(df), np.datetime64('NaT'), dtype='datetime64[ns]')
+        valid = ~np.isnat(stamps)
+        stamps = stamps[valid]
+        days = stamps.astype('datetime64[D]')
+        hours = ((stamps - days) // np.timedelta64(1, 'h')).astype(np.int8)
+
+        if responsible_column in df.columns:
+            responsible = df[responsible_column].fillna('Não atribuído').astype(str).to_numpy()[valid]
+        else:
+            responsible = np.full(len(stamps), 'Não atribuído', dtype=object)
+        ids = pd.factorize(df[id_column].to_numpy()[valid])[0] if id_column in df.columns \
+            else np.arange(len(stamps))
+
+        records = pd.DataFrame({
+            'RESPONSAVEL': pd.Categorical(responsible),
+            'DIA': days,
+            'HORA': hours,
+        })
+        # Tabela base: conclusões por (responsável, dia, hora)
+        base = records.groupby(['RESPONSAVEL', 'DIA', 'HORA'], observed=True).size().rename('N').reset_index()
+
+        # Semana ISO e dia da semana derivados dos dias distintos (não das linhas)
+        unique_days, inverse = np.unique(base['DIA'].to_numpy().astype('datetime64[D]'), return_inverse=True)
+        base['SEMANA'] = _iso_week_labels(unique_days)[inverse]
+        base['DIA_SEMANA'] = _weekday(unique_days)[inverse]
+        self.base = base
+
+        # Processos distintos por (responsável, dia da semana)
+        self.weekday_ids = pd.DataFrame({
+            'RESPONSAVEL': records['RESPONSAVEL'],
+            'DIA_SEMANA': _weekday(days),
+            'ID': ids,
+        }).drop_duplicates()
+
+        self.first_stamp = pd.Timestamp(stamps.min()) if len(stamps) else None
+        self.responsibles = sorted(records['RESPONSAVEL'].cat.categories.tolist())
+        self._memo = {}
+
+    # --- Filtros -----------------------------------------------------------------------------
+
+    def _slice(self, table, responsibles):
+        if responsibles is None:
+            return table
+        return table[table['RESPONSAVEL'].isin(list(responsibles)).to_numpy()]
+
+    def _memoized(self, name, compute, *args):
+        """Retorna a consulta em cache para (name, args) ou calcula e guarda o resultado."""
+        key = (name,) + tuple(tuple(a) if isinstance(a, list) else a for a in args)
+        if key not in self._memo:
+            self._memo[key] = compute(*args)
+        result = self._memo[key]
+        return result.copy() if isinstance(result, pd.DataFrame) else result
+
+    # --- Consultas ---------------------------------------------------------------------------
+
+    def first_day(self, responsibles=None):
+        """Data (datetime.date) da primeira conclusão, ou None sem dados."""
+        base = self._slice(self.base, responsibles)
+        return None if base.empty else base['DIA'].min().date()
+
+    def total(self, responsibles=None):
+        """Número de conclusões com data."""
+        return int(self._slice(self.base, responsibles)['N'].sum())
+
+    def daily(self, responsibles=None, start=None, end=None):
+        """
+        Conclusões por dia.
+
+        Args:
+            start, end (date, optional): Se informados, inclui todos os dias do intervalo
+                (dias sem conclusões com 0) e descarta os de fora
+
+        Returns:
+            pandas.DataFrame: Colunas DATA_CONCLUSAO (datetime.date) e CONCLUSOES
+        """
+        def compute(responsibles, start, end):
+            counts = self._slice(self.base, responsibles).groupby('DIA')['N'].sum()
+            if start is not None and end is not None:
+                counts = counts.reindex(pd.date_range(pd.Timestamp(start).normalize(),
+                                                      pd.Timestamp(end).normalize(), freq='D'), fill_value=0)
+            return pd.DataFrame({
+                'DATA_CONCLUSAO': counts.index.date,
+                'CONCLUSOES': counts.to_numpy().astype(int),
+            })
+        return self._memoized('daily', compute, responsibles, start, end)
+
+    def weekly(self, responsibles=None):
+        """Conclusões por semana ISO (colunas SEMANA 'AAAA-SS' e CONCLUSOES, em ordem cronológica)."""
+        def compute(responsibles):
+            counts = self._slice(self.base, responsibles).groupby('SEMANA')['N'].sum()
+            return pd.DataFrame({'SEMANA': counts.index.to_numpy(), 'CONCLUSOES': counts.to_numpy().astype(int)})
+        return self._memoized('weekly', compute, responsibles)
+
+    def by_weekday(self, responsibles=None):
+        """
+        Conclusões e processos distintos por dia da semana (apenas dias com conclusões).
+
+        Returns:
+            pandas.DataFrame: Colunas DIA_SEMANA (em português), CONCLUSOES e PROCESSOS_UNICOS,
+            de segunda a domingo
+        """
+        def compute(responsibles):
+            counts = self._slice(self.base, responsibles).groupby('DIA_SEMANA')['N'].sum()
+            ids = self._slice(self.weekday_ids, responsibles)
+            unique = ids.drop_duplicates(['DIA_SEMANA', 'ID'])['DIA_SEMANA'].value_counts()
+            return pd.DataFrame({
+                'DIA_SEMANA': np.asarray(DIAS_SEMANA_PT, dtype=object)[counts.index.to_numpy()],
+                'CONCLUSOES': counts.to_numpy().astype(int),
+                'PROCESSOS_UNICOS': unique.reindex(counts.index, fill_value=0).to_numpy().astype(int),
+            })
+        return self._memoized('by_weekday', compute, responsibles)
+
+    def by_hour(self, responsibles=None, fill=True):
+        """
+        Conclusões por hora do dia (colunas HORA e CONCLUSOES).
+
+        Args:
+            fill (bool): Inclui as 24 horas (horas sem conclusões com 0)
+        """
+        def compute(responsibles, fill):
+            counts = self._slice(self.base, responsibles).groupby('HORA')['N'].sum()
+            if fill:
+                counts = counts.reindex(range(24), fill_value=0)
+            return pd.DataFrame({'HORA': counts.index.to_numpy().astype(int),
+                                 'CONCLUSOES': counts.to_numpy().astype(int)})
+        return self._memoized('by_hour', compute, responsibles, fill)
+
+    def by_responsible(self, dimension, responsibles=None):
+        """
+        Tabela responsável × dimensão temporal ('DIA', 'SEMANA', 'DIA_SEMANA' ou 'HORA').
+
+        Returns:
+            pandas.DataFrame: Uma linha por responsável e uma coluna por valor da dimensão
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Dimensão temporal inválida: {dimension}")
+
+        def compute(dimension, responsibles):
+            table = (
+                self._slice(self.base, responsibles)
+                .pivot_table(index='RESPONSAVEL', columns=dimension, values='N', aggfunc='sum',
+                             fill_value=0, observed=True)
+            )
+            if dimension == 'DIA_SEMANA':
+                table.columns = [DIAS_SEMANA_PT[c] for c in table.columns]
+            return table.rename_axis(index='Responsável', columns=None).reset_index()
+        return self._memoized('by_responsible', compute, dimension, responsibles)
+
+
+def _data_version(df, date_column):
+    """Chave barata da versão dos dados (ver utils.cube_cache.data_version)."""
+    return cheap_data_version(
+        df, [ID_FIELD, RESPONSIBLE_FIELD, date_column],
+        id_fields=(ID_FIELD,),
+        count_fields=(RESPONSIBLE_FIELD,),
+        extreme_fields=(date_column,),
+    )
+
+
+def get_temporal_cube(df, data_version=None, date_column=DATE_FIELD):
+    """
+    Retorna o cubo temporal dos dados, montando-o apenas quando a versão dos dados muda.
+
+    Args:
+        df (pandas.DataFrame): Conclusões (uma linha por conclusão)
+        data_version (hashable, optional): Identificador da versão dos dados; se omitido,
+            usa a chave barata de _data_version
+        date_column (str): Coluna com a data/hora da conclusão
+
+    Returns:
+        TemporalCube: Cubo compartilhado entre a página de Conclusões e os slides
+    """
+    key = (date_column, data_version if data_version is not None else _data_version(df, date_column))
+    return _cubes.get(key, lambda: TemporalCube(df, date_column=date_column))
@@ -0,0 +1,268 @@
+"""
+Índice de texto completo local (SQLite FTS5) para mensagens de tickets e descrições de reclamações.
+
+As buscas nessas páginas filtravam DataFrames inteiros com substring (str.contains), linha a linha.
+Aqui cada texto é indexado uma vez num arquivo SQLite em .cache/search, com os termos sem acento
+e em minúsculas (unidecode), e a busca devolve os documentos ordenados por relevância (BM25).
+
+Cada documento pode levar uma data e uma categoria (ex.: createdAt e departamento do ticket), e a
+busca pode ser restrita a elas ou a um conjunto de chaves: os filtros são aplicados na própria
+consulta MATCH, antes do limite de resultados, e não depois sobre os mais relevantes de todo o
+histórico.
+
+A atualização é incremental:
+- upsert() só regrava documentos novos ou alterados (comparando um resumo do conteúdo);
+- fontes que só crescem (tickets) guardam uma marca d'água em set_meta()/get_meta() e enviam
+  apenas os documentos posteriores a ela;
+- sync_in_background() roda a sincronização numa thread, para que a primeira indexação de todo o
+  histórico não aconteça dentro da execução da página.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from unidecode import unidecode
+
+# Diretório dos índices em disco (ignorado pelo git)
+INDEX_DIR = Path(os.getenv('SEARCH_INDEX_DIR', Path(__file__).parents[1] / '.cache' / 'search'))
+
+DEFAULT_LIMIT = 200
+
+# Tamanho mínimo do último termo para buscá-lo como prefixo
+MIN_PREFIX = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    rowid INTEGER PRIMARY KEY,
+    chave TEXT UNIQUE NOT NULL,
+    resumo TEXT NOT NULL,
+    data TEXT,
+    categoria TEXT
+);
+CREATE INDEX IF NOT EXISTS documentos_data ON documentos (data);
+CREATE VIRTUAL TABLE IF NOT EXISTS termos USING fts5(texto, tokenize='unicode61');
+CREATE TABLE IF NOT EXISTS meta (
+    nome TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+_TOKEN = re.compile(r'\w+')
+
+
+def fold(text):
+    """Texto sem acentos e em minúsculas ('Certidão' -> 'certidao'); None vira ''."""
+    if text is None or text != text:
+        return ''
+    return unidecode(str(text)).lower()
+
+
+def _digest(*values):
+    content = '\x1f'.join('' if v is None else str(v) for v in values)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _attribute(value):
+    """Data ou categoria gravada junto do documento (None para valores ausentes)."""
+    if value is None or value != value:
+        return None
+    return str(value)
+
+
+def match_expression(query):
+    """
+    Converte a busca do usuário numa expressão MATCH do FTS5.
+
+    Todos os termos precisam aparecer no documento. O último termo, o que está sendo digitado,
+    é buscado como prefixo ("certid" encontra "certidão") quando tem ao menos MIN_PREFIX
+    caracteres. Retorna '' quando a busca não tem termos.
+    """
+    tokens = [f'"{token}"' for token in _TOKEN.findall(fold(query))]
+    if tokens and len(tokens[-1]) - 2 >= MIN_PREFIX:
+        tokens[-1] += '*'
+    return ' '.join(tokens)
+
+
+class TextIndex:
+    """
+    Índice FTS5 de documentos identificados por uma chave (ex.: ID do ticket).
+
+    Args:
+        path (str | Path): Arquivo SQLite do índice (criado se não existir; ':memory:' não é
+            suportado, pois cada operação abre a sua conexão)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(documentos)')]
+            if columns and 'categoria' not in columns:
+                # Índice de uma versão sem data/categoria: recriado do zero (inclusive a marca d'água)
+                conn.executescript('DROP TABLE documentos; DROP TABLE IF EXISTS termos; DROP TABLE IF EXISTS meta;')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Conexão de uma operação: confirma a transação ao final e fecha a conexão."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Atualização -------------------------------------------------------------------------
+
+    def upsert(self, documents):
+        """
+        Indexa ou atualiza documentos, ignorando os que não mudaram.
+
+        Args:
+            documents (iterable): Tuplas (chave, texto) ou (chave, texto, data, categoria)
+
+        Returns:
+            int: Número de documentos gravados
+        """
+        written = 0
+        with self._lock, self._connect() as conn:
+            for document in documents:
+                key, text = str(document[0]), fold(document[1])
+                date = _attribute(document[2]) if len(document) > 2 else None
+                category = _attribute(document[3]) if len(document) > 3 else None
+                digest = _digest(text, date, category)
+                row = conn.execute('SELECT rowid, resumo FROM documentos WHERE chave = ?', (key,)).fetchone()
+                if row is not None:
+                    if row[1] == digest:
+                        continue
+                    conn.execute('UPDATE documentos SET resumo = ?, data = ?, categoria = ? WHERE rowid = ?',
+                                 (digest, date, category, row[0]))
+                    conn.execute('DELETE FROM termos WHERE rowid = ?', (row[0],))
+                    rowid = row[0]
+                else:
+                    rowid = conn.execute('INSERT INTO documentos (chave, resumo, data, categoria) VALUES (?, ?, ?, ?)',
+                                         (key, digest, date, category)).lastrowid
+                conn.execute('INSERT INTO termos (rowid, texto) VALUES (?, ?)', (rowid, text))
+                written += 1
+        return written
+
+    def remove(self, keys):
+        """Remove documentos do índice pelas chaves."""
+        with self._lock, self._connect() as conn:
+            for key in keys:
+                row = conn.execute('SELECT rowid FROM documentos WHERE chave = ?', (str(key),)).fetchone()
+                if row is not None:
+                    conn.execute('DELETE FROM termos WHERE rowid = ?', (row[0],))
+                    conn.execute('DELETE FROM documentos WHERE rowid = ?', (row[0],))
+
+    def get_meta(self, name, default=None):
+        """Valor salvo junto do índice (ex.: marca d'água da última sincronização)."""
+        with self._connect() as conn:
+            row = conn.execute('SELECT valor FROM meta WHERE nome = ?', (name,)).fetchone()
+        return row[0] if row is not None else default
+
+    def set_meta(self, name, value):
+        with self._lock, self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO meta (nome, valor) VALUES (?, ?)', (name, str(value)))
+
+    def sync_in_background(self, sync, wait=0):
+        """
+        Executa sync(índice) numa thread em segundo plano (uma sincronização por vez).
+
+        Args:
+            sync (callable): Função que envia os documentos pendentes ao índice
+            wait (float): Segundos a aguardar o término (sincronizações pequenas terminam aqui)
+
+        Returns:
+            bool: True se a sincronização ainda está em andamento
+        """
+        def run():
+            try:
+                sync(self)
+            except Exception as e:
+                print(f"Erro ao sincronizar o índice de busca {self.path.name}: {e}")
+
+        with self._lock:
+            if self._sync_thread is None or not self._sync_thread.is_alive():
+                self._sync_thread = threading.Thread(target=run, daemon=True, name=f'indice-{self.path.stem}')
+                self._sync_thread.start()
+            thread = self._sync_thread
+        if wait:
+            thread.join(wait)
+        return thread.is_alive()
+
+    # --- Consulta ----------------------------------------------------------------------------
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM documentos').fetchone()[0]
+
+    def search(self, query, limit=DEFAULT_LIMIT, since=None, category=None, keys=None):
+        """
+        Busca documentos que contêm todos os termos (sem distinção de acentos e maiúsculas).
+
+        Os filtros entram na consulta MATCH: o limite vale para os documentos que os atendem.
+
+        Args:
+            query (str): Texto digitado pelo usuário
+            limit (int): Número máximo de resultados
+            since (datetime | str, optional): Só documentos com data a partir desta
+            category (str, optional): Só documentos desta categoria
+            keys (iterable, optional): Só documentos com estas chaves
+
+        Returns:
+            list: Pares (chave, pontuação), do mais relevante para o menos relevante
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        conditions, params = ['termos MATCH ?'], [expression]
+        if since is not None:
+            conditions.append('d.data >= ?')
+            params.append(str(since))
+        if category is not None:
+            conditions.append('d.categoria = ?')
+            params.append(str(category))
+        with self._connect() as conn:
+            if keys is not None:
+                conn.execute('CREATE TEMP TABLE filtro (chave TEXT PRIMARY KEY)')
+                conn.executemany('INSERT OR IGNORE INTO filtro VALUES (?)', ((str(k),) for k in keys))
+                conditions.append('d.chave IN (SELECT chave FROM filtro)')
+            rows = conn.execute(f"""
+                SELECT d.chave, bm25(termos) AS pontuacao
+                FROM termos
+                JOIN documentos d ON d.rowid = termos.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY pontuacao
+                LIMIT ?
+            """, params + [int(limit)]).fetchall()
+        # bm25() é negativo (quanto menor, mais relevante); expõe uma pontuação positiva
+        return [(key, -score) for key, score in rows]
+
+
+def get_text_index(name):
+    """
+    Retorna o índice compartilhado pelo processo para uma fonte de textos.
+
+    Args:
+        name (str): Nome da fonte ('tickets', 'reclamacoes'); define o arquivo em INDEX_DIR
+
+    Returns:
+        TextIndex: Índice da fonte
+    """
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = TextIndex(INDEX_DIR / f'{name}.sqlite')
+        return index
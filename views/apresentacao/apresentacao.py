@@ -3,7 +3,6 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import time
 import os
 import sys
 from pathlib import Path
@@ -32,6 +31,7 @@ def update_progress(progress_bar, progress_value, message_container, message):
 
 # Importar módulos específicos do projeto
 from api.bitrix_connector import load_merged_data, get_higilizacao_fields
+from views.apresentacao.carrossel import mostrar_carrossel, get_carrossel_worker
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -240,30 +240,19 @@ def show_apresentacao(slide_inicial=0):
         date_from_str = date_from.strftime("%Y-%m-%d")
         date_to_str = date_to.strftime("%Y-%m-%d")
         
-        # Carregar os dados necessários e chamar o carrossel
+        # Modo apresentação: os dados são carregados em segundo plano pelo worker do carrossel
         if not st.session_state.modo_config:
-            # Carregar dados (ou usar dados em cache)
-            if 'df_conclusoes' not in st.session_state or recarregar:
-                df, df_todos = carregar_dados_apresentacao(
-                    date_from=date_from_str,
-                    date_to=date_to_str,
-                    progress_bar=progress_container.progress(0),
-                    message_container=message_container
-                )
-                st.session_state['df_conclusoes'] = df
-                st.session_state['df_todos'] = df_todos
-            else:
-                df = st.session_state['df_conclusoes']
-                df_todos = st.session_state['df_todos']
+            # Data final de hoje acompanha o dia corrente; outra data fica fixa
+            data_final = None if date_to == datetime.now().date() else date_to
+            if recarregar:
+                get_carrossel_worker(dias_analise, data_final).request_refresh()
             
             # Iniciar carrossel automático
             iniciar_carrossel_metricas(
-                df, 
-                df_todos, 
-                date_from, 
-                date_to, 
                 st.session_state.tempo_slide, 
-                slide_inicial=slide_inicial
+                slide_inicial=slide_inicial,
+                dias_analise=dias_analise,
+                date_to=data_final
             )
         else:
             # Modo de configuração - exibir slides específicos para teste - importar diretamente do arquivo
@@ -359,7 +348,7 @@ def show_apresentacao(slide_inicial=0):
                     tab_index += 1
                     
                     with slide_tabs[tab_index]:
-                        slide_ranking_produtividade(df, df_todos)
+                        slide_ranking_produtividade(df, df_todos, date_from, date_to)
                     tab_index += 1
                     
                     with slide_tabs[tab_index]:
@@ -858,203 +847,22 @@ def carregar_dados_apresentacao(date_from=None, date_to=None, progress_bar=None,
     
     return df_conclusoes, df_todos
 
-def iniciar_carrossel_metricas(df, df_todos, date_from, date_to, tempo_por_slide=15, slide_inicial=0):
+def iniciar_carrossel_metricas(tempo_por_slide=15, slide_inicial=0, dias_analise=30, date_to=None):
     """
-    Inicia o carrossel de métricas, exibindo cada uma por um tempo determinado
+    Inicia o carrossel de métricas em modo quiosque.
+    
+    Os dados são recarregados e os slides pré-renderizados em segundo plano
+    (views.apresentacao.carrossel); aqui apenas os slides prontos são rotacionados,
+    sem recarregar dados nem bloquear a sessão.
     
     Args:
-        df (pandas.DataFrame): DataFrame com os dados de conclusões
-        df_todos (pandas.DataFrame): DataFrame com todos os dados (incluindo não concluídos)
-        date_from (datetime): Data inicial do período analisado
-        date_to (datetime): Data final do período analisado
         tempo_por_slide (int): Tempo em segundos para exibição de cada slide
         slide_inicial (int): Índice do slide para iniciar a apresentação
+        dias_analise (int): Quantidade de dias do período analisado
+        date_to (date, optional): Data final fixa; None acompanha o dia corrente
     """
-    # Log para depuração
-    print("=" * 50)
-    print(f"INICIANDO CARROSSEL - Slide inicial: {slide_inicial}")
-    print(f"Total slides: 13 | Tempo por slide: {tempo_por_slide}s")
-    
-    # Verificar se os dados necessários estão na sessão
-    print(f"Dados de conclusões na sessão: {'Sim' if df is not None and not df.empty else 'Não'}")
-    print(f"Dados completos na sessão: {'Sim' if df_todos is not None and not df_todos.empty else 'Não'}")
-    print(f"Dados de produção na sessão: {'Sim' if 'df_producao' in st.session_state else 'Não'}")
-    print(f"Dados de cartório na sessão: {'Sim' if 'df_cartorio' in st.session_state else 'Não'}")
-    print(f"Dados de famílias na sessão: {'Sim' if 'df_familias' in st.session_state else 'Não'}")
-    print("=" * 50)
-    
-    # Se não temos dados na sessão, garantir que os dataframes principais foram passados
-    if df is None or df.empty:
-        st.error("Dados de conclusões não disponíveis para o carrossel")
-        return
-    
-    # Armazenar os dataframes principais na sessão para garantir que as funções de slide possam acessá-los
-    st.session_state['df_conclusoes'] = df
-    st.session_state['df_todos'] = df_todos
-    
-    # Importar as funções dos slides usando caminho absoluto para evitar conflito com a pasta slides/
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    # Adicionar ao path para garantir que o módulo seja encontrado
-    sys.path.insert(0, current_dir)
-    
-    # Importar diretamente do arquivo
-    from funcoes_slides import (
-        slide_metricas_destaque,
-        slide_analise_diaria,
-        slide_analise_semanal,
-        slide_analise_dia_semana,
-        slide_analise_horario,
-        slide_producao_metricas_macro,
-        slide_producao_status_responsavel,
-        slide_cartorio_visao_geral,
-        slide_cartorio_analise_familias,
-        slide_cartorio_ids_familia
-    )
-    # Importar a versão corrigida do ranking
-    from ranking_fix import slide_ranking_produtividade
-
-    # Inicializar variáveis de controle
-    slide_atual = slide_inicial
-    continuar_apresentacao = True
-    ultima_atualizacao = datetime.now()
-    
-    # Definir número de slides e seus nomes
-    total_slides = 13  # Agora temos um slide a mais
-    nomes_slides = [
-        "Métricas Destaque",
-        "Ranking de Produtividade",
-        "Análise Diária",
-        "Análise Semanal",
-        "Análise por Dia da Semana",
-        "Análise por Hora do Dia",
-        # Slides do módulo de produção
-        "Produção - Métricas Macro",
-        "Produção - Status por Responsável",
-        "Produção - Pendências por Responsável",
-        "Produção - Ranking de Pendências",
-        # Slides do módulo de cartório
-        "Cartório - Visão Geral",
-        "Cartório - Análise de Famílias",
-        "Cartório - IDs por Família"
-    ]
-    
-    # Pré-carregar dados se necessário (idêntico ao comportamento original)
-    st.toast("Preparando apresentação automática...", icon="🔄")
-    
-    # Configuração adicional para mostrar instruções de navegação
-    st.markdown("""
-    <div style="position: fixed; bottom: 80px; left: 20px; background-color: rgba(0,0,0,0.6); padding: 10px; border-radius: 8px; z-index: 1000; color: white;">
-        <p style="margin: 0; font-size: 0.9rem;">Pressione ESC para sair da apresentação</p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    while continuar_apresentacao:
-        try:
-            # Verificar se é hora de atualizar os dados (a cada 1 minuto)
-            agora = datetime.now()
-            if (agora - ultima_atualizacao).total_seconds() >= 60:  # 60 segundos = 1 minuto
-                st.rerun()  # Força o recarregamento da aplicação
-            
-            # Criar novos containers em cada iteração para evitar qualquer persistência
-            main_area = st.empty()
-            progress_container = st.empty()
-            
-            # Imprimir informações sobre o slide atual
-            print(f"Preparando slide {slide_atual+1}/{total_slides}: {nomes_slides[slide_atual]}")
-            
-            # Criar um novo container para este slide específico
-            with main_area.container():
-                try:
-                    # Mostrar o título do slide e informações complementares
-                    if slide_atual >= 6 and slide_atual <= 8:
-                        # Slides de produção (6, 7, 8)
-                        st.subheader("➡️ MÓDULO DE PRODUÇÃO")
-                    elif slide_atual >= 9:
-                        # Slides de cartório (9, 10, 11)
-                        st.subheader("➡️ MÓDULO DE CARTÓRIO")
-                    
-                    # Chamar a função correspondente ao slide atual
-                    if slide_atual == 0:
-                        slide_metricas_destaque(df, df_todos, date_from, date_to)
-                    elif slide_atual == 1:
-                        slide_ranking_produtividade(df, df_todos)
-                    elif slide_atual == 2:
-                        slide_analise_diaria(df, date_from, date_to)
-                    elif slide_atual == 3:
-                        slide_analise_semanal(df)
-                    elif slide_atual == 4:
-                        slide_analise_dia_semana(df)
-                    elif slide_atual == 5:
-                        slide_analise_horario(df)
-                    # Slides de produção
-                    elif slide_atual == 6:
-                        slide_producao_metricas_macro(df)
-                    elif slide_atual == 7:
-                        slide_producao_status_responsavel(df)
-                    elif slide_atual == 8:
-                        slide_producao_pendencias_responsavel(df)
-                    elif slide_atual == 9:
-                        slide_producao_ranking_pendencias(df)
-                    # Slides de cartório
-                    elif slide_atual == 10:
-                        slide_cartorio_visao_geral(df)
-                    elif slide_atual == 11:
-                        slide_cartorio_analise_familias(df)
-                    elif slide_atual == 12:
-                        slide_cartorio_ids_familia(df)
-                except Exception as e:
-                    import traceback
-                    st.error(f"Erro ao exibir slide {slide_atual+1}: {str(e)}")
-                    st.code(traceback.format_exc())
-                    print(f"Erro ao exibir slide {slide_atual+1}: {str(e)}")
-                    print(traceback.format_exc())
-                
-                # Exibir contador de slides e botão de info (para todos os slides)
-                st.markdown(f"""
-                <div class="slide-counter">
-                    {slide_atual + 1}/{total_slides} - {nomes_slides[slide_atual]}
-                </div>
-                <div class="slide-info">
-                    <span class="updated-at">Atualizado às {datetime.now().strftime('%H:%M')}</span>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Adicionar links para navegação direta
-                st.markdown("""
-                <div style="position: fixed; bottom: 40px; right: 20px; background-color: rgba(0,0,0,0.6); padding: 10px; border-radius: 8px; z-index: 1000;">
-                    <span style="color: white; font-size: 0.9rem;">Navegar para: </span>
-                    <a href="?slide=0" target="_self" style="color: white; margin: 0 5px;">Conclusões</a> | 
-                    <a href="?slide=6" target="_self" style="color: white; margin: 0 5px;">Produção</a> | 
-                    <a href="?slide=10" target="_self" style="color: white; margin: 0 5px;">Cartório</a>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Atualizar barra de progresso
-            for i in range(tempo_por_slide * 10):
-                progress_percent = (i + 1) / (tempo_por_slide * 10)
-                progress_container.markdown(f"""
-                <div class="progress-bar-container">
-                    <div class="progress-bar" style="width: {progress_percent * 100}%;"></div>
-                </div>
-                """, unsafe_allow_html=True)
-                time.sleep(0.1)
-            
-            # Avançar para o próximo slide
-            print(f"Avançando do slide {slide_atual} para {(slide_atual + 1) % total_slides}")
-            slide_atual = (slide_atual + 1) % total_slides
-            
-            # Remover completamente os containers antes do próximo slide
-            main_area.empty()
-            progress_container.empty()
-        
-        except Exception as e:
-            import traceback
-            print(f"Erro crítico na apresentação: {str(e)}")
-            print(traceback.format_exc())
-            
-            # Tentar continuar com o próximo slide
-            slide_atual = (slide_atual + 1) % total_slides
-            time.sleep(2)  # Pausa para não entrar em loop infinito de erros
+    print(f"INICIANDO CARROSSEL - Slide inicial: {slide_inicial} | Tempo por slide: {tempo_por_slide}s")
+    mostrar_carrossel(tempo_por_slide, slide_inicial, dias_analise, date_to)
 
 # Permitir executar diretamente este módulo
 if __name__ == "__main__":
@@ -1,3 +1,7 @@
+# Módulo legado, mantido apenas como referência: não é importado por nenhuma página
+# (ver views/apresentacao/__init__.py). A apresentação em uso é views.apresentacao.apresentacao,
+# cuja rotação é feita pelo CarrosselWorker (views.apresentacao.carrossel); o laço
+# sleep/rerun de iniciar_carrossel_metricas abaixo não roda em produção.
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -5,6 +9,7 @@ import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import time
 from api.bitrix_connector import load_merged_data, get_higilizacao_fields
+from utils.business_days import business_day_count, business_hours
 import os
 from dotenv import load_dotenv
 
@@ -112,28 +117,9 @@ def slide_metricas_destaque(df, df_todos, date_from, date_to):
     # Ajustar a data inicial para ser a data da primeira conclusão
     data_inicio_efetiva = max(date_from.date(), data_primeira_conclusao)
     
-    # Contar dias úteis naturais (dias em que houve trabalho)
-    dias_uteis_naturais = 0
-    horas_uteis = 0
-    
-    # Calcular dia a dia a partir da primeira conclusão
-    data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-    while data_atual.date() <= date_to.date():
-        # Dia da semana: 0 = segunda, 6 = domingo
-        dia_semana = data_atual.weekday()
-        
-        # Segunda a sábado são considerados dias úteis
-        if 0 <= dia_semana <= 5:  # Segunda a sábado
-            dias_uteis_naturais += 1
-            
-            # Registrar horas para média horária
-            if 0 <= dia_semana <= 4:  # Segunda a sexta
-                horas_uteis += 12  # 7h - 19h (12 horas)
-            else:  # Sábado
-                horas_uteis += 3   # 9h - 12h (3 horas)
-        
-        # Avançar para o próximo dia
-        data_atual += timedelta(days=1)
+    # Contar dias úteis (seg-sáb, exceto feriados) e horas úteis (seg-sex 12h, sábado 3h)
+    dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
+    horas_uteis = business_hours(data_inicio_efetiva, date_to.date())
     
     # Calcular médias
     # Média diária baseada em dias naturais (dias em que houve trabalho)
@@ -265,27 +251,25 @@ def slide_ranking_produtividade(df, df_todos):
             # Lista para armazenar dados dos responsáveis com suas estatísticas
             dados_responsaveis = []
             
+            # Primeira/última conclusão e dias úteis de cada responsável, calculados de uma só vez
+            df_datas = df.dropna(subset=['DATA_CONCLUSAO'])
+            dias_por_responsavel = df_datas['DATA_CONCLUSAO'].dt.date.groupby(df_datas['ASSIGNED_BY_NAME']).agg(
+                ['min', 'max', 'nunique']
+            )
+            dias_por_responsavel['dias_uteis'] = business_day_count(
+                dias_por_responsavel['min'], dias_por_responsavel['max']
+            ).astype(int)
+            
             # Para cada responsável no ranking
             for i, (idx, row) in enumerate(ranking.iterrows()):
                 responsavel = row['ASSIGNED_BY_NAME']
-                df_resp = df[df['ASSIGNED_BY_NAME'] == responsavel]
                 
-                if not df_resp.empty:
+                if responsavel in dias_por_responsavel.index:
                     # Dias úteis entre primeira e última conclusão
-                    primeira_conclusao = df_resp['DATA_CONCLUSAO'].min().date()
-                    ultima_conclusao = df_resp['DATA_CONCLUSAO'].max().date()
-                    
-                    dias_uteis = 0
-                    data_atual = datetime.combine(primeira_conclusao, datetime.min.time())
-                    
-                    while data_atual.date() <= ultima_conclusao:
-                        dia_semana = data_atual.weekday()
-                        if dia_semana <= 5:  # Segunda a sábado
-                            dias_uteis += 1
-                        data_atual += timedelta(days=1)
+                    dias_uteis = int(dias_por_responsavel.at[responsavel, 'dias_uteis'])
                     
                     # Dias em que o responsável realmente trabalhou
-                    dias_com_conclusao = df_resp['DATA_CONCLUSAO'].dt.date.nunique()
+                    dias_com_conclusao = int(dias_por_responsavel.at[responsavel, 'nunique'])
                     
                     # Média diária
                     media_diaria = row['TOTAL_CONCLUSOES'] / max(1, dias_uteis)
@@ -540,26 +524,18 @@ def slide_analise_diaria(df, date_from, date_to):
         # Média simples (média aritmética diária)
         media_diaria_simples = df_diario['CONCLUSOES'].mean()
         
-        # Calcular dias úteis naturais a partir da primeira conclusão
-        dias_uteis_naturais = 0
-        
         # Converter para datetime se não for
         if not isinstance(date_from, datetime):
             date_from = datetime.combine(date_from, datetime.min.time())
         if not isinstance(date_to, datetime):
             date_to = datetime.combine(date_to, datetime.min.time())
         
-        # Calcular dia a dia
-        data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-        while data_atual.date() <= date_to.date():
-            dia_semana = data_atual.weekday()
-            if dia_semana <= 5:  # Segunda a sábado
-                dias_uteis_naturais += 1
-            data_atual += timedelta(days=1)
+        # Calcular dias úteis naturais a partir da primeira conclusão (seg-sáb, exceto feriados)
+        dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
         
         # Média ajustada (por dia útil natural)
         total_conclusoes = df_diario['CONCLUSOES'].sum()
-        media_diaria_ajustada = round(total_conclusoes / dias_uteis_naturais, 1)
+        media_diaria_ajustada = round(total_conclusoes / max(1, dias_uteis_naturais), 1)
         
         # Criar gráfico melhorado para TV vertical
         fig = go.Figure()
@@ -0,0 +1,352 @@
+"""
+Carrossel da apresentação (modo quiosque) com slides pré-renderizados em segundo plano.
+
+O carrossel antigo rodava um laço `while` dentro do script do Streamlit: recarregava os dados
+em primeiro plano (st.rerun a cada minuto), remontava cada slide a partir dos DataFrames brutos a
+cada rotação e segurava a sessão com time.sleep. Aqui as responsabilidades são separadas:
+
+- CarrosselWorker: thread em segundo plano que recarrega os dados (conclusões, produção, cartório
+  e famílias) a cada refresh_interval e, quando os dados mudam, executa todas as funções de slide
+  contra um gravador (_SlideRecorder) no lugar do módulo `st`. O resultado é um baralho versionado:
+  HTML, figuras Plotly e tabelas já prontos, publicado de uma vez (troca atômica de referência);
+- mostrar_carrossel: fragmento com run_every que apenas reproduz o slide pré-renderizado da vez.
+  Nenhuma rotação consulta o Bitrix24 nem recalcula agregações, e não há time.sleep nem st.rerun.
+"""
+import importlib.util
+import os
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from views.apresentacao.data_loader import (
+    carregar_dados_apresentacao,
+    carregar_dados_producao,
+    carregar_dados_cartorio
+)
+
+# Intervalo entre recargas dos dados em segundo plano (segundos)
+DEFAULT_REFRESH_INTERVAL = 300
+
+# Período padrão analisado (dias até a data final)
+DEFAULT_DIAS_ANALISE = 30
+
+# Diretório da exportação HTML estática (views.apresentacao.exportador); vazio desativa
+EXPORT_DIR = os.getenv('APRESENTACAO_EXPORT_DIR', '')
+
+_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Slides do carrossel: (nome, arquivo de origem, função, argumentos)
+# Argumentos: 'completo' = (df, df_todos, date_from, date_to); 'periodo' = (df, date_from, date_to);
+# 'df' = (df). Os slides de produção e cartório leem os próprios dados de session_state.
+SLIDES = [
+    ("Métricas Destaque", "funcoes_slides.py", "slide_metricas_destaque", "completo"),
+    ("Ranking de Produtividade", "ranking_fix.py", "slide_ranking_produtividade", "completo"),
+    ("Análise Diária", "funcoes_slides.py", "slide_analise_diaria", "periodo"),
+    ("Análise Semanal", "funcoes_slides.py", "slide_analise_semanal", "df"),
+    ("Análise por Dia da Semana", "funcoes_slides.py", "slide_analise_dia_semana", "df"),
+    ("Análise por Hora do Dia", "funcoes_slides.py", "slide_analise_horario", "df"),
+    ("Produção - Métricas Macro", "funcoes_slides.py", "slide_producao_metricas_macro", "df"),
+    ("Produção - Status por Responsável", "funcoes_slides.py", "slide_producao_status_responsavel", "df"),
+    ("Produção - Pendências por Responsável", "producao/pendencias_responsavel.py",
+     "slide_producao_pendencias_responsavel_v2", "df"),
+    ("Produção - Ranking de Pendências", "producao/ranking_pendencias.py", "slide_producao_ranking_pendencias", "df"),
+    ("Cartório - Visão Geral", "funcoes_slides.py", "slide_cartorio_visao_geral", "df"),
+    ("Cartório - Análise de Famílias", "funcoes_slides.py", "slide_cartorio_analise_familias", "df"),
+    ("Cartório - IDs por Família", "funcoes_slides.py", "slide_cartorio_ids_familia", "df"),
+]
+
+# Primeiro slide de cada módulo (links de navegação)
+INICIO_PRODUCAO = 6
+INICIO_CARTORIO = 10
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+class _SlideRecorder:
+    """
+    Substituto do módulo `st` durante a pré-renderização: grava as chamadas para reproduzi-las depois.
+
+    columns/container/empty devolvem gravadores filhos (usados com `with`); as demais chamadas
+    (markdown, plotly_chart, dataframe, error, ...) são gravadas com seus argumentos.
+    """
+
+    def __init__(self, session_state):
+        self.ops = []
+        self.session_state = session_state
+        self.column_config = st.column_config
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _child(self, name, args, kwargs, count=1):
+        children = [_SlideRecorder(self.session_state) for _ in range(count)]
+        self.ops.append((name, args, kwargs, children))
+        return children
+
+    def columns(self, spec, *args, **kwargs):
+        count = spec if isinstance(spec, int) else len(spec)
+        return self._child('columns', (spec,) + args, kwargs, count)
+
+    def container(self, *args, **kwargs):
+        return self._child('container', args, kwargs)[0]
+
+    def empty(self):
+        return self._child('empty', (), {})[0]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.ops.append((name, args, kwargs, None))
+        return record
+
+
+def _replay(ops, target):
+    """Reproduz as chamadas gravadas em um container do Streamlit."""
+    for name, args, kwargs, children in ops:
+        if children is None:
+            getattr(target, name)(*args, **kwargs)
+        elif name == 'columns':
+            for column, child in zip(target.columns(*args, **kwargs), children):
+                _replay(child.ops, column)
+        else:
+            _replay(children[0].ops, getattr(target, name)(*args, **kwargs))
+
+
+def _load_slide_module(filename):
+    """
+    Carrega uma cópia privada do módulo de slides, cujo `st` pode ser trocado pelo gravador
+    sem afetar as páginas que importam o módulo original.
+    """
+    name = "_carrossel_" + filename.replace('/', '_').replace('.py', '')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _frame_fingerprint(df):
+    """Impressão digital barata de um DataFrame (tamanho + hash do conteúdo)."""
+    if df is None or df.empty:
+        return (0,)
+    try:
+        hashed = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # Colunas com tipos não hasheáveis (ex.: listas): usa a representação em texto
+        hashed = pd.util.hash_pandas_object(df.astype(str), index=False)
+    return (len(df), tuple(df.columns), int(hashed.sum()))
+
+
+class CarrosselWorker(threading.Thread):
+    """
+    Thread que mantém o baralho de slides pré-renderizados atualizado.
+
+    Args:
+        dias_analise (int): Quantidade de dias do período analisado
+        date_to (date, optional): Data final fixa; se omitida, usa o dia corrente a cada recarga
+        refresh_interval (int): Segundos entre recargas dos dados
+    """
+
+    def __init__(self, dias_analise=DEFAULT_DIAS_ANALISE, date_to=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        super().__init__(name=f"carrossel-{dias_analise}", daemon=True)
+        self.dias_analise = dias_analise
+        self.date_to = date_to
+        self.refresh_interval = refresh_interval
+        self.deck = None
+        self._fingerprint = None
+        self._modules = {}
+        self._wake = threading.Event()
+        # Funções chamadas com cada nova versão do baralho (ex.: exportação HTML estática)
+        self.listeners = []
+
+    def request_refresh(self):
+        """Antecipa a próxima recarga (sem bloquear quem chamou)."""
+        self._wake.set()
+
+    def run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erro ao atualizar o carrossel: {str(e)}")
+                print(traceback.format_exc())
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    def _periodo(self):
+        date_to = self.date_to or datetime.now().date()
+        return date_to - timedelta(days=self.dias_analise), date_to
+
+    def _carregar(self, date_from, date_to):
+        """Carrega os DataFrames de todos os módulos (mesmas fontes do carrossel antigo)."""
+        date_from_str = date_from.strftime("%Y-%m-%d")
+        date_to_str = date_to.strftime("%Y-%m-%d")
+        df, df_todos = carregar_dados_apresentacao(date_from=date_from_str, date_to=date_to_str)
+        dados = {
+            'df_conclusoes': df,
+            'df_todos': df_todos,
+            'df_producao': carregar_dados_producao(date_from=date_from_str, date_to=date_to_str),
+            'df_cartorio': carregar_dados_cartorio(),
+        }
+        try:
+            from views.cartorio.analysis import analisar_familia_certidoes
+            df_familias = analisar_familia_certidoes()
+            if isinstance(df_familias, pd.DataFrame) and not df_familias.empty:
+                dados['df_familias'] = df_familias
+        except Exception as e:
+            print(f"Erro ao carregar famílias para o carrossel: {str(e)}")
+        return dados
+
+    def _renderizar(self, dados, date_from, date_to):
+        """Executa cada função de slide contra o gravador; erros viram um st.error no próprio slide."""
+        df, df_todos = dados['df_conclusoes'], dados['df_todos']
+        argumentos = {
+            'completo': (df, df_todos, date_from, date_to),
+            'periodo': (df, date_from, date_to),
+            'df': (df,),
+        }
+        # Os slides podem gravar em session_state (ex.: cartório); cada baralho tem a sua cópia
+        session_state = dict(dados)
+        slides = []
+        for nome, arquivo, funcao, tipo in SLIDES:
+            recorder = _SlideRecorder(session_state)
+            try:
+                if arquivo not in self._modules:
+                    self._modules[arquivo] = _load_slide_module(arquivo)
+                module = self._modules[arquivo]
+                module.st = recorder
+                getattr(module, funcao)(*argumentos[tipo])
+            except Exception as e:
+                recorder.error(f"Erro ao exibir slide {nome}: {str(e)}")
+                print(f"Erro ao pré-renderizar o slide {nome}: {str(e)}")
+                print(traceback.format_exc())
+            slides.append({'nome': nome, 'ops': recorder.ops})
+        return slides
+
+    def refresh(self):
+        """Recarrega os dados e, se mudaram, publica uma nova versão do baralho."""
+        date_from, date_to = self._periodo()
+        dados = self._carregar(date_from, date_to)
+        fingerprint = (date_from, date_to) + tuple(_frame_fingerprint(df) for df in dados.values())
+        agora = datetime.now()
+
+        if self.deck is not None and fingerprint == self._fingerprint:
+            # Dados iguais: mantém os slides e só atualiza o horário da última verificação
+            self.deck = dict(self.deck, atualizado_em=agora)
+            return False
+
+        slides = self._renderizar(dados, date_from, date_to)
+        versao = self.deck['versao'] + 1 if self.deck is not None else 1
+        self._fingerprint = fingerprint
+        self.deck = {
+            'versao': versao,
+            'gerado_em': agora,
+            'atualizado_em': agora,
+            'periodo': (date_from, date_to),
+            'slides': slides,
+        }
+        print(f"Carrossel: versão {versao} com {len(slides)} slides pré-renderizados")
+        for listener in self.listeners:
+            try:
+                listener(self.deck)
+            except Exception as e:
+                print(f"Erro ao publicar a versão {versao} do carrossel: {str(e)}")
+                print(traceback.format_exc())
+        return True
+
+
+def get_carrossel_worker(dias_analise=DEFAULT_DIAS_ANALISE, date_to=None):
+    """
+    Retorna (e inicia, se preciso) o worker do carrossel para o período (compartilhado entre sessões).
+
+    Args:
+        dias_analise (int): Quantidade de dias do período analisado
+        date_to (date, optional): Data final fixa; None acompanha o dia corrente
+
+    Returns:
+        CarrosselWorker: Worker em execução
+    """
+    key = (dias_analise, date_to)
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None or not worker.is_alive():
+            worker = _workers[key] = CarrosselWorker(dias_analise, date_to)
+            if EXPORT_DIR:
+                from views.apresentacao.exportador import agendar_exportacao
+                agendar_exportacao(worker, EXPORT_DIR)
+            worker.start()
+    return worker
+
+
+def mostrar_carrossel(tempo_por_slide=10, slide_inicial=0, dias_analise=DEFAULT_DIAS_ANALISE, date_to=None):
+    """
+    Exibe o carrossel em modo quiosque, reproduzindo os slides pré-renderizados pelo worker.
+
+    Args:
+        tempo_por_slide (int): Tempo em segundos para exibição de cada slide
+        slide_inicial (int): Índice do slide para iniciar a apresentação
+        dias_analise (int): Quantidade de dias do período analisado
+        date_to (date, optional): Data final fixa; None acompanha o dia corrente
+    """
+    worker = get_carrossel_worker(dias_analise, date_to)
+
+    if st.session_state.get('carrossel_inicio') != slide_inicial:
+        st.session_state.carrossel_inicio = slide_inicial
+        st.session_state.carrossel_slide = slide_inicial
+
+    st.markdown("""
+    <div style="position: fixed; bottom: 80px; left: 20px; background-color: rgba(0,0,0,0.6); padding: 10px; border-radius: 8px; z-index: 1000; color: white;">
+        <p style="margin: 0; font-size: 0.9rem;">Pressione ESC para sair da apresentação</p>
+    </div>
+    <style>
+    @keyframes carrossel-progresso { from { width: 0%; } to { width: 100%; } }
+    </style>
+    """, unsafe_allow_html=True)
+
+    @st.fragment(run_every=tempo_por_slide)
+    def _rotacionar():
+        deck = worker.deck
+        if deck is None:
+            st.info("Preparando apresentação... os slides estão sendo gerados em segundo plano.")
+            return
+
+        slides = deck['slides']
+        indice = st.session_state.carrossel_slide % len(slides)
+        slide = slides[indice]
+
+        if INICIO_PRODUCAO <= indice < INICIO_CARTORIO:
+            st.subheader("➡️ MÓDULO DE PRODUÇÃO")
+        elif indice >= INICIO_CARTORIO:
+            st.subheader("➡️ MÓDULO DE CARTÓRIO")
+
+        _replay(slide['ops'], st.container())
+
+        st.markdown(f"""
+        <div class="slide-counter">
+            {indice + 1}/{len(slides)} - {slide['nome']}
+        </div>
+        <div class="slide-info">
+            <span class="updated-at">Atualizado às {deck['atualizado_em'].strftime('%H:%M')}</span>
+        </div>
+        <div style="position: fixed; bottom: 40px; right: 20px; background-color: rgba(0,0,0,0.6); padding: 10px; border-radius: 8px; z-index: 1000;">
+            <span style="color: white; font-size: 0.9rem;">Navegar para: </span>
+            <a href="?slide=0" target="_self" style="color: white; margin: 0 5px;">Conclusões</a> |
+            <a href="?slide={INICIO_PRODUCAO}" target="_self" style="color: white; margin: 0 5px;">Produção</a> |
+            <a href="?slide={INICIO_CARTORIO}" target="_self" style="color: white; margin: 0 5px;">Cartório</a>
+        </div>
+        <div class="progress-bar-container">
+            <div class="progress-bar" style="width: 0%; animation: carrossel-progresso {tempo_por_slide}s linear forwards;"></div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        st.session_state.carrossel_slide = indice + 1
+
+    _rotacionar()
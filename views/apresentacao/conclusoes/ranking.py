@@ -1,10 +1,9 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
+from utils.ranking_engine import get_ranking_engine
 
-def slide_ranking_produtividade(df, df_todos):
+def slide_ranking_produtividade(df, df_todos, date_from=None, date_to=None):
     """
     Exibe um ranking de produtividade dos responsáveis com visual aprimorado
     Versão avançada baseada no módulo conclusoes.py
@@ -12,6 +11,7 @@ def slide_ranking_produtividade(df, df_todos):
     Args:
         df (pandas.DataFrame): DataFrame com os dados concluídos
         df_todos (pandas.DataFrame): DataFrame com todos os dados (incluindo não concluídos)
+        date_from, date_to (date, optional): Período carregado
     """
     try:
         # Forçar limpeza de elementos persistentes
@@ -24,109 +24,13 @@ def slide_ranking_produtividade(df, df_todos):
             st.error("Não foi possível gerar o ranking: coluna de responsáveis não encontrada.")
             return
         
-        # Agrupar por responsável e contar o número de conclusões para os que concluíram
-        if not df.empty and 'ASSIGNED_BY_NAME' in df.columns:
-            ranking_conclusoes = df.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_CONCLUSOES')
-        else:
-            # Se não há conclusões, criar DataFrame vazio com as colunas necessárias
-            ranking_conclusoes = pd.DataFrame(columns=['ASSIGNED_BY_NAME', 'TOTAL_CONCLUSOES'])
+        # Ranking do motor compartilhado com a página de Conclusões (mesmos números)
+        motor = get_ranking_engine()
+        motor.update(df_todos, start=date_from, end=date_to)
+        ranking = motor.ranking(start=date_from, end=date_to)
         
-        # Calcular a taxa de conclusão por responsável
-        total_por_responsavel = df_todos.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_ATRIBUIDOS')
-        
-        # Fazer merge outer para incluir todos os responsáveis, mesmo os que não tiveram conclusões
-        ranking = pd.merge(total_por_responsavel, ranking_conclusoes, on='ASSIGNED_BY_NAME', how='left')
-        
-        # Preencher valores NaN de conclusões com 0
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].fillna(0)
-        
-        # Converter para inteiro
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].astype(int)
-        
-        # Calcular pendentes
-        ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
-        
-        # Calcular taxa de conclusão
-        ranking['TAXA_CONCLUSAO'] = (ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'] * 100).round(1)
-        
-        # Calcular dias trabalhados (dias em que cada responsável teve pelo menos uma conclusão)
-        if not df.empty and 'DATA_CONCLUSAO' in df.columns:
-            # Criar colunas auxiliares
-            df_temp = df.copy()
-            df_temp['DATA'] = df_temp['DATA_CONCLUSAO'].dt.date
-            df_temp['DIA_SEMANA'] = df_temp['DATA_CONCLUSAO'].dt.weekday
-            
-            # Lista para armazenar os dados de dias trabalhados com primeira conclusão
-            dados_dias_trabalhados = []
-            
-            # Para cada responsável, calcular dias úteis a partir da primeira conclusão
-            for responsavel in df_temp['ASSIGNED_BY_NAME'].unique():
-                # Filtrar dados do responsável
-                df_resp = df_temp[df_temp['ASSIGNED_BY_NAME'] == responsavel]
-                
-                # Encontrar data da primeira conclusão
-                primeira_conclusao = df_resp['DATA'].min()
-                
-                # Encontrar data da última conclusão
-                ultima_conclusao = df_resp['DATA'].max()
-                
-                # Calcular dias úteis entre a primeira e a última conclusão
-                dias_uteis = 0
-                data_atual = datetime.combine(primeira_conclusao, datetime.min.time())
-                
-                while data_atual.date() <= ultima_conclusao:
-                    dia_semana = data_atual.weekday()
-                    if dia_semana <= 5:  # Segunda a sábado
-                        dias_uteis += 1
-                    data_atual += timedelta(days=1)
-                
-                # Dias em que o responsável realmente trabalhou (com conclusões)
-                dias_com_conclusao = df_resp['DATA'].nunique()
-                
-                # Adicionar à lista de dados
-                dados_dias_trabalhados.append({
-                    'ASSIGNED_BY_NAME': responsavel,
-                    'PRIMEIRA_CONCLUSAO': primeira_conclusao,
-                    'ULTIMA_CONCLUSAO': ultima_conclusao,
-                    'DIAS_UTEIS_PERIODO': dias_uteis,
-                    'DIAS_COM_CONCLUSAO': dias_com_conclusao
-                })
-            
-            # Converter para DataFrame
-            df_dias = pd.DataFrame(dados_dias_trabalhados)
-            
-            # Mesclar com o ranking
-            if not df_dias.empty:
-                ranking = pd.merge(ranking, df_dias, on='ASSIGNED_BY_NAME', how='left')
-                
-                # Usar os dias úteis do período como dias trabalhados
-                ranking['DIAS_TRABALHADOS'] = ranking['DIAS_UTEIS_PERIODO']
-            else:
-                ranking['DIAS_TRABALHADOS'] = 0
-        else:
-            ranking['DIAS_TRABALHADOS'] = 0
-        
-        # Preencher NaN em dias trabalhados com 0
-        ranking['DIAS_TRABALHADOS'] = ranking['DIAS_TRABALHADOS'].fillna(0)
-        
-        # Calcular média diária (evitando divisão por zero)
-        ranking['MEDIA_DIARIA'] = 0.0  # Valor padrão
-        mask = ranking['DIAS_TRABALHADOS'] > 0
-        ranking.loc[mask, 'MEDIA_DIARIA'] = (ranking.loc[mask, 'TOTAL_CONCLUSOES'] / ranking.loc[mask, 'DIAS_TRABALHADOS']).round(2)
-        
-        # Determinar o melhor valor para destaque (maior média diária)
-        if not ranking.empty and 'MEDIA_DIARIA' in ranking.columns:
-            melhor_media = ranking['MEDIA_DIARIA'].max()
-            
-            # Criar coluna de status para destacar
-            ranking['STATUS'] = ''
-            ranking.loc[ranking['MEDIA_DIARIA'] == melhor_media, 'STATUS'] = '🏆'
-        
-        # Ordenar pelo total de conclusões em ordem decrescente
-        ranking = ranking.sort_values('TOTAL_CONCLUSOES', ascending=False).reset_index(drop=True)
-        
-        # Adicionar coluna de posição
-        ranking.insert(0, 'POSICAO', ranking.index + 1)
+        # Meta = média diária de conclusões por responsável (calculada uma vez para todos os cards)
+        meta_diaria = round(motor.daily_target(start=date_from, end=date_to), 1)
         
         # Função para renderizar o card de cada responsável
         def renderizar_card_responsavel(resp, compacto=False):
@@ -136,14 +40,10 @@ def slide_ranking_produtividade(df, df_todos):
             pendentes = resp['PENDENTES']
             taxa = resp['TAXA_CONCLUSAO']
             media_diaria = resp['MEDIA_DIARIA']
-            dias_uteis = resp['DIAS_TRABALHADOS']
+            dias_uteis = int(resp['DIAS_TRABALHADOS'])  # DIAS_UTEIS_PERIODO do motor, inteiro
             status = resp['STATUS']
             destaque = posicao <= 3  # Top 3 = destaque especial
             
-            # Calcular meta baseada na média global
-            media_global = df.groupby('DATA_CONCLUSAO').size().mean() if 'DATA_CONCLUSAO' in df.columns else 0
-            meta_diaria = round(media_global, 1)  # Meta = 100% da média global diária
-            
             # Verificar se atingiu a meta
             atingiu_meta = media_diaria >= meta_diaria
             
@@ -191,7 +91,7 @@ def slide_ranking_produtividade(df, df_todos):
                         </div>
                     </div>
                     <div style="font-size: 0.7rem; color: #757575; text-align: right;">
-                        {int(dias_uteis)} dias úteis
+                        {dias_uteis} dias úteis
                     </div>
                 </div>
                 """
@@ -218,7 +118,7 @@ def slide_ranking_produtividade(df, df_todos):
                         </div>
                     </div>
                     <div style="font-size: 0.8rem; color: #757575; text-align: right; margin-top: 5px;">
-                        {int(dias_uteis)} dias úteis | {int(pendentes)} pendentes
+                        {dias_uteis} dias úteis | {int(pendentes)} pendentes
                     </div>
                 </div>
                 """
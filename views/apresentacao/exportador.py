@@ -0,0 +1,291 @@
+"""
+Exportação estática da apresentação: um único arquivo HTML autocontido com todos os slides.
+
+Cada tela de TV com uma sessão Streamlit própria reexecutava o pipeline inteiro. O exportador
+converte o baralho pré-renderizado pelo CarrosselWorker (views.apresentacao.carrossel) em HTML:
+o HTML dos slides é mantido, as figuras Plotly vão embutidas como JSON (com o plotly.js inline)
+e a rotação automática é feita em JavaScript. O arquivo é regravado (troca atômica) a cada nova
+versão do baralho e pode ser servido como arquivo estático para qualquer número de telas.
+
+Uso:
+- no app: defina APRESENTACAO_EXPORT_DIR para exportar a cada atualização do carrossel;
+- sem Streamlit (cron/serviço): python -m views.apresentacao.exportador --saida /srv/apresentacao
+"""
+import argparse
+import html
+import json
+import os
+import re
+import tempfile
+import textwrap
+from datetime import datetime
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from views.apresentacao.carrossel import (
+    CarrosselWorker,
+    DEFAULT_DIAS_ANALISE,
+    DEFAULT_REFRESH_INTERVAL,
+    _SlideRecorder,
+    _load_slide_module
+)
+
+EXPORT_FILENAME = 'index.html'
+
+# Tempo padrão de cada slide na rotação (segundos)
+DEFAULT_TEMPO_SLIDE = 15
+
+_CAIXAS = {
+    'error': ('#ffebee', '#c62828'),
+    'warning': ('#fff8e1', '#f9a825'),
+    'info': ('#e3f2fd', '#1565c0'),
+    'success': ('#e8f5e9', '#2e7d32'),
+}
+
+_ESTILO_BASE = """
+body { margin: 0; padding: 20px; box-sizing: border-box; }
+.slide { display: none; }
+.slide.ativo { display: block; }
+.colunas { display: flex; gap: 24px; }
+.colunas > .coluna { flex: 1 1 0; min-width: 0; }
+.caixa { border-left: 6px solid; border-radius: 6px; padding: 12px 16px; margin: 10px 0; }
+table.tabela { border-collapse: collapse; width: 100%; font-size: 1.1rem; }
+table.tabela th, table.tabela td { border-bottom: 1px solid #e0e0e0; padding: 6px 10px; text-align: left; }
+@keyframes carrossel-progresso { from { width: 0%; } to { width: 100%; } }
+"""
+
+_SCRIPT_ROTACAO = """
+(function () {
+    var slides = document.querySelectorAll('.slide');
+    var figuras = JSON.parse(document.getElementById('figuras').textContent);
+    var tempo = %(tempo)d * 1000;
+    var indice = parseInt(window.location.hash.slice(1), 10) || 0;
+    var desenhadas = {};
+
+    function mostrar(i) {
+        slides.forEach(function (s) { s.classList.remove('ativo'); });
+        var slide = slides[i];
+        slide.classList.add('ativo');
+        slide.querySelectorAll('.figura').forEach(function (div) {
+            if (desenhadas[div.id]) { Plotly.Plots.resize(div); return; }
+            var fig = figuras[div.id];
+            Plotly.newPlot(div, fig.data, fig.layout, Object.assign({responsive: true}, fig.config));
+            desenhadas[div.id] = true;
+        });
+        var barra = document.getElementById('progresso');
+        barra.style.animation = 'none';
+        void barra.offsetWidth;
+        barra.style.animation = 'carrossel-progresso ' + (tempo / 1000) + 's linear forwards';
+        window.location.hash = i;
+    }
+
+    mostrar(indice %% slides.length);
+    setInterval(function () {
+        indice = (indice + 1) %% slides.length;
+        mostrar(indice);
+    }, tempo);
+    // Recarrega o arquivo periodicamente para exibir a exportação mais recente (mantém o slide pelo hash)
+    setTimeout(function () { window.location.reload(); }, %(recarregar)d * 1000);
+})();
+"""
+
+
+def _inline_markdown(texto):
+    texto = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', texto)
+    return re.sub(r'(?<!\*)\*(?!\s)(.+?)\*', r'<em>\1</em>', texto)
+
+
+def _markdown_html(texto, unsafe_allow_html=False):
+    """
+    Converte o subconjunto de Markdown usado nos slides (títulos, listas, negrito) para HTML.
+
+    Sem unsafe_allow_html (como no Streamlit), o texto é escapado antes das substituições: nomes,
+    mensagens de erro e demais textos gravados aparecem literalmente, sem virar marcação.
+    """
+    texto = textwrap.dedent(str(texto)).strip()
+    if unsafe_allow_html and texto.startswith('<'):
+        return texto
+    partes, itens = [], []
+    for linha in texto.splitlines():
+        linha = linha.strip()
+        if not unsafe_allow_html:
+            linha = html.escape(linha)
+        if linha.startswith('- '):
+            itens.append(f"<li>{_inline_markdown(linha[2:])}</li>")
+            continue
+        if itens:
+            partes.append(f"<ul>{''.join(itens)}</ul>")
+            itens = []
+        titulo = re.match(r'^(#{1,6})\s+(.*)$', linha)
+        if titulo:
+            nivel = len(titulo.group(1))
+            partes.append(f"<h{nivel}>{_inline_markdown(titulo.group(2))}</h{nivel}>")
+        elif linha:
+            partes.append(f"<p>{_inline_markdown(linha)}</p>")
+    if itens:
+        partes.append(f"<ul>{''.join(itens)}</ul>")
+    return '\n'.join(partes)
+
+
+def _tabela_html(dados, hide_index=False):
+    """Tabela HTML de um DataFrame ou Styler (as cores do Styler são preservadas)."""
+    if isinstance(dados, pd.DataFrame):
+        return dados.to_html(index=not hide_index, classes='tabela', border=0)
+    if hide_index:
+        dados = dados.hide(axis='index')
+    return dados.set_table_attributes('class="tabela"').to_html()
+
+
+def _ops_html(ops, figuras):
+    """Converte as chamadas gravadas de um slide em HTML; as figuras são acumuladas em `figuras`."""
+    partes = []
+    for name, args, kwargs, children in ops:
+        if name == 'columns':
+            colunas = ''.join(f'<div class="coluna">{_ops_html(child.ops, figuras)}</div>' for child in children)
+            partes.append(f'<div class="colunas">{colunas}</div>')
+        elif children is not None:
+            partes.append(f'<div>{_ops_html(children[0].ops, figuras)}</div>')
+        elif name == 'markdown':
+            partes.append(_markdown_html(args[0], kwargs.get('unsafe_allow_html', False)))
+        elif name in ('title', 'header', 'subheader'):
+            nivel = {'title': 1, 'header': 2, 'subheader': 3}[name]
+            partes.append(f'<h{nivel}>{html.escape(str(args[0]))}</h{nivel}>')
+        elif name == 'caption':
+            partes.append(f'<p style="color: #757575; font-size: 0.9rem;">{html.escape(str(args[0]))}</p>')
+        elif name in _CAIXAS:
+            fundo, borda = _CAIXAS[name]
+            partes.append(f'<div class="caixa" style="background-color: {fundo}; border-color: {borda};">'
+                          f'{_markdown_html(args[0])}</div>')
+        elif name == 'plotly_chart':
+            figura_id = f'figura-{len(figuras)}'
+            fig = json.loads(args[0].to_json()) if hasattr(args[0], 'to_json') else args[0]
+            figuras[figura_id] = {
+                'data': fig.get('data', []),
+                'layout': fig.get('layout', {}),
+                'config': kwargs.get('config') or {},
+            }
+            partes.append(f'<div class="figura" id="{figura_id}"></div>')
+        elif name in ('dataframe', 'table'):
+            partes.append(_tabela_html(args[0], kwargs.get('hide_index', False)))
+        elif name == 'metric':
+            rotulo, valor = args[0], args[1] if len(args) > 1 else kwargs.get('value', '')
+            partes.append(f'<div class="metric-box"><h3>{html.escape(str(rotulo))}</h3>'
+                          f'<p>{html.escape(str(valor))}</p></div>')
+        else:
+            partes.append(f'<!-- {html.escape(name)} não suportado na exportação -->')
+    return '\n'.join(partes)
+
+
+def _estilos_apresentacao():
+    """CSS da apresentação (styles.aplicar_estilos_apresentacao gravado, sem sessão Streamlit)."""
+    recorder = _SlideRecorder({})
+    styles = _load_slide_module('styles.py')
+    styles.st = recorder
+    styles.aplicar_estilos_apresentacao()
+    return '\n'.join(str(args[0]) for name, args, kwargs, children in recorder.ops if name == 'markdown')
+
+
+def deck_to_html(deck, tempo_por_slide=DEFAULT_TEMPO_SLIDE, recarregar_a_cada=DEFAULT_REFRESH_INTERVAL):
+    """
+    Monta o HTML autocontido de um baralho do carrossel.
+
+    Args:
+        deck (dict): Baralho publicado pelo CarrosselWorker
+        tempo_por_slide (int): Tempo em segundos de cada slide na rotação
+        recarregar_a_cada (int): Segundos até a página recarregar a exportação mais recente
+
+    Returns:
+        str: Documento HTML
+    """
+    figuras = {}
+    total = len(deck['slides'])
+    secoes = []
+    for indice, slide in enumerate(deck['slides']):
+        secoes.append(f"""
+<section class="slide">
+{_ops_html(slide['ops'], figuras)}
+<div class="slide-counter">{indice + 1}/{total} - {html.escape(slide['nome'])}</div>
+</section>""")
+
+    atualizado = deck['atualizado_em'].strftime('%d/%m/%Y %H:%M')
+    # "</" dentro do JSON fecharia a tag <script> antes da hora
+    figuras_json = json.dumps(figuras, ensure_ascii=False).replace('</', '<\\/')
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Apresentação - versão {deck['versao']}</title>
+<style>{_ESTILO_BASE}</style>
+{_estilos_apresentacao()}
+<script>{get_plotlyjs()}</script>
+</head>
+<body>
+{''.join(secoes)}
+<div class="slide-info"><span class="updated-at">Atualizado em {atualizado}</span></div>
+<div class="progress-bar-container"><div class="progress-bar" id="progresso" style="width: 0%;"></div></div>
+<script type="application/json" id="figuras">{figuras_json}</script>
+<script>{_SCRIPT_ROTACAO % {'tempo': tempo_por_slide, 'recarregar': recarregar_a_cada}}</script>
+</body>
+</html>
+"""
+
+
+def exportar_deck(deck, destino, tempo_por_slide=DEFAULT_TEMPO_SLIDE, recarregar_a_cada=DEFAULT_REFRESH_INTERVAL):
+    """
+    Grava o baralho em `destino/index.html` (arquivo temporário + troca atômica).
+
+    Returns:
+        str: Caminho do arquivo gravado
+    """
+    os.makedirs(destino, exist_ok=True)
+    conteudo = deck_to_html(deck, tempo_por_slide, recarregar_a_cada)
+    caminho = os.path.join(destino, EXPORT_FILENAME)
+    fd, temporario = tempfile.mkstemp(dir=destino, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+        # mkstemp cria o arquivo só para o dono; o servidor estático precisa lê-lo
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except Exception:
+        os.unlink(temporario)
+        raise
+    print(f"Apresentação versão {deck['versao']} exportada em {caminho} ({datetime.now().strftime('%H:%M:%S')})")
+    return caminho
+
+
+def agendar_exportacao(worker, destino, tempo_por_slide=DEFAULT_TEMPO_SLIDE):
+    """Exporta o baralho do worker a cada nova versão (e imediatamente, se já houver uma)."""
+    def exportar(deck):
+        exportar_deck(deck, destino, tempo_por_slide, worker.refresh_interval)
+    worker.listeners.append(exportar)
+    if worker.deck is not None:
+        exportar(worker.deck)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta a apresentação como HTML estático, atualizado periodicamente.")
+    parser.add_argument('--saida', default=os.getenv('APRESENTACAO_EXPORT_DIR', 'apresentacao_estatica'),
+                        help="Diretório do index.html exportado")
+    parser.add_argument('--intervalo', type=int, default=DEFAULT_REFRESH_INTERVAL,
+                        help="Segundos entre recargas dos dados")
+    parser.add_argument('--tempo-slide', type=int, default=DEFAULT_TEMPO_SLIDE,
+                        help="Segundos de cada slide na rotação")
+    parser.add_argument('--dias', type=int, default=DEFAULT_DIAS_ANALISE,
+                        help="Quantidade de dias do período analisado")
+    parser.add_argument('--uma-vez', action='store_true', help="Exporta uma vez e encerra")
+    args = parser.parse_args()
+
+    worker = CarrosselWorker(args.dias, refresh_interval=args.intervalo)
+    agendar_exportacao(worker, args.saida, args.tempo_slide)
+    if args.uma_vez:
+        worker.refresh()
+    else:
+        # Mesmo laço da thread do carrossel, em primeiro plano
+        worker.run()
+
+
+if __name__ == "__main__":
+    main()
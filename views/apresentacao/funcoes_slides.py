@@ -8,6 +8,11 @@ import sys
 import os
 from pathlib import Path
 
+from utils.business_days import business_day_count, business_hours
+from utils.ranking_engine import get_ranking_engine
+from utils.status_cube import get_status_cube
+from utils.temporal_cube import get_temporal_cube
+
 # Este arquivo contém funções de slide para suportar a migração
 # Foram copiadas e aprimoradas a partir do arquivo apresentacao_conclusoes.py
 
@@ -65,28 +70,9 @@ def slide_metricas_destaque(df, df_todos, date_from, date_to):
     # Ajustar a data inicial para ser a data da primeira conclusão
     data_inicio_efetiva = max(date_from.date(), data_primeira_conclusao)
     
-    # Contar dias úteis naturais (dias em que houve trabalho)
-    dias_uteis_naturais = 0
-    horas_uteis = 0
-    
-    # Calcular dia a dia a partir da primeira conclusão
-    data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-    while data_atual.date() <= date_to.date():
-        # Dia da semana: 0 = segunda, 6 = domingo
-        dia_semana = data_atual.weekday()
-        
-        # Segunda a sábado são considerados dias úteis
-        if 0 <= dia_semana <= 5:  # Segunda a sábado
-            dias_uteis_naturais += 1
-            
-            # Registrar horas para média horária
-            if 0 <= dia_semana <= 4:  # Segunda a sexta
-                horas_uteis += 12  # 7h - 19h (12 horas)
-            else:  # Sábado
-                horas_uteis += 3   # 9h - 12h (3 horas)
-        
-        # Avançar para o próximo dia
-        data_atual += timedelta(days=1)
+    # Contar dias úteis (seg-sáb, exceto feriados) e horas úteis (seg-sex 12h, sábado 3h)
+    dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
+    horas_uteis = business_hours(data_inicio_efetiva, date_to.date())
     
     # Calcular médias
     # Média diária baseada em dias naturais (dias em que houve trabalho)
@@ -157,9 +143,12 @@ def slide_metricas_destaque(df, df_todos, date_from, date_to):
     </div>
     """, unsafe_allow_html=True)
 
-def slide_ranking_produtividade(df, df_todos):
+def slide_ranking_produtividade(df, df_todos, date_from=None, date_to=None):
     """
     Slide com ranking de produtividade por responsável
+    
+    Os números vêm do motor de ranking compartilhado com a página de Conclusões
+    (date_from/date_to: período carregado).
     """
     # Forçar limpeza de elementos persistentes
     st.empty()
@@ -172,35 +161,13 @@ def slide_ranking_produtividade(df, df_todos):
             st.error("Não foi possível gerar o ranking: coluna de responsáveis não encontrada.")
             return
         
-        # Agrupar por responsável e contar o número de conclusões
-        if not df.empty and 'ASSIGNED_BY_NAME' in df.columns:
-            ranking_conclusoes = df.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_CONCLUSOES')
-        else:
-            ranking_conclusoes = pd.DataFrame(columns=['ASSIGNED_BY_NAME', 'TOTAL_CONCLUSOES'])
-        
-        # Calcular a taxa de conclusão por responsável
-        total_por_responsavel = df_todos.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_ATRIBUIDOS')
-        
-        # Fazer merge outer para incluir todos os responsáveis
-        ranking = pd.merge(total_por_responsavel, ranking_conclusoes, on='ASSIGNED_BY_NAME', how='left')
+        # Ranking do motor compartilhado com a página de Conclusões (mesmos números)
+        motor = get_ranking_engine()
+        motor.update(df_todos, start=date_from, end=date_to)
+        ranking = motor.ranking(start=date_from, end=date_to)
         
-        # Preencher valores NaN de conclusões com 0
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].fillna(0)
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].astype(int)
-        
-        # Calcular pendentes e taxa de conclusão
-        ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
-        ranking['TAXA_CONCLUSAO'] = (ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'] * 100).round(1)
-        
-        # Ordenar pelo total de conclusões em ordem decrescente
-        ranking = ranking.sort_values('TOTAL_CONCLUSOES', ascending=False).reset_index(drop=True)
-        
-        # Adicionar coluna de posição
-        ranking.insert(0, 'POSICAO', ranking.index + 1)
-        
-        # Calcular a média global para estabelecer a meta
-        media_global = df.groupby('DATA_CONCLUSAO').size().mean() if 'DATA_CONCLUSAO' in df.columns else 0
-        meta_diaria = round(media_global, 1)  # Meta = 100% da média global diária
+        # Meta = média diária de conclusões por responsável nos dias com conclusão
+        meta_diaria = round(motor.daily_target(start=date_from, end=date_to), 1)
         
         # Calcular total de pendentes do mês
         total_pendentes = ranking['PENDENTES'].sum()
@@ -213,82 +180,21 @@ def slide_ranking_produtividade(df, df_todos):
         # Calcular meta diária para concluir todos até o fim do mês
         meta_diaria_fim_mes = round(total_pendentes / max(1, dias_restantes), 1)
         
-        # Calcular dias trabalhados e média diária para cada responsável
-        if 'DATA_CONCLUSAO' in df.columns:
-            # Lista para armazenar dados dos responsáveis com suas estatísticas
-            dados_responsaveis = []
-            
-            # Para cada responsável no ranking
-            for i, (idx, row) in enumerate(ranking.iterrows()):
-                responsavel = row['ASSIGNED_BY_NAME']
-                df_resp = df[df['ASSIGNED_BY_NAME'] == responsavel]
-                
-                if not df_resp.empty:
-                    # Dias úteis entre primeira e última conclusão
-                    primeira_conclusao = df_resp['DATA_CONCLUSAO'].min().date()
-                    ultima_conclusao = df_resp['DATA_CONCLUSAO'].max().date()
-                    
-                    dias_uteis = 0
-                    data_atual = datetime.combine(primeira_conclusao, datetime.min.time())
-                    
-                    while data_atual.date() <= ultima_conclusao:
-                        dia_semana = data_atual.weekday()
-                        if dia_semana <= 5:  # Segunda a sábado
-                            dias_uteis += 1
-                        data_atual += timedelta(days=1)
-                    
-                    # Dias em que o responsável realmente trabalhou
-                    dias_com_conclusao = df_resp['DATA_CONCLUSAO'].dt.date.nunique()
-                    
-                    # Média diária
-                    media_diaria = row['TOTAL_CONCLUSOES'] / max(1, dias_uteis)
-                    
-                    # Verificar se atingiu a meta
-                    atingiu_meta = media_diaria >= meta_diaria
-                    
-                    # Adicionar dados
-                    dados_responsaveis.append({
-                        'posicao': int(row['POSICAO']),
-                        'nome': responsavel,
-                        'total': int(row['TOTAL_CONCLUSOES']),
-                        'pendentes': int(row['PENDENTES']),
-                        'taxa': row['TAXA_CONCLUSAO'],
-                        'dias_uteis': dias_uteis,
-                        'dias_com_conclusao': dias_com_conclusao,
-                        'media_diaria': round(media_diaria, 1),
-                        'atingiu_meta': atingiu_meta,
-                        'destaque': i < 3  # Top 3 = destaque especial
-                    })
-                else:
-                    # Responsável sem conclusões
-                    dados_responsaveis.append({
-                        'posicao': int(row['POSICAO']),
-                        'nome': responsavel,
-                        'total': int(row['TOTAL_CONCLUSOES']),
-                        'pendentes': int(row['PENDENTES']),
-                        'taxa': row['TAXA_CONCLUSAO'],
-                        'dias_uteis': 0,
-                        'dias_com_conclusao': 0,
-                        'media_diaria': 0.0,
-                        'atingiu_meta': False,
-                        'destaque': False
-                    })
-        else:
-            # Caso não tenha a coluna de data de conclusão
-            dados_responsaveis = [
-                {
-                    'posicao': int(row['POSICAO']),
-                    'nome': row['ASSIGNED_BY_NAME'],
-                    'total': int(row['TOTAL_CONCLUSOES']),
-                    'pendentes': int(row['PENDENTES']),
-                    'taxa': row['TAXA_CONCLUSAO'],
-                    'dias_uteis': 0,
-                    'dias_com_conclusao': 0,
-                    'media_diaria': 0.0,
-                    'atingiu_meta': False,
-                    'destaque': i < 3  # Top 3 = destaque especial
-                } for i, (idx, row) in enumerate(ranking.iterrows())
-            ]
+        # Dados dos cards montados a partir das colunas do ranking (responsáveis sem conclusões
+        # não entram nos destaques nem contam como meta atingida)
+        com_conclusoes = ranking['TOTAL_CONCLUSOES'] > 0
+        dados_responsaveis = pd.DataFrame({
+            'posicao': ranking['POSICAO'],
+            'nome': ranking['ASSIGNED_BY_NAME'],
+            'total': ranking['TOTAL_CONCLUSOES'],
+            'pendentes': ranking['PENDENTES'],
+            'taxa': ranking['TAXA_CONCLUSAO'],
+            'dias_uteis': ranking['DIAS_UTEIS_PERIODO'],
+            'dias_com_conclusao': ranking['DIAS_COM_CONCLUSAO'],
+            'media_diaria': ranking['MEDIA_DIARIA'].round(1),
+            'atingiu_meta': com_conclusoes & (ranking['MEDIA_DIARIA'] >= meta_diaria),
+            'destaque': com_conclusoes & (ranking['POSICAO'] <= 3),
+        }).to_dict('records')
         
         # Exibir informação sobre as metas - DESIGN MELHORADO
         st.markdown(f"""
@@ -469,16 +375,16 @@ def slide_analise_diaria(df, date_from, date_to):
             st.warning("Não há dados disponíveis para análise diária.")
             return
         
-        # Preparar dados
-        df_valido = df.dropna(subset=['DATA_CONCLUSAO']).copy()
-        df_diario = df_valido.groupby(df_valido['DATA_CONCLUSAO'].dt.date).size().reset_index(name='CONCLUSOES')
+        # Contagens diárias do cubo temporal (compartilhado com os demais slides temporais)
+        cubo = get_temporal_cube(df)
+        df_diario = cubo.daily()
         
         if df_diario.empty:
             st.warning("Não há dados disponíveis para análise diária.")
             return
     
         # Encontrar a data da primeira conclusão
-        data_primeira_conclusao = df_valido['DATA_CONCLUSAO'].min().date()
+        data_primeira_conclusao = cubo.first_day()
         
         # Ajustar a data inicial para ser a data da primeira conclusão
         if isinstance(date_from, datetime):
@@ -489,26 +395,18 @@ def slide_analise_diaria(df, date_from, date_to):
         # Média simples (média aritmética diária)
         media_diaria_simples = df_diario['CONCLUSOES'].mean()
         
-        # Calcular dias úteis naturais a partir da primeira conclusão
-        dias_uteis_naturais = 0
-        
         # Converter para datetime se não for
         if not isinstance(date_from, datetime):
             date_from = datetime.combine(date_from, datetime.min.time())
         if not isinstance(date_to, datetime):
             date_to = datetime.combine(date_to, datetime.min.time())
         
-        # Calcular dia a dia
-        data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-        while data_atual.date() <= date_to.date():
-            dia_semana = data_atual.weekday()
-            if dia_semana <= 5:  # Segunda a sábado
-                dias_uteis_naturais += 1
-            data_atual += timedelta(days=1)
+        # Calcular dias úteis naturais a partir da primeira conclusão (seg-sáb, exceto feriados)
+        dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
         
         # Média ajustada (por dia útil natural)
         total_conclusoes = df_diario['CONCLUSOES'].sum()
-        media_diaria_ajustada = round(total_conclusoes / dias_uteis_naturais, 1)
+        media_diaria_ajustada = round(total_conclusoes / max(1, dias_uteis_naturais), 1)
         
         # Criar gráfico para TV vertical
         fig = go.Figure()
@@ -656,14 +554,8 @@ def slide_analise_semanal(df):
             st.warning("Não há dados disponíveis para análise semanal.")
             return
     
-        # Preparar dados
-        df_valido = df.dropna(subset=['DATA_CONCLUSAO']).copy()
-        
-        # Adicionar coluna de semana no formato YYYY-WW
-        df_valido['SEMANA'] = df_valido['DATA_CONCLUSAO'].dt.strftime('%Y-%V')
-    
-    # Agrupar por semana
-        df_semanal = df_valido.groupby('SEMANA').size().reset_index(name='CONCLUSOES')
+        # Conclusões por semana ISO (formato YYYY-WW) do cubo temporal
+        df_semanal = get_temporal_cube(df).weekly()
         
         if df_semanal.empty:
             st.warning("Não há dados disponíveis para análise semanal.")
@@ -815,34 +707,8 @@ def slide_analise_dia_semana(df):
             st.warning("Não há dados disponíveis para análise por dia da semana.")
             return
     
-        # Preparar dados
-        df_valido = df.dropna(subset=['DATA_CONCLUSAO']).copy()
-        
-        # Mapeamento para traduzir dias da semana
-        dias_semana_pt = {
-            'Monday': 'Segunda-feira',
-            'Tuesday': 'Terça-feira',
-            'Wednesday': 'Quarta-feira',
-            'Thursday': 'Quinta-feira',
-            'Friday': 'Sexta-feira',
-            'Saturday': 'Sábado',
-            'Sunday': 'Domingo'
-        }
-        
-    # Adicionar coluna de dia da semana
-        df_valido['DIA_SEMANA'] = df_valido['DATA_CONCLUSAO'].dt.day_name().map(dias_semana_pt)
-    
-    # Agrupar por dia da semana
-        df_dia_semana = df_valido.groupby('DIA_SEMANA').agg({
-            'DATA_CONCLUSAO': 'count',
-            'ID': 'nunique'
-        }).reset_index()
-        df_dia_semana.columns = ['DIA_SEMANA', 'CONCLUSOES', 'PROCESSOS_UNICOS']
-        
-        # Ordenar os dias da semana
-        ordem_dias = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
-        df_dia_semana['DIA_ORDEM'] = pd.Categorical(df_dia_semana['DIA_SEMANA'], categories=ordem_dias, ordered=True)
-        df_dia_semana = df_dia_semana.sort_values('DIA_ORDEM')
+        # Conclusões e processos distintos por dia da semana (segunda a domingo) do cubo temporal
+        df_dia_semana = get_temporal_cube(df).by_weekday()
         
         # Média de conclusões por dia
         media_conclusoes = df_dia_semana['CONCLUSOES'].mean()
@@ -980,16 +846,8 @@ def slide_analise_horario(df):
             st.warning("Não há dados disponíveis para análise por horário.")
             return
     
-        # Preparar dados
-        df_valido = df.dropna(subset=['DATA_CONCLUSAO']).copy()
-        df_valido['HORA'] = df_valido['DATA_CONCLUSAO'].dt.hour
-    
-    # Agrupar por hora
-        df_hora = df_valido.groupby('HORA').size().reset_index(name='CONCLUSOES')
-        
-        # Certificar que todas as horas estão representadas (0-23)
-        todas_horas = pd.DataFrame({'HORA': range(24)})
-        df_hora = pd.merge(todas_horas, df_hora, on='HORA', how='left').fillna(0)
+        # Conclusões por hora do cubo temporal, com todas as horas representadas (0-23)
+        df_hora = get_temporal_cube(df).by_hour()
         
         # Calcular médias
         media_hora = df_hora['CONCLUSOES'].mean()
@@ -1188,20 +1046,16 @@ def slide_producao_metricas_macro(df):
         st.warning("Não há dados disponíveis para análise de produção.")
         return
     
-    # Calcular contagem por status
-    status_counts = {}
+    # Contagem por status a partir do cubo de status (todas as linhas; status nulos contam como
+    # PENDENCIA e status não reconhecidos ficam fora, como na contagem por valor)
+    status_counts = {'COMPLETO': 0, 'INCOMPLETO': 0, 'PENDENCIA': 0}
     if 'UF_CRM_HIGILIZACAO_STATUS' in df.columns:
-        # Substituir valores nulos no status por 'PENDENCIA'
-        df['UF_CRM_HIGILIZACAO_STATUS'] = df['UF_CRM_HIGILIZACAO_STATUS'].fillna('PENDENCIA')
-        
-        # Contar por status
-        status_series = df['UF_CRM_HIGILIZACAO_STATUS'].value_counts()
-        
-        # Garantir que todos os status estão presentes
-        for status in ['COMPLETO', 'INCOMPLETO', 'PENDENCIA']:
-            status_counts[status] = status_series.get(status, 0)
-    else:
-        status_counts = {'COMPLETO': 0, 'INCOMPLETO': 0, 'PENDENCIA': 0}
+        contagens = get_status_cube(df).status_counts(unique=False)
+        status_counts = {
+            'COMPLETO': contagens['completo'],
+            'INCOMPLETO': contagens['incompleto'],
+            'PENDENCIA': contagens['pendente'] - contagens['nao_reconhecido'],
+        }
     
     # Total de registros
     total_registros = sum(status_counts.values())
@@ -1298,22 +1152,10 @@ def slide_producao_status_responsavel(df):
         return
     
     try:
-        # Substituir valores nulos no status por 'PENDENCIA'
-        df['UF_CRM_HIGILIZACAO_STATUS'] = df['UF_CRM_HIGILIZACAO_STATUS'].fillna('PENDENCIA')
-        
-        # Agrupar por responsável e status e contar ocorrências
-        status_counts = df.groupby(['ASSIGNED_BY_NAME', 'UF_CRM_HIGILIZACAO_STATUS']).size().unstack(fill_value=0)
-        
-        # Garantir que todas as colunas de status existem
-        for status in ['COMPLETO', 'INCOMPLETO', 'PENDENCIA']:
-            if status not in status_counts.columns:
-                status_counts[status] = 0
-        
-        # Selecionar apenas as colunas que nos interessam
-        display_df = status_counts[['COMPLETO', 'INCOMPLETO', 'PENDENCIA']].copy()
-        
-        # Resetar o índice
-        display_df = display_df.reset_index()
+        # Contagens por responsável e status a partir do cubo de status (montado uma vez por versão
+        # dos dados; status nulos contam como PENDENCIA), sem alterar o df_producao compartilhado
+        status_counts = get_status_cube(df).status_by_responsible()
+        display_df = status_counts[['COMPLETO', 'INCOMPLETO', 'PENDENCIA']].reset_index()
         
         # Remover linhas com 'TOTAL' no nome do responsável
         display_df = display_df[~display_df['ASSIGNED_BY_NAME'].astype(str).str.lower().str.contains('total')]
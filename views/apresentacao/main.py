@@ -1,21 +1,17 @@
 import streamlit as st
 import pandas as pd
-import time
 from datetime import datetime, timedelta
 
 # Importações de módulos internos
 from views.apresentacao.utils import hide_streamlit_elements
 from views.apresentacao.styles import aplicar_estilos_apresentacao
+from views.apresentacao.carrossel import mostrar_carrossel
 from views.apresentacao.data_loader import (
     carregar_dados_apresentacao,
     carregar_dados_producao,
     carregar_dados_cartorio
 )
 
-# Importar slides
-from views.apresentacao.producao.metricas_macro import slide_producao_metricas_macro
-from views.apresentacao.producao.status_responsavel import slide_producao_status_responsavel
-
 def show_apresentacao_conclusoes(slide_inicial=0):
     """
     Exibe o modo de apresentação da página de conclusões,
@@ -196,6 +192,11 @@ def show_apresentacao_conclusoes(slide_inicial=0):
                     st.query_params["config"] = 1
                     st.query_params["slide"] = slide_inicial
     
+    # Modo apresentação: slides pré-renderizados em segundo plano, sem carregar dados aqui
+    if not modo_config:
+        mostrar_carrossel(st.session_state.tempo_slide, slide_inicial)
+        return
+    
     # Guardar os valores de configuração em parâmetros
     mostrar_conclusoes = st.session_state.get('mostrar_conclusoes', True) if not modo_config else mostrar_conclusoes
     mostrar_producao = st.session_state.get('mostrar_producao', True) if not modo_config else mostrar_producao
@@ -317,9 +318,6 @@ def show_apresentacao_conclusoes(slide_inicial=0):
                 import traceback
                 print(f"Erro completo: {traceback.format_exc()}")
         
-        # Adicionar pequena pausa para mensagens serem visíveis
-        time.sleep(1)
-        
         # Limpar containers
         progress_container.empty()
         message_container.empty()
@@ -332,95 +330,3 @@ def show_apresentacao_conclusoes(slide_inicial=0):
     if not tem_dados:
         st.error("Não foram encontrados dados para o período ou módulos selecionados.")
         return
-    
-    # Interface de apresentação - abordagem com tabs em vez de carrossel
-    if not modo_config:
-        # Criar tabs para cada slide
-        total_tabs = 0
-        if mostrar_conclusoes:
-            total_tabs += 6  # 6 slides de conclusões
-        if mostrar_producao: 
-            total_tabs += 3  # 3 slides de produção
-        if mostrar_cartorio:
-            total_tabs += 3  # 3 slides de cartório
-        
-        # Criar tabs e mantê-las escondidas no modo apresentação
-        slide_tabs = st.tabs([f"Slide {i+1}" for i in range(total_tabs)])
-        
-        # Índice da tab atual
-        tab_index = 0
-        
-        # Adicionar CSS para ocultar as tabs no modo apresentação
-        if not modo_config:
-            st.markdown("""
-            <style>
-            [data-testid="stTabBar"] {
-                display: none;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-        
-        # Slides de Conclusões
-        if mostrar_conclusoes:
-            # Aqui seriam adicionados os slides de conclusões
-            # Por enquanto, deixamos como placeholder para não modificar conclusões.py
-            tab_index += 6
-        
-        # Slides de Produção
-        if mostrar_producao:
-            with slide_tabs[tab_index]:
-                slide_producao_metricas_macro()
-            tab_index += 1
-            
-            with slide_tabs[tab_index]:
-                slide_producao_status_responsavel()
-            tab_index += 1
-            
-            # Slide de pendências por responsável seria adicionado aqui
-            tab_index += 1
-        
-        # Slides de Cartório
-        if mostrar_cartorio:
-            # Aqui seriam adicionados os slides de cartório
-            tab_index += 3
-        
-        # Selecionar a tab atual com base no slide_inicial
-        if 0 <= slide_inicial < total_tabs:
-            # Usar JavaScript para clicar na tab correta
-            tab_script = f"""
-            <script>
-                function select_tab() {{
-                    const tabs = window.parent.document.querySelectorAll('[data-testid="stTabBar"] button');
-                    if (tabs.length > {slide_inicial}) {{
-                        tabs[{slide_inicial}].click();
-                    }}
-                }}
-                setTimeout(select_tab, 100);
-            </script>
-            """
-            st.markdown(tab_script, unsafe_allow_html=True)
-            
-            # Lógica de temporização para avançar automaticamente
-            if not modo_config:
-                # Contador de tempo restante
-                time_container = st.empty()
-                
-                # Começar contagem regressiva
-                tempo_restante = st.session_state.tempo_slide
-                proximo_slide = (slide_inicial + 1) % total_tabs
-                
-                # Mostrar contador em formato pequeno no canto
-                time_container.markdown(f"""
-                <div style="position: fixed; bottom: 10px; right: 10px; background-color: rgba(25, 118, 210, 0.7); 
-                     color: white; padding: 5px 10px; border-radius: 15px; font-size: 14px; z-index: 1000;">
-                    Próximo slide em {tempo_restante}s
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Aguardar o tempo definido
-                time.sleep(tempo_restante)
-                
-                # Redirecionar para o próximo slide
-                st.switch_page("main.py")
-                st.query_params["slide"] = proximo_slide
-                st.query_params["config"] = 0
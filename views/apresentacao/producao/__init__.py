@@ -1,11 +1,7 @@
-from views.apresentacao.producao.metricas_macro import slide_producao_metricas_macro
-from views.apresentacao.producao.status_responsavel import slide_producao_status_responsavel
 from views.apresentacao.producao.pendencias_responsavel import slide_producao_pendencias_responsavel_v2 as slide_producao_pendencias_responsavel
 from views.apresentacao.producao.ranking_pendencias import slide_producao_ranking_pendencias
 
 __all__ = [
-    'slide_producao_metricas_macro',
-    'slide_producao_status_responsavel',
     'slide_producao_pendencias_responsavel',
     'slide_producao_ranking_pendencias'
 ]
@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from utils.status_cube import get_status_cube
+
 def slide_producao_pendencias_responsavel_v2(df):
     """
     Exibe um relatório de pendências por responsável com visualização aprimorada (versão 2)
@@ -37,64 +39,16 @@ def slide_producao_pendencias_responsavel_v2(df):
         st.error("Não foram encontrados campos de higienização nos dados.")
         return
     
-    # Filtrar apenas os registros pendentes ou incompletos
-    df_pendencias = df[df['UF_CRM_HIGILIZACAO_STATUS'].isin(['PENDENCIA', 'INCOMPLETO'])].copy()
+    # Pendências por responsável e campo (fatia do cubo de status), apenas processos pendentes ou incompletos
+    cube = get_status_cube(df)
+    status_pendentes = ['PENDENCIA', 'INCOMPLETO']
     
-    if df_pendencias.empty:
+    if cube.total_rows(statuses=status_pendentes) == 0:
         st.success("Não há pendências! Todos os processos estão completos.")
         return
     
-    # Criar DataFrame para armazenar as contagens de pendências
-    pendencias_data = []
-    
-    # Processar cada responsável
-    for responsavel in df_pendencias['ASSIGNED_BY_NAME'].unique():
-        # Filtrar dados do responsável
-        df_resp = df_pendencias[df_pendencias['ASSIGNED_BY_NAME'] == responsavel]
-        
-        # Inicializar contadores
-        contagem = {'Responsável': responsavel}
-        total_pendencias = 0
-        
-        # Contar pendências por categoria
-        for campo_id, campo_nome in campos_higienizacao.items():
-            if campo_id in df_resp.columns:
-                # Lista de valores que contam como pendência (igual ao components/tables.py)
-                valores_pendencia = [
-                    'NÃO', 'Não', 'NAO', 'nao', 'não', 'N', 'n',
-                    'NÃO SELECIONADO', 'Não Selecionado', 'NAO SELECIONADO', 
-                    'Nao Selecionado', 'não selecionado', 'não selecionada',
-                    'n/s', 'N/S', False, 'false', 'FALSE'
-                ]
-                
-                # Criar máscara para identificar registros que são 'NÃO', 'NÃO SELECIONADO' ou equivalentes
-                mascara_nao = df_resp[campo_id].astype(str).str.upper().isin([str(v).upper() for v in valores_pendencia])
-                
-                # Máscara para valores vazios ou nulos
-                mascara_vazio = (
-                    df_resp[campo_id].isna() | 
-                    (df_resp[campo_id].astype(str).str.strip() == '') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NAN') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NONE') |
-                    (df_resp[campo_id].astype(str).str.upper() == 'NULL')
-                )
-                
-                # Contar todas as ocorrências de pendências
-                pendencias = (mascara_nao | mascara_vazio).sum()
-                contagem[campo_nome] = pendencias
-                total_pendencias += pendencias
-        
-        # Adicionar total
-        contagem['Total'] = total_pendencias
-        
-        # Adicionar à lista de dados
-        pendencias_data.append(contagem)
-    
-    # Criar DataFrame com os dados de pendências
-    df_pendencias_resumo = pd.DataFrame(pendencias_data)
-    
-    # Classificar por total de pendências (maior primeiro)
-    df_pendencias_resumo = df_pendencias_resumo.sort_values('Total', ascending=False)
+    # Contagens por campo e Total, já ordenadas por total de pendências (maior primeiro)
+    df_pendencias_resumo = cube.field_counts('PENDENCIAS', statuses=status_pendentes)
     
     # Preencher valores NaN com 0
     for campo in campos_higienizacao.values():
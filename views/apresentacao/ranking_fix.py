@@ -1,10 +1,14 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
+from utils.ranking_engine import get_ranking_engine
 
-def slide_ranking_produtividade(df, df_todos):
+def slide_ranking_produtividade(df, df_todos, date_from=None, date_to=None):
     """
     Slide com ranking de produtividade por responsável
+    
+    Os números vêm do motor de ranking compartilhado com a página de Conclusões
+    (date_from/date_to: período carregado).
     """
     # Forçar limpeza de elementos persistentes
     st.empty()
@@ -17,35 +21,13 @@ def slide_ranking_produtividade(df, df_todos):
             st.error("Não foi possível gerar o ranking: coluna de responsáveis não encontrada.")
             return
         
-        # Agrupar por responsável e contar o número de conclusões
-        if not df.empty and 'ASSIGNED_BY_NAME' in df.columns:
-            ranking_conclusoes = df.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_CONCLUSOES')
-        else:
-            ranking_conclusoes = pd.DataFrame(columns=['ASSIGNED_BY_NAME', 'TOTAL_CONCLUSOES'])
-        
-        # Calcular a taxa de conclusão por responsável
-        total_por_responsavel = df_todos.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_ATRIBUIDOS')
-        
-        # Fazer merge outer para incluir todos os responsáveis
-        ranking = pd.merge(total_por_responsavel, ranking_conclusoes, on='ASSIGNED_BY_NAME', how='left')
-        
-        # Preencher valores NaN de conclusões com 0
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].fillna(0)
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].astype(int)
+        # Ranking do motor compartilhado com a página de Conclusões (mesmos números)
+        motor = get_ranking_engine()
+        motor.update(df_todos, start=date_from, end=date_to)
+        ranking = motor.ranking(start=date_from, end=date_to)
         
-        # Calcular pendentes e taxa de conclusão
-        ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
-        ranking['TAXA_CONCLUSAO'] = (ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'] * 100).round(1)
-        
-        # Ordenar pelo total de conclusões em ordem decrescente
-        ranking = ranking.sort_values('TOTAL_CONCLUSOES', ascending=False).reset_index(drop=True)
-        
-        # Adicionar coluna de posição
-        ranking.insert(0, 'POSICAO', ranking.index + 1)
-        
-        # Calcular a média global para estabelecer a meta
-        media_global = df.groupby('DATA_CONCLUSAO').size().mean() if 'DATA_CONCLUSAO' in df.columns else 0
-        meta_diaria = round(media_global, 1)  # Meta = 100% da média global diária
+        # Meta = média diária de conclusões por responsável nos dias com conclusão
+        meta_diaria = round(motor.daily_target(start=date_from, end=date_to), 1)
         
         # Calcular total de pendentes do mês
         total_pendentes = ranking['PENDENTES'].sum()
@@ -58,82 +40,21 @@ def slide_ranking_produtividade(df, df_todos):
         # Calcular meta diária para concluir todos até o fim do mês
         meta_diaria_fim_mes = round(total_pendentes / max(1, dias_restantes), 1)
         
-        # Calcular dias trabalhados e média diária para cada responsável
-        if 'DATA_CONCLUSAO' in df.columns:
-            # Lista para armazenar dados dos responsáveis com suas estatísticas
-            dados_responsaveis = []
-            
-            # Para cada responsável no ranking
-            for i, (idx, row) in enumerate(ranking.iterrows()):
-                responsavel = row['ASSIGNED_BY_NAME']
-                df_resp = df[df['ASSIGNED_BY_NAME'] == responsavel]
-                
-                if not df_resp.empty:
-                    # Dias úteis entre primeira e última conclusão
-                    primeira_conclusao = df_resp['DATA_CONCLUSAO'].min().date()
-                    ultima_conclusao = df_resp['DATA_CONCLUSAO'].max().date()
-                    
-                    dias_uteis = 0
-                    data_atual = datetime.combine(primeira_conclusao, datetime.min.time())
-                    
-                    while data_atual.date() <= ultima_conclusao:
-                        dia_semana = data_atual.weekday()
-                        if dia_semana <= 5:  # Segunda a sábado
-                            dias_uteis += 1
-                        data_atual += timedelta(days=1)
-                    
-                    # Dias em que o responsável realmente trabalhou
-                    dias_com_conclusao = df_resp['DATA_CONCLUSAO'].dt.date.nunique()
-                    
-                    # Média diária
-                    media_diaria = row['TOTAL_CONCLUSOES'] / max(1, dias_uteis)
-                    
-                    # Verificar se atingiu a meta
-                    atingiu_meta = media_diaria >= meta_diaria
-                    
-                    # Adicionar dados
-                    dados_responsaveis.append({
-                        'posicao': int(row['POSICAO']),
-                        'nome': responsavel,
-                        'total': int(row['TOTAL_CONCLUSOES']),
-                        'pendentes': int(row['PENDENTES']),
-                        'taxa': row['TAXA_CONCLUSAO'],
-                        'dias_uteis': dias_uteis,
-                        'dias_com_conclusao': dias_com_conclusao,
-                        'media_diaria': round(media_diaria, 1),
-                        'atingiu_meta': atingiu_meta,
-                        'destaque': i < 3  # Top 3 = destaque especial
-                    })
-                else:
-                    # Responsável sem conclusões
-                    dados_responsaveis.append({
-                        'posicao': int(row['POSICAO']),
-                        'nome': responsavel,
-                        'total': int(row['TOTAL_CONCLUSOES']),
-                        'pendentes': int(row['PENDENTES']),
-                        'taxa': row['TAXA_CONCLUSAO'],
-                        'dias_uteis': 0,
-                        'dias_com_conclusao': 0,
-                        'media_diaria': 0.0,
-                        'atingiu_meta': False,
-                        'destaque': False
-                    })
-        else:
-            # Caso não tenha a coluna de data de conclusão
-            dados_responsaveis = [
-                {
-                    'posicao': int(row['POSICAO']),
-                    'nome': row['ASSIGNED_BY_NAME'],
-                    'total': int(row['TOTAL_CONCLUSOES']),
-                    'pendentes': int(row['PENDENTES']),
-                    'taxa': row['TAXA_CONCLUSAO'],
-                    'dias_uteis': 0,
-                    'dias_com_conclusao': 0,
-                    'media_diaria': 0.0,
-                    'atingiu_meta': False,
-                    'destaque': i < 3  # Top 3 = destaque especial
-                } for i, (idx, row) in enumerate(ranking.iterrows())
-            ]
+        # Dados dos cards montados a partir das colunas do ranking (responsáveis sem conclusões
+        # não entram nos destaques nem contam como meta atingida)
+        com_conclusoes = ranking['TOTAL_CONCLUSOES'] > 0
+        dados_responsaveis = pd.DataFrame({
+            'posicao': ranking['POSICAO'],
+            'nome': ranking['ASSIGNED_BY_NAME'],
+            'total': ranking['TOTAL_CONCLUSOES'],
+            'pendentes': ranking['PENDENTES'],
+            'taxa': ranking['TAXA_CONCLUSAO'],
+            'dias_uteis': ranking['DIAS_UTEIS_PERIODO'],
+            'dias_com_conclusao': ranking['DIAS_COM_CONCLUSAO'],
+            'media_diaria': ranking['MEDIA_DIARIA'].round(1),
+            'atingiu_meta': com_conclusoes & (ranking['MEDIA_DIARIA'] >= meta_diaria),
+            'destaque': com_conclusoes & (ranking['POSICAO'] <= 3),
+        }).to_dict('records')
         
         # Exibir informação sobre as metas
         st.markdown(f"""
@@ -7,6 +7,7 @@ import numpy as np
 
 # Importar funções necessárias do arquivo original
 from views.cartorio.produtividade import formatar_nome_etapa, obter_mapeamento_campos
+from api.stage_dictionary import get_stage_dictionary
 
 # --- INÍCIO DA ADIÇÃO: Mapeamento STAGE_ID -> NOME_ESTAGIO ---
 def obter_nomes_estagios_local():
@@ -14,61 +15,10 @@ def obter_nomes_estagios_local():
     Retorna um dicionário mapeando STAGE_IDs técnicos para nomes legíveis.
     Este mapeamento é crucial para a exibição correta das métricas.
     Se múltiplos IDs são mapeados para o mesmo nome, suas contagens serão somadas.
-    """
-    # Mapeamento baseado na tabela fornecida e nomes comuns
-    # IMPORTANTE: Este mapeamento deve ser mantido atualizado com os estágios do Bitrix24
-    mapeamento = {
-        # SUCESSO
-        'C1052:WON': 'Certidão Entregue',  # Assumindo que WON = Entregue/Success final
-        'C1052:SUCCESS': 'Certidão Entregue', # Agrupa com WON
-        'DT1052_16:SUCCESS': 'Certidão Entregue', # Agrupa com WON
-        'DT1052_34:SUCCESS': 'Certidão Entregue', # Agrupa com WON
-        'DT1052_16:CLIENT': 'Certidão Entregue', # Agrupa com WON
-        'DT1052_34:CLIENT': 'Certidão Entregue', # Agrupa com WON
-        'CLIENT': 'Certidão Entregue', # Agrupa com WON
-        # 'UF_CRM_DATA_CERTIDAO_FISICA_ENTREGUE': 'Certidão Física Entregue', # Verificar se existe ID correspondente
-        'UF_CRM_DATA_CERTIDAO_FISICA_ENVIADA': 'Certidão Física Enviada', # Mapear ID correto se houver
-        'UF_CRM_DATA_CERTIDAO_EMITIDA': 'Certidão Emitida', # Mapear ID correto se houver
-        # IDs de sucesso genéricos podem precisar ser mapeados se usados
-        'DT1052_16:UC_JRGCW3': 'Certidão Pronta', # Exemplo
-        'DT1052_34:UC_84B1S2': 'Certidão Pronta', # Exemplo
-
-        # EM ANDAMENTO
-        'C1052:UC_LNHG7G': 'Apenas Ass. Req. Cliente P/ Montagem', # Exemplo, verificar ID correto
-        'C1052:PREPARATION': 'Aguardando Certidão', # Exemplo, verificar ID correto
-        'C1052:FINAL_INVOICE': 'Devolutiva Busca', # Mapeamento conhecido
-        'C1052:UC_3LJ0KG': 'NÃO TRABALHAR(DESPRIORIZADA)', # Mapeamento fornecido
-        'C1052:UC_52V88J': 'Solicitar Cart. Origem', # Exemplo, verificar ID correto
-        'C1052:EXECUTING': 'Aguard. Cart. Origem', # Exemplo, verificar ID correto
-        'C1052:UC_RJC2DD': 'PRIO2 - FAZER BUSCA CRC', # Mapeamento fornecido
-        'C1052:UC_XM32IE': 'SEM DADOS SUFICIENTES PARA BUSCA', # Mapeamento fornecido
-        'C1052:UC_6T0J0A': 'Busca CRC', # Exemplo, verificar ID correto
-        'C1052:UC_T71A6N': 'Montagem Requerimento Cartório', # Exemplo, verificar ID correto
-        'C1052:UC_K85YX7': 'PRIO2 - FAZER BUSCA CRC', # Mapeamento fornecido (Agrupa com UC_RJC2DD)
-        # 'UF_CRM_DATA_SOLICITAR_CARTORIO_ORIGEM_PRIORIDADE': 'Cart. Origem Prioridade', # Mapear ID correto se houver
-
-        # FALHA
-        'C1052:LOSE': 'Devolução ADM', # Assumindo LOSE principal = Devolução ADM
-        'C1052:APOLOGY': 'Dev. ADM Verificado', # Exemplo, verificar ID correto
-        'C1052:UC_O1L97N': 'Solicitação Duplicada', # Exemplo, verificar ID correto
-        'C1052:UC_Q448V8': 'Devolvido Requerimento', # Exemplo, verificar ID correto
-        'C1052:UC_7L6CGJ': 'CANCELADO' # Mapeamento fornecido
-        # Adicionar outros IDs de falha se existirem
-    }
-    # Adicionar prefixo C1052: se estiver faltando em algum ID (pode variar)
-    # Esta parte pode precisar de ajuste dependendo do formato exato dos IDs nos dados
-    mapeamento_final = {}
-    for key, value in mapeamento.items():
-        if not key.startswith('C1052:') and not key.startswith('DT'):
-             # Tenta adicionar prefixo padrão se parecer um ID sem ele
-             # Pode ser necessário ajustar 'C1052:' para o prefixo correto se variar
-             # Ou remover esta lógica se os IDs no dict já estiverem corretos
-             # mapeamento_final[f'C1052:{key}'] = value
-             mapeamento_final[key] = value # Mantem como está por enquanto
-        else:
-            mapeamento_final[key] = value
 
-    return mapeamento_final
+    O mapeamento é mantido no dicionário de estágios compartilhado (api/stage_dictionary.py).
+    """
+    return get_stage_dictionary('crm', use_crm_status=False).names
 # --- FIM DA ADIÇÃO ---
 
 def definir_parametros_sla():
@@ -161,6 +111,184 @@ def definir_parametros_sla():
         'processo_moderado': st.session_state.processo_moderado
     }
 
+# Sequência lógica das etapas do processo de emissão
+ETAPAS_SEQUENCIA = [
+    "Deu ganho na Busca",
+    "Montar Requerimento", 
+    "Requerimento Montado",
+    "Solicitado ao Cartório Origem", 
+    "Certidao Emitida", 
+    "Certidao Fisica Enviada", 
+    "Certidao Fisica Entregue"
+]
+
+# Durações fora do intervalo (0, LIMITE_OUTLIER_HORAS) são descartadas como outliers (máx 30 dias)
+LIMITE_OUTLIER_HORAS = 720
+
+# Rótulos de classificação de SLA, do mais rápido ao mais lento
+ROTULOS_SLA = ["🟢 Rápido", "🟡 Moderado", "🔴 Lento"]
+
+def mapear_etapas_para_campos(colunas, campos_data, etapas=ETAPAS_SEQUENCIA):
+    """Mapeia cada etapa da sequência para o primeiro campo de data disponível com esse nome"""
+    etapa_para_campo = {}
+    for etapa in etapas:
+        for campo in campos_data:
+            if campo in colunas and formatar_nome_etapa(campo) == etapa:
+                etapa_para_campo[etapa] = campo
+                break
+    return etapa_para_campo
+
+def calcular_matriz_duracoes(df, pares_campos):
+    """
+    Calcula de uma só vez a duração (em horas) de todos os pares de campos de data
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os campos de data
+        pares_campos (list): Lista de tuplas (campo_inicio, campo_fim)
+        
+    Returns:
+        numpy.ndarray: Matriz (registros x pares) em horas; NaN quando falta alguma das datas
+        ou quando a duração é um outlier (<= 0 ou >= LIMITE_OUTLIER_HORAS)
+    """
+    if not pares_campos:
+        return np.empty((len(df), 0))
+    
+    campos = list(dict.fromkeys(campo for par in pares_campos for campo in par))
+    datas = {campo: pd.to_datetime(df[campo], errors='coerce').to_numpy(dtype='datetime64[ns]') for campo in campos}
+    inicio = np.column_stack([datas[campo_inicio] for campo_inicio, _ in pares_campos])
+    fim = np.column_stack([datas[campo_fim] for _, campo_fim in pares_campos])
+    
+    horas = (fim - inicio) / np.timedelta64(1, 'h')
+    with np.errstate(invalid='ignore'):
+        horas[~((horas > 0) & (horas < LIMITE_OUTLIER_HORAS))] = np.nan
+    return horas
+
+def classificar_sla(horas, limite_rapido, limite_moderado):
+    """
+    Classifica durações (em horas) nas faixas de SLA usando np.select
+    
+    Valores NaN recebem string vazia.
+    """
+    horas = np.asarray(horas, dtype=float)
+    with np.errstate(invalid='ignore'):
+        condicoes = [horas < limite_rapido, horas < limite_moderado, horas >= limite_moderado]
+    return np.select(condicoes, ROTULOS_SLA, default='')
+
+def contar_classes_sla(horas, limite_rapido, limite_moderado):
+    """Conta, para cada coluna da matriz de durações, quantos registros caem em cada faixa de SLA"""
+    classes = classificar_sla(horas, limite_rapido, limite_moderado)
+    if classes.ndim == 1:
+        classes = classes[:, np.newaxis]
+    return {rotulo: (classes == rotulo).sum(axis=0) for rotulo in ROTULOS_SLA}
+
+def resumir_duracoes(horas):
+    """
+    Estatísticas por coluna da matriz de durações (ignorando NaN)
+    
+    Returns:
+        pandas.DataFrame: Colunas registros, media, mediana e p90 (uma linha por coluna da matriz)
+    """
+    horas = np.atleast_2d(np.asarray(horas, dtype=float).T).T
+    registros = (~np.isnan(horas)).sum(axis=0)
+    resumo = pd.DataFrame({
+        'registros': registros,
+        'media': np.nan,
+        'mediana': np.nan,
+        'p90': np.nan
+    })
+    com_dados = registros > 0
+    if com_dados.any():
+        subconjunto = horas[:, com_dados]
+        resumo.loc[com_dados, 'media'] = np.nanmean(subconjunto, axis=0)
+        resumo.loc[com_dados, 'mediana'] = np.nanmedian(subconjunto, axis=0)
+        resumo.loc[com_dados, 'p90'] = np.nanpercentile(subconjunto, 90, axis=0)
+    return resumo
+
+def resumir_por_responsavel(horas, responsaveis):
+    """
+    Estatísticas de duração por responsável em uma única agregação
+    
+    Args:
+        horas (numpy.ndarray): Durações em horas (uma por registro, NaN quando inválida)
+        responsaveis (array-like): Responsável de cada registro
+        
+    Returns:
+        pandas.DataFrame: Colunas responsavel, count, mean, median, min, max e p90
+    """
+    df_tempo = pd.DataFrame({'responsavel': np.asarray(responsaveis, dtype=object), 'tempo_diff': horas})
+    df_tempo = df_tempo.dropna()
+    if df_tempo.empty:
+        return pd.DataFrame(columns=['responsavel', 'count', 'mean', 'median', 'min', 'max', 'p90'])
+    
+    grupos = df_tempo.groupby('responsavel')['tempo_diff']
+    resumo = grupos.agg(['count', 'mean', 'median', 'min', 'max'])
+    resumo['p90'] = grupos.quantile(0.9)
+    return resumo.reset_index()
+
+@st.cache_data(show_spinner=False)
+def calcular_duracoes_etapas(df, campos_data, mapeamento_campos=None):
+    """
+    Motor de durações: calcula todos os pares consecutivos de etapas (e o tempo total do processo)
+    em uma única operação vetorizada
+    
+    O resultado não depende dos limites de SLA, que são aplicados depois com classificar_sla;
+    assim, mover os controles de SLA não refaz o cálculo das durações.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os campos de data
+        campos_data (list): Lista de campos de data para análise
+        mapeamento_campos (dict, optional): Mapeamento campo de data -> campo de responsável
+        
+    Returns:
+        dict: pares (lista de dicts), horas (matriz registros x pares), resumo (DataFrame por par),
+        horas_total (array ou None) e por_responsavel (dict rótulo do par -> DataFrame)
+    """
+    etapa_para_campo = mapear_etapas_para_campos(df.columns, campos_data)
+    
+    pares = []
+    for etapa_anterior, etapa_atual in zip(ETAPAS_SEQUENCIA[:-1], ETAPAS_SEQUENCIA[1:]):
+        if etapa_anterior in etapa_para_campo and etapa_atual in etapa_para_campo:
+            pares.append({
+                'rotulo': f"{etapa_anterior} → {etapa_atual}",
+                'etapa_anterior': etapa_anterior,
+                'etapa_atual': etapa_atual,
+                'campo_anterior': etapa_para_campo[etapa_anterior],
+                'campo_atual': etapa_para_campo[etapa_atual]
+            })
+    
+    pares_campos = [(par['campo_anterior'], par['campo_atual']) for par in pares]
+    
+    # Tempo total do processo (primeira à última etapa) entra como coluna extra da mesma matriz
+    primeira_etapa, ultima_etapa = ETAPAS_SEQUENCIA[0], ETAPAS_SEQUENCIA[-1]
+    tem_total = primeira_etapa in etapa_para_campo and ultima_etapa in etapa_para_campo
+    if tem_total:
+        pares_campos.append((etapa_para_campo[primeira_etapa], etapa_para_campo[ultima_etapa]))
+    
+    matriz = calcular_matriz_duracoes(df, pares_campos)
+    horas = matriz[:, :len(pares)]
+    horas_total = matriz[:, -1] if tem_total else None
+    
+    resumo = resumir_duracoes(horas)
+    resumo.insert(0, 'par', [par['rotulo'] for par in pares])
+    
+    por_responsavel = {}
+    for j, par in enumerate(pares):
+        campo_resp = (mapeamento_campos or {}).get(par['campo_atual'])
+        if campo_resp in df.columns:
+            por_responsavel[par['rotulo']] = resumir_por_responsavel(horas[:, j], df[campo_resp])
+    
+    return {
+        'pares': pares,
+        'horas': horas,
+        'resumo': resumo,
+        'horas_total': horas_total,
+        'por_responsavel': por_responsavel
+    }
+
+def formatar_duracao(horas):
+    """Formata uma duração em horas como texto (dias quando passa de 24 horas)"""
+    return f"{horas/24:.1f} dias" if horas > 24 else f"{horas:.1f} horas"
+
 def visualizar_funil_processo(df, campos_data):
     """Cria visualização do funil completo do processo com taxas de conversão"""
     
@@ -319,104 +447,36 @@ def analisar_tempo_entre_etapas(df, campos_data, parametros_sla):
         - 🔴 **Lento**: Mais de {tempo_moderado} horas
         """)
     
-    # Definir sequência lógica das etapas 
-    etapas_sequencia = [
-        "Deu ganho na Busca",
-        "Montar Requerimento", 
-        "Requerimento Montado",
-        "Solicitado ao Cartório Origem", 
-        "Certidao Emitida", 
-        "Certidao Fisica Enviada", 
-        "Certidao Fisica Entregue"
-    ]
-    
-    # Mapear etapas para seus campos correspondentes
-    etapa_para_campo = {}
-    for etapa in etapas_sequencia:
-        for campo in campos_data:
-            if campo in df.columns and formatar_nome_etapa(campo) == etapa:
-                etapa_para_campo[etapa] = campo
-                break
-    
-    # Calcular tempo entre etapas
-    tempos_medios = []
-    tempos_medianos = []
-    etapas_pares = []
-    classificacoes = []
-    dados_pares = []
-    
-    for i in range(1, len(etapas_sequencia)):
-        etapa_anterior = etapas_sequencia[i-1]
-        etapa_atual = etapas_sequencia[i]
-        
-        if etapa_anterior in etapa_para_campo and etapa_atual in etapa_para_campo:
-            campo_anterior = etapa_para_campo[etapa_anterior]
-            campo_atual = etapa_para_campo[etapa_atual]
-            
-            # Filtrar registros com ambas as datas
-            df_par = df.dropna(subset=[campo_anterior, campo_atual]).copy()
-            
-            if not df_par.empty:
-                # Calcular diferença em horas
-                df_par['tempo_diff'] = (pd.to_datetime(df_par[campo_atual]) - 
-                                        pd.to_datetime(df_par[campo_anterior])).dt.total_seconds() / 3600
-                
-                # Remover outliers (valores negativos ou extremamente altos)
-                df_par = df_par[(df_par['tempo_diff'] > 0) & (df_par['tempo_diff'] < 720)]  # Máx 30 dias
-                
-                if not df_par.empty:
-                    tempo_medio_horas = df_par['tempo_diff'].mean()
-                    tempo_mediano_horas = df_par['tempo_diff'].median()
-                    
-                    # Formatação para exibição
-                    if tempo_medio_horas > 24:
-                        tempo_medio = f"{tempo_medio_horas/24:.1f} dias"
-                    else:
-                        tempo_medio = f"{tempo_medio_horas:.1f} horas"
-                        
-                    if tempo_mediano_horas > 24:
-                        tempo_mediano = f"{tempo_mediano_horas/24:.1f} dias"
-                    else:
-                        tempo_mediano = f"{tempo_mediano_horas:.1f} horas"
-                    
-                    # Classificar com base nos parâmetros personalizados
-                    if tempo_medio_horas < tempo_rapido:
-                        classificacao = "🟢 Rápido"
-                    elif tempo_medio_horas < tempo_moderado:
-                        classificacao = "🟡 Moderado"
-                    else:
-                        classificacao = "🔴 Lento"
-                    
-                    # Guardar dados para exibição
-                    tempos_medios.append(tempo_medio)
-                    tempos_medianos.append(tempo_mediano)
-                    etapas_pares.append(f"{etapa_anterior} → {etapa_atual}")
-                    classificacoes.append(classificacao)
-                    
-                    # Guardar dados para gráfico
-                    df_tempo = pd.DataFrame({
-                        'Par de Etapas': f"{etapa_anterior} → {etapa_atual}",
-                        'Etapa Anterior': etapa_anterior,
-                        'Etapa Atual': etapa_atual,
-                        'Tempo (horas)': df_par['tempo_diff']
-                    })
-                    dados_pares.append(df_tempo)
+    # Durações de todos os pares de etapas, calculadas de uma só vez
+    motor = calcular_duracoes_etapas(df, campos_data, obter_mapeamento_campos())
+    pares = motor['pares']
+    horas = motor['horas']
+    resumo = motor['resumo']
+    resumo = resumo[resumo['registros'] > 0]
     
     # Se não há dados para análise
-    if not etapas_pares:
+    if resumo.empty:
         st.warning("Não há dados suficientes para analisar o tempo entre etapas.")
         return
     
-    # Combinar dados para gráfico
-    df_todos_tempos = pd.concat(dados_pares) if dados_pares else pd.DataFrame()
+    # Combinar dados para gráfico (formato longo: uma linha por registro e par)
+    linhas, colunas = np.nonzero(~np.isnan(horas))
+    rotulos_pares = np.array([par['rotulo'] for par in pares], dtype=object)
+    df_todos_tempos = pd.DataFrame({
+        'Par de Etapas': rotulos_pares[colunas],
+        'Etapa Anterior': np.array([par['etapa_anterior'] for par in pares], dtype=object)[colunas],
+        'Etapa Atual': np.array([par['etapa_atual'] for par in pares], dtype=object)[colunas],
+        'Tempo (horas)': horas[linhas, colunas]
+    })
     
     if not df_todos_tempos.empty:
-        # Criar tabela com estatísticas
+        # Criar tabela com estatísticas (classificação pelo tempo médio de cada par)
         df_stats = pd.DataFrame({
-            'Transição': etapas_pares,
-            'Tempo Médio': tempos_medios,
-            'Tempo Mediano': tempos_medianos,
-            'Classificação': classificacoes
+            'Transição': resumo['par'].values,
+            'Tempo Médio': [formatar_duracao(h) for h in resumo['media']],
+            'Tempo Mediano': [formatar_duracao(h) for h in resumo['mediana']],
+            'P90': [formatar_duracao(h) for h in resumo['p90']],
+            'Classificação': classificar_sla(resumo['media'].values, tempo_rapido, tempo_moderado)
         })
         
         # Exibir tabela de tempos
@@ -427,6 +487,7 @@ def analisar_tempo_entre_etapas(df, campos_data, parametros_sla):
                 "Transição": st.column_config.TextColumn("Transição entre Etapas"),
                 "Tempo Médio": st.column_config.TextColumn("Tempo Médio"),
                 "Tempo Mediano": st.column_config.TextColumn("Tempo Mediano"),
+                "P90": st.column_config.TextColumn("P90", help="90% das transições levaram até este tempo"),
                 "Classificação": st.column_config.TextColumn("Classificação")
             },
             use_container_width=True,
@@ -467,91 +528,80 @@ def analisar_tempo_entre_etapas(df, campos_data, parametros_sla):
         st.plotly_chart(fig, use_container_width=True)
         
         # Calcular tempo total do processo (primeira à última etapa)
-        primeira_etapa = etapas_sequencia[0]
-        ultima_etapa = etapas_sequencia[-1]
+        primeira_etapa = ETAPAS_SEQUENCIA[0]
+        ultima_etapa = ETAPAS_SEQUENCIA[-1]
         
-        if primeira_etapa in etapa_para_campo and ultima_etapa in etapa_para_campo:
-            campo_primeiro = etapa_para_campo[primeira_etapa]
-            campo_ultimo = etapa_para_campo[ultima_etapa]
-            
-            df_tempo_total = df.dropna(subset=[campo_primeiro, campo_ultimo]).copy()
+        if motor['horas_total'] is not None:
+            tempo_total = motor['horas_total'][~np.isnan(motor['horas_total'])]
             
-            if not df_tempo_total.empty:
-                df_tempo_total['tempo_total'] = (pd.to_datetime(df_tempo_total[campo_ultimo]) - 
-                                              pd.to_datetime(df_tempo_total[campo_primeiro])).dt.total_seconds() / 3600
+            if tempo_total.size:
+                tempo_medio_total = tempo_total.mean() / 24  # em dias
+                tempo_mediano_total = np.median(tempo_total) / 24  # em dias
                 
-                # Remover outliers
-                df_tempo_total = df_tempo_total[(df_tempo_total['tempo_total'] > 0) & 
-                                            (df_tempo_total['tempo_total'] < 720)]
-                
-                if not df_tempo_total.empty:
-                    tempo_medio_total = df_tempo_total['tempo_total'].mean() / 24  # em dias
-                    tempo_mediano_total = df_tempo_total['tempo_total'].median() / 24  # em dias
-                    
-                    st.markdown("### Tempo Total do Processo")
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.metric(
-                            "Tempo Médio",
-                            f"{tempo_medio_total:.1f} dias",
-                            help=f"Média de tempo entre {primeira_etapa} e {ultima_etapa}"
-                        )
-                    
-                    with col2:
-                        st.metric(
-                            "Tempo Mediano",
-                            f"{tempo_mediano_total:.1f} dias",
-                            help=f"Mediana de tempo entre {primeira_etapa} e {ultima_etapa}"
-                        )
-                    
-                    # Classificar por SLA
-                    processo_rapido = parametros_sla['processo_rapido']
-                    processo_moderado = parametros_sla['processo_moderado']
-                    
-                    processos_rapidos = len(df_tempo_total[df_tempo_total['tempo_total'] < 24*processo_rapido])
-                    processos_medios = len(df_tempo_total[(df_tempo_total['tempo_total'] >= 24*processo_rapido) & 
-                                                      (df_tempo_total['tempo_total'] < 24*processo_moderado)])
-                    processos_lentos = len(df_tempo_total[df_tempo_total['tempo_total'] >= 24*processo_moderado])
-                    
-                    total_processos = len(df_tempo_total)
-                    
-                    # Criar gráfico de distribuição por SLA
-                    dados_sla = pd.DataFrame({
-                        'SLA': [f'Rápido (< {processo_rapido} dias)', 
-                              f'Médio ({processo_rapido}-{processo_moderado} dias)', 
-                              f'Lento (> {processo_moderado} dias)'],
-                        'Quantidade': [processos_rapidos, processos_medios, processos_lentos],
-                        'Percentual': [100*processos_rapidos/total_processos if total_processos > 0 else 0,
-                                      100*processos_medios/total_processos if total_processos > 0 else 0,
-                                      100*processos_lentos/total_processos if total_processos > 0 else 0]
-                    })
-                    
-                    fig = px.pie(
-                        dados_sla,
-                        values='Quantidade',
-                        names='SLA',
-                        title="Distribuição de Processos por Tempo de Processamento",
-                        color='SLA',
-                        color_discrete_map={
-                            f'Rápido (< {processo_rapido} dias)': '#4CAF50',
-                            f'Médio ({processo_rapido}-{processo_moderado} dias)': '#FFC107',
-                            f'Lento (> {processo_moderado} dias)': '#F44336'
-                        }
+                st.markdown("### Tempo Total do Processo")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric(
+                        "Tempo Médio",
+                        f"{tempo_medio_total:.1f} dias",
+                        help=f"Média de tempo entre {primeira_etapa} e {ultima_etapa}"
                     )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Mostrar tabela com detalhamento
-                    st.dataframe(
-                        dados_sla,
-                        column_config={
-                            "SLA": st.column_config.TextColumn("Classificação"),
-                            "Quantidade": st.column_config.NumberColumn("Quantidade", format="%d"),
-                            "Percentual": st.column_config.ProgressColumn("% do Total", format="%.1f%%")
-                        },
-                        use_container_width=True,
-                        hide_index=True
+                
+                with col2:
+                    st.metric(
+                        "Tempo Mediano",
+                        f"{tempo_mediano_total:.1f} dias",
+                        help=f"Mediana de tempo entre {primeira_etapa} e {ultima_etapa}"
                     )
+                
+                # Classificar por SLA
+                processo_rapido = parametros_sla['processo_rapido']
+                processo_moderado = parametros_sla['processo_moderado']
+                
+                contagem_sla = contar_classes_sla(tempo_total, 24*processo_rapido, 24*processo_moderado)
+                processos_rapidos, processos_medios, processos_lentos = (
+                    int(contagem_sla[rotulo][0]) for rotulo in ROTULOS_SLA
+                )
+                
+                total_processos = tempo_total.size
+                
+                # Criar gráfico de distribuição por SLA
+                dados_sla = pd.DataFrame({
+                    'SLA': [f'Rápido (< {processo_rapido} dias)', 
+                          f'Médio ({processo_rapido}-{processo_moderado} dias)', 
+                          f'Lento (> {processo_moderado} dias)'],
+                    'Quantidade': [processos_rapidos, processos_medios, processos_lentos],
+                    'Percentual': [100*processos_rapidos/total_processos if total_processos > 0 else 0,
+                                  100*processos_medios/total_processos if total_processos > 0 else 0,
+                                  100*processos_lentos/total_processos if total_processos > 0 else 0]
+                })
+                
+                fig = px.pie(
+                    dados_sla,
+                    values='Quantidade',
+                    names='SLA',
+                    title="Distribuição de Processos por Tempo de Processamento",
+                    color='SLA',
+                    color_discrete_map={
+                        f'Rápido (< {processo_rapido} dias)': '#4CAF50',
+                        f'Médio ({processo_rapido}-{processo_moderado} dias)': '#FFC107',
+                        f'Lento (> {processo_moderado} dias)': '#F44336'
+                    }
+                )
+                
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Mostrar tabela com detalhamento
+                st.dataframe(
+                    dados_sla,
+                    column_config={
+                        "SLA": st.column_config.TextColumn("Classificação"),
+                        "Quantidade": st.column_config.NumberColumn("Quantidade", format="%d"),
+                        "Percentual": st.column_config.ProgressColumn("% do Total", format="%.1f%%")
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
 
 def analisar_desempenho_responsaveis(df, campos_data, mapeamento_campos, parametros_sla):
     """Analisa o desempenho dos responsáveis em termos de tempo de processamento"""
@@ -614,23 +664,12 @@ def analisar_desempenho_responsaveis(df, campos_data, mapeamento_campos, paramet
         campo_resp = item_selecionado['campo_resp']
         
         # Identificar relação com a etapa anterior se possível
-        etapas_sequencia = [
-            "Deu ganho na Busca",
-            "Montar Requerimento", 
-            "Requerimento Montado",
-            "Solicitado ao Cartório Origem", 
-            "Certidao Emitida", 
-            "Certidao Fisica Enviada", 
-            "Certidao Fisica Entregue"
-        ]
-        
-        # Verificar se a etapa atual está na sequência
-        if etapa_selecionada in etapas_sequencia:
-            idx_etapa = etapas_sequencia.index(etapa_selecionada)
+        if etapa_selecionada in ETAPAS_SEQUENCIA:
+            idx_etapa = ETAPAS_SEQUENCIA.index(etapa_selecionada)
             
             # Se não for a primeira etapa, verificar etapa anterior
             if idx_etapa > 0:
-                etapa_anterior = etapas_sequencia[idx_etapa - 1]
+                etapa_anterior = ETAPAS_SEQUENCIA[idx_etapa - 1]
                 
                 # Encontrar campo de data correspondente
                 campo_data_anterior = None
@@ -655,44 +694,26 @@ def analisar_desempenho_responsaveis(df, campos_data, mapeamento_campos, paramet
         # Analisar tempo se temos etapa anterior
         tempos_por_responsavel = None
         if campo_data_anterior and campo_data_anterior in df.columns:
-            # Filtrar registros que têm ambas datas (anterior e atual)
-            df_tempo = df.dropna(subset=[campo_data_anterior, campo_data]).copy()
+            # Durações do par (anterior -> atual) por responsável, já agregadas pelo motor de durações
+            motor = calcular_duracoes_etapas(df, campos_data, mapeamento_campos)
+            tempos_por_responsavel = motor['por_responsavel'].get(f"{etapa_anterior} → {etapa_selecionada}")
             
-            if not df_tempo.empty:
-                # Calcular a diferença de tempo em horas
-                df_tempo['tempo_diff'] = (pd.to_datetime(df_tempo[campo_data]) - 
-                                         pd.to_datetime(df_tempo[campo_data_anterior])).dt.total_seconds() / 3600
+            if tempos_por_responsavel is not None and not tempos_por_responsavel.empty:
+                tempos_por_responsavel = tempos_por_responsavel.rename(columns={'responsavel': campo_resp})
                 
-                # Remover outliers
-                df_tempo = df_tempo[(df_tempo['tempo_diff'] > 0) & (df_tempo['tempo_diff'] < 720)]  # Max 30 dias
+                # Ordenar por média de tempo (mais rápido primeiro)
+                tempos_por_responsavel = tempos_por_responsavel.sort_values('mean')
                 
-                if not df_tempo.empty:
-                    # Agrupar por responsável e calcular estatísticas
-                    tempos_por_responsavel = df_tempo.groupby(campo_resp)['tempo_diff'].agg(
-                        ['count', 'mean', 'median', 'min', 'max']
-                    ).reset_index()
-                    
-                    # Ordenar por média de tempo (mais rápido primeiro)
-                    tempos_por_responsavel = tempos_por_responsavel.sort_values('mean')
-                    
-                    # Adicionar classificação
-                    def classificar_tempo(tempo):
-                        if tempo < tempo_rapido:
-                            return "🟢 Rápido"
-                        elif tempo < tempo_moderado:
-                            return "🟡 Moderado"
-                        else:
-                            return "🔴 Lento"
-                    
-                    tempos_por_responsavel['classificacao'] = tempos_por_responsavel['mean'].apply(classificar_tempo)
-                    
-                    # Formatar para exibição
-                    tempos_por_responsavel['tempo_medio'] = tempos_por_responsavel['mean'].apply(
-                        lambda x: f"{x/24:.1f} dias" if x > 24 else f"{x:.1f} horas"
-                    )
-                    tempos_por_responsavel['tempo_mediano'] = tempos_por_responsavel['median'].apply(
-                        lambda x: f"{x/24:.1f} dias" if x > 24 else f"{x:.1f} horas"
-                    )
+                # Adicionar classificação
+                tempos_por_responsavel['classificacao'] = classificar_sla(
+                    tempos_por_responsavel['mean'].values, tempo_rapido, tempo_moderado
+                )
+                
+                # Formatar para exibição
+                tempos_por_responsavel['tempo_medio'] = tempos_por_responsavel['mean'].map(formatar_duracao)
+                tempos_por_responsavel['tempo_mediano'] = tempos_por_responsavel['median'].map(formatar_duracao)
+            else:
+                tempos_por_responsavel = None
         
         # Calcular volume de trabalho por responsável
         volume_por_responsavel = df_analise[campo_resp].value_counts().reset_index()
@@ -742,7 +763,7 @@ def analisar_desempenho_responsaveis(df, campos_data, mapeamento_campos, paramet
             tempo_mais_lento = tempos_por_responsavel.iloc[-1]['tempo_medio']
             
             tempo_medio_geral = tempos_por_responsavel['mean'].mean()
-            tempo_medio_geral_formatado = f"{tempo_medio_geral/24:.1f} dias" if tempo_medio_geral > 24 else f"{tempo_medio_geral:.1f} horas"
+            tempo_medio_geral_formatado = formatar_duracao(tempo_medio_geral)
             
             st.markdown(f"""
             <p>O tempo médio de processamento desta etapa é de <strong>{tempo_medio_geral_formatado}</strong>, com variações significativas por responsável.</p>
@@ -945,15 +966,11 @@ def mostrar_dashboard_tempo_crm(df):
     # Verificar se a coluna STAGE_ID existe
     if 'STAGE_ID' in df.columns:
         try:
-            # Obter mapeamento local de IDs para nomes
-            mapping_nomes = obter_nomes_estagios_local()
-
-            # Função para aplicar o mapeamento (retorna nome ou ID original se não mapeado)
-            def map_nome(stage_id):
-                return mapping_nomes.get(str(stage_id).strip(), str(stage_id).strip()) # Garante que ID é string
-
-            # Cria coluna com nomes mapeados ou IDs originais
-            df['NOME_ESTAGIO'] = df['STAGE_ID'].apply(map_nome)
+            # Cria coluna com nomes mapeados ou IDs originais (mapeamento local + crm_status,
+            # resolvido uma vez por STAGE_ID distinto)
+            df['NOME_ESTAGIO'] = get_stage_dictionary('crm').map_names(
+                df['STAGE_ID'].astype(str).str.strip(), as_categorical=False
+            )
             st.info("Mapeamento de Nomes de Estágio aplicado. IDs não encontrados no mapeamento serão exibidos como estão.")
 
         except Exception as e:
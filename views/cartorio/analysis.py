@@ -330,6 +330,60 @@ def analisar_familias_ausentes():
         st.error(f"Erro durante a análise: {str(e)}")
         return 0, pd.DataFrame()
 
+# Códigos de estágio que representam certidão entregue/concluída (etapas de sucesso)
+CODIGOS_SUCESSO_CERTIDAO = [
+    'SUCCESS', 
+    'DT1052_16:SUCCESS', 
+    'DT1052_34:SUCCESS',
+    'DT1052_16:UC_JRGCW3',
+    'DT1052_34:UC_84B1S2',
+    'UC_JRGCW3',
+    'UC_84B1S2',
+    'DT1052_16:CLIENT',
+    'DT1052_34:CLIENT',
+    'DT1052_34:UC_D0RG5P',
+    'CLIENT',
+    'UC_D0RG5P'
+]
+
+def agregar_metricas_familia(df_cartorio, colunas_primeiro=None,
+                             coluna_familia='UF_CRM_12_1723552666',
+                             coluna_requerente='UF_CRM_12_1723552729'):
+    """
+    Calcula todas as métricas por família em uma única passada agrupada.
+
+    A flag de sucesso é pré-calculada uma vez (STAGE_ID em CODIGOS_SUCESSO_CERTIDAO) e
+    somada no mesmo groupby que conta certidões e requerentes únicos.
+
+    Args:
+        df_cartorio (pandas.DataFrame): Registros de certidões com ID de família
+        colunas_primeiro (dict): Colunas de saída -> coluna de origem, agregadas com 'first'
+        coluna_familia (str): Coluna com o ID da família
+        coluna_requerente (str): Coluna com o ID do requerente
+
+    Returns:
+        pandas.DataFrame: ID_FAMILIA, colunas de colunas_primeiro, TOTAL_CERTIDOES,
+        TOTAL_REQUERENTES e CERTIDOES_ENTREGUES
+    """
+    df = df_cartorio.dropna(subset=[coluna_familia])
+    sucesso = df['STAGE_ID'].isin(CODIGOS_SUCESSO_CERTIDAO) if 'STAGE_ID' in df.columns else pd.Series(False, index=df.index)
+    df = df.assign(_SUCESSO=sucesso.astype(int))
+
+    agregacoes = {saida: (origem, 'first') for saida, origem in (colunas_primeiro or {}).items()}
+    agregacoes['TOTAL_CERTIDOES'] = ('ID', 'count')
+    agregacoes['TOTAL_REQUERENTES'] = (coluna_requerente, 'nunique')
+    agregacoes['CERTIDOES_ENTREGUES'] = ('_SUCESSO', 'sum')
+
+    metricas = df.groupby(coluna_familia).agg(**agregacoes).reset_index()
+    return metricas.rename(columns={coluna_familia: 'ID_FAMILIA'})
+
+def _mapear_por_familia(df_negocios, coluna_valor, coluna_familia='UF_CRM_1722605592778'):
+    """
+    Retorna uma Series ID da família -> valor, mantendo o último negócio de cada família.
+    """
+    df = df_negocios.dropna(subset=[coluna_familia])
+    return df.drop_duplicates(subset=[coluna_familia], keep='last').set_index(coluna_familia)[coluna_valor]
+
 def analisar_familia_certidoes():
     """
     Analisa os dados de famílias, cruzando informações entre diferentes tabelas para obter:
@@ -399,6 +453,7 @@ def analisar_familia_certidoes():
         
         # Carregar dados de vendas
         df_vendas = load_bitrix_data(url_deal, filters=category_filter)
+        df_vendas_uf = pd.DataFrame()
         
         progress_bar.progress(70)
         
@@ -434,58 +489,24 @@ def analisar_familia_certidoes():
         progress_bar.progress(85)
         status_text.info("Processando dados e realizando cruzamentos...")
         
-        # Agrupar por ID de família para obter contagens
-        analise_familia = df_cartorio.groupby('UF_CRM_12_1723552666').agg(
-            NOME=('TITLE', 'first'),
-            CARTORIO=('NOME_CARTORIO', 'first'),
-            ASSIGN=('ASSIGNED_BY_NAME', 'first'),
-            TOTAL_CERTIDOES=('ID', 'count'),
-            ID_REQUERENTE=('UF_CRM_12_1723552729', lambda x: x.iloc[0] if not x.isna().all() else 'Não disponível')
-        ).reset_index()
-        
-        # Renomear a coluna de ID
-        analise_familia = analise_familia.rename(columns={'UF_CRM_12_1723552666': 'ID_FAMILIA'})
-        
-        # Calcular total de requerentes únicos por família
-        def contar_requerentes_unicos(id_familia):
-            df_filtrado = df_cartorio[df_cartorio['UF_CRM_12_1723552666'] == id_familia]
-            requerentes_unicos = df_filtrado['UF_CRM_12_1723552729'].dropna().unique()
-            return len(requerentes_unicos)
-            
-        # Adicionar contagem de requerentes únicos
-        analise_familia['TOTAL_REQUERENTES'] = analise_familia['ID_FAMILIA'].apply(contar_requerentes_unicos)
-        
-        # Adicionar contagem de membros por família (cada ID de certidão representa um membro)
-        analise_familia['MEMBROS'] = analise_familia['TOTAL_CERTIDOES'] / 3  # Considerando média de 3 certidões por membro
-        # Garantir que o número de membros seja pelo menos 1
-        analise_familia['MEMBROS'] = analise_familia['MEMBROS'].apply(lambda x: max(1, round(x)))
-
-        # Adicionar contagem de certidões entregues (SUCCESS)
-        def contar_certidoes_entregues(id_familia):
-            # Filtrar pelo ID da família
-            df_filtrado = df_cartorio[df_cartorio['UF_CRM_12_1723552666'] == id_familia]
-            
-            # Lista de códigos de estágio que representam sucesso (baseado no arquivo visualization.py)
-            success_codes = [
-                'SUCCESS', 
-                'DT1052_16:SUCCESS', 
-                'DT1052_34:SUCCESS',
-                'DT1052_16:UC_JRGCW3',
-                'DT1052_34:UC_84B1S2',
-                'UC_JRGCW3',
-                'UC_84B1S2',
-                'DT1052_16:CLIENT',
-                'DT1052_34:CLIENT',
-                'DT1052_34:UC_D0RG5P',
-                'CLIENT',
-                'UC_D0RG5P'
-            ]
-            
-            # Verificar se algum dos registros tem estágio de sucesso
-            return sum(df_filtrado['STAGE_ID'].isin(success_codes))
-        
-        # Aplicar a função em cada ID de família
-        analise_familia['CERTIDOES_ENTREGUES'] = analise_familia['ID_FAMILIA'].apply(contar_certidoes_entregues)
+        # Agregar todas as métricas por família em uma única passada
+        analise_familia = agregar_metricas_familia(df_cartorio, colunas_primeiro={
+            'NOME': 'TITLE',
+            'CARTORIO': 'NOME_CARTORIO',
+            'ASSIGN': 'ASSIGNED_BY_NAME',
+            'ID_REQUERENTE': 'UF_CRM_12_1723552729'
+        })
+        analise_familia = analise_familia[[
+            'ID_FAMILIA', 'NOME', 'CARTORIO', 'ASSIGN', 'TOTAL_CERTIDOES', 'ID_REQUERENTE',
+            'TOTAL_REQUERENTES', 'CERTIDOES_ENTREGUES'
+        ]]
+        
+        # Adicionar contagem de membros por família (média de 3 certidões por membro, no mínimo 1)
+        analise_familia.insert(
+            analise_familia.columns.get_loc('TOTAL_REQUERENTES') + 1,
+            'MEMBROS',
+            (analise_familia['TOTAL_CERTIDOES'] / 3).round().clip(lower=1).astype(int)
+        )
         
         # Adicionar responsável ADM e status da higienização
         if not df_adm.empty and not df_adm_uf.empty:
@@ -498,28 +519,17 @@ def analisar_familia_certidoes():
                 how='inner'
             )
             
-            # Criar dicionário para mapear ID da família para responsável ADM
-            resp_adm_map = {}
-            status_higienizacao_map = {}
-            
-            # Verificar se a coluna de higienização existe nos dados
-            tem_coluna_higienizacao = 'UF_CRM_HIGILIZACAO_STATUS' in df_adm_uf.columns
+            # Mapear ID da família para responsável ADM e status de higienização
+            resp_adm = _mapear_por_familia(df_adm_completo, 'ASSIGNED_BY_NAME')
+            analise_familia['RESPONSAVEL_ADM'] = analise_familia['ID_FAMILIA'].map(resp_adm)
             
-            for _, row in df_adm_completo.iterrows():
-                if not pd.isna(row['UF_CRM_1722605592778']):
-                    resp_adm_map[row['UF_CRM_1722605592778']] = row['ASSIGNED_BY_NAME']
-                    
-                    # Obter status de higienização apenas se a coluna existir
-                    if tem_coluna_higienizacao:
-                        status = row['UF_CRM_HIGILIZACAO_STATUS'] if 'UF_CRM_HIGILIZACAO_STATUS' in row and not pd.isna(row['UF_CRM_HIGILIZACAO_STATUS']) else 'Não definido'
-                    else:
-                        status = 'Campo não disponível'
-                    
-                    status_higienizacao_map[row['UF_CRM_1722605592778']] = status
-            
-            # Aplicar mapeamento para obter o responsável ADM
-            analise_familia['RESPONSAVEL_ADM'] = analise_familia['ID_FAMILIA'].map(resp_adm_map)
-            analise_familia['STATUS_HIGILIZACAO'] = analise_familia['ID_FAMILIA'].map(status_higienizacao_map)
+            # Obter status de higienização apenas se a coluna existir
+            if 'UF_CRM_HIGILIZACAO_STATUS' in df_adm_completo.columns:
+                df_adm_completo['UF_CRM_HIGILIZACAO_STATUS'] = df_adm_completo['UF_CRM_HIGILIZACAO_STATUS'].fillna('Não definido')
+                status_higienizacao = _mapear_por_familia(df_adm_completo, 'UF_CRM_HIGILIZACAO_STATUS')
+            else:
+                status_higienizacao = pd.Series('Campo não disponível', index=resp_adm.index)
+            analise_familia['STATUS_HIGILIZACAO'] = analise_familia['ID_FAMILIA'].map(status_higienizacao)
             
             # Substituir valores NaN no status de higienização
             analise_familia['STATUS_HIGILIZACAO'] = analise_familia['STATUS_HIGILIZACAO'].fillna('Não encontrado')
@@ -528,7 +538,7 @@ def analisar_familia_certidoes():
             analise_familia['STATUS_HIGILIZACAO'] = 'Não disponível'
         
         # Adicionar responsável de vendas
-        if 'df_vendas' in locals() and not df_vendas.empty and 'df_vendas_uf' in locals() and not df_vendas_uf.empty:
+        if not df_vendas.empty and not df_vendas_uf.empty:
             # Mesclar ID da família do negócio (UF_CRM_1722605592778) com o responsável de vendas
             df_vendas_completo = pd.merge(
                 df_vendas, 
@@ -538,15 +548,10 @@ def analisar_familia_certidoes():
                 how='inner'
             )
             
-            # Criar dicionário para mapear ID da família para responsável de vendas
-            resp_vendas_map = {}
-            
-            for _, row in df_vendas_completo.iterrows():
-                if not pd.isna(row['UF_CRM_1722605592778']):
-                    resp_vendas_map[row['UF_CRM_1722605592778']] = row['ASSIGNED_BY_NAME']
-            
-            # Aplicar mapeamento para obter o responsável de vendas
-            analise_familia['RESPONSAVEL_VENDAS'] = analise_familia['ID_FAMILIA'].map(resp_vendas_map)
+            # Mapear ID da família para responsável de vendas
+            analise_familia['RESPONSAVEL_VENDAS'] = analise_familia['ID_FAMILIA'].map(
+                _mapear_por_familia(df_vendas_completo, 'ASSIGNED_BY_NAME')
+            )
         else:
             analise_familia['RESPONSAVEL_VENDAS'] = 'Não disponível'
         
@@ -611,59 +616,19 @@ def analisar_acompanhamento_emissao_familia():
         status_text.info(f"Processando {len(df_cartorio)} registros...")
         progress_bar.progress(60)
         
-        # Agrupar por ID de família para criar a análise
-        acompanhamento = df_cartorio.groupby('UF_CRM_12_1723552666').agg(
-            NOME_FAMILIA=('UF_CRM_12_1722882763189', 'first'),
-            TOTAL_CERTIDOES=('ID', 'count')
-        ).reset_index()
-        
-        # Renomear a coluna de ID
-        acompanhamento = acompanhamento.rename(columns={'UF_CRM_12_1723552666': 'ID_FAMILIA'})
-        
-        # Calcular total de requerentes únicos por família
-        def contar_requerentes_unicos(id_familia):
-            df_filtrado = df_cartorio[df_cartorio['UF_CRM_12_1723552666'] == id_familia]
-            requerentes_unicos = df_filtrado['UF_CRM_12_1723552729'].dropna().unique()
-            return len(requerentes_unicos)
-            
-        # Adicionar contagem de requerentes únicos
-        acompanhamento['TOTAL_REQUERENTES'] = acompanhamento['ID_FAMILIA'].apply(contar_requerentes_unicos)
-        
-        # Função para contar certidões concluídas (etapas de Sucesso)
-        def contar_certidoes_concluidas(id_familia):
-            # Filtrar pelo ID da família
-            df_filtrado = df_cartorio[df_cartorio['UF_CRM_12_1723552666'] == id_familia]
-            
-            # Lista de códigos de estágio que representam sucesso
-            success_codes = [
-                'SUCCESS', 
-                'DT1052_16:SUCCESS', 
-                'DT1052_34:SUCCESS',
-                'DT1052_16:UC_JRGCW3',
-                'DT1052_34:UC_84B1S2',
-                'UC_JRGCW3',
-                'UC_84B1S2',
-                'DT1052_16:CLIENT',
-                'DT1052_34:CLIENT',
-                'DT1052_34:UC_D0RG5P',
-                'CLIENT',
-                'UC_D0RG5P'
-            ]
-            
-            # Contar registros em estágios de sucesso
-            return sum(df_filtrado['STAGE_ID'].isin(success_codes))
-        
-        # Adicionar contagem de certidões concluídas
-        acompanhamento['CERTIDOES_CONCLUIDAS'] = acompanhamento['ID_FAMILIA'].apply(contar_certidoes_concluidas)
-        
-        # Calcular percentual de conclusão
-        acompanhamento['PERCENTUAL_CONCLUSAO'] = acompanhamento.apply(
-            lambda row: (row['CERTIDOES_CONCLUIDAS'] / row['TOTAL_CERTIDOES'] * 100) if row['TOTAL_CERTIDOES'] > 0 else 0, 
-            axis=1
-        )
-        
-        # Arredondar percentual para 2 casas decimais
-        acompanhamento['PERCENTUAL_CONCLUSAO'] = acompanhamento['PERCENTUAL_CONCLUSAO'].round(2)
+        # Agregar todas as métricas por família em uma única passada
+        acompanhamento = agregar_metricas_familia(df_cartorio, colunas_primeiro={
+            'NOME_FAMILIA': 'UF_CRM_12_1722882763189'
+        }).rename(columns={'CERTIDOES_ENTREGUES': 'CERTIDOES_CONCLUIDAS'})
+        acompanhamento = acompanhamento[[
+            'ID_FAMILIA', 'NOME_FAMILIA', 'TOTAL_CERTIDOES', 'TOTAL_REQUERENTES', 'CERTIDOES_CONCLUIDAS'
+        ]]
+        
+        # Calcular percentual de conclusão (0 quando a família não tem certidões com ID)
+        total_certidoes = acompanhamento['TOTAL_CERTIDOES']
+        acompanhamento['PERCENTUAL_CONCLUSAO'] = (
+            acompanhamento['CERTIDOES_CONCLUIDAS'] / total_certidoes.where(total_certidoes > 0) * 100
+        ).fillna(0).round(2)
         
         progress_bar.progress(100)
         status_text.success(f"Análise concluída para {len(acompanhamento)} famílias")
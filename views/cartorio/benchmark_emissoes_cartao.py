@@ -0,0 +1,200 @@
+"""
+Benchmark dos resumos de Emissões Cartão (por família e por requerente).
+
+Gera uma planilha sintética (100 mil linhas por padrão) com a mesma estrutura de
+"Certidões Carrão" e compara:
+- a implementação anterior (groupby com value_counts().to_dict() e .apply por grupo),
+  reproduzida aqui como referência;
+- a implementação atual de emissoes_cartao (uma passada agrupada, contagens por coluna e
+  percentuais calculados aritmeticamente).
+
+Também confere se as duas produzem o mesmo resultado (a ordem de status empatados no texto
+não é considerada, pois a implementação anterior não a definia).
+
+O resultado é gravado em JSON em .cache/benchmarks (ignorado pelo git; outro diretório
+pode ser indicado com BENCHMARK_DIR ou --saida).
+
+Uso:
+    python -m views.cartorio.benchmark_emissoes_cartao
+    python -m views.cartorio.benchmark_emissoes_cartao --linhas 250000 --repeticoes 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Permitir execução direta a partir da raiz do projeto
+RAIZ_PROJETO = Path(__file__).parents[2]
+if str(RAIZ_PROJETO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROJETO))
+
+from views.cartorio.emissoes_cartao import (
+    STATUS_CONCLUIDOS,
+    criar_resumo_por_familia,
+    criar_resumo_por_requerente,
+)
+
+# Diretório dos resultados (ignorado pelo git)
+DIRETORIO_BENCHMARKS = Path(os.getenv('BENCHMARK_DIR', RAIZ_PROJETO / '.cache' / 'benchmarks'))
+
+STATUS_EMISSAO = ['Entregue', 'Concluído', 'Finalizado', 'Pronto para retirada', 'Em andamento',
+                  'Aguardando cartório', 'Pendente', '']
+STATUS_CARTORIOS = ['Solicitado', 'Em busca', 'Emitida', 'Devolvida', '']
+STATUS_EMPRESA = ['Aberto', 'Pago', 'Aguardando pagamento', '']
+
+
+def gerar_planilha_sintetica(linhas=100_000, familias=None, semente=42):
+    """
+    Gera dados no formato de carregar_dados_planilha (colunas renomeadas, textos sem nulos).
+
+    Args:
+        linhas (int): Número de certidões (linhas da planilha)
+        familias (int): Número de famílias distintas (padrão: uma a cada ~30 linhas)
+        semente (int): Semente do gerador aleatório
+
+    Returns:
+        pandas.DataFrame: Planilha sintética
+    """
+    rng = np.random.default_rng(semente)
+    familias = familias or max(1, linhas // 30)
+    familia = rng.integers(0, familias, linhas)
+    return pd.DataFrame({
+        'ADM_RESPONSAVEL': np.array([f'ADM {i}' for i in range(12)], dtype=object)[familia % 12],
+        'NOME_FAMILIA': np.array([f'FAMILIA {i:05d}' for i in range(familias)], dtype=object)[familia],
+        'NOME_REQUERENTE': np.array([f'REQUERENTE {i}' for i in range(8)], dtype=object)[rng.integers(0, 8, linhas)],
+        'TIPO_CERTIDAO': rng.choice(['Nascimento', 'Casamento', 'Óbito'], linhas).astype(object),
+        'STATUS_EMISSAO': rng.choice(STATUS_EMISSAO, linhas).astype(object),
+        'STATUS_CARTORIOS': rng.choice(STATUS_CARTORIOS, linhas).astype(object),
+        'STATUS_EMPRESA': rng.choice(STATUS_EMPRESA, linhas).astype(object),
+        'DATA_ENTREGA_ATUALIZACAO': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, linhas), unit='D'),
+    })
+
+
+def _percentual_concluido_legado(status_dict):
+    if not status_dict:
+        return 0
+    total = sum(status_dict.values())
+    if total == 0:
+        return 0
+    concluidos = sum(status_dict.get(status, 0) for status in STATUS_CONCLUIDOS)
+    return round((concluidos / total) * 100, 1)
+
+
+def _resumo_legado(df, chaves, contar_requerentes):
+    """Implementação anterior dos resumos (referência para tempo e resultado)."""
+    agregacoes = {'ADM_RESPONSAVEL': ('ADM_RESPONSAVEL', 'first')}
+    if contar_requerentes:
+        agregacoes['Total_Requerentes'] = ('NOME_REQUERENTE', 'nunique')
+    agregacoes.update(
+        Total_Certidoes=('TIPO_CERTIDAO', 'count'),
+        Status_Emissao=('STATUS_EMISSAO', lambda x: x.value_counts().to_dict()),
+        Status_Cartorio=('STATUS_CARTORIOS', lambda x: x.value_counts().to_dict()),
+        Status_Empresa=('STATUS_EMPRESA', lambda x: x.value_counts().to_dict()),
+        Ultima_Atualizacao=('DATA_ENTREGA_ATUALIZACAO', 'max'),
+    )
+    resumo = df.groupby(chaves).agg(**agregacoes).reset_index()
+    resumo['Percentual_Concluido'] = resumo['Status_Emissao'].apply(_percentual_concluido_legado)
+    for coluna in ['Status_Emissao', 'Status_Cartorio', 'Status_Empresa']:
+        resumo[f'{coluna}_Texto'] = resumo[coluna].apply(lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()]))
+    return resumo.sort_values(chaves)
+
+
+def _cronometrar(funcao, df, repeticoes):
+    """Executa a função `repeticoes` vezes e retorna (melhor tempo em segundos, último resultado)."""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(df)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def _resultados_equivalentes(legado, atual):
+    """Compara os resumos ignorando a ordem de status empatados nos textos."""
+    legado = legado[atual.columns].reset_index(drop=True)
+    atual = atual.reset_index(drop=True)
+    for coluna in [c for c in atual.columns if c.endswith('_Texto')]:
+        legado[coluna] = legado[coluna].map(lambda texto: sorted(texto.split(', ')))
+        atual[coluna] = atual[coluna].map(lambda texto: sorted(texto.split(', ')))
+    try:
+        pd.testing.assert_frame_equal(legado, atual, check_dtype=False)
+        return True
+    except AssertionError as e:
+        print(f"Resultados divergentes: {e}")
+        return False
+
+
+def executar_benchmark(linhas=100_000, repeticoes=3, salvar=True, diretorio=None):
+    """
+    Executa o benchmark e, opcionalmente, salva o resultado em JSON (em diretorio ou,
+    por padrão, em DIRETORIO_BENCHMARKS).
+
+    Returns:
+        dict: tempos (s) da implementação anterior e atual, speed-up e equivalência por resumo
+    """
+    df = gerar_planilha_sintetica(linhas)
+    casos = {
+        'por_familia': (lambda d: _resumo_legado(d, ['NOME_FAMILIA'], True), criar_resumo_por_familia),
+        'por_requerente': (lambda d: _resumo_legado(d, ['NOME_FAMILIA', 'NOME_REQUERENTE'], False), criar_resumo_por_requerente),
+    }
+
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'linhas': linhas,
+        'familias': int(df['NOME_FAMILIA'].nunique()),
+        'repeticoes': repeticoes,
+        'resumos': {},
+    }
+    for nome, (legado, atual) in casos.items():
+        segundos_legado, resumo_legado = _cronometrar(legado, df, repeticoes)
+        segundos_atual, resumo_atual = _cronometrar(atual, df, repeticoes)
+        resultado['resumos'][nome] = {
+            'grupos': len(resumo_atual),
+            'segundos_anterior': round(segundos_legado, 4),
+            'segundos_atual': round(segundos_atual, 4),
+            'speedup': round(segundos_legado / segundos_atual, 1) if segundos_atual > 0 else None,
+            'equivalente': _resultados_equivalentes(resumo_legado, resumo_atual),
+        }
+
+    if salvar:
+        diretorio = Path(diretorio or DIRETORIO_BENCHMARKS)
+        diretorio.mkdir(parents=True, exist_ok=True)
+        destino = diretorio / f"emissoes_cartao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        resultado['arquivo'] = str(destino)
+
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos resumos de Emissões Cartão")
+    parser.add_argument('--linhas', type=int, default=100_000, help="Número de linhas da planilha sintética")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por implementação (vale o melhor tempo)")
+    parser.add_argument('--nao-salvar', action='store_true', help="Apenas exibe o resultado, sem gravar o JSON")
+    parser.add_argument('--saida', default=None,
+                        help=f"Diretório do JSON de resultado (padrão: {DIRETORIO_BENCHMARKS})")
+    args = parser.parse_args()
+
+    resultado = executar_benchmark(linhas=args.linhas, repeticoes=args.repeticoes, salvar=not args.nao_salvar,
+                                   diretorio=args.saida)
+
+    print("\n=== BENCHMARK DE RESUMOS - EMISSÕES CARTÃO ===")
+    print(f"Linhas: {resultado['linhas']} | Famílias: {resultado['familias']} | Repetições: {resultado['repeticoes']}")
+    for nome, metricas in resultado['resumos'].items():
+        print(f"  {nome:<15} grupos={metricas['grupos']:<7} anterior={metricas['segundos_anterior']}s "
+              f"atual={metricas['segundos_atual']}s speed-up={metricas['speedup']}x "
+              f"equivalente={'sim' if metricas['equivalente'] else 'NÃO'}")
+    if resultado.get('arquivo'):
+        print(f"Resultado salvo em {resultado['arquivo']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,94 +13,118 @@ import requests
 import json
 from io import StringIO
 
+from utils.sheet_source import fetch_sheet, DEFAULT_REFRESH_INTERVAL
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
-def carregar_dados_planilha():
+# ID da planilha "Certidões Carrão" e URL de exportação em CSV
+PLANILHA_ID = "1x_LOEGoL4LHHdbCH6OETSTPeHtf24WFLmFTv7_zXPNY"
+PLANILHA_CSV_URL = f"https://docs.google.com/spreadsheets/d/{PLANILHA_ID}/export?format=csv"
+
+# Fonte e intervalo de atualização configuráveis (EMISSOES_CARTAO_CSV aceita um arquivo local para testes)
+PLANILHA_FONTE = os.getenv('EMISSOES_CARTAO_CSV', PLANILHA_CSV_URL)
+PLANILHA_INTERVALO_ATUALIZACAO = int(os.getenv('EMISSOES_CARTAO_REFRESH_SECONDS', DEFAULT_REFRESH_INTERVAL))
+
+# Mapeamento das colunas da planilha para o formato padrão
+COLUNAS_MAPEADAS = {
+    'ADM RESPONSAVEL': 'ADM_RESPONSAVEL',
+    'NOME DA FAMILIA': 'NOME_FAMILIA',
+    'NOME DO REQUERENTE': 'NOME_REQUERENTE',
+    'CARTÓRIO': 'CARTORIO',
+    'TIPO CERTIDÃO': 'TIPO_CERTIDAO',
+    'LIVRO': 'LIVRO',
+    'FOLHA': 'FOLHA',
+    'TERMO': 'TERMO',
+    'STATUS EMPRESA': 'STATUS_EMPRESA',
+    'DATA DE SOLICITAÇÃO': 'DATA_SOLICITACAO',
+    'DATA DE ENTREGA OU ATUALIZAÇÃO DO CARTÓRIO': 'DATA_ENTREGA_ATUALIZACAO',
+    'STATUS CARTÓRIOS': 'STATUS_CARTORIOS',
+    'OBS - CARTÓRIO': 'OBS_CARTORIO',
+    'OBS - EMPRESA': 'OBS_EMPRESA',
+    'STATUS DA EMISSÃO': 'STATUS_EMISSAO',
+    'OBSERVAÇÃO': 'OBSERVACAO'
+}
+
+COLUNAS_TEXTO = ['ADM_RESPONSAVEL', 'NOME_FAMILIA', 'NOME_REQUERENTE', 'CARTORIO',
+                 'TIPO_CERTIDAO', 'STATUS_EMPRESA', 'STATUS_CARTORIOS',
+                 'OBS_CARTORIO', 'OBS_EMPRESA', 'STATUS_EMISSAO', 'OBSERVACAO']
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def processar_csv_planilha(content_hash, _conteudo):
     """
-    Carrega os dados da planilha do Google "Emissões Cartão"
+    Converte o CSV da planilha em DataFrame padronizado (memoizado pelo hash do conteúdo).
+
+    Args:
+        content_hash (str): Hash do conteúdo, usado como chave do cache
+        _conteudo (bytes): Conteúdo CSV (não entra na chave do cache)
+
+    Returns:
+        pandas.DataFrame: Dados com colunas renomeadas, datas convertidas e textos sem nulos
+    """
+    df = pd.read_csv(StringIO(_conteudo.decode('utf-8')))
+    if df.empty:
+        return df
+    
+    # Aplicar o mapeamento de colunas caso necessário
+    colunas_renomeadas = {original: nova for original, nova in COLUNAS_MAPEADAS.items() if original in df.columns}
+    if colunas_renomeadas:
+        df = df.rename(columns=colunas_renomeadas)
+    
+    # Converter colunas de data
+    for coluna in ['DATA_SOLICITACAO', 'DATA_ENTREGA_ATUALIZACAO']:
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+    
+    # Preencher valores nulos em campos de texto com string vazia (todas as colunas de uma vez)
+    colunas_presentes = [coluna for coluna in COLUNAS_TEXTO if coluna in df.columns]
+    df[colunas_presentes] = df[colunas_presentes].fillna('')
+    
+    return df
+
+def carregar_planilha_emissoes(forcar=False):
+    """
+    Carrega a planilha do Google "Emissões Cartão" pela fonte com cache em disco
+    
+    A planilha só é consultada após o intervalo de atualização (ou com forcar=True) e,
+    mesmo assim, com revalidação condicional; se o Google falhar, a última versão válida é usada.
+    
+    Args:
+        forcar (bool): Revalida com o servidor mesmo dentro do intervalo de atualização
     
     Returns:
-        pandas.DataFrame: DataFrame com os dados da planilha
+        tuple: (DataFrame com os dados da planilha, hash do conteúdo ou None em caso de erro)
     """
     try:
-        # ID da planilha a partir da URL
-        planilha_id = "1x_LOEGoL4LHHdbCH6OETSTPeHtf24WFLmFTv7_zXPNY"
-        
-        # URL para exportar a planilha como CSV
-        csv_url = f"https://docs.google.com/spreadsheets/d/{planilha_id}/export?format=csv"
-        
-        st.info("Tentando acessar a planilha...")
-        
-        # Fazer requisição HTTP para obter os dados
-        response = requests.get(csv_url)
-        
-        if response.status_code != 200:
-            st.error(f"Erro ao acessar a planilha (código {response.status_code})")
-            st.error("""
+        try:
+            snapshot = fetch_sheet(PLANILHA_FONTE, refresh_interval=PLANILHA_INTERVALO_ATUALIZACAO, force=forcar)
+        except requests.HTTPError as e:
+            st.error(f"Erro ao acessar a planilha (código {e.response.status_code})")
+            st.error(f"""
             ### A planilha não está acessível! Siga estes passos:
             
-            1. Abra a planilha: [Certidões Carrão](https://docs.google.com/spreadsheets/d/1x_LOEGoL4LHHdbCH6OETSTPeHtf24WFLmFTv7_zXPNY/)
+            1. Abra a planilha: [Certidões Carrão](https://docs.google.com/spreadsheets/d/{PLANILHA_ID}/)
             2. Clique no botão "Compartilhar" no canto superior direito
             3. Clique em "Geral" e selecione "Qualquer pessoa com o link"
             4. Mude a configuração para "Qualquer pessoa na internet com este link pode visualizar"
             5. Clique em "Concluído"
             6. Tente novamente clicar em "Atualizar Dados"
             """)
-            return pd.DataFrame()
+            return pd.DataFrame(), None
         
-        # Converter CSV para DataFrame
-        df = pd.read_csv(StringIO(response.content.decode('utf-8')))
+        if snapshot['stale']:
+            atualizado_em = datetime.fromtimestamp(snapshot['fetched_at']).strftime('%d/%m/%Y %H:%M')
+            st.warning(f"Não foi possível atualizar a planilha ({snapshot['error']}). Exibindo a última versão válida, de {atualizado_em}.")
+        
+        df = processar_csv_planilha(snapshot['content_hash'], snapshot['content'])
         
         # Verificar se o DataFrame não está vazio
         if df.empty:
             st.warning("A planilha foi acessada, mas não contém dados. Verifique se existe conteúdo na planilha.")
-            return pd.DataFrame()
-        
-        # Renomear colunas para formato padrão
-        colunas_mapeadas = {
-            'ADM RESPONSAVEL': 'ADM_RESPONSAVEL',
-            'NOME DA FAMILIA': 'NOME_FAMILIA',
-            'NOME DO REQUERENTE': 'NOME_REQUERENTE',
-            'CARTÓRIO': 'CARTORIO',
-            'TIPO CERTIDÃO': 'TIPO_CERTIDAO',
-            'LIVRO': 'LIVRO',
-            'FOLHA': 'FOLHA',
-            'TERMO': 'TERMO',
-            'STATUS EMPRESA': 'STATUS_EMPRESA',
-            'DATA DE SOLICITAÇÃO': 'DATA_SOLICITACAO',
-            'DATA DE ENTREGA OU ATUALIZAÇÃO DO CARTÓRIO': 'DATA_ENTREGA_ATUALIZACAO',
-            'STATUS CARTÓRIOS': 'STATUS_CARTORIOS',
-            'OBS - CARTÓRIO': 'OBS_CARTORIO',
-            'OBS - EMPRESA': 'OBS_EMPRESA',
-            'STATUS DA EMISSÃO': 'STATUS_EMISSAO',
-            'OBSERVAÇÃO': 'OBSERVACAO'
-        }
-        
-        # Aplicar o mapeamento de colunas caso necessário
-        colunas_renomeadas = {}
-        for coluna_original, coluna_nova in colunas_mapeadas.items():
-            if coluna_original in df.columns:
-                colunas_renomeadas[coluna_original] = coluna_nova
-        
-        if colunas_renomeadas:
-            df = df.rename(columns=colunas_renomeadas)
+            return pd.DataFrame(), None
         
-        # Converter colunas de data
-        for coluna in ['DATA_SOLICITACAO', 'DATA_ENTREGA_ATUALIZACAO']:
-            if coluna in df.columns:
-                df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
-        
-        # Preencher valores nulos em campos de texto com string vazia
-        colunas_texto = ['ADM_RESPONSAVEL', 'NOME_FAMILIA', 'NOME_REQUERENTE', 'CARTORIO', 
-                        'TIPO_CERTIDAO', 'STATUS_EMPRESA', 'STATUS_CARTORIOS', 
-                        'OBS_CARTORIO', 'OBS_EMPRESA', 'STATUS_EMISSAO', 'OBSERVACAO']
-        
-        for coluna in colunas_texto:
-            if coluna in df.columns:
-                df[coluna] = df[coluna].fillna('')
-        
-        return df
+        return df, snapshot['content_hash']
     
     except Exception as e:
         st.error(f"Erro ao carregar dados da planilha: {str(e)}")
@@ -110,7 +134,36 @@ def carregar_dados_planilha():
         2. Se a planilha está compartilhada publicamente com opção "Qualquer pessoa com o link"
         3. Se a planilha existe e está acessível
         """)
-        return pd.DataFrame()
+        return pd.DataFrame(), None
+
+def carregar_dados_planilha(forcar=False):
+    """
+    Carrega os dados da planilha do Google "Emissões Cartão"
+    
+    Args:
+        forcar (bool): Revalida com o servidor mesmo dentro do intervalo de atualização
+    
+    Returns:
+        pandas.DataFrame: DataFrame com os dados da planilha
+    """
+    df, _ = carregar_planilha_emissoes(forcar)
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def calcular_resumos_emissoes(content_hash, filtros, _df):
+    """
+    Calcula métricas e resumos por família e por requerente, memoizados pelo hash do conteúdo
+    da planilha e pelos filtros aplicados.
+    
+    Args:
+        content_hash (str): Hash do conteúdo da planilha
+        filtros (tuple): Filtros aplicados (responsável, família, status)
+        _df (pandas.DataFrame): Dados já filtrados (não entram na chave do cache)
+    
+    Returns:
+        tuple: (métricas, resumo por família, resumo por requerente)
+    """
+    return calcular_metricas_emissao(_df), criar_resumo_por_familia(_df), criar_resumo_por_requerente(_df)
 
 def calcular_metricas_emissao(df):
     """
@@ -162,6 +215,77 @@ def calcular_metricas_emissao(df):
         'adm_responsaveis': adm_responsaveis
     }
 
+# Status da emissão considerados concluídos no percentual de conclusão
+# Esta lista deve ser adaptada conforme os status reais da planilha
+STATUS_CONCLUIDOS = ['Concluído', 'Entregue', 'Finalizado', 'Pronto para retirada']
+
+# Colunas de status resumidas em texto ("status: quantidade, ...") nos resumos
+COLUNAS_STATUS_TEXTO = {
+    'STATUS_EMISSAO': 'Status_Emissao_Texto',
+    'STATUS_CARTORIOS': 'Status_Cartorio_Texto',
+    'STATUS_EMPRESA': 'Status_Empresa_Texto',
+}
+
+def _texto_contagens_status(df, chaves, coluna):
+    """
+    Monta o texto "status: quantidade, ..." de cada grupo, do status mais frequente ao menos frequente.
+    
+    As contagens vêm de um único groupby (grupo x status); os rótulos são formatados uma vez por
+    par (status, quantidade) distinto e associados às linhas por lookup categórico.
+    """
+    contagens = df.groupby(chaves + [coluna], sort=False, observed=True).size().rename('N').reset_index()
+    # Ordenação estável: dentro do grupo, maior contagem primeiro e empates na ordem de aparição
+    contagens = contagens.sort_values(chaves + ['N'], ascending=[True] * len(chaves) + [False], kind='mergesort')
+    
+    pares = pd.Categorical(list(zip(contagens[coluna].astype(str), contagens['N'])))
+    rotulos = [f"{status}: {n}" for status, n in pares.categories]
+    rotulos_linhas = [rotulos[codigo] for codigo in pares.codes]
+    
+    # Linhas já ordenadas por grupo: une os rótulos entre as fronteiras de cada grupo
+    grupos = contagens.groupby(chaves, sort=False).ngroup().to_numpy()
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    fins = np.r_[inicios[1:], len(grupos)]
+    textos = [', '.join(rotulos_linhas[inicio:fim]) for inicio, fim in zip(inicios, fins)]
+    
+    indice = pd.MultiIndex.from_frame(contagens[chaves].iloc[inicios]) if len(chaves) > 1 \
+        else pd.Index(contagens[chaves[0]].iloc[inicios])
+    return pd.Series(textos, index=indice, dtype=object)
+
+def _resumir_emissoes(df, chaves, contar_requerentes):
+    """
+    Resumo agrupado por `chaves` em uma única passada: totais, percentual concluído e textos de status.
+    
+    Args:
+        df: DataFrame com os dados de emissões
+        chaves (list): Colunas de agrupamento
+        contar_requerentes (bool): Inclui a coluna Total_Requerentes
+    
+    Returns:
+        pandas.DataFrame: Uma linha por grupo
+    """
+    agregacoes = {'ADM_RESPONSAVEL': ('ADM_RESPONSAVEL', 'first')}
+    if contar_requerentes:
+        agregacoes['Total_Requerentes'] = ('NOME_REQUERENTE', 'nunique')
+    agregacoes['Total_Certidoes'] = ('TIPO_CERTIDAO', 'count')
+    agregacoes['Total_Status'] = ('STATUS_EMISSAO', 'count')
+    agregacoes['Concluidos'] = ('_CONCLUIDO', 'sum')
+    agregacoes['Ultima_Atualizacao'] = ('DATA_ENTREGA_ATUALIZACAO', 'max')
+    
+    base = df.assign(_CONCLUIDO=df['STATUS_EMISSAO'].isin(STATUS_CONCLUIDOS))
+    resumo = base.groupby(chaves).agg(**agregacoes)
+    
+    # Percentual de conclusão calculado sobre as contagens (0 quando não há status)
+    total_status = resumo['Total_Status'].to_numpy(dtype=float)
+    percentual = np.divide(resumo['Concluidos'].to_numpy(dtype=float) * 100, total_status,
+                           out=np.zeros(len(resumo)), where=total_status > 0)
+    resumo['Percentual_Concluido'] = np.round(percentual, 1)
+    resumo = resumo.drop(columns=['Total_Status', 'Concluidos'])
+    
+    for coluna, coluna_texto in COLUNAS_STATUS_TEXTO.items():
+        resumo[coluna_texto] = _texto_contagens_status(df, chaves, coluna).reindex(resumo.index).fillna('')
+    
+    return resumo.reset_index()
+
 def criar_resumo_por_familia(df):
     """
     Cria um resumo dos dados agrupados por família
@@ -175,50 +299,7 @@ def criar_resumo_por_familia(df):
     if df.empty:
         return pd.DataFrame()
     
-    # Agrupar por família
-    resumo_familia = df.groupby('NOME_FAMILIA').agg(
-        ADM_RESPONSAVEL=('ADM_RESPONSAVEL', 'first'),
-        Total_Requerentes=('NOME_REQUERENTE', 'nunique'),
-        Total_Certidoes=('TIPO_CERTIDAO', 'count'),
-        Status_Emissao=('STATUS_EMISSAO', lambda x: x.value_counts().to_dict()),
-        Status_Cartorio=('STATUS_CARTORIOS', lambda x: x.value_counts().to_dict()),
-        Status_Empresa=('STATUS_EMPRESA', lambda x: x.value_counts().to_dict()),
-        Ultima_Atualizacao=('DATA_ENTREGA_ATUALIZACAO', 'max')
-    ).reset_index()
-    
-    # Calcular percentuais de conclusão
-    def calcular_percentual_concluido(status_dict):
-        if not status_dict:
-            return 0
-        
-        total = sum(status_dict.values())
-        if total == 0:
-            return 0
-        
-        # Considerar como concluídos os status "Concluído", "Entregue", etc.
-        # Esta lista deve ser adaptada conforme os status reais da planilha
-        status_concluidos = ['Concluído', 'Entregue', 'Finalizado', 'Pronto para retirada']
-        
-        concluidos = sum(status_dict.get(status, 0) for status in status_concluidos)
-        return round((concluidos / total) * 100, 1)
-    
-    # Aplicar cálculo de percentual
-    resumo_familia['Percentual_Concluido'] = resumo_familia['Status_Emissao'].apply(calcular_percentual_concluido)
-    
-    # Converter dicionários para string para exibição
-    resumo_familia['Status_Emissao_Texto'] = resumo_familia['Status_Emissao'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    resumo_familia['Status_Cartorio_Texto'] = resumo_familia['Status_Cartorio'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    resumo_familia['Status_Empresa_Texto'] = resumo_familia['Status_Empresa'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    return resumo_familia
+    return _resumir_emissoes(df, ['NOME_FAMILIA'], contar_requerentes=True)
 
 def criar_resumo_por_requerente(df):
     """
@@ -228,56 +309,12 @@ def criar_resumo_por_requerente(df):
         df: DataFrame com os dados de emissões
     
     Returns:
-        pandas.DataFrame: DataFrame com o resumo por requerente
+        pandas.DataFrame: DataFrame com o resumo por requerente (ordenado por família e requerente)
     """
     if df.empty:
         return pd.DataFrame()
     
-    # Agrupar por requerente
-    resumo_requerente = df.groupby(['NOME_FAMILIA', 'NOME_REQUERENTE']).agg(
-        ADM_RESPONSAVEL=('ADM_RESPONSAVEL', 'first'),
-        Total_Certidoes=('TIPO_CERTIDAO', 'count'),
-        Status_Emissao=('STATUS_EMISSAO', lambda x: x.value_counts().to_dict()),
-        Status_Cartorio=('STATUS_CARTORIOS', lambda x: x.value_counts().to_dict()),
-        Status_Empresa=('STATUS_EMPRESA', lambda x: x.value_counts().to_dict()),
-        Ultima_Atualizacao=('DATA_ENTREGA_ATUALIZACAO', 'max')
-    ).reset_index()
-    
-    # Calcular percentuais de conclusão
-    def calcular_percentual_concluido(status_dict):
-        if not status_dict:
-            return 0
-        
-        total = sum(status_dict.values())
-        if total == 0:
-            return 0
-        
-        # Considerar como concluídos os status "Concluído", "Entregue", etc.
-        status_concluidos = ['Concluído', 'Entregue', 'Finalizado', 'Pronto para retirada']
-        
-        concluidos = sum(status_dict.get(status, 0) for status in status_concluidos)
-        return round((concluidos / total) * 100, 1)
-    
-    # Aplicar cálculo de percentual
-    resumo_requerente['Percentual_Concluido'] = resumo_requerente['Status_Emissao'].apply(calcular_percentual_concluido)
-    
-    # Converter dicionários para string para exibição
-    resumo_requerente['Status_Emissao_Texto'] = resumo_requerente['Status_Emissao'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    resumo_requerente['Status_Cartorio_Texto'] = resumo_requerente['Status_Cartorio'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    resumo_requerente['Status_Empresa_Texto'] = resumo_requerente['Status_Empresa'].apply(
-        lambda x: ', '.join([f"{k}: {v}" for k, v in x.items()])
-    )
-    
-    # Ordenar por família e requerente
-    resumo_requerente = resumo_requerente.sort_values(['NOME_FAMILIA', 'NOME_REQUERENTE'])
-    
-    return resumo_requerente
+    return _resumir_emissoes(df, ['NOME_FAMILIA', 'NOME_REQUERENTE'], contar_requerentes=False)
 
 def criar_graficos_resumo(df, metricas):
     """
@@ -396,7 +433,8 @@ def exibir_dashboard_emissoes_cartao():
     # Carregar dados automaticamente na primeira vez ou se o botão for clicado
     if 'df_emissoes' not in st.session_state or st.session_state.get('dados_atualizados', False):
         with st.spinner("Carregando dados da planilha..."):
-            st.session_state['df_emissoes'] = carregar_dados_planilha()
+            forcar = st.session_state.get('dados_atualizados', False)
+            st.session_state['df_emissoes'], st.session_state['emissoes_content_hash'] = carregar_planilha_emissoes(forcar)
             if 'dados_atualizados' in st.session_state:
                 del st.session_state['dados_atualizados']
     
@@ -448,8 +486,12 @@ def exibir_dashboard_emissoes_cartao():
         if status_selecionado != 'Todos':
             df_filtrado = df_filtrado[df_filtrado['STATUS_EMISSAO'] == status_selecionado]
         
-        # Calcular métricas com base nos dados filtrados
-        metricas = calcular_metricas_emissao(df_filtrado)
+        # Calcular métricas e resumos com base nos dados filtrados (memoizados pelo hash da planilha)
+        metricas, resumo_familia, resumo_requerente = calcular_resumos_emissoes(
+            st.session_state.get('emissoes_content_hash'),
+            (resp_selecionado, familia_selecionada, status_selecionado),
+            df_filtrado
+        )
         
         # Mostrar métricas
         st.markdown("### Métricas Gerais")
@@ -507,8 +549,6 @@ def exibir_dashboard_emissoes_cartao():
         
         # Aba: Por Família
         with tab_familia:
-            resumo_familia = criar_resumo_por_familia(df_filtrado)
-            
             if not resumo_familia.empty:
                 st.dataframe(
                     resumo_familia[[
@@ -545,8 +585,6 @@ def exibir_dashboard_emissoes_cartao():
         
         # Aba: Por Requerente
         with tab_requerente:
-            resumo_requerente = criar_resumo_por_requerente(df_filtrado)
-            
             if not resumo_requerente.empty:
                 st.dataframe(
                     resumo_requerente[[
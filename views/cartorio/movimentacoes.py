@@ -18,6 +18,7 @@ sys.path.insert(0, str(utils_path))
 
 # Importar a função que usa cache da API Bitrix
 from bitrix_connector import load_bitrix_data
+from api.stage_dictionary import get_stage_dictionary
 from refresh_utils import handle_refresh_trigger, get_force_reload_status, clear_force_reload_flag
 
 def analisar_produtividade(df):
@@ -222,102 +223,22 @@ def mapear_estagio_para_nome(df):
     # Criar uma cópia do DataFrame para não modificar o original
     df_modificado = df.copy()
     
-    # Definir o mapeamento de estágios para nomes didáticos
-    # EM ANDAMENTO
-    em_andamento = {
-        'DT1052_16:NEW': 'Aguardando Certidão',
-        'DT1052_34:NEW': 'Aguardando Certidão',
-        'DT1052_16:UC_QRZ6JG': 'Busca CRC',
-        'DT1052_34:UC_68BLQ7': 'Busca CRC',
-        'DT1052_16:UC_7F0WK2': 'Apenas Ass. Req. Cliente P/ Montagem',
-        'DT1052_34:UC_HN9GMI': 'Apenas Ass. Req. Cliente P/ Montagem',
-        'DT1052_16:PREPARATION': 'Montagem Requerimento Cartório',
-        'DT1052_34:PREPARATION': 'Montagem Requerimento Cartório',
-        'DT1052_16:UC_IWZBMO': 'Solicitar Cart. Origem',
-        'DT1052_34:CLIENT': 'Certidão Emitida',
-        'DT1052_34:UC_8L5JUS': 'Solicitar Cart. Origem',
-        'DT1052_16:UC_8EGMU7': 'Cart. Origem Prioridade',
-        'DT1052_16:UC_KXHDOQ': 'Aguard. Cart. Origem',
-        'DT1052_34:UC_6KOYL5': 'Aguard. Cart. Origem',
-        'DT1052_16:CLIENT': 'Certidão Emitida',
-        'DT1052_34:UC_D0RG5P': 'Certidão Emitida',
-        'DT1052_16:UC_JRGCW3': 'Certidão Física',
-        'DT1052_34:UC_84B1S2': 'Certidão Física',
-        # Versões curtas dos nomes (sem prefixo)
-        'NEW': 'Aguard. Certidão',
-        'PREPARATION': 'Mont. Requerim.',
-        'CLIENT': 'Certidão Emitida',
-        'UC_QRZ6JG': 'Busca CRC',
-        'UC_68BLQ7': 'Busca CRC',
-        'UC_7F0WK2': 'Solic. Requerim.',
-        'UC_HN9GMI': 'Solic. Requerim.',
-        'UC_IWZBMO': 'Solic. C. Origem',
-        'UC_8L5JUS': 'Solic. C. Origem',
-        'UC_8EGMU7': 'C. Origem Prior.',
-        'UC_KXHDOQ': 'Aguard. C. Origem',
-        'UC_6KOYL5': 'Aguard. C. Origem',
-        'UC_D0RG5P': 'Certidão Emitida',
-        'UC_JRGCW3': 'Certidão Física',
-        'UC_84B1S2': 'Certidão Física'
-    }
-    
-    # SUCESSO
-    sucesso = {
-        'DT1052_16:SUCCESS': 'Certidão Entregue',
-        'DT1052_34:SUCCESS': 'Certidão Entregue',
-        'SUCCESS': 'Certidão Entregue'
-    }
-    
-    # FALHA
-    falha = {
-        'DT1052_16:FAIL': 'Devolução ADM',
-        'DT1052_34:FAIL': 'Devolução ADM',
-        'DT1052_16:UC_R5UEXF': 'Dev. ADM Verificado',
-        'DT1052_34:UC_Z3J98J': 'Dev. ADM Verificado',
-        'DT1052_16:UC_HYO7L2': 'Devolutiva Busca',
-        'DT1052_34:UC_5LAJNY': 'Devolutiva Busca',
-        'DT1052_16:UC_UG0UDZ': 'Solicitação Duplicada',
-        'DT1052_34:UC_LF04SU': 'Solicitação Duplicada',
-        'DT1052_16:UC_P61ZVH': 'Devolvido Requerimento',
-        'DT1052_34:UC_2BAINE': 'Devolvido Requerimento',
-        # Versões curtas dos nomes (sem prefixo)
-        'FAIL': 'Devolução ADM',
-        'UC_R5UEXF': 'Dev. ADM Verif.',
-        'UC_Z3J98J': 'Dev. ADM Verif.',
-        'UC_HYO7L2': 'Dev. Busca',
-        'UC_5LAJNY': 'Dev. Busca',
-        'UC_UG0UDZ': 'Solic. Duplicada',
-        'UC_LF04SU': 'Solic. Duplicada',
-        'UC_P61ZVH': 'Dev. Requerim.',
-        'UC_2BAINE': 'Dev. Requerim.'
-    }
-    
-    # Combinar todos os mapeamentos
-    mapeamento_completo = {**em_andamento, **sucesso, **falha}
-    
-    # Adicionar informação de categoria para cada estágio
-    categorias_estagios = {}
-    for estagio in em_andamento:
-        categorias_estagios[estagio] = 'EM ANDAMENTO'
-    for estagio in sucesso:
-        categorias_estagios[estagio] = 'SUCESSO'
-    for estagio in falha:
-        categorias_estagios[estagio] = 'FALHA'
-    
-    # Adicionar colunas com os nomes dos estágios
-    if 'STAGE_ID' in df_modificado.columns:
-        df_modificado['STAGE_NAME'] = df_modificado['STAGE_ID'].map(mapeamento_completo)
-        # Manter o ID original quando não houver mapeamento
-        df_modificado['STAGE_NAME'] = df_modificado['STAGE_NAME'].fillna(df_modificado['STAGE_ID'])
-        # Adicionar categoria do estágio
-        df_modificado['STAGE_CATEGORY'] = df_modificado['STAGE_ID'].map(categorias_estagios)
-    
-    if 'PREVIOUS_STAGE_ID' in df_modificado.columns:
-        df_modificado['PREVIOUS_STAGE_NAME'] = df_modificado['PREVIOUS_STAGE_ID'].map(mapeamento_completo)
-        # Manter o ID original quando não houver mapeamento
-        df_modificado['PREVIOUS_STAGE_NAME'] = df_modificado['PREVIOUS_STAGE_NAME'].fillna(df_modificado['PREVIOUS_STAGE_ID'])
-        # Adicionar categoria do estágio anterior
-        df_modificado['PREVIOUS_STAGE_CATEGORY'] = df_modificado['PREVIOUS_STAGE_ID'].map(categorias_estagios)
+    # Dicionário de estágios compartilhado (mapeamentos locais + crm_status do Bitrix)
+    dicionario_estagios = get_stage_dictionary('cartorio')
+    
+    # Adicionar colunas com os nomes dos estágios (o ID original é mantido quando não houver mapeamento)
+    # e a categoria do estágio em maiúsculas (EM ANDAMENTO / SUCESSO / FALHA)
+    for coluna_id, coluna_nome, coluna_categoria in (
+        ('STAGE_ID', 'STAGE_NAME', 'STAGE_CATEGORY'),
+        ('PREVIOUS_STAGE_ID', 'PREVIOUS_STAGE_NAME', 'PREVIOUS_STAGE_CATEGORY'),
+    ):
+        if coluna_id in df_modificado.columns:
+            df_modificado[coluna_nome] = dicionario_estagios.map_names(
+                df_modificado[coluna_id], as_categorical=False
+            )
+            df_modificado[coluna_categoria] = dicionario_estagios.map_categories(
+                df_modificado[coluna_id], default=np.nan, as_categorical=False
+            ).str.upper()
     
     return df_modificado 
 
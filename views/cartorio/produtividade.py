@@ -61,7 +61,65 @@ def obter_mapeamento_campos():
         'UF_CRM_DATA_MONTAR_REQUERIMENTO': 'UF_CRM_MONTAGEM_PASTA_RESPONSAVEL'  # Adicionando o par que faltava
     }
 
-def aplicar_filtros_produtividade(df_analise, campos_data, periodo_inicio, periodo_fim):
+@st.cache_data(show_spinner=False)
+def construir_tabela_eventos(df, campos_data, mapeamento_campos):
+    """
+    Converte as colunas de data de cada etapa em uma tabela longa de eventos
+    
+    Cada par (registro, campo de data preenchido) vira uma linha. A tabela é construída
+    uma única vez por versão dos dados e ordenada por data, permitindo filtrar períodos
+    com busca binária em vez de copiar o DataFrame inteiro para cada campo.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame com os dados dos cartórios (formato largo)
+        campos_data (list): Lista de campos de data para análise
+        mapeamento_campos (dict): Dicionário que mapeia campos de data para campos de responsável
+        
+    Returns:
+        pandas.DataFrame: Colunas ID, ETAPA (categórica, nome do campo de data),
+        DATA (datetime64) e RESPONSAVEL (categórica), ordenada por DATA
+    """
+    campos = [campo for campo in campos_data if campo in df.columns]
+    colunas = ['ID', 'ETAPA', 'DATA', 'RESPONSAVEL']
+    if df.empty or not campos:
+        return pd.DataFrame(columns=colunas)
+    
+    # Matriz (registros x etapas) de datas; NaT onde a etapa não ocorreu
+    datas = np.column_stack([
+        pd.to_datetime(df[campo], errors='coerce').to_numpy(dtype='datetime64[ns]') for campo in campos
+    ])
+    linhas, etapas = np.nonzero(~np.isnat(datas))
+    
+    # Matriz de responsáveis alinhada às etapas (None quando a etapa não tem campo de responsável)
+    responsaveis = np.column_stack([
+        df[mapeamento_campos[campo]].to_numpy(dtype=object)
+        if mapeamento_campos.get(campo) in df.columns else np.full(len(df), None, dtype=object)
+        for campo in campos
+    ])
+    
+    ids = df['ID'].to_numpy() if 'ID' in df.columns else df.index.to_numpy()
+    eventos = pd.DataFrame({
+        'ID': ids[linhas],
+        'ETAPA': pd.Categorical.from_codes(etapas, categories=campos),
+        'DATA': datas[linhas, etapas],
+        'RESPONSAVEL': pd.Categorical(responsaveis[linhas, etapas])
+    })
+    return eventos.sort_values('DATA', kind='stable').reset_index(drop=True)
+
+def filtrar_eventos_periodo(eventos, periodo_inicio, periodo_fim):
+    """
+    Retorna os eventos com DATA dentro de [periodo_inicio, periodo_fim]
+    
+    Usa busca binária sobre a coluna DATA (a tabela de eventos é ordenada por data).
+    """
+    if eventos.empty:
+        return eventos
+    datas = eventos['DATA'].to_numpy()
+    inicio = np.searchsorted(datas, np.datetime64(pd.Timestamp(periodo_inicio)), side='left')
+    fim = np.searchsorted(datas, np.datetime64(pd.Timestamp(periodo_fim)), side='right')
+    return eventos.iloc[inicio:fim]
+
+def aplicar_filtros_produtividade(df_analise, campos_data, periodo_inicio, periodo_fim, eventos=None):
     """
     Aplica filtros de período aos dados de produtividade
     
@@ -70,48 +128,26 @@ def aplicar_filtros_produtividade(df_analise, campos_data, periodo_inicio, perio
         campos_data (list): Lista de campos de data para análise
         periodo_inicio (datetime): Data inicial do período
         periodo_fim (datetime): Data final do período
+        eventos (pandas.DataFrame, optional): Tabela de eventos já construída para df_analise
         
     Returns:
-        pandas.DataFrame: DataFrame filtrado pelo período especificado
+        pandas.DataFrame: Registros com ao menos uma etapa dentro do período especificado
     """
-    # Preparar para filtragem por data
-    df_filtrado = df_analise.copy()
+    if df_analise.empty:
+        return pd.DataFrame()
     
-    # Processar filtragem por data
-    dfs_por_campo = []
-    registros_filtrados = set()  # Para guardar IDs únicos
+    if eventos is None:
+        eventos = construir_tabela_eventos(df_analise, campos_data, obter_mapeamento_campos())
+    eventos_periodo = filtrar_eventos_periodo(eventos, periodo_inicio, periodo_fim)
     
-    if not df_filtrado.empty:
-        for campo in campos_data:
-            if campo not in df_filtrado.columns:
-                continue
-                
-            # Filtrar registros com data no período para este campo
-            filtro_campo = (df_filtrado[campo] >= periodo_inicio) & (df_filtrado[campo] <= periodo_fim)
-            df_campo = df_filtrado[filtro_campo].copy()
-            
-            if not df_campo.empty:
-                # Adicionar ao conjunto de IDs únicos se a coluna ID existir
-                if 'ID' in df_campo.columns:
-                    registros_filtrados.update(df_campo['ID'].unique())
-                dfs_por_campo.append(df_campo)
-        
-        # Unir todos os dataframes filtrados preservando todas as colunas
-        if dfs_por_campo:
-            # Preservar todas as colunas no dataframe unido, mantendo os dados originais
-            if 'ID' in df_filtrado.columns:
-                # Se temos a coluna ID, podemos filtrar por IDs mais facilmente
-                df_filtrado = df_filtrado[df_filtrado['ID'].isin(registros_filtrados)]
-            else:
-                # Caso contrário, fazer merge manual
-                df_filtrado = pd.concat(dfs_por_campo).drop_duplicates()
-        else:
-            st.warning("Nenhum registro encontrado no período selecionado.")
-            df_filtrado = pd.DataFrame()
-    else:
-        df_filtrado = pd.DataFrame()
-        
-    return df_filtrado
+    if eventos_periodo.empty:
+        st.warning("Nenhum registro encontrado no período selecionado.")
+        return pd.DataFrame()
+    
+    ids_periodo = eventos_periodo['ID'].unique()
+    if 'ID' in df_analise.columns:
+        return df_analise[df_analise['ID'].isin(ids_periodo)]
+    return df_analise[df_analise.index.isin(ids_periodo)]
 
 def analisar_produtividade_etapas(df):
     """
@@ -279,26 +315,25 @@ def analisar_produtividade_etapas(df):
     for campo in campos_data:
         df[campo] = pd.to_datetime(df[campo], errors='coerce')
     
+    # Tabela longa de eventos (ID, etapa, data, responsável), construída uma vez por versão dos dados
+    eventos_base = construir_tabela_eventos(df, campos_data, mapeamento_campos)
+    
     # Pré-calcular os responsáveis mais produtivos para destaque na página principal
     destaques_responsaveis = {}
+    contagem_resp = (
+        eventos_base.dropna(subset=['RESPONSAVEL'])
+        .groupby(['ETAPA', 'RESPONSAVEL'], observed=True).size()
+    )
     for campo_data in campos_data:
-        if campo_data in df.columns and campo_data in mapeamento_campos:
-            campo_resp = mapeamento_campos.get(campo_data)
-            if campo_resp and campo_resp in df.columns:
-                # Filtrar dados válidos
-                df_etapa = df.dropna(subset=[campo_data, campo_resp])
-                if not df_etapa.empty:
-                    # Contar registros por responsável
-                    contagem = df_etapa[campo_resp].value_counts()
-                    if not contagem.empty:
-                        # Obter top 3 responsáveis para esta etapa
-                        top_resp = contagem.nlargest(3)
-                        nome_etapa = formatar_nome_etapa(campo_data)
-                        destaques_responsaveis[nome_etapa] = {
-                            'responsaveis': [(resp, qtd) for resp, qtd in zip(top_resp.index, top_resp.values)],
-                            'campo_data': campo_data,
-                            'campo_resp': campo_resp
-                        }
+        if campo_data in mapeamento_campos and campo_data in contagem_resp.index.get_level_values('ETAPA'):
+            # Obter top 3 responsáveis para esta etapa
+            top_resp = contagem_resp.xs(campo_data, level='ETAPA').nlargest(3)
+            nome_etapa = formatar_nome_etapa(campo_data)
+            destaques_responsaveis[nome_etapa] = {
+                'responsaveis': [(resp, qtd) for resp, qtd in zip(top_resp.index, top_resp.values)],
+                'campo_data': campo_data,
+                'campo_resp': mapeamento_campos.get(campo_data)
+            }
     
     # Botão para mostrar o mapeamento de campos
     col1, col2 = st.columns(2)
@@ -450,42 +485,15 @@ def analisar_produtividade_etapas(df):
         
         df_analise = df_analise[mascara_final]
     
-    # Preparar para filtragem por data
-    df_filtrado = df_analise.copy()
-    
-    # Processar filtragem por data
-    dfs_por_campo = []
-    registros_filtrados = set()  # Para guardar IDs únicos
-    
-    if not df_filtrado.empty:
-        for campo in campos_data:
-            if campo not in df_filtrado.columns:
-                continue
-                
-            # Filtrar registros com data no período para este campo
-            filtro_campo = (df_filtrado[campo] >= periodo_inicio) & (df_filtrado[campo] <= periodo_fim)
-            df_campo = df_filtrado[filtro_campo].copy()
-            
-            if not df_campo.empty:
-                # Adicionar ao conjunto de IDs únicos se a coluna ID existir
-                if 'ID' in df_campo.columns:
-                    registros_filtrados.update(df_campo['ID'].unique())
-                dfs_por_campo.append(df_campo)
-        
-        # Unir todos os dataframes filtrados preservando todas as colunas
-        if dfs_por_campo:
-            # Preservar todas as colunas no dataframe unido, mantendo os dados originais
-            if 'ID' in df_filtrado.columns:
-                # Se temos a coluna ID, podemos filtrar por IDs mais facilmente
-                df_filtrado = df_filtrado[df_filtrado['ID'].isin(registros_filtrados)]
-            else:
-                # Caso contrário, fazer merge manual
-                df_filtrado = pd.concat(dfs_por_campo).drop_duplicates()
-        else:
-            st.warning("Nenhum registro encontrado no período selecionado.")
-            df_filtrado = pd.DataFrame()
+    # Eventos dos registros que passaram pelos filtros de responsável, restritos ao período
+    if 'ID' in df_analise.columns:
+        eventos_analise = eventos_base[eventos_base['ID'].isin(df_analise['ID'])]
     else:
-        df_filtrado = pd.DataFrame()
+        eventos_analise = eventos_base[eventos_base['ID'].isin(df_analise.index)]
+    eventos_periodo = filtrar_eventos_periodo(eventos_analise, periodo_inicio, periodo_fim)
+    
+    # Registros (formato largo) com ao menos uma etapa no período, para as tabelas detalhadas
+    df_filtrado = aplicar_filtros_produtividade(df_analise, campos_data, periodo_inicio, periodo_fim, eventos=eventos_analise)
     
     if df_filtrado.empty:
         st.warning("Não há dados disponíveis para o período e filtros selecionados.")
@@ -500,17 +508,14 @@ def analisar_produtividade_etapas(df):
         "📑 Tabelas por Etapa"
     ])
     
-    # Filtrar DF para o período selecionado para uso nas abas
-    df_filtrado = aplicar_filtros_produtividade(df_analise, campos_data, periodo_inicio, periodo_fim)
-    
     with tab1:
-        mostrar_metricas_etapa(df_filtrado, campos_data, periodo_inicio, periodo_fim)
+        mostrar_metricas_etapa(df_filtrado, campos_data, periodo_inicio, periodo_fim, eventos=eventos_periodo)
     
     with tab2:
-        analisar_distribuicao_temporal(df_filtrado, campos_data)
+        analisar_distribuicao_temporal(df_filtrado, campos_data, eventos=eventos_periodo)
     
     with tab3:
-        analisar_matriz_responsavel_data(df_filtrado, campos_data, mapeamento_campos)
+        analisar_matriz_responsavel_data(df_filtrado, campos_data, mapeamento_campos, eventos=eventos_periodo)
     
     with tab4:
         # Nova aba para destaques de produtividade
@@ -630,7 +635,7 @@ def mostrar_destaques_produtividade(destaques):
         🥉 Terceiro Lugar - Terceira maior produtividade
         """)
 
-def mostrar_metricas_etapa(df, campos_data, periodo_inicio, periodo_fim):
+def mostrar_metricas_etapa(df, campos_data, periodo_inicio, periodo_fim, eventos=None):
     """
     Mostra as métricas de produtividade por etapa
     
@@ -639,6 +644,7 @@ def mostrar_metricas_etapa(df, campos_data, periodo_inicio, periodo_fim):
         campos_data (list): Lista de campos de data para análise
         periodo_inicio (datetime): Data inicial do período
         periodo_fim (datetime): Data final do período
+        eventos (pandas.DataFrame, optional): Tabela de eventos do período (ver construir_tabela_eventos)
     """
     # Usando st.markdown em vez de st.html
     st.markdown("""
@@ -668,52 +674,46 @@ def mostrar_metricas_etapa(df, campos_data, periodo_inicio, periodo_fim):
     ids_por_etapa = {}
     todos_ids = set()
     
-    for campo in colunas_existentes:
-        # Obter série temporal filtrada
-        serie_data = df[campo].dropna()
+    if eventos is None:
+        eventos = filtrar_eventos_periodo(
+            construir_tabela_eventos(df, campos_data, obter_mapeamento_campos()), periodo_inicio, periodo_fim
+        )
+    
+    if not eventos.empty:
+        # Uma única agregação (etapa x dia) sobre a tabela de eventos
+        dias_evento = eventos['DATA'].dt.normalize()
+        contagem_diaria = eventos.groupby(['ETAPA', dias_evento], observed=True).size()
+        contagem_diaria.index = contagem_diaria.index.set_names(['ETAPA', 'DIA'])
+        dias_com_atividade.update(d.date() for d in contagem_diaria.index.get_level_values('DIA').unique())
+        ids_etapas = eventos.groupby('ETAPA', observed=True)['ID'].unique()
         
-        # Verificar se o campo tem algum dado
-        if serie_data.empty:
-            continue
+        for campo in colunas_existentes:
+            if campo not in ids_etapas.index:
+                continue
             
-        # Nome amigável para o campo
-        nome_etapa = formatar_nome_etapa(campo)
-        
-        # Calcular estatísticas básicas
-        total = len(serie_data)
-        total_geral += total
-        
-        # Guardar IDs únicos para esta etapa
-        if 'ID' in df.columns:
-            ids_etapa = set(df.loc[~df[campo].isna(), 'ID'].unique())
-            ids_por_etapa[nome_etapa] = ids_etapa
-            todos_ids.update(ids_etapa)
-        
-        # Calcular dados temporais
-        if not serie_data.empty:
-            datas_unicas = set(serie_data.dt.date)
-            dias_com_atividade.update(datas_unicas)
+            # Nome amigável para o campo
+            nome_etapa = formatar_nome_etapa(campo)
+            contagem_campo = contagem_diaria.xs(campo, level='ETAPA')
             
-            # Agrupar por dia
-            contagem_diaria = serie_data.dt.date.value_counts().sort_index()
+            # Calcular estatísticas básicas
+            total = int(contagem_campo.sum())
+            total_geral += total
             
-            # Encontrar dia com maior produtividade
-            if not contagem_diaria.empty:
-                dia_max = contagem_diaria.idxmax()
-                valor_max = contagem_diaria.max()
-                
-                # Calcular média diária (apenas para dias em que houve atividade)
-                media_diaria = total / len(contagem_diaria)
-                
-                # Guardar estatísticas
-                dados_campos[nome_etapa] = {
-                    'total': total,
-                    'dia_max': dia_max,
-                    'valor_max': valor_max,
-                    'media_diaria': media_diaria,
-                    'num_dias': len(contagem_diaria),
-                    'campo_original': campo
-                }
+            # Guardar IDs únicos para esta etapa
+            if 'ID' in df.columns:
+                ids_etapa = set(ids_etapas[campo])
+                ids_por_etapa[nome_etapa] = ids_etapa
+                todos_ids.update(ids_etapa)
+            
+            # Guardar estatísticas (média calculada apenas sobre dias com atividade)
+            dados_campos[nome_etapa] = {
+                'total': total,
+                'dia_max': contagem_campo.idxmax().date(),
+                'valor_max': int(contagem_campo.max()),
+                'media_diaria': total / len(contagem_campo),
+                'num_dias': len(contagem_campo),
+                'campo_original': campo
+            }
     
     # Se não houver dados, mostra mensagem e sai
     if not dados_campos:
@@ -1126,13 +1126,14 @@ def mostrar_metricas_etapa(df, campos_data, periodo_inicio, periodo_fim):
     if isinstance(df_resumo, pd.DataFrame) and 'Etapa' in df_resumo.columns:
         df_resumo['Etapa'] = df_resumo['Etapa'].apply(lambda x: str(x).replace('_', ' ') if '_' in str(x) else x)
 
-def analisar_distribuicao_temporal(df, campos_data):
+def analisar_distribuicao_temporal(df, campos_data, eventos=None):
     """
     Análise de distribuição temporal dos dados
     
     Args:
         df (pandas.DataFrame): DataFrame com dados filtrados
         campos_data (list): Lista de campos de data para análise
+        eventos (pandas.DataFrame, optional): Tabela de eventos do período (ver construir_tabela_eventos)
     """
     st.markdown("### Análise de Distribuição Temporal")
     
@@ -1141,37 +1142,23 @@ def analisar_distribuicao_temporal(df, campos_data):
         st.warning("Não há dados suficientes para análise temporal.")
         return
     
-    # Preparar os dados para visualização
-    dados_temporais = []
+    if eventos is None:
+        eventos = construir_tabela_eventos(df, campos_data, obter_mapeamento_campos())
     
-    # Processar cada campo de data
-    for campo in campos_data:
-        if campo in df.columns:
-            # Filtrar registros que têm data neste campo
-            serie_data = df[campo].dropna()
-            
-            if not serie_data.empty:
-                # Converter para datetime se ainda não estiver nesse formato
-                serie_data = pd.to_datetime(serie_data)
-                
-                # Agrupar por data (sem hora)
-                contagem_diaria = serie_data.dt.date.value_counts().sort_index()
-                
-                # Converter para DataFrame
-                df_campo = pd.DataFrame({
-                    'Data': contagem_diaria.index,
-                    'Quantidade': contagem_diaria.values,
-                    'Etapa': formatar_nome_etapa(campo)
-                })
-                
-                dados_temporais.append(df_campo)
-    
-    # Combinar todos os dados
-    if not dados_temporais:
+    # Combinar todos os dados: contagem diária por etapa em uma única agregação
+    if eventos.empty:
         st.warning("Não há dados temporais disponíveis para análise.")
         return
-        
-    df_temporal = pd.concat(dados_temporais, ignore_index=True)
+    
+    df_temporal = (
+        eventos.groupby(['ETAPA', eventos['DATA'].dt.normalize()], observed=True)
+        .size()
+        .reset_index(name='Quantidade')
+        .rename(columns={'DATA': 'Data'})
+    )
+    df_temporal['Data'] = df_temporal['Data'].dt.date
+    df_temporal['Etapa'] = df_temporal['ETAPA'].astype(str).map(formatar_nome_etapa)
+    df_temporal = df_temporal[['Data', 'Quantidade', 'Etapa']]
     
     # Criar gráfico de linha para visualizar a distribuição temporal
     fig = px.line(
@@ -1212,7 +1199,7 @@ def analisar_distribuicao_temporal(df, campos_data):
     • Compare as alturas das linhas para entender como as etapas variam no tempo.
     """)
 
-def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos):
+def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos, eventos=None):
     """
     Cria uma matriz de visualização de responsáveis por data para cada par de campos
     
@@ -1220,6 +1207,7 @@ def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos):
         df (pandas.DataFrame): DataFrame com dados filtrados
         campos_data (list): Lista de campos de data para análise
         mapeamento_campos (dict): Dicionário que mapeia campos de data para campos de responsável
+        eventos (pandas.DataFrame, optional): Tabela de eventos do período (ver construir_tabela_eventos)
     """
     st.markdown("""
     <div style="background: linear-gradient(135deg, #4338CA 0%, #6366F1 100%); padding: 20px; border-radius: 12px; margin-bottom: 25px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
@@ -1249,22 +1237,23 @@ def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos):
     • Comparação visual da distribuição de carga de trabalho
     """)
     
+    if eventos is None:
+        eventos = construir_tabela_eventos(df, campos_data, mapeamento_campos)
+    
+    # Eventos com responsável preenchido (pares data/responsável válidos)
+    eventos_resp = eventos.dropna(subset=['RESPONSAVEL'])
+    registros_por_etapa = eventos_resp.groupby('ETAPA', observed=True).size()
+    
     # Verificar pares de campos válidos (data e responsável)
     pares_validos = []
     for campo_data in campos_data:
-        if campo_data in df.columns and campo_data in mapeamento_campos:
-            campo_resp = mapeamento_campos[campo_data]
-            if campo_resp in df.columns:
-                # Verificar se existem dados para este par
-                df_temp = df.dropna(subset=[campo_data, campo_resp])
-                if not df_temp.empty:
-                    nome_etapa = formatar_nome_etapa(campo_data)
-                    pares_validos.append({
-                        'campo_data': campo_data,
-                        'campo_resp': campo_resp,
-                        'nome_etapa': nome_etapa,
-                        'num_registros': len(df_temp)
-                    })
+        if campo_data in registros_por_etapa.index and campo_data in mapeamento_campos:
+            pares_validos.append({
+                'campo_data': campo_data,
+                'campo_resp': mapeamento_campos[campo_data],
+                'nome_etapa': formatar_nome_etapa(campo_data),
+                'num_registros': int(registros_por_etapa[campo_data])
+            })
     
     if not pares_validos:
         st.warning("Não foram encontrados pares válidos de campos de data e responsável para análise.")
@@ -1288,44 +1277,38 @@ def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos):
     # Para cada etapa, criar um expansor com suas análises
     for i, par in enumerate(pares_validos):
         campo_data = par['campo_data']
-        campo_resp = par['campo_resp']
         nome_etapa = par['nome_etapa']
         num_registros = par['num_registros']
         
         # Criar um expansor para esta etapa (expandido por padrão para as primeiras 3)
         with st.expander(f"{nome_etapa} ({num_registros} registros)", expanded=(i < 3)):
-            # Filtrar dados para o par atual
-            df_filtrado = df.dropna(subset=[campo_data, campo_resp]).copy()
-            
-            # Converter campo de data para datetime se necessário
-            df_filtrado[campo_data] = pd.to_datetime(df_filtrado[campo_data])
-            
-            # Extrair data (sem hora)
-            df_filtrado['data_apenas'] = df_filtrado[campo_data].dt.date
+            # Eventos do par atual
+            df_filtrado = eventos_resp[eventos_resp['ETAPA'] == campo_data]
+            datas_etapa = df_filtrado['DATA'].dt.normalize()
             
             # Ajustar agrupamento temporal conforme granularidade
             if granularidade == "Semanal":
                 # Agrupar por semana (primeiro dia da semana)
-                df_filtrado['periodo'] = df_filtrado[campo_data].apply(
-                    lambda x: (x - pd.Timedelta(days=x.weekday())).date()
-                )
+                periodo = datas_etapa - pd.to_timedelta(datas_etapa.dt.weekday, unit='D')
                 formato_data = "%d/%m/%Y"
                 descricao_periodo = "Semana"
             elif granularidade == "Mensal":
                 # Agrupar por mês (primeiro dia do mês)
-                df_filtrado['periodo'] = df_filtrado[campo_data].apply(
-                    lambda x: x.replace(day=1).date()
-                )
+                periodo = datas_etapa.dt.to_period('M').dt.start_time
                 formato_data = "%b/%Y"
                 descricao_periodo = "Mês"
             else:  # Diária
                 # Usar a data sem alteração
-                df_filtrado['periodo'] = df_filtrado['data_apenas']
+                periodo = datas_etapa
                 formato_data = "%d/%m/%Y"
                 descricao_periodo = "Data"
             
             # Contar registros por responsável e período
-            contagem = df_filtrado.groupby([campo_resp, 'periodo']).size().reset_index()
+            contagem = (
+                df_filtrado.groupby([df_filtrado['RESPONSAVEL'].astype(str), periodo.dt.date])
+                .size()
+                .reset_index()
+            )
             contagem.columns = ['responsavel', 'periodo', 'quantidade']
             
             # Se não houver dados, mostrar mensagem e continuar com próxima etapa
@@ -1464,25 +1447,9 @@ def analisar_matriz_responsavel_data(df, campos_data, mapeamento_campos):
                 # Preparar dados para heatmap normalizado (excluindo coluna de total)
                 heatmap_norm = matriz_filtrada.drop(columns=['Total']).copy()
                 
-                # Normalizar por linha (responsável)
-                for idx in heatmap_norm.index:
-                    row_sum = heatmap_norm.loc[idx].sum()
-                    # Garantir que row_sum é um valor escalar
-                    # pandas já importado no início do arquivo
-                    if isinstance(row_sum, pd.Series):
-                        # Se for uma pandas Series, pegar o primeiro valor como float
-                        if len(row_sum) > 0:
-                            row_sum = float(row_sum.iloc[0])
-                        else:
-                            row_sum = 0.0
-                    elif isinstance(row_sum, (list, tuple)):
-                        # Se for lista ou tupla, pegar o primeiro elemento
-                        row_sum = float(row_sum[0]) if row_sum else 0.0
-                    else:
-                        # Caso seja um escalar
-                        row_sum = float(row_sum)
-                    if row_sum > 0:  # Evitar divisão por zero
-                        heatmap_norm.loc[idx] = heatmap_norm.loc[idx] / row_sum * 100
+                # Normalizar por linha (responsável), evitando divisão por zero
+                somas_linha = heatmap_norm.sum(axis=1)
+                heatmap_norm = heatmap_norm.div(somas_linha.where(somas_linha > 0, 1), axis=0) * 100
                 
                 # Criar figura do heatmap normalizado
                 fig_norm = px.imshow(
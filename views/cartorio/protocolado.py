@@ -4,76 +4,13 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from api.bitrix_connector import load_bitrix_data, get_credentials
+from api.stage_dictionary import get_stage_dictionary, CARTORIO_EM_ANDAMENTO, CARTORIO_SUCESSO, CARTORIO_FALHA
 from datetime import datetime
 
-# Dicionários de mapeamento de estágios
-em_andamento = {
-    'DT1052_16:NEW': 'Aguardando Certidão',
-    'DT1052_34:NEW': 'Aguardando Certidão',
-    'DT1052_16:UC_QRZ6JG': 'Busca CRC',
-    'DT1052_34:UC_68BLQ7': 'Busca CRC',
-    'DT1052_16:UC_7F0WK2': 'Apenas Ass. Req. Cliente P/ Montagem',
-    'DT1052_34:UC_HN9GMI': 'Apenas Ass. Req. Cliente P/ Montagem',
-    'DT1052_16:PREPARATION': 'Montagem Requerimento Cartório',
-    'DT1052_34:PREPARATION': 'Montagem Requerimento Cartório',
-    'DT1052_16:UC_IWZBMO': 'Solicitar Cart. Origem',
-    'DT1052_34:CLIENT': 'Certidão Emitida',
-    'DT1052_34:UC_8L5JUS': 'Solicitar Cart. Origem',
-    'DT1052_16:UC_8EGMU7': 'Cart. Origem Prioridade',
-    'DT1052_16:UC_KXHDOQ': 'Aguard. Cart. Origem',
-    'DT1052_34:UC_6KOYL5': 'Aguard. Cart. Origem',
-    'DT1052_16:CLIENT': 'Certidão Emitida',
-    'DT1052_34:UC_D0RG5P': 'Certidão Emitida',
-    'DT1052_16:UC_JRGCW3': 'Certidão Física',
-    'DT1052_34:UC_84B1S2': 'Certidão Física',
-    # Versões curtas dos nomes (sem prefixo)
-    'NEW': 'Aguard. Certidão',
-    'PREPARATION': 'Mont. Requerim.',
-    'CLIENT': 'Certidão Emitida',
-    'UC_QRZ6JG': 'Busca CRC',
-    'UC_68BLQ7': 'Busca CRC',
-    'UC_7F0WK2': 'Solic. Requerim.',
-    'UC_HN9GMI': 'Solic. Requerim.',
-    'UC_IWZBMO': 'Solic. C. Origem',
-    'UC_8L5JUS': 'Solic. C. Origem',
-    'UC_8EGMU7': 'C. Origem Prior.',
-    'UC_KXHDOQ': 'Aguard. C. Origem',
-    'UC_6KOYL5': 'Aguard. C. Origem',
-    'UC_D0RG5P': 'Certidão Emitida',
-    'UC_JRGCW3': 'Certidão Física',
-    'UC_84B1S2': 'Certidão Física'
-}
-
-# SUCESSO
-sucesso = {
-    'DT1052_16:SUCCESS': 'Certidão Entregue',
-    'DT1052_34:SUCCESS': 'Certidão Entregue',
-    'SUCCESS': 'Certidão Entregue'
-}
-
-# FALHA
-falha = {
-    'DT1052_16:FAIL': 'Devolução ADM',
-    'DT1052_34:FAIL': 'Devolução ADM',
-    'DT1052_16:UC_R5UEXF': 'Dev. ADM Verificado',
-    'DT1052_34:UC_Z3J98J': 'Dev. ADM Verificado',
-    'DT1052_16:UC_HYO7L2': 'Devolutiva Busca',
-    'DT1052_34:UC_5LAJNY': 'Devolutiva Busca',
-    'DT1052_16:UC_UG0UDZ': 'Solicitação Duplicada',
-    'DT1052_34:UC_LF04SU': 'Solicitação Duplicada',
-    'DT1052_16:UC_P61ZVH': 'Devolvido Requerimento',
-    'DT1052_34:UC_2BAINE': 'Devolvido Requerimento',
-    # Versões curtas dos nomes (sem prefixo)
-    'FAIL': 'Devolução ADM',
-    'UC_R5UEXF': 'Dev. ADM Verif.',
-    'UC_Z3J98J': 'Dev. ADM Verif.',
-    'UC_HYO7L2': 'Dev. Busca',
-    'UC_5LAJNY': 'Dev. Busca',
-    'UC_UG0UDZ': 'Solic. Duplicada',
-    'UC_LF04SU': 'Solic. Duplicada',
-    'UC_P61ZVH': 'Dev. Requerim.',
-    'UC_2BAINE': 'Dev. Requerim.'
-}
+# Dicionários de mapeamento de estágios (definidos no serviço compartilhado de estágios)
+em_andamento = CARTORIO_EM_ANDAMENTO
+sucesso = CARTORIO_SUCESSO
+falha = CARTORIO_FALHA
 
 def carregar_dados_protocolado():
     """
@@ -256,8 +193,8 @@ def processar_dados_protocolado(df_deal, df_deal_uf, df_cartorio):
         """)
     
     # Criar colunas para análise de status
-    df_resultado['STATUS_CATEGORIA'] = df_resultado['STAGE_ID_y'].apply(
-        lambda x: 'Sucesso' if x in sucesso else ('Em Andamento' if x in em_andamento else ('Falha' if x in falha else 'Desconhecido'))
+    df_resultado['STATUS_CATEGORIA'] = get_stage_dictionary('cartorio').map_categories(
+        df_resultado['STAGE_ID_y'], as_categorical=False
     )
     
     # Mapear colunas para nomes padronizados
@@ -816,9 +753,10 @@ def visualizar_certidoes_por_requerente(df_processado):
     # Criar cópia do DataFrame para trabalhar
     df_requerentes = df_processado.copy()
     
-    # Mapear o estágio para um nome legível
-    df_requerentes['NOME_ESTAGIO'] = df_requerentes['STAGE_ID_EMISSAO'].apply(
-        lambda x: sucesso.get(x, falha.get(x, em_andamento.get(x, "Desconhecido")))
+    # Mapear o estágio para um nome legível e para a categoria (uma consulta por estágio distinto)
+    dicionario_estagios = get_stage_dictionary('cartorio')
+    df_requerentes['NOME_ESTAGIO'] = dicionario_estagios.map_names(
+        df_requerentes['STAGE_ID_EMISSAO'], default="Desconhecido"
     )
     
     # Definir cores para os status
@@ -829,9 +767,7 @@ def visualizar_certidoes_por_requerente(df_processado):
         'Desconhecido': '#9E9E9E'  # Cinza
     }
     
-    df_requerentes['STATUS_CATEGORIA'] = df_requerentes['STAGE_ID_EMISSAO'].apply(
-        lambda x: 'Sucesso' if x in sucesso else ('Falha' if x in falha else ('Em Andamento' if x in em_andamento else 'Desconhecido'))
-    )
+    df_requerentes['STATUS_CATEGORIA'] = dicionario_estagios.map_categories(df_requerentes['STAGE_ID_EMISSAO'])
     
     df_requerentes['COR_STATUS'] = df_requerentes['STATUS_CATEGORIA'].map(cores_status)
     
@@ -864,8 +800,8 @@ def visualizar_certidoes_por_requerente(df_processado):
     contagem_estagios.columns = ['STAGE_ID', 'QUANTIDADE']
     
     # Adicionar o nome legível do estágio
-    contagem_estagios['NOME_ESTAGIO'] = contagem_estagios['STAGE_ID'].apply(
-        lambda x: sucesso.get(x, falha.get(x, em_andamento.get(x, "Desconhecido")))
+    contagem_estagios['NOME_ESTAGIO'] = dicionario_estagios.map_names(
+        contagem_estagios['STAGE_ID'], default="Desconhecido", as_categorical=False
     )
     
     # Adicionar estágios que não têm registros para completar o funil
@@ -877,8 +813,8 @@ def visualizar_certidoes_por_requerente(df_processado):
             ], ignore_index=True)
     
     # Categorizar os estágios
-    contagem_estagios['CATEGORIA'] = contagem_estagios['STAGE_ID'].apply(
-        lambda x: 'Sucesso' if x in sucesso else ('Falha' if x in falha else 'Em Andamento')
+    contagem_estagios['CATEGORIA'] = dicionario_estagios.map_categories(
+        contagem_estagios['STAGE_ID'], default='Em Andamento', as_categorical=False
     )
     
     # Definir cores por categoria
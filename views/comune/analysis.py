@@ -64,35 +64,34 @@ def criar_visao_macro(df_comune):
     
     return visao_completa
 
+def _explodir_chaves_familia(serie):
+    """
+    Divide valores separados por vírgula e normaliza a chave de família.
+
+    Retorna uma Series (indexada pelo índice original) com uma chave por linha,
+    sem nulos nem strings vazias.
+    """
+    chaves = serie.dropna().astype(str).str.split(',').explode().str.strip()
+    return chaves[chaves != '']
+
 def cruzar_comune_deal(df_comune, df_deal, df_deal_uf):
     """
     Cruza os dados de COMUNE com os negócios (CRM_DEAL)
+
+    O cruzamento é feito por chave de família: os campos UF_CRM_12_1723552666 (COMUNE)
+    e UF_CRM_1722605592778 (DEAL_UF) podem conter várias chaves separadas por vírgula,
+    então ambos os lados são explodidos em uma chave por linha e cruzados com um único
+    merge. O lado do Deal é indexado pela chave normalizada (uma linha por chave) e o
+    resultado é deduplicado por registro de COMUNE, evitando explosão de linhas.
     """
-    # Resumo inicial dos dataframes
-    print(f"\n=== RESUMO ANTES DO CRUZAMENTO ===")
-    print(f"df_comune: {len(df_comune)} registros")
-    print(f"df_deal: {len(df_deal)} registros")
-    print(f"df_deal_uf: {len(df_deal_uf)} registros")
-    
     if df_comune.empty or df_deal.empty or df_deal_uf.empty:
         st.warning("Um dos DataFrames está vazio, não é possível fazer o cruzamento.")
         return pd.DataFrame()
     
-    # Verificar se as colunas necessárias existem
-    colunas_comune = df_comune.columns.tolist()
-    colunas_deal = df_deal.columns.tolist()
-    colunas_deal_uf = df_deal_uf.columns.tolist()
-    
-    # Imprimir informações para debug
-    print(f"\n=== COLUNAS DISPONÍVEIS ===")
-    print(f"Colunas em df_comune: {colunas_comune}")
-    print(f"Colunas em df_deal: {colunas_deal}")
-    print(f"Colunas em df_deal_uf: {colunas_deal_uf}")
-    
     # Verificar coluna de cruzamento UF_CRM_12_1723552666 (COMUNE)
-    if 'UF_CRM_12_1723552666' not in colunas_comune:
+    if 'UF_CRM_12_1723552666' not in df_comune.columns:
         # Tentar identificar colunas alternativas para cruzamento
-        possiveis_colunas_comune = [col for col in colunas_comune if 'UF_CRM_' in col]
+        possiveis_colunas_comune = [col for col in df_comune.columns if 'UF_CRM_' in col]
         
         if possiveis_colunas_comune:
             print(f"\n=== POSSÍVEIS COLUNAS DE CRUZAMENTO EM COMUNE ===")
@@ -110,9 +109,9 @@ def cruzar_comune_deal(df_comune, df_deal, df_deal_uf):
         return pd.DataFrame()
     
     # Verificar coluna de cruzamento UF_CRM_1722605592778 (DEAL_UF)
-    if 'UF_CRM_1722605592778' not in colunas_deal_uf:
+    if 'UF_CRM_1722605592778' not in df_deal_uf.columns:
         # Tentar identificar colunas alternativas para cruzamento
-        possiveis_colunas_deal = [col for col in colunas_deal_uf if 'UF_CRM_' in col]
+        possiveis_colunas_deal = [col for col in df_deal_uf.columns if 'UF_CRM_' in col]
         
         if possiveis_colunas_deal:
             print(f"\n=== POSSÍVEIS COLUNAS DE CRUZAMENTO EM DEAL_UF ===")
@@ -129,138 +128,56 @@ def cruzar_comune_deal(df_comune, df_deal, df_deal_uf):
         
         return pd.DataFrame()
     
-    # CORREÇÃO: Verificar se os campos contêm múltiplas URLs separadas por vírgulas
-    # Verificar um valor exemplo em cada coluna
-    exemplo_comune = df_comune['UF_CRM_12_1723552666'].dropna().iloc[0] if not df_comune['UF_CRM_12_1723552666'].dropna().empty else ''
-    exemplo_deal = df_deal_uf['UF_CRM_1722605592778'].dropna().iloc[0] if not df_deal_uf['UF_CRM_1722605592778'].dropna().empty else ''
-    
-    print(f"\n=== ANÁLISE DE VALORES PARA CRUZAMENTO ===")
-    print(f"Exemplo em UF_CRM_12_1723552666 (COMUNE): {exemplo_comune[:100]}...")
-    print(f"Exemplo em UF_CRM_1722605592778 (DEAL_UF): {exemplo_deal[:100]}...")
-    
-    # Verificar se contém vírgulas (indicando múltiplas URLs)
-    contem_virgulas_comune = ',' in str(exemplo_comune)
-    contem_virgulas_deal = ',' in str(exemplo_deal)
-    
-    print(f"Campo COMUNE contém múltiplos valores separados por vírgula: {contem_virgulas_comune}")
-    print(f"Campo DEAL_UF contém múltiplos valores separados por vírgula: {contem_virgulas_deal}")
-    
     # Preparar DataFrame de COMUNE com mapeamento de estágios
     mapa_estagios = mapear_estagios_comune()
-    df_comune_prep = df_comune.copy()
+    df_cruzado = df_comune.copy()
     
-    if 'STAGE_ID' in df_comune_prep.columns:
-        df_comune_prep['STAGE_NAME'] = df_comune_prep['STAGE_ID'].map(mapa_estagios)
+    if 'STAGE_ID' in df_cruzado.columns:
+        df_cruzado['STAGE_NAME'] = df_cruzado['STAGE_ID'].map(mapa_estagios)
     else:
         st.warning("Coluna 'STAGE_ID' não encontrada no DataFrame de comune.")
         # Criar uma coluna STAGE_NAME padrão para evitar erros
-        df_comune_prep['STAGE_NAME'] = "DESCONHECIDO"
+        df_cruzado['STAGE_NAME'] = "DESCONHECIDO"
     
     # Preparar DataFrame de DEAL_UF
     try:
-        print(f"\n=== JUNTANDO DEAL E DEAL_UF ===")
-        print(f"Colunas utilizadas para join: 'ID' em df_deal e 'DEAL_ID' em df_deal_uf")
-        
         df_deal_prep = pd.merge(df_deal, df_deal_uf, left_on='ID', right_on='DEAL_ID', how='inner')
-        
-        print(f"Resultado do join: {len(df_deal_prep)} registros (de {len(df_deal)} em df_deal e {len(df_deal_uf)} em df_deal_uf)")
     except Exception as e:
         st.warning(f"Erro ao mesclar df_deal e df_deal_uf: {str(e)}")
         # Criar um DataFrame vazio com as colunas necessárias
         df_cruzado = pd.DataFrame(columns=['STAGE_NAME', 'TEM_DEAL'])
         return df_cruzado
     
-    # CORREÇÃO: Usar uma abordagem diferente para o cruzamento quando há múltiplos valores
-    # Em vez de fazer um merge que explode os registros, vamos fazer um loop e verificar a correspondência
-    
-    # Inicializar o DataFrame de resultado como uma cópia do DataFrame do Comune
-    df_cruzado = df_comune_prep.copy()
-    
-    # Inicializar uma coluna TEM_DEAL com False
-    df_cruzado['TEM_DEAL'] = False
-    
-    # Inicializar colunas para armazenar informações do Deal
-    df_cruzado['DEAL_ID'] = None
-    df_cruzado['DEAL_TITLE'] = None
+    # Índice do lado Deal: uma linha por chave de família normalizada (primeiro Deal encontrado)
+    chaves_deal = _explodir_chaves_familia(df_deal_prep['UF_CRM_1722605592778'])
+    indice_deal = pd.DataFrame({
+        'CHAVE_FAMILIA': chaves_deal.values,
+        'DEAL_ID': df_deal_prep.loc[chaves_deal.index, 'DEAL_ID'].values,
+        'DEAL_TITLE': (
+            df_deal_prep.loc[chaves_deal.index, 'TITLE'].values
+            if 'TITLE' in df_deal_prep.columns else None
+        ),
+    }).drop_duplicates('CHAVE_FAMILIA').set_index('CHAVE_FAMILIA')
+    
+    # Lado COMUNE: uma linha por (registro, chave), referenciando a posição do registro
+    posicoes = pd.RangeIndex(len(df_cruzado))
+    chaves_comune = _explodir_chaves_familia(
+        pd.Series(df_cruzado['UF_CRM_12_1723552666'].values, index=posicoes)
+    )
+    chaves_comune = chaves_comune.rename('CHAVE_FAMILIA').rename_axis('_POS_COMUNE').reset_index()
+    
+    # Cruzamento único; deduplicar por registro de COMUNE para nunca multiplicar linhas
+    correspondencias = chaves_comune.merge(
+        indice_deal, left_on='CHAVE_FAMILIA', right_index=True, how='inner'
+    ).drop_duplicates('_POS_COMUNE').set_index('_POS_COMUNE')
+    
+    df_cruzado['TEM_DEAL'] = posicoes.isin(correspondencias.index)
+    df_cruzado['DEAL_ID'] = correspondencias['DEAL_ID'].reindex(posicoes).values
+    df_cruzado['DEAL_TITLE'] = correspondencias['DEAL_TITLE'].reindex(posicoes).values
     
-    # Iniciar contagem
-    registros_processados = 0
     total_registros = len(df_cruzado)
-    registros_com_match = 0
-    
-    # Criar um conjunto com todos os valores do campo UF_CRM_1722605592778 do deal para busca rápida
-    # Se o campo contiver múltiplos valores separados por vírgula, tratar cada um como um valor separado
-    valores_deal = set()
-    
-    for valor in df_deal_prep['UF_CRM_1722605592778'].dropna():
-        if contem_virgulas_deal and isinstance(valor, str):
-            # Dividir por vírgula e adicionar cada valor ao conjunto
-            for v in valor.split(','):
-                v_limpo = v.strip()
-                if v_limpo:
-                    valores_deal.add(v_limpo)
-        else:
-            # Adicionar o valor diretamente
-            valores_deal.add(valor)
-    
-    print(f"Total de valores únicos em DEAL_UF após processamento: {len(valores_deal)}")
-    
-    # Para cada registro no Comune, verificar se há correspondência em Deal
-    for idx, row in df_cruzado.iterrows():
-        registros_processados += 1
-        
-        if registros_processados % 100 == 0:
-            print(f"Processados {registros_processados}/{total_registros} registros ({registros_processados/total_registros*100:.1f}%)")
-        
-        valor_comune = row['UF_CRM_12_1723552666']
-        tem_match = False
-        deal_id = None
-        deal_title = None
-        
-        # Verificar se o valor do Comune está no conjunto de valores Deal
-        if pd.notna(valor_comune):
-            if contem_virgulas_comune and isinstance(valor_comune, str):
-                # Dividir por vírgula e verificar cada valor
-                for v in valor_comune.split(','):
-                    v_limpo = v.strip()
-                    if v_limpo and v_limpo in valores_deal:
-                        tem_match = True
-                        break
-            else:
-                # Verificar o valor diretamente
-                tem_match = valor_comune in valores_deal
-        
-        # Se encontrou correspondência, buscar informações do Deal correspondente
-        if tem_match:
-            registros_com_match += 1
-            
-            # Para simplicidade, não nos preocupamos em identificar qual Deal específico corresponde
-            # Apenas marcamos como tendo correspondência
-            df_cruzado.at[idx, 'TEM_DEAL'] = True
-    
-    print(f"\n=== RESULTADO DO CRUZAMENTO ===")
-    print(f"Total de registros no Comune: {total_registros}")
-    print(f"Registros com correspondência: {registros_com_match} ({registros_com_match/total_registros*100:.2f}%)")
-    print(f"Registros sem correspondência: {total_registros - registros_com_match} ({(total_registros - registros_com_match)/total_registros*100:.2f}%)")
-    
-    # Verificar o tamanho do DataFrame resultante para garantir que não houve explosão
-    print(f"Tamanho do DataFrame resultante: {len(df_cruzado)} registros")
-    if len(df_cruzado) > len(df_comune) * 1.1:
-        print("ALERTA: O DataFrame resultante é significativamente maior que o original!")
-    
-    # Garantir que a coluna STAGE_NAME exista
-    if 'STAGE_NAME' not in df_cruzado.columns:
-        df_cruzado['STAGE_NAME'] = "DESCONHECIDO"
-    
-    # Resumo por estágio
-    if 'STAGE_NAME' in df_cruzado.columns and 'TEM_DEAL' in df_cruzado.columns:
-        print(f"\n=== RESUMO DE CORRESPONDÊNCIAS POR ESTÁGIO ===")
-        resumo = df_cruzado.groupby('STAGE_NAME').agg(
-            TOTAL=('STAGE_NAME', 'count'),
-            COM_DEAL=('TEM_DEAL', lambda x: sum(x)),
-            PERCENTUAL=('TEM_DEAL', lambda x: f"{sum(x)/len(x)*100:.2f}%")
-        )
-        print(resumo)
+    registros_com_match = int(df_cruzado['TEM_DEAL'].sum())
+    print(f"Cruzamento COMUNE x DEAL: {registros_com_match}/{total_registros} registros com correspondência")
     
     return df_cruzado
 
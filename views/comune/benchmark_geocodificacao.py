@@ -0,0 +1,473 @@
+"""
+Benchmark de qualidade e desempenho da geocodificação de COMUNE.
+
+Roda o geocodificador de data_loader (limpeza, normalização e geocodificar_comunes)
+contra um conjunto rotulado (golden set) e mede:
+- precisão e recall por etapa (manual, exata, fuzzy, prefixo, província)
+- nomes processados por segundo
+- pico de memória
+
+O golden set é derivado da coluna "Comune/Paróquia" da planilha histórica (para os IDs
+de "Relatório Comune - comune.csv") rotulada com o gazetteer ISTAT data/comuni_italiani.csv
+(comune, província e região). Os rótulos não usam nada do geocodificador: nem as correções
+manuais (CORRECOES_MANUAIS), nem o mapa de coordenadas, nem a sua normalização. Só entram na
+avaliação os registros VERIFICADOS, cujo texto nomeia exatamente um comune do gazetteer (a
+província citada desfaz homônimos); os demais ficam no arquivo para revisão manual.
+
+Cada predição é avaliada pelo comune a que a coordenada pertence (a entrada do mapa ou a
+correção manual de onde veio), comparado ao rótulo. LAT_ESPERADA/LON_ESPERADA ficam vazias
+e podem ser preenchidas com coordenadas de uma referência externa (ex.: ISTAT, GeoNames);
+quando presentes, a predição é avaliada pela distância, o que valida também as coordenadas
+das correções manuais.
+
+O golden set é gravado uma única vez em Benchmarks/golden_geocodificacao.csv (versionado);
+ajustes posteriores nos prefixos, substituições ou correções manuais não alteram os rótulos.
+O resultado de cada execução é gravado em JSON em .cache/benchmarks (ignorado pelo git; outro
+diretório pode ser indicado com BENCHMARK_DIR ou --saida) e comparado à execução anterior.
+
+Uso:
+    python -m views.comune.benchmark_geocodificacao
+    python -m views.comune.benchmark_geocodificacao --regerar-golden --tolerancia-km 10
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from unidecode import unidecode
+
+# Permitir execução direta a partir da raiz do projeto
+RAIZ_PROJETO = Path(__file__).parents[2]
+if str(RAIZ_PROJETO) not in sys.path:
+    sys.path.insert(0, str(RAIZ_PROJETO))
+
+from views.comune.data_loader import (
+    CORRECOES_MANUAIS,
+    _limpar_antes_normalizar,
+    _normalizar_localizacao,
+    carregar_coordenadas_mapa,
+    carregar_gazetteer_comuni,
+    geocodificar_comunes,
+)
+
+DIRETORIO_BENCHMARKS = Path(os.getenv('BENCHMARK_DIR', RAIZ_PROJETO / '.cache' / 'benchmarks'))
+ARQUIVO_GOLDEN = Path(__file__).parent / 'Benchmarks' / 'golden_geocodificacao.csv'
+ARQUIVO_RELATORIO = RAIZ_PROJETO / 'Relatório Comune - comune.csv'
+ARQUIVO_PLANILHA = Path(__file__).parent / 'Planilhas' / 'Emissões Italiana, Antes de movimentação geral - comune.csv'
+
+# Versão do critério de avaliação (execuções com critérios diferentes não são comparadas)
+VERSAO_AVALIACAO = 2
+
+# Nomes de região do mapa de coordenadas (em inglês) -> nome no gazetteer
+ALIASES_REGIAO = {'lombardy': 'lombardia', 'piedmont': 'piemonte', 'tuscany': 'toscana'}
+
+COLUNAS_GOLDEN = [
+    'ID', 'TEXTO_ORIGINAL', 'COMUNE_ESPERADO', 'PROVINCIA_ESPERADA', 'REGIAO_ESPERADA',
+    'VERIFICADO', 'LAT_ESPERADA', 'LON_ESPERADA',
+]
+
+# Etapas do geocodificador, identificadas pelo prefixo de COORD_SOURCE (ordem importa:
+# 'FuzzyMatch_PrefixMatch_90' pertence à etapa fuzzy)
+ETAPAS = [
+    ('manual', ('Correção Manual',)),
+    ('provincia_manual', ('Correção Província',)),
+    ('exata', ('ExactMatch_',)),
+    ('fuzzy', ('FuzzyMatch_',)),
+    ('prefixo', ('PrefixMatch_',)),
+    ('provincia', ('ProvinciaMatch', 'ProvinciaFuzzy_')),
+]
+
+
+def _normalizar_simples(texto):
+    """Normalização mínima usada apenas para rotular o golden set."""
+    if pd.isna(texto):
+        return ''
+    return ' '.join(unidecode(str(texto)).lower().replace("'", ' ').split())
+
+
+def _normalizar_regiao(texto):
+    """
+    Região normalizada, sem espaços nem hífens ('Trentino-Alto Adige/Südtirol' e
+    'trentino-alto adige' coincidem); '' quando não especificada.
+    """
+    regiao = _normalizar_simples(str(texto).split('/')[0] if pd.notna(texto) else '')
+    regiao = regiao.replace('-', '').replace(' ', '')
+    if regiao == 'naoespecificado':
+        return ''
+    return ALIASES_REGIAO.get(regiao, regiao)
+
+
+def _distancia_km(lat1, lon1, lat2, lon2):
+    """Distância haversine em km."""
+    raio_terra = 6371.0
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * raio_terra * math.asin(math.sqrt(a))
+
+
+def _etapa_da_fonte(fonte):
+    """Converte o valor de COORD_SOURCE na etapa do geocodificador."""
+    if pd.isna(fonte):
+        return 'sem_match'
+    for etapa, prefixos in ETAPAS:
+        if str(fonte).startswith(prefixos):
+            return etapa
+    return 'outra'
+
+
+def _maior_nome_conhecido(texto, nomes_conhecidos, max_palavras=4):
+    """
+    Procura o maior n-grama de texto que seja um nome do gazetteer.
+
+    Entre n-gramas do mesmo tamanho, vence o último; nomes de uma palavra precisam ter
+    ao menos 4 letras para evitar falsos rótulos.
+    """
+    palavras = texto.split()
+    for tamanho in range(min(max_palavras, len(palavras)), 0, -1):
+        for inicio in range(len(palavras) - tamanho, -1, -1):
+            candidato = ' '.join(palavras[inicio:inicio + tamanho])
+            if tamanho == 1 and len(candidato) < 4:
+                continue
+            if candidato in nomes_conhecidos:
+                return candidato
+    return None
+
+
+def gerar_golden_set():
+    """
+    Deriva o golden set a partir da planilha histórica e do gazetteer.
+
+    O rótulo é o maior nome de comune do gazetteer contido no primeiro trecho do texto
+    (antes de vírgula, parêntese ou barra), preferindo a última ocorrência ("Parrocchia di
+    ... in Trevignano" -> Trevignano); a província citada no texto desempata homônimos.
+    O registro é VERIFICADO quando o primeiro trecho é exatamente o nome do comune e o
+    comune é único no gazetteer (ou único na província citada).
+
+    Returns:
+        pandas.DataFrame: ID, TEXTO_ORIGINAL, COMUNE_ESPERADO, PROVINCIA_ESPERADA,
+        REGIAO_ESPERADA, VERIFICADO, LAT_ESPERADA, LON_ESPERADA (vazias)
+    """
+    ids_relatorio = pd.read_csv(ARQUIVO_RELATORIO, usecols=['ID'], dtype={'ID': str})['ID']
+    df_planilha = pd.read_csv(ARQUIVO_PLANILHA, usecols=['ID', 'Comune/Paróquia'], dtype=str)
+    df_planilha = df_planilha[df_planilha['ID'].isin(ids_relatorio)].dropna(subset=['Comune/Paróquia'])
+    df_planilha = df_planilha.drop_duplicates(subset=['ID']).rename(columns={'Comune/Paróquia': 'TEXTO_ORIGINAL'})
+
+    df_gazetteer = carregar_gazetteer_comuni()[['nome', 'provincia', 'regione', 'nome_norm', 'provincia_norm']]
+    df_gazetteer['nome_norm'] = df_gazetteer['nome_norm'].map(_normalizar_simples)
+    df_gazetteer['provincia_norm'] = df_gazetteer['provincia_norm'].map(_normalizar_simples)
+    gazetteer_por_nome = df_gazetteer.groupby('nome_norm')
+
+    linhas = []
+    for registro in df_planilha.itertuples(index=False):
+        partes = str(registro.TEXTO_ORIGINAL).replace('(', ',').replace('/', ',').split(',')
+        primeiro_trecho = _normalizar_simples(partes[0])
+        nome = _maior_nome_conhecido(primeiro_trecho, gazetteer_por_nome.groups)
+        if nome is None:
+            continue
+        candidatos = gazetteer_por_nome.get_group(nome)
+        dicas_provincia = {_normalizar_simples(p) for p in partes[1:]}
+        preferidos = candidatos[candidatos['provincia_norm'].isin(dicas_provincia)]
+        escolhido = (preferidos if not preferidos.empty else candidatos).iloc[0]
+        verificado = primeiro_trecho == nome and (len(candidatos) == 1 or len(preferidos) == 1)
+
+        linhas.append({
+            'ID': registro.ID,
+            'TEXTO_ORIGINAL': registro.TEXTO_ORIGINAL,
+            'COMUNE_ESPERADO': escolhido['nome'],
+            'PROVINCIA_ESPERADA': escolhido['provincia'],
+            'REGIAO_ESPERADA': escolhido['regione'],
+            'VERIFICADO': verificado,
+            'LAT_ESPERADA': None,
+            'LON_ESPERADA': None,
+        })
+
+    return pd.DataFrame(linhas, columns=COLUNAS_GOLDEN)
+
+
+def carregar_golden_set(regerar=False):
+    """
+    Lê o golden set salvo, gerando-o na primeira execução (ou quando regerar=True).
+    Arquivos de versões anteriores (sem a coluna VERIFICADO) são regerados.
+    """
+    if not regerar and ARQUIVO_GOLDEN.exists():
+        regerar = 'VERIFICADO' not in pd.read_csv(ARQUIVO_GOLDEN, nrows=0, encoding='utf-8').columns
+    if regerar:
+        df_golden = gerar_golden_set()
+        ARQUIVO_GOLDEN.parent.mkdir(parents=True, exist_ok=True)
+        df_golden.to_csv(ARQUIVO_GOLDEN, index=False, encoding='utf-8')
+        print(f"Golden set gerado com {len(df_golden)} registros em {ARQUIVO_GOLDEN}")
+        return df_golden
+    return pd.read_csv(ARQUIVO_GOLDEN, dtype={'ID': str}, encoding='utf-8')
+
+
+def _geocodificar(df_golden, df_coordenadas):
+    """Limpeza, normalização e geocodificação do texto de cada registro do golden set."""
+    df_items = pd.DataFrame({'ID': df_golden['ID'], 'COMUNE_ORIG': df_golden['TEXTO_ORIGINAL']})
+    # A planilha não separa a província; o geocodificador recebe apenas o texto do comune
+    df_items['PROVINCIA_NORM'] = 'nao especificado'
+    df_items['COMUNE_NORM'] = _normalizar_localizacao(_limpar_antes_normalizar(df_items['COMUNE_ORIG']))
+    return geocodificar_comunes(df_items, df_coordenadas)
+
+
+def executar_geocodificador(df_golden, df_coordenadas):
+    """
+    Executa limpeza, normalização e geocodificação sobre o golden set, medindo tempo
+    e pico de memória.
+
+    O tempo é medido numa execução sem tracemalloc (que deixa a alocação de objetos várias
+    vezes mais lenta); o pico de memória, numa segunda execução rastreada.
+
+    Returns:
+        tuple: (DataFrame geocodificado, segundos, pico de memória em MB)
+    """
+    inicio = time.perf_counter()
+    df_items = _geocodificar(df_golden, df_coordenadas)
+    segundos = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    try:
+        _geocodificar(df_golden, df_coordenadas)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return df_items, segundos, pico / (1024 * 1024)
+
+
+def _comunes_por_coordenada(df_coordenadas):
+    """
+    Comunes de cada coordenada que o geocodificador pode atribuir.
+
+    Returns:
+        tuple: (mapa, manuais) - dicionários (lat, lon) -> lista de (nome, região) das entradas
+        do mapa e -> nomes das correções manuais (nomes na normalização do geocodificador)
+    """
+    mapa, manuais = {}, {}
+    for nome, regiao, lat, lon in zip(df_coordenadas['COMUNE_MAPA_NORM'], df_coordenadas['PROVINCIA_MAPA_NORM'],
+                                      df_coordenadas['latitude'], df_coordenadas['longitude']):
+        chave = (round(float(lat), 4), round(float(lon), 4))
+        mapa.setdefault(chave, []).append((nome, _normalizar_regiao(regiao)))
+    for nome, (lat, lon, _) in CORRECOES_MANUAIS.items():
+        manuais.setdefault((round(lat, 4), round(lon, 4)), []).append(nome)
+    return mapa, manuais
+
+
+def _comune_correto(etapa, lat, lon, esperado, comunes):
+    """
+    Verifica se a coordenada atribuída pertence ao comune esperado.
+
+    A coordenada é associada à entrada de onde veio: correção manual (pelo nome da correção)
+    ou entrada do mapa (nome e, quando houver, região). Os nomes são comparados na
+    normalização do geocodificador, aplicada ao rótulo do gazetteer. Etapas de província não
+    identificam o comune e nunca contam como corretas.
+    """
+    if pd.isna(lat) or pd.isna(lon) or etapa.startswith('provincia'):
+        return False
+    mapa, manuais = comunes
+    chave = (round(float(lat), 4), round(float(lon), 4))
+    nome_esperado = _normalizar_localizacao(pd.Series([esperado['COMUNE_ESPERADO']])).iloc[0]
+    if etapa == 'manual':
+        return nome_esperado in manuais.get(chave, [])
+    regiao_esperada = _normalizar_regiao(esperado['REGIAO_ESPERADA'])
+    return any(
+        nome == nome_esperado and regiao in ('', regiao_esperada)
+        for nome, regiao in mapa.get(chave, [])
+    )
+
+
+def avaliar(df_golden, df_resultado, df_coordenadas, tolerancia_km):
+    """
+    Calcula precisão e recall por etapa sobre os registros verificados do golden set.
+
+    Uma predição é correta quando a coordenada pertence ao comune do rótulo (ver
+    _comune_correto) ou, se o rótulo tiver coordenadas de referência externa, quando fica a
+    até tolerancia_km delas.
+    Precisão da etapa = corretas / resolvidas pela etapa; recall da etapa = corretas /
+    total avaliado (a soma dos recalls é o recall geral).
+    """
+    df_golden = df_golden[df_golden['VERIFICADO'].astype(str).str.lower() == 'true']
+    df = df_golden.merge(
+        df_resultado[['ID', 'latitude', 'longitude', 'COORD_SOURCE']], on='ID', how='left'
+    )
+    df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+    df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+    df['ETAPA'] = df['COORD_SOURCE'].map(_etapa_da_fonte)
+    comunes = _comunes_por_coordenada(df_coordenadas)
+    com_referencia = df['LAT_ESPERADA'].notna() & df['LON_ESPERADA'].notna()
+    df['CORRETO'] = [
+        pd.notna(registro.latitude) and pd.notna(registro.longitude) and _distancia_km(
+            registro.latitude, registro.longitude, registro.LAT_ESPERADA, registro.LON_ESPERADA
+        ) <= tolerancia_km
+        if referencia else
+        _comune_correto(registro.ETAPA, registro.latitude, registro.longitude, registro._asdict(), comunes)
+        for registro, referencia in zip(df.itertuples(index=False), com_referencia)
+    ]
+
+    total = len(df)
+    por_etapa = {}
+    for etapa in [nome for nome, _ in ETAPAS] + ['outra']:
+        df_etapa = df[df['ETAPA'] == etapa]
+        corretas = int(df_etapa['CORRETO'].sum())
+        por_etapa[etapa] = {
+            'resolvidos': len(df_etapa),
+            'corretos': corretas,
+            'precisao': round(corretas / len(df_etapa), 4) if len(df_etapa) else None,
+            'recall': round(corretas / total, 4) if total else None,
+        }
+
+    resolvidos = int((df['ETAPA'] != 'sem_match').sum())
+    corretos = int(df['CORRETO'].sum())
+    geral = {
+        'total': total,
+        'com_coordenada_referencia': int(com_referencia.sum()),
+        'resolvidos': resolvidos,
+        'sem_match': total - resolvidos,
+        'corretos': corretos,
+        'precisao': round(corretos / resolvidos, 4) if resolvidos else None,
+        'recall': round(corretos / total, 4) if total else None,
+    }
+    return geral, por_etapa
+
+
+def comparar_com_anterior(resultado, anterior):
+    """Gera o veredito de qualidade e desempenho em relação à execução anterior."""
+    if anterior is None:
+        return {'qualidade': 'sem referência', 'desempenho': 'sem referência'}
+
+    def _delta(atual, antes):
+        if atual is None or antes is None:
+            return None
+        return round(atual - antes, 4)
+
+    delta_precisao = _delta(resultado['geral']['precisao'], anterior['geral']['precisao'])
+    delta_recall = _delta(resultado['geral']['recall'], anterior['geral']['recall'])
+    delta_nomes_s = _delta(resultado['nomes_por_segundo'], anterior['nomes_por_segundo'])
+
+    if delta_precisao is None or delta_recall is None:
+        qualidade = 'indeterminado'
+    elif delta_precisao < 0 or delta_recall < 0:
+        qualidade = 'piorou'
+    elif delta_precisao > 0 or delta_recall > 0:
+        qualidade = 'melhorou'
+    else:
+        qualidade = 'igual'
+
+    # Variações de até 10% no throughput são tratadas como ruído
+    antes_nomes_s = anterior['nomes_por_segundo'] or 0
+    if not antes_nomes_s:
+        desempenho = 'indeterminado'
+    elif resultado['nomes_por_segundo'] < antes_nomes_s * 0.9:
+        desempenho = 'mais lento'
+    elif resultado['nomes_por_segundo'] > antes_nomes_s * 1.1:
+        desempenho = 'mais rápido'
+    else:
+        desempenho = 'igual'
+
+    return {
+        'qualidade': qualidade,
+        'desempenho': desempenho,
+        'delta_precisao': delta_precisao,
+        'delta_recall': delta_recall,
+        'delta_nomes_por_segundo': delta_nomes_s,
+        'referencia': anterior['arquivo'],
+    }
+
+
+def _ultimo_resultado(diretorio):
+    """Retorna o JSON da execução mais recente salva em `diretorio`, se usar o mesmo critério."""
+    arquivos = sorted(Path(diretorio).glob('geocodificacao_*.json'))
+    if not arquivos:
+        return None
+    with open(arquivos[-1], 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+    if anterior.get('versao_avaliacao') != VERSAO_AVALIACAO:
+        return None
+    anterior['arquivo'] = arquivos[-1].name
+    return anterior
+
+
+def executar_benchmark(tolerancia_km=15.0, regerar_golden=False, salvar=True, diretorio=None):
+    """
+    Executa o benchmark completo e, opcionalmente, salva o resultado em JSON (em diretorio ou,
+    por padrão, em DIRETORIO_BENCHMARKS).
+
+    Returns:
+        dict: métricas gerais, por etapa, throughput, memória e veredito
+    """
+    diretorio = Path(diretorio or DIRETORIO_BENCHMARKS)
+    df_golden = carregar_golden_set(regerar=regerar_golden)
+    df_coordenadas = carregar_coordenadas_mapa()
+    df_resultado, segundos, pico_mb = executar_geocodificador(df_golden, df_coordenadas)
+    geral, por_etapa = avaliar(df_golden, df_resultado, df_coordenadas, tolerancia_km)
+
+    nomes_unicos = df_resultado['COMUNE_NORM'].nunique()
+    resultado = {
+        'executado_em': datetime.now().isoformat(timespec='seconds'),
+        'versao_avaliacao': VERSAO_AVALIACAO,
+        'tolerancia_km': tolerancia_km,
+        'golden_set': ARQUIVO_GOLDEN.name,
+        'registros_golden': len(df_golden),
+        'geral': geral,
+        'por_etapa': por_etapa,
+        'segundos': round(segundos, 4),
+        'nomes_unicos': int(nomes_unicos),
+        'nomes_por_segundo': round(nomes_unicos / segundos, 2) if segundos > 0 else None,
+        'registros_por_segundo': round(len(df_resultado) / segundos, 2) if segundos > 0 else None,
+        'pico_memoria_mb': round(pico_mb, 2),
+    }
+    resultado['veredito'] = comparar_com_anterior(resultado, _ultimo_resultado(diretorio))
+
+    if salvar:
+        diretorio.mkdir(parents=True, exist_ok=True)
+        destino = diretorio / f"geocodificacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        resultado['arquivo'] = str(destino)
+
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de qualidade e desempenho da geocodificação de COMUNE")
+    parser.add_argument('--tolerancia-km', type=float, default=15.0,
+                        help="Distância máxima (km) para considerar uma coordenada correta")
+    parser.add_argument('--regerar-golden', action='store_true',
+                        help="Regera o golden set a partir da planilha e do gazetteer")
+    parser.add_argument('--nao-salvar', action='store_true',
+                        help="Apenas exibe o resultado, sem gravar o JSON")
+    parser.add_argument('--saida', default=None,
+                        help=f"Diretório do JSON de resultado (padrão: {DIRETORIO_BENCHMARKS})")
+    args = parser.parse_args()
+
+    resultado = executar_benchmark(
+        tolerancia_km=args.tolerancia_km,
+        regerar_golden=args.regerar_golden,
+        salvar=not args.nao_salvar,
+        diretorio=args.saida,
+    )
+
+    print("\n=== BENCHMARK DE GEOCODIFICAÇÃO ===")
+    geral = resultado['geral']
+    print(f"Golden set: {resultado['registros_golden']} registros, {geral['total']} verificados | "
+          f"resolvidos: {geral['resolvidos']} | corretos: {geral['corretos']}")
+    print(f"Precisão geral: {geral['precisao']} | Recall geral: {geral['recall']}")
+    for etapa, metricas in resultado['por_etapa'].items():
+        if metricas['resolvidos']:
+            print(f"  {etapa:<17} resolvidos={metricas['resolvidos']:<5} "
+                  f"precisão={metricas['precisao']} recall={metricas['recall']}")
+    print(f"Nomes/s: {resultado['nomes_por_segundo']} | Pico de memória: {resultado['pico_memoria_mb']} MB")
+    print(f"Veredito: qualidade {resultado['veredito']['qualidade']}, desempenho {resultado['veredito']['desempenho']}")
+    if resultado.get('arquivo'):
+        print(f"Resultado salvo em {resultado['arquivo']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 from api.bitrix_connector import load_bitrix_data, get_credentials
+from api.stage_dictionary import get_stage_dictionary
+from utils.reference_data import load_reference_table, read_csv_typed
 from datetime import datetime
 from dotenv import load_dotenv
 import os
@@ -21,6 +23,148 @@ except ImportError:
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# Dicionário de correções manuais para casos específicos
+CORRECOES_MANUAIS = {
+    # Comune: (latitude, longitude, fonte)
+    "piavon": (45.7167, 12.4333, "Correção Manual"),
+    "vazzola": (45.8333, 12.3333, "Correção Manual"),
+    "oderzo": (45.7833, 12.4833, "Correção Manual"),
+    "valdobbiadene": (45.9000, 12.0333, "Correção Manual"),
+    "motta di livenza": (45.7833, 12.6167, "Correção Manual"),
+    "susegana": (45.8500, 12.2500, "Correção Manual"),
+    "vittorio veneto": (45.9833, 12.3000, "Correção Manual"),
+    "boara polesine": (45.0333, 11.7833, "Correção Manual"),
+    "mansuè": (45.8333, 12.5167, "Correção Manual"),
+    "san dona di piave": (45.6333, 12.5667, "Correção Manual"),
+    "godego": (45.7000, 11.8667, "Correção Manual"),
+    "castello di godego": (45.7000, 11.8667, "Correção Manual"),
+    "legnago": (45.1833, 11.3167, "Correção Manual"),
+    "stienta": (44.9500, 11.5500, "Correção Manual"),
+    "montebelluna": (45.7833, 12.0500, "Correção Manual"),
+    "vigasio": (45.3167, 10.9333, "Correção Manual"),
+    "villorba": (45.7333, 12.2333, "Correção Manual"),
+    "bondeno": (44.8833, 11.4167, "Correção Manual"),
+    "trevignano": (45.7333, 12.1000, "Correção Manual"),
+    "cavarzere": (45.1333, 12.0667, "Correção Manual"),
+    "arcade": (45.7333, 12.2000, "Correção Manual"),
+    "castelfranco veneto": (45.6667, 11.9333, "Correção Manual"),
+    "gaiarine": (45.9000, 12.4833, "Correção Manual"),
+    "borso del grappa": (45.8167, 11.8000, "Correção Manual"),
+    "cittadella": (45.6500, 11.7833, "Correção Manual"),
+    "albignasego": (45.3667, 11.8500, "Correção Manual"),
+    "zero branco": (45.6167, 12.1667, "Correção Manual"),
+    "sona": (45.4333, 10.8333, "Correção Manual"),
+    "lendinara": (45.0833, 11.5833, "Correção Manual"),
+    # Novas correções manuais
+    "annone veneto": (45.8000, 12.7000, "Correção Manual"),
+    "campagna lupia": (45.3667, 12.1000, "Correção Manual"),
+    "campolongo maggiore": (45.3000, 12.0500, "Correção Manual"),
+    "fossalta di portogruaro": (45.7833, 12.9000, "Correção Manual"),
+    "meolo": (45.6167, 12.4667, "Correção Manual"),
+    "marcon": (45.5500, 12.3000, "Correção Manual"),
+    "pramaggiore": (45.7833, 12.7500, "Correção Manual"),
+    "san stino di livenza": (45.7333, 12.6833, "Correção Manual"),
+    "spinea": (45.4833, 12.1667, "Correção Manual"),
+    "scorzè": (45.5833, 12.1000, "Correção Manual"),
+    "salgareda": (45.7167, 12.5000, "Correção Manual"),
+    "pravisdomini": (45.8167, 12.6333, "Correção Manual"),
+    "cinto caomaggiore": (45.8167, 12.8333, "Correção Manual"),
+    "ceggia": (45.6833, 12.6333, "Correção Manual"),
+    "casale sul sile": (45.5833, 12.3333, "Correção Manual"),
+    "mira": (45.4333, 12.1333, "Correção Manual"),
+    "mogliano veneto": (45.5833, 12.2333, "Correção Manual"),
+    "noale": (45.5500, 12.0667, "Correção Manual"),
+    "preganziol": (45.6000, 12.2667, "Correção Manual"),
+    "quarto d'altino": (45.5667, 12.3667, "Correção Manual"),
+    "lancenigo": (45.7000, 12.2500, "Correção Manual"),
+    "sanguinetto": (45.1833, 11.1500, "Correção Manual"),
+    "bovolone": (45.2500, 11.1167, "Correção Manual"),
+    "roncade": (45.6333, 12.3833, "Correção Manual"),
+    "casier": (45.6500, 12.3000, "Correção Manual"),
+    "paese": (45.7167, 12.1667, "Correção Manual"),
+    "castelfranco": (45.6667, 11.9333, "Correção Manual"),
+    "pederobba": (45.8500, 11.9833, "Correção Manual"),
+    "vedelago": (45.7000, 12.0333, "Correção Manual"),
+    "riese pio x": (45.7333, 11.9167, "Correção Manual"),
+    "altivole": (45.7833, 11.9333, "Correção Manual"),
+    "camposampiero": (45.5667, 11.9333, "Correção Manual"),
+    "trebaseleghe": (45.5667, 12.0333, "Correção Manual"),
+    "noventa padovana": (45.3833, 11.9500, "Correção Manual"),
+    "chioggia": (45.2167, 12.2833, "Correção Manual"),
+    "motta": (45.7833, 12.6167, "Correção Manual")
+}
+
+# Correções de províncias típicas italianas (usadas quando o comune não é encontrado)
+PROVINCIAS_MANUAIS = {
+    "treviso": (45.6667, 12.2500, "Correção Província"),
+    "venezia": (45.4375, 12.3358, "Correção Província"),
+    "padova": (45.4167, 11.8667, "Correção Província"),
+    "verona": (45.4386, 10.9928, "Correção Província"),
+    "vicenza": (45.5500, 11.5500, "Correção Província"),
+    "rovigo": (45.0667, 11.7833, "Correção Província"),
+    "mantova": (45.1500, 10.7833, "Correção Província"),
+    "belluno": (46.1333, 12.2167, "Correção Província"),
+    "pordenone": (45.9667, 12.6500, "Correção Província"),
+    "udine": (46.0667, 13.2333, "Correção Província"),
+    "cremona": (45.1333, 10.0333, "Correção Província"),
+    "brescia": (45.5417, 10.2167, "Correção Província"),
+    "bergamo": (45.6950, 9.6700, "Correção Província"),
+    "milano": (45.4669, 9.1900, "Correção Província"),
+    "cosenza": (39.3000, 16.2500, "Correção Província"),
+    "salerno": (40.6806, 14.7594, "Correção Província"),
+    "caserta": (41.0667, 14.3333, "Correção Província"),
+    "napoli": (40.8333, 14.2500, "Correção Província"),
+    "potenza": (40.6333, 15.8000, "Correção Província"),
+    "ferrara": (44.8333, 11.6167, "Correção Província"),
+    "bologna": (44.4939, 11.3428, "Correção Província"),
+    "lucca": (43.8428, 10.5039, "Correção Província"),
+    "roma": (41.9000, 12.5000, "Correção Província"),
+    "benevento": (41.1333, 14.7833, "Correção Província"),
+    "campobasso": (41.5667, 14.6667, "Correção Província"),
+    "cagliari": (39.2278, 9.1111, "Correção Província"),
+    "messina": (38.1936, 15.5542, "Correção Província"),
+    "catanzaro": (38.9000, 16.6000, "Correção Província"),
+    "palermo": (38.1111, 13.3517, "Correção Província"),
+    # Novas adições
+    "trento": (46.0667, 11.1167, "Correção Província"),
+    "bolzano": (46.5000, 11.3500, "Correção Província"),
+    "gorizia": (45.9419, 13.6167, "Correção Província"),
+    "trieste": (45.6486, 13.7772, "Correção Província"),
+    "modena": (44.6458, 10.9256, "Correção Província"),
+    "parma": (44.8015, 10.3280, "Correção Província"),
+    "reggio emilia": (44.6979, 10.6312, "Correção Província"),
+    "piacenza": (45.0472, 9.6997, "Correção Província"),
+    "ravenna": (44.4167, 12.2000, "Correção Província"),
+    "forlì": (44.2225, 12.0408, "Correção Província"),
+    "rimini": (44.0592, 12.5683, "Correção Província"),
+    "ancona": (43.6167, 13.5167, "Correção Província"),
+    "pesaro": (43.9100, 12.9139, "Correção Província"),
+    "macerata": (43.3000, 13.4500, "Correção Província"),
+    "fermo": (43.1583, 13.7167, "Correção Província"),
+    "ascoli piceno": (42.8500, 13.5833, "Correção Província"),
+    "perugia": (43.1167, 12.3833, "Correção Província"),
+    "terni": (42.5667, 12.6500, "Correção Província"),
+    "firenze": (43.7714, 11.2542, "Correção Província"),
+    "prato": (43.8833, 11.1000, "Correção Província"),
+    "pistoia": (43.9333, 10.9167, "Correção Província"),
+    "massa": (44.0333, 10.1500, "Correção Província"),
+    "lucca": (43.8500, 10.5000, "Correção Província"),
+    "pisa": (43.7167, 10.3833, "Correção Província"),
+    "livorno": (43.5500, 10.3167, "Correção Província"),
+    "arezzo": (43.4667, 11.8833, "Correção Província"),
+    "siena": (43.3167, 11.3500, "Correção Província"),
+    "grosseto": (42.7667, 11.1167, "Correção Província"),
+    "viterbo": (42.4167, 12.1000, "Correção Província"),
+    "rieti": (42.4000, 12.8500, "Correção Província"),
+    "latina": (41.4667, 12.9000, "Correção Província"),
+    "frosinone": (41.6333, 13.3500, "Correção Província"),
+    "caserta": (41.0833, 14.3333, "Correção Província"),
+    "isernia": (41.6000, 14.2333, "Correção Província"),
+    "chieti": (42.3500, 14.1667, "Correção Província"),
+    "pescara": (42.4667, 14.2000, "Correção Província"),
+    "teramo": (42.6667, 13.7000, "Correção Província")
+}
+
 def _limpar_antes_normalizar(series):
     """Tenta remover texto extra após vírgula, parêntese, barra ou hífen e prefixos natti/matri."""
     if not isinstance(series, pd.Series):
@@ -214,25 +358,38 @@ def _normalizar_localizacao(series):
     
     return normalized
 
+# Formato das datas exportadas do Bitrix nas planilhas históricas (dia primeiro)
+FORMATO_DATA_PLANILHA = '%d/%m/%Y %H:%M:%S'
+
+def _ler_datas_solicitacao(csv_path):
+    """Lê a planilha histórica com dtypes e formato de data explícitos."""
+    df_datas = read_csv_typed(
+        csv_path,
+        usecols=['ID', 'Movido em'],
+        dtypes={'ID': str, 'Movido em': str},
+        date_columns={'Movido em': FORMATO_DATA_PLANILHA}
+    )
+    # Renomear colunas
+    df_datas = df_datas.rename(columns={'Movido em': 'DATA_SOLICITACAO_ORIGINAL'})
+    # Remover linhas onde a data não pôde ser convertida ou o ID é nulo
+    df_datas.dropna(subset=['ID', 'DATA_SOLICITACAO_ORIGINAL'], inplace=True)
+    # Remover IDs duplicados, mantendo o primeiro
+    df_datas.drop_duplicates(subset=['ID'], keep='first', inplace=True)
+    return df_datas.reset_index(drop=True)
+
 def carregar_datas_solicitacao():
     """
     Carrega as datas de solicitação originais do arquivo CSV.
+
+    O arquivo é estático: o resultado fica em cache (memória e disco) enquanto o
+    mtime do CSV não mudar.
     """
     # Construir o caminho relativo para o arquivo CSV
     script_dir = os.path.dirname(__file__) # Diretório atual do script
     csv_path = os.path.join(script_dir, 'Planilhas', 'Emissões Italiana, Antes de movimentação geral - comune.csv')
 
     try:
-        df_datas = pd.read_csv(csv_path, usecols=['ID', 'Movido em'], dtype={'ID': str})
-        # Renomear colunas
-        df_datas = df_datas.rename(columns={'Movido em': 'DATA_SOLICITACAO_ORIGINAL'})
-        # Converter para datetime, tratando erros
-        df_datas['DATA_SOLICITACAO_ORIGINAL'] = pd.to_datetime(df_datas['DATA_SOLICITACAO_ORIGINAL'], errors='coerce')
-        # Remover linhas onde a data não pôde ser convertida ou o ID é nulo
-        df_datas.dropna(subset=['ID', 'DATA_SOLICITACAO_ORIGINAL'], inplace=True)
-        # Remover IDs duplicados, mantendo o primeiro (ou último, dependendo da lógica desejada)
-        df_datas.drop_duplicates(subset=['ID'], keep='first', inplace=True)
-        return df_datas
+        return load_reference_table(csv_path, _ler_datas_solicitacao, key='datas_solicitacao')
     except FileNotFoundError:
         st.error(f"Arquivo CSV não encontrado em: {csv_path}")
         return pd.DataFrame({'ID': [], 'DATA_SOLICITACAO_ORIGINAL': []})
@@ -240,6 +397,38 @@ def carregar_datas_solicitacao():
         st.error(f"Erro ao ler o arquivo CSV: {e}")
         return pd.DataFrame({'ID': [], 'DATA_SOLICITACAO_ORIGINAL': []})
 
+def _ler_mapa_italia(json_path):
+    """Lê o JSON de coordenadas com tipos explícitos (texto para nomes, float para lat/lng)."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data_json = json.load(f)
+    df_coords = pd.DataFrame(data_json)
+    for col in ['city', 'admin_name']:
+        if col in df_coords.columns:
+            df_coords[col] = df_coords[col].astype(str)
+    for col in ['lat', 'lng']:
+        if col in df_coords.columns:
+            df_coords[col] = pd.to_numeric(df_coords[col], errors='coerce')
+    return df_coords
+
+def _ler_gazetteer_comuni(csv_path):
+    """Lê o gazetteer de comuni italianos mantendo códigos ISTAT como texto."""
+    return read_csv_typed(csv_path, dtypes=str)
+
+def carregar_gazetteer_comuni():
+    """
+    Carrega o gazetteer data/comuni_italiani.csv (nome, província, região e variações
+    normalizadas de cada comune), com cache pelo mtime do arquivo.
+    """
+    csv_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'comuni_italiani.csv')
+    try:
+        return load_reference_table(os.path.normpath(csv_path), _ler_gazetteer_comuni, key='gazetteer_comuni')
+    except FileNotFoundError:
+        st.error(f"Arquivo do gazetteer não encontrado em: {csv_path}")
+        return pd.DataFrame()
+    except Exception as e:
+        st.error(f"Erro ao ler o gazetteer de comuni: {e}")
+        return pd.DataFrame()
+
 def carregar_coordenadas_mapa():
     """
     Carrega as coordenadas do arquivo JSON mapa_italia.json e normaliza.
@@ -248,9 +437,7 @@ def carregar_coordenadas_mapa():
     json_path = os.path.join(script_dir, 'Mapa', 'mapa_italia.json')
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            data_json = json.load(f)
-        df_coords = pd.DataFrame(data_json)
+        df_coords = load_reference_table(json_path, _ler_mapa_italia, key='mapa_italia')
         
         cols_necessarias = ['city', 'admin_name', 'lat', 'lng']
         if not all(col in df_coords.columns for col in cols_necessarias):
@@ -292,62 +479,21 @@ def carregar_coordenadas_mapa():
         st.error(f"Erro ao ler ou processar o arquivo JSON de coordenadas: {e}")
         return pd.DataFrame()
 
-def carregar_dados_comune(force_reload=False):
-    """
-    Carrega dados do Bitrix, normaliza locais (com limpeza prévia), 
-    junta datas e coordenadas (APENAS fuzzy matching no Comune).
-    
-    Args:
-        force_reload (bool): Se True, força o recarregamento dos dados ignorando o cache
-        
-    Returns:
-        pandas.DataFrame: DataFrame com os dados processados
+def geocodificar_comunes(df_items, df_coordenadas):
     """
-    # Verificar se deve forçar o recarregamento
-    if force_reload:
-        st.info("Forçando recarregamento completo dos dados do Comune (ignorando cache)")
-    
-    # --- Carregar Bitrix --- 
-    BITRIX_TOKEN, BITRIX_URL = get_credentials()
-    url_items = f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=crm_dynamic_items_1052"
-    category_filter = {"dimensionsFilters": [[{
-        "fieldName": "CATEGORY_ID", "values": ["22"], "type": "INCLUDE", "operator": "EQUALS"
-    }]]}
-    df_items = load_bitrix_data(url_items, filters=category_filter, force_reload=force_reload)
-    if df_items is None or df_items.empty: return pd.DataFrame()
-    if 'ID' not in df_items.columns: return pd.DataFrame()
-    df_items['ID'] = df_items['ID'].astype(str)
+    Atribui coordenadas aos registros a partir de COMUNE_NORM e PROVINCIA_NORM.
 
-    # --- Normalizar Locais Bitrix (com limpeza prévia do Comune) --- 
-    col_provincia_bitrix = 'UF_CRM_12_1743015702671'
-    col_comune_bitrix = 'UF_CRM_12_1722881735827'
+    Aplica, em ordem, as correções manuais, os matches exatos, o fuzzy matching,
+    a correspondência por prefixo e, por último, a província. Cada registro recebe
+    latitude, longitude e a etapa que o resolveu em COORD_SOURCE.
 
-    if col_provincia_bitrix in df_items.columns:
-        df_items['PROVINCIA_ORIG'] = df_items[col_provincia_bitrix]
-        # Normalizar província (pode não ser usada para merge, mas útil para exibição)
-        df_items['PROVINCIA_NORM'] = _normalizar_localizacao(df_items[col_provincia_bitrix])
-    else:
-        df_items['PROVINCIA_ORIG'] = 'Não Especificado'; df_items['PROVINCIA_NORM'] = 'nao especificado'
+    Args:
+        df_items (pandas.DataFrame): Registros com as colunas COMUNE_NORM e PROVINCIA_NORM
+        df_coordenadas (pandas.DataFrame): Saída de carregar_coordenadas_mapa()
 
-    if col_comune_bitrix in df_items.columns:
-        df_items['COMUNE_ORIG'] = df_items[col_comune_bitrix]
-        # 1. Limpar antes de normalizar
-        comunes_limpos = _limpar_antes_normalizar(df_items[col_comune_bitrix])
-        # 2. Normalizar o resultado limpo
-        df_items['COMUNE_NORM'] = _normalizar_localizacao(comunes_limpos)
-    else:
-        df_items['COMUNE_ORIG'] = 'Não Especificado'; df_items['COMUNE_NORM'] = 'nao especificado'
-        
-    # --- Juntar Datas CSV --- 
-    df_datas_solicitacao = carregar_datas_solicitacao()
-    if not df_datas_solicitacao.empty:
-        df_items = pd.merge(df_items, df_datas_solicitacao, on='ID', how='left')
-        print(f"{df_items['DATA_SOLICITACAO_ORIGINAL'].notna().sum()}/{len(df_items)} registros com data.")
-    else: df_items['DATA_SOLICITACAO_ORIGINAL'] = pd.NaT
-    
-    # --- Juntar Coordenadas (JSON) --- 
-    df_coordenadas = carregar_coordenadas_mapa()
-    
+    Returns:
+        pandas.DataFrame: df_items com latitude, longitude e COORD_SOURCE
+    """
     df_items['latitude'] = pd.NA
     df_items['longitude'] = pd.NA
     df_items['COORD_SOURCE'] = pd.NA
@@ -363,156 +509,14 @@ def carregar_dados_comune(force_reload=False):
         if 'nao especificado' in json_provincias_norm_list: 
             json_provincias_norm_list.remove('nao especificado')
 
-        # Nova adição: Dicionário de correções manuais para casos específicos
-        correcoes_manuais = {
-            # Comune: (latitude, longitude, fonte)
-            "piavon": (45.7167, 12.4333, "Correção Manual"),
-            "vazzola": (45.8333, 12.3333, "Correção Manual"),
-            "oderzo": (45.7833, 12.4833, "Correção Manual"),
-            "valdobbiadene": (45.9000, 12.0333, "Correção Manual"),
-            "motta di livenza": (45.7833, 12.6167, "Correção Manual"),
-            "susegana": (45.8500, 12.2500, "Correção Manual"),
-            "vittorio veneto": (45.9833, 12.3000, "Correção Manual"),
-            "boara polesine": (45.0333, 11.7833, "Correção Manual"),
-            "mansuè": (45.8333, 12.5167, "Correção Manual"),
-            "san dona di piave": (45.6333, 12.5667, "Correção Manual"),
-            "godego": (45.7000, 11.8667, "Correção Manual"),
-            "castello di godego": (45.7000, 11.8667, "Correção Manual"),
-            "legnago": (45.1833, 11.3167, "Correção Manual"),
-            "stienta": (44.9500, 11.5500, "Correção Manual"),
-            "montebelluna": (45.7833, 12.0500, "Correção Manual"),
-            "vigasio": (45.3167, 10.9333, "Correção Manual"),
-            "villorba": (45.7333, 12.2333, "Correção Manual"),
-            "bondeno": (44.8833, 11.4167, "Correção Manual"),
-            "trevignano": (45.7333, 12.1000, "Correção Manual"),
-            "cavarzere": (45.1333, 12.0667, "Correção Manual"),
-            "arcade": (45.7333, 12.2000, "Correção Manual"),
-            "castelfranco veneto": (45.6667, 11.9333, "Correção Manual"),
-            "gaiarine": (45.9000, 12.4833, "Correção Manual"),
-            "borso del grappa": (45.8167, 11.8000, "Correção Manual"),
-            "cittadella": (45.6500, 11.7833, "Correção Manual"),
-            "albignasego": (45.3667, 11.8500, "Correção Manual"),
-            "zero branco": (45.6167, 12.1667, "Correção Manual"),
-            "sona": (45.4333, 10.8333, "Correção Manual"),
-            "lendinara": (45.0833, 11.5833, "Correção Manual"),
-            # Novas correções manuais
-            "annone veneto": (45.8000, 12.7000, "Correção Manual"),
-            "campagna lupia": (45.3667, 12.1000, "Correção Manual"),
-            "campolongo maggiore": (45.3000, 12.0500, "Correção Manual"),
-            "fossalta di portogruaro": (45.7833, 12.9000, "Correção Manual"),
-            "meolo": (45.6167, 12.4667, "Correção Manual"),
-            "marcon": (45.5500, 12.3000, "Correção Manual"),
-            "pramaggiore": (45.7833, 12.7500, "Correção Manual"),
-            "san stino di livenza": (45.7333, 12.6833, "Correção Manual"),
-            "spinea": (45.4833, 12.1667, "Correção Manual"),
-            "scorzè": (45.5833, 12.1000, "Correção Manual"),
-            "salgareda": (45.7167, 12.5000, "Correção Manual"),
-            "pravisdomini": (45.8167, 12.6333, "Correção Manual"),
-            "cinto caomaggiore": (45.8167, 12.8333, "Correção Manual"),
-            "ceggia": (45.6833, 12.6333, "Correção Manual"),
-            "casale sul sile": (45.5833, 12.3333, "Correção Manual"),
-            "mira": (45.4333, 12.1333, "Correção Manual"),
-            "mogliano veneto": (45.5833, 12.2333, "Correção Manual"),
-            "noale": (45.5500, 12.0667, "Correção Manual"),
-            "preganziol": (45.6000, 12.2667, "Correção Manual"),
-            "quarto d'altino": (45.5667, 12.3667, "Correção Manual"),
-            "lancenigo": (45.7000, 12.2500, "Correção Manual"),
-            "sanguinetto": (45.1833, 11.1500, "Correção Manual"),
-            "bovolone": (45.2500, 11.1167, "Correção Manual"),
-            "roncade": (45.6333, 12.3833, "Correção Manual"),
-            "casier": (45.6500, 12.3000, "Correção Manual"),
-            "paese": (45.7167, 12.1667, "Correção Manual"),
-            "castelfranco": (45.6667, 11.9333, "Correção Manual"),
-            "pederobba": (45.8500, 11.9833, "Correção Manual"),
-            "vedelago": (45.7000, 12.0333, "Correção Manual"),
-            "riese pio x": (45.7333, 11.9167, "Correção Manual"),
-            "altivole": (45.7833, 11.9333, "Correção Manual"),
-            "camposampiero": (45.5667, 11.9333, "Correção Manual"),
-            "trebaseleghe": (45.5667, 12.0333, "Correção Manual"),
-            "noventa padovana": (45.3833, 11.9500, "Correção Manual"),
-            "chioggia": (45.2167, 12.2833, "Correção Manual"),
-            "motta": (45.7833, 12.6167, "Correção Manual")
-        }
-
-        # Adicionar correções de províncias típicas italianas
-        provincias_manuais = {
-            "treviso": (45.6667, 12.2500, "Correção Província"),
-            "venezia": (45.4375, 12.3358, "Correção Província"),
-            "padova": (45.4167, 11.8667, "Correção Província"),
-            "verona": (45.4386, 10.9928, "Correção Província"),
-            "vicenza": (45.5500, 11.5500, "Correção Província"),
-            "rovigo": (45.0667, 11.7833, "Correção Província"),
-            "mantova": (45.1500, 10.7833, "Correção Província"),
-            "belluno": (46.1333, 12.2167, "Correção Província"),
-            "pordenone": (45.9667, 12.6500, "Correção Província"),
-            "udine": (46.0667, 13.2333, "Correção Província"),
-            "cremona": (45.1333, 10.0333, "Correção Província"),
-            "brescia": (45.5417, 10.2167, "Correção Província"),
-            "bergamo": (45.6950, 9.6700, "Correção Província"),
-            "milano": (45.4669, 9.1900, "Correção Província"),
-            "cosenza": (39.3000, 16.2500, "Correção Província"),
-            "salerno": (40.6806, 14.7594, "Correção Província"),
-            "caserta": (41.0667, 14.3333, "Correção Província"),
-            "napoli": (40.8333, 14.2500, "Correção Província"),
-            "potenza": (40.6333, 15.8000, "Correção Província"),
-            "ferrara": (44.8333, 11.6167, "Correção Província"),
-            "bologna": (44.4939, 11.3428, "Correção Província"),
-            "lucca": (43.8428, 10.5039, "Correção Província"),
-            "roma": (41.9000, 12.5000, "Correção Província"),
-            "benevento": (41.1333, 14.7833, "Correção Província"),
-            "campobasso": (41.5667, 14.6667, "Correção Província"),
-            "cagliari": (39.2278, 9.1111, "Correção Província"),
-            "messina": (38.1936, 15.5542, "Correção Província"),
-            "catanzaro": (38.9000, 16.6000, "Correção Província"),
-            "palermo": (38.1111, 13.3517, "Correção Província"),
-            # Novas adições
-            "trento": (46.0667, 11.1167, "Correção Província"),
-            "bolzano": (46.5000, 11.3500, "Correção Província"),
-            "gorizia": (45.9419, 13.6167, "Correção Província"),
-            "trieste": (45.6486, 13.7772, "Correção Província"),
-            "modena": (44.6458, 10.9256, "Correção Província"),
-            "parma": (44.8015, 10.3280, "Correção Província"),
-            "reggio emilia": (44.6979, 10.6312, "Correção Província"),
-            "piacenza": (45.0472, 9.6997, "Correção Província"),
-            "ravenna": (44.4167, 12.2000, "Correção Província"),
-            "forlì": (44.2225, 12.0408, "Correção Província"),
-            "rimini": (44.0592, 12.5683, "Correção Província"),
-            "ancona": (43.6167, 13.5167, "Correção Província"),
-            "pesaro": (43.9100, 12.9139, "Correção Província"),
-            "macerata": (43.3000, 13.4500, "Correção Província"),
-            "fermo": (43.1583, 13.7167, "Correção Província"),
-            "ascoli piceno": (42.8500, 13.5833, "Correção Província"),
-            "perugia": (43.1167, 12.3833, "Correção Província"),
-            "terni": (42.5667, 12.6500, "Correção Província"),
-            "firenze": (43.7714, 11.2542, "Correção Província"),
-            "prato": (43.8833, 11.1000, "Correção Província"),
-            "pistoia": (43.9333, 10.9167, "Correção Província"),
-            "massa": (44.0333, 10.1500, "Correção Província"),
-            "lucca": (43.8500, 10.5000, "Correção Província"),
-            "pisa": (43.7167, 10.3833, "Correção Província"),
-            "livorno": (43.5500, 10.3167, "Correção Província"),
-            "arezzo": (43.4667, 11.8833, "Correção Província"),
-            "siena": (43.3167, 11.3500, "Correção Província"),
-            "grosseto": (42.7667, 11.1167, "Correção Província"),
-            "viterbo": (42.4167, 12.1000, "Correção Província"),
-            "rieti": (42.4000, 12.8500, "Correção Província"),
-            "latina": (41.4667, 12.9000, "Correção Província"),
-            "frosinone": (41.6333, 13.3500, "Correção Província"),
-            "caserta": (41.0833, 14.3333, "Correção Província"),
-            "isernia": (41.6000, 14.2333, "Correção Província"),
-            "chieti": (42.3500, 14.1667, "Correção Província"),
-            "pescara": (42.4667, 14.2000, "Correção Província"),
-            "teramo": (42.6667, 13.7000, "Correção Província")
-        }
-
         # Aplicar correções manuais primeiro
         registros_atualizados = 0
         
         for idx, row in df_items.iterrows():
             # Verificar nome do comune nas correções manuais
             comune_norm = row['COMUNE_NORM']
-            if comune_norm in correcoes_manuais:
-                lat, lon, source = correcoes_manuais[comune_norm]
+            if comune_norm in CORRECOES_MANUAIS:
+                lat, lon, source = CORRECOES_MANUAIS[comune_norm]
                 df_items.at[idx, 'latitude'] = lat
                 df_items.at[idx, 'longitude'] = lon
                 df_items.at[idx, 'COORD_SOURCE'] = source
@@ -521,8 +525,8 @@ def carregar_dados_comune(force_reload=False):
                 
             # Verificar província se o comune não foi encontrado
             provincia_norm = row['PROVINCIA_NORM']
-            if pd.isna(row['latitude']) and provincia_norm in provincias_manuais:
-                lat, lon, source = provincias_manuais[provincia_norm]
+            if pd.isna(row['latitude']) and provincia_norm in PROVINCIAS_MANUAIS:
+                lat, lon, source = PROVINCIAS_MANUAIS[provincia_norm]
                 df_items.at[idx, 'latitude'] = lat
                 df_items.at[idx, 'longitude'] = lon
                 df_items.at[idx, 'COORD_SOURCE'] = source
@@ -775,6 +779,66 @@ def carregar_dados_comune(force_reload=False):
             
             print(f"Taxa de correspondência total: {match_rate:.1f}% ({total_matches}/{len(df_items)})")
     
+    return df_items
+
+def carregar_dados_comune(force_reload=False):
+    """
+    Carrega dados do Bitrix, normaliza locais (com limpeza prévia), 
+    junta datas e coordenadas (APENAS fuzzy matching no Comune).
+    
+    Args:
+        force_reload (bool): Se True, força o recarregamento dos dados ignorando o cache
+        
+    Returns:
+        pandas.DataFrame: DataFrame com os dados processados
+    """
+    # Verificar se deve forçar o recarregamento
+    if force_reload:
+        st.info("Forçando recarregamento completo dos dados do Comune (ignorando cache)")
+    
+    # --- Carregar Bitrix --- 
+    BITRIX_TOKEN, BITRIX_URL = get_credentials()
+    url_items = f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=crm_dynamic_items_1052"
+    category_filter = {"dimensionsFilters": [[{
+        "fieldName": "CATEGORY_ID", "values": ["22"], "type": "INCLUDE", "operator": "EQUALS"
+    }]]}
+    df_items = load_bitrix_data(url_items, filters=category_filter, force_reload=force_reload)
+    if df_items is None or df_items.empty: return pd.DataFrame()
+    if 'ID' not in df_items.columns: return pd.DataFrame()
+    df_items['ID'] = df_items['ID'].astype(str)
+
+    # --- Normalizar Locais Bitrix (com limpeza prévia do Comune) --- 
+    col_provincia_bitrix = 'UF_CRM_12_1743015702671'
+    col_comune_bitrix = 'UF_CRM_12_1722881735827'
+
+    if col_provincia_bitrix in df_items.columns:
+        df_items['PROVINCIA_ORIG'] = df_items[col_provincia_bitrix]
+        # Normalizar província (pode não ser usada para merge, mas útil para exibição)
+        df_items['PROVINCIA_NORM'] = _normalizar_localizacao(df_items[col_provincia_bitrix])
+    else:
+        df_items['PROVINCIA_ORIG'] = 'Não Especificado'; df_items['PROVINCIA_NORM'] = 'nao especificado'
+
+    if col_comune_bitrix in df_items.columns:
+        df_items['COMUNE_ORIG'] = df_items[col_comune_bitrix]
+        # 1. Limpar antes de normalizar
+        comunes_limpos = _limpar_antes_normalizar(df_items[col_comune_bitrix])
+        # 2. Normalizar o resultado limpo
+        df_items['COMUNE_NORM'] = _normalizar_localizacao(comunes_limpos)
+    else:
+        df_items['COMUNE_ORIG'] = 'Não Especificado'; df_items['COMUNE_NORM'] = 'nao especificado'
+        
+    # --- Juntar Datas CSV --- 
+    df_datas_solicitacao = carregar_datas_solicitacao()
+    if not df_datas_solicitacao.empty:
+        df_items = pd.merge(df_items, df_datas_solicitacao, on='ID', how='left')
+        print(f"{df_items['DATA_SOLICITACAO_ORIGINAL'].notna().sum()}/{len(df_items)} registros com data.")
+    else: df_items['DATA_SOLICITACAO_ORIGINAL'] = pd.NaT
+    
+    # --- Juntar Coordenadas (JSON) --- 
+    df_coordenadas = carregar_coordenadas_mapa()
+    
+    df_items = geocodificar_comunes(df_items, df_coordenadas)
+    
     # Aplicar limpeza final e conversão de tipos
     if 'latitude' in df_items.columns and 'longitude' in df_items.columns:
         # Converter coordenadas para numérico
@@ -934,38 +998,10 @@ def mapear_estagios_comune():
     """
     Retorna um dicionário com mapeamento dos estágios do COMUNE
     """
-    return {
-        "DT1052_22:UC_2QZ8S2": "PENDENTE",
-        "DT1052_22:UC_E1VKYT": "PESQUISA NÃO FINALIZADA",
-        "DT1052_22:UC_MVS02R": "DEVOLUTIVA EMISSOR",
-        "DT1052_22:NEW": "SOLICITAR",
-        "DT1052_22:UC_4RQBZV": "URGENTE",
-        "DT1052_22:UC_F0IRDH": "SOLICITAR - TEM INFO",
-        "DT1052_22:PREPARATION": "AGUARDANDO COMUNE/PARÓQUIA",
-        "DT1052_22:UC_S4DFU2": "AGUARDANDO COMUNE/PARÓQUIA - TEM INFO",
-        "DT1052_22:UC_1RC076": "AGUARDANDO PDF",
-        "DT1052_22:CLIENT": "ENTREGUE PDF",
-        "DT1052_22:UC_A9UEMO": "NEGATIVA COMUNE",
-        "DT1052_22:SUCCESS": "DOCUMENTO FISICO ENTREGUE",
-        "DT1052_22:FAIL": "CANCELADO"
-    }
+    return get_stage_dictionary('comune', use_crm_status=False).names
 
 def mapear_estagios_macro():
     """
     Retorna um dicionário com mapeamento dos estágios do COMUNE para a visão macro
     """
-    return {
-        "DT1052_22:UC_2QZ8S2": "PENDENTE",                    # PENDENTE
-        "DT1052_22:UC_E1VKYT": "PESQUISA NÃO FINALIZADA",     # PESQUISA NÃO FINALIZADA
-        "DT1052_22:UC_MVS02R": "DEVOLUTIVA EMISSOR",          # DEVOLUTIVA EMISSOR
-        "DT1052_22:NEW": "SOLICITAR",                         # SOLICITAR
-        "DT1052_22:UC_4RQBZV": "URGENTE",                     # URGENTE
-        "DT1052_22:UC_F0IRDH": "SOLICITAR - TEM INFO",        # SOLICITAR - TEM INFO
-        "DT1052_22:PREPARATION": "AGUARDANDO COMUNE/PARÓQUIA", # AGUARDANDO COMUNE/PARÓQUIA
-        "DT1052_22:UC_S4DFU2": "AGUARDANDO COMUNE/PARÓQUIA - TEM INFO", # AGUARDANDO COMUNE/PARÓQUIA - TEM INFO
-        "DT1052_22:UC_1RC076": "AGUARDANDO PDF",              # AGUARDANDO PDF
-        "DT1052_22:CLIENT": "ENTREGUE PDF",                   # ENTREGUE PDF
-        "DT1052_22:UC_A9UEMO": "NEGATIVA COMUNE",             # NEGATIVA COMUNE
-        "DT1052_22:SUCCESS": "DOCUMENTO FISICO ENTREGUE",     # DOCUMENTO FISICO ENTREGUE
-        "DT1052_22:FAIL": "CANCELADO"                         # CANCELADO
-    } 
\ No newline at end of file
+    return get_stage_dictionary('comune', use_crm_status=False).names 
\ No newline at end of file
@@ -11,6 +11,10 @@ import io
 import base64
 from PIL import Image
 from api.bitrix_connector import load_merged_data, get_higilizacao_fields, get_status_color
+from api.responsible_directory import get_responsible_directory
+from utils.ranking_engine import get_ranking_engine
+from utils.business_days import business_day_count, business_hours
+from utils.temporal_cube import get_temporal_cube
 import time
 import os
 import sys
@@ -52,6 +56,10 @@ def get_credentials():
 # URL base do Bitrix24 para API REST
 BITRIX_URL = get_credentials()
 
+# Dias da semana na ordem de datetime.weekday() (0 = segunda)
+DIAS_SEMANA = ["Segunda-feira", "Terça-feira", "Quarta-feira",
+               "Quinta-feira", "Sexta-feira", "Sábado", "Domingo"]
+
 def show_conclusoes():
     """
     Exibe a página de conclusões com métricas de produtividade e análises
@@ -114,11 +122,9 @@ def show_conclusoes():
     
         with col4:
             # Dia da semana
-            dias_semana = ["Segunda-feira", "Terça-feira", "Quarta-feira", 
-                        "Quinta-feira", "Sexta-feira", "Sábado", "Domingo"]
             dia_semana_selecionado = st.multiselect(
                 "Dia da semana",
-                options=dias_semana,
+                options=DIAS_SEMANA,
                 help="Deixe vazio para ver todos"
             )
         
@@ -158,6 +164,9 @@ def show_conclusoes():
                 message_container=message_container
             )
             
+            # Aproveitar os negócios carregados para manter o diretório de responsáveis atualizado
+            get_responsible_directory(32, refresh=False).merge_frame(df_todos)
+            
             # Armazenar na sessão
             st.session_state.df_conclusoes = df
             st.session_state.df_todos_conclusoes = df_todos
@@ -188,7 +197,7 @@ def show_conclusoes():
     
     # 2. Ranking de Produtividade
     st.subheader("Ranking de Produtividade")
-    mostrar_ranking_produtividade(df_filtrado, df_todos)
+    mostrar_ranking_produtividade(df_filtrado, df_todos, date_from, date_to, responsavel_selecionado, dia_semana_selecionado)
     
     # Separador
     st.markdown("---")
@@ -556,14 +565,12 @@ def carregar_dados_conclusoes(date_from=None, date_to=None, progress_bar=None, m
 
 def obter_lista_responsaveis():
     """
-    Obtém a lista de responsáveis disponíveis no Bitrix24
+    Obtém a lista de responsáveis disponíveis no Bitrix24 (diretório em memória, atualizado de forma incremental)
     """
     try:
-        # Carregar dados do Bitrix
-        df = load_merged_data(category_id=32)
-        if not df.empty and 'ASSIGNED_BY_NAME' in df.columns:
-            responsaveis = sorted(df['ASSIGNED_BY_NAME'].unique().tolist())
-            return responsaveis if responsaveis else ["Ana Clara", "Leonardo Reis", "Leticia", "Pamela"]
+        responsaveis = get_responsible_directory(32).names()
+        if responsaveis:
+            return responsaveis
     except Exception as e:
         st.error(f"Erro ao obter lista de responsáveis: {str(e)}")
     
@@ -630,13 +637,10 @@ def mostrar_metricas_destaque(df, df_todos, date_from, date_to):
     # Calcular métricas com dados originais
     total_conclusoes = len(df_filtrado)
     
-    # Carregar dados totais da página inicial
+    # Total de negócios da categoria (diretório de responsáveis, sem baixar a categoria inteira)
     try:
-        df_inicio = load_merged_data(category_id=32)
-        if not df_inicio.empty:
-            # Total de negócios (todos os registros)
-            total_negocios = len(df_inicio)
-            
+        total_negocios = get_responsible_directory(32).total_deals()
+        if total_negocios > 0:
             # Total de concluídos
             concluidos = len(df_filtrado)
             
@@ -694,35 +698,9 @@ def mostrar_metricas_destaque(df, df_todos, date_from, date_to):
     # Ajustar a data inicial para ser a data da primeira conclusão
     data_inicio_efetiva = max(date_from.date(), data_primeira_conclusao)
     
-    # SIMPLIFICAR: Contar dias úteis naturais (dias em que houve trabalho)
-    dias_uteis_naturais = 0
-    horas_uteis = 0
-    
-    # Criar uma lista para debug com detalhes de cada dia
-    dias_debug = []
-    
-    # Calcular dia a dia a partir da primeira conclusão
-    data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-    while data_atual.date() <= date_to.date():
-        # Dia da semana: 0 = segunda, 6 = domingo
-        dia_semana = data_atual.weekday()
-        
-        # Segunda a sábado são considerados dias úteis
-        if 0 <= dia_semana <= 5:  # Segunda a sábado
-            dias_uteis_naturais += 1
-            
-            # Registrar horas para média horária
-            if 0 <= dia_semana <= 4:  # Segunda a sexta
-                horas_uteis += 12  # 7h - 19h (12 horas)
-                dias_debug.append(f"{data_atual.strftime('%d/%m/%Y')} ({['Seg', 'Ter', 'Qua', 'Qui', 'Sex'][dia_semana]}): +1 dia, +12h")
-            else:  # Sábado
-                horas_uteis += 3   # 9h - 12h (3 horas)
-                dias_debug.append(f"{data_atual.strftime('%d/%m/%Y')} (Sáb): +1 dia, +3h")
-        else:  # Domingo
-            dias_debug.append(f"{data_atual.strftime('%d/%m/%Y')} (Dom): +0 dias, +0h")
-        
-        # Avançar para o próximo dia
-        data_atual += timedelta(days=1)
+    # Dias úteis (seg-sáb, sem feriados) e horas úteis (seg-sex 12h, sábado 3h) a partir da primeira conclusão
+    dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
+    horas_uteis = business_hours(data_inicio_efetiva, date_to.date())
     
     # Calcular médias
     # Média diária baseada em dias naturais (dias em que houve trabalho)
@@ -762,7 +740,7 @@ def mostrar_metricas_destaque(df, df_todos, date_from, date_to):
             <span style="font-weight: 700;">{data_inicio_efetiva.strftime('%d/%m/%Y')} a {date_to.strftime('%d/%m/%Y')}</span>
         </div>
         <div style="font-size: 18px; margin-bottom: 10px;">
-            <strong style="color: #4A148C;">Dias úteis (seg-sáb):</strong> 
+            <strong style="color: #4A148C;">Dias úteis (seg-sáb, exceto feriados):</strong> 
             <span style="font-weight: 800; font-size: 20px;">{dias_uteis_naturais}</span> dias | 
             <strong style="color: #4A148C;">Horas úteis:</strong> 
             <span style="font-weight: 800; font-size: 20px;">{horas_uteis}h</span>
@@ -777,166 +755,50 @@ def mostrar_metricas_destaque(df, df_todos, date_from, date_to):
 
 def calcular_dias_uteis(data_inicio, data_fim):
     """
-    Calcula o número de dias úteis entre duas datas (considerando 6 dias por semana)
+    Calcula o número de dias úteis entre duas datas (segunda a sábado, exceto feriados)
     
     Args:
-        data_inicio (datetime): Data inicial
-        data_fim (datetime): Data final
+        data_inicio (datetime): Data inicial (ou array de datas)
+        data_fim (datetime): Data final (ou array de datas)
         
     Returns:
-        int: Número de dias úteis
+        int: Número de dias úteis (pelo menos 1, para evitar divisão por zero)
     """
-    # Converter para datetime se não for
-    if not isinstance(data_inicio, datetime):
-        data_inicio = datetime.combine(data_inicio, datetime.min.time())
-    if not isinstance(data_fim, datetime):
-        data_fim = datetime.combine(data_fim, datetime.min.time())
-    
-    # Diferença em dias
-    delta = (data_fim - data_inicio).days + 1
-    
-    # Calcular número de semanas completas
-    semanas = delta // 7
-    dias_uteis = semanas * 6  # 6 dias úteis por semana
-    
-    # Calcular dias restantes
-    dias_restantes = delta % 7
-    
-    # Início da semana (0 = segunda, 6 = domingo)
-    dia_semana_inicio = data_inicio.weekday()
-    
-    # Contar dias restantes
-    for i in range(dias_restantes):
-        dia = (dia_semana_inicio + i) % 7
-        if dia < 6:  # Se não for domingo
-            dias_uteis += 1
-            
-    return max(1, dias_uteis)  # Retorna pelo menos 1 para evitar divisão por zero
+    return np.maximum(1, business_day_count(data_inicio, data_fim))
 
-def mostrar_ranking_produtividade(df, df_todos):
+def mostrar_ranking_produtividade(df, df_todos, date_from=None, date_to=None, responsaveis=None, dias_semana=None):
     """
     Exibe um ranking de produtividade dos responsáveis
     
+    O ranking vem do motor compartilhado com a Apresentação (utils.ranking_engine), que mantém as
+    contagens diárias por responsável e só processa as diferenças de cada nova carga.
+    
     Args:
         df (pandas.DataFrame): DataFrame com os dados concluídos
         df_todos (pandas.DataFrame): DataFrame com todos os dados (incluindo não concluídos)
+        date_from, date_to (date, optional): Período carregado
+        responsaveis (list, optional): Responsáveis selecionados no filtro
+        dias_semana (list, optional): Dias da semana selecionados no filtro (ex.: "Segunda-feira")
     """
     try:
-        # Usar os dados originais sem filtragem
-        df_filtrado = df
-        
         # Verificar se a coluna de responsáveis existe em df_todos
         if 'ASSIGNED_BY_NAME' not in df_todos.columns:
             st.error("Não foi possível gerar o ranking: coluna de responsáveis não encontrada.")
             return
         
-        # Agrupar por responsável e contar o número de conclusões para os que concluíram
-        if not df_filtrado.empty and 'ASSIGNED_BY_NAME' in df_filtrado.columns:
-            ranking_conclusoes = df_filtrado.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_CONCLUSOES')
-        else:
-            # Se não há conclusões, criar DataFrame vazio com as colunas necessárias
-            ranking_conclusoes = pd.DataFrame(columns=['ASSIGNED_BY_NAME', 'TOTAL_CONCLUSOES'])
-        
-        # Calcular a taxa de conclusão por responsável
-        total_por_responsavel = df_todos.groupby('ASSIGNED_BY_NAME').size().reset_index(name='TOTAL_ATRIBUIDOS')
-        
-        # Fazer merge outer para incluir todos os responsáveis, mesmo os que não tiveram conclusões
-        ranking = pd.merge(total_por_responsavel, ranking_conclusoes, on='ASSIGNED_BY_NAME', how='left')
-        
-        # Preencher valores NaN de conclusões com 0
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].fillna(0)
-        
-        # Converter para inteiro
-        ranking['TOTAL_CONCLUSOES'] = ranking['TOTAL_CONCLUSOES'].astype(int)
-        
-        # Calcular pendentes
-        ranking['PENDENTES'] = ranking['TOTAL_ATRIBUIDOS'] - ranking['TOTAL_CONCLUSOES']
-        
-        # Calcular taxa de conclusão
-        ranking['TAXA_CONCLUSAO'] = (ranking['TOTAL_CONCLUSOES'] / ranking['TOTAL_ATRIBUIDOS'] * 100).round(1)
-        
-        # Calcular dias trabalhados (dias em que cada responsável teve pelo menos uma conclusão)
-        if not df_filtrado.empty and 'DATA_CONCLUSAO' in df_filtrado.columns:
-            # Criar colunas auxiliares
-            df_temp = df_filtrado.copy()
-            df_temp['DATA'] = df_temp['DATA_CONCLUSAO'].dt.date
-            df_temp['DIA_SEMANA'] = df_temp['DATA_CONCLUSAO'].dt.weekday
-            
-            # Lista para armazenar os dados de dias trabalhados com primeira conclusão
-            dados_dias_trabalhados = []
-            
-            # Para cada responsável, calcular dias úteis a partir da primeira conclusão
-            for responsavel in df_temp['ASSIGNED_BY_NAME'].unique():
-                # Filtrar dados do responsável
-                df_resp = df_temp[df_temp['ASSIGNED_BY_NAME'] == responsavel]
-                
-                # Encontrar data da primeira conclusão
-                primeira_conclusao = df_resp['DATA'].min()
-                
-                # Encontrar data da última conclusão
-                ultima_conclusao = df_resp['DATA'].max()
-                
-                # Calcular dias úteis entre a primeira e a última conclusão
-                dias_uteis = 0
-                data_atual = datetime.combine(primeira_conclusao, datetime.min.time())
-                
-                while data_atual.date() <= ultima_conclusao:
-                    dia_semana = data_atual.weekday()
-                    if dia_semana <= 5:  # Segunda a sábado
-                        dias_uteis += 1
-                    data_atual += timedelta(days=1)
-                
-                # Dias em que o responsável realmente trabalhou (com conclusões)
-                dias_com_conclusao = df_resp['DATA'].nunique()
-                
-                # Adicionar à lista de dados
-                dados_dias_trabalhados.append({
-                    'ASSIGNED_BY_NAME': responsavel,
-                    'PRIMEIRA_CONCLUSAO': primeira_conclusao,
-                    'ULTIMA_CONCLUSAO': ultima_conclusao,
-                    'DIAS_UTEIS_PERIODO': dias_uteis,
-                    'DIAS_COM_CONCLUSAO': dias_com_conclusao
-                })
-            
-            # Converter para DataFrame
-            df_dias = pd.DataFrame(dados_dias_trabalhados)
-            
-            # Mesclar com o ranking
-            if not df_dias.empty:
-                ranking = pd.merge(ranking, df_dias, on='ASSIGNED_BY_NAME', how='left')
-                
-                # Usar os dias úteis do período como dias trabalhados
-                ranking['DIAS_TRABALHADOS'] = ranking['DIAS_UTEIS_PERIODO']
-            else:
-                ranking['DIAS_TRABALHADOS'] = 0
-        else:
-            ranking['DIAS_TRABALHADOS'] = 0
-        
-        # Preencher NaN em dias trabalhados com 0
-        ranking['DIAS_TRABALHADOS'] = ranking['DIAS_TRABALHADOS'].fillna(0)
-        
-        # Calcular média diária (evitando divisão por zero)
-        ranking['MEDIA_DIARIA'] = 0.0  # Valor padrão
-        mask = ranking['DIAS_TRABALHADOS'] > 0
-        ranking.loc[mask, 'MEDIA_DIARIA'] = (ranking.loc[mask, 'TOTAL_CONCLUSOES'] / ranking.loc[mask, 'DIAS_TRABALHADOS']).round(2)
-        
-        # Determinar o melhor valor para destaque (maior média diária)
-        if not ranking.empty and 'MEDIA_DIARIA' in ranking.columns:
-            melhor_media = ranking['MEDIA_DIARIA'].max()
-            
-            # Criar coluna de status para destacar
-            ranking['STATUS'] = ''
-            ranking.loc[ranking['MEDIA_DIARIA'] == melhor_media, 'STATUS'] = '🏆'
-        
-        # Ordenar pelo total de conclusões em ordem decrescente
-        ranking = ranking.sort_values('TOTAL_CONCLUSOES', ascending=False).reset_index(drop=True)
-        
-        # Adicionar coluna de posição
-        ranking.insert(0, 'POSICAO', ranking.index + 1)
+        # Atualizar o motor com a carga atual (sem custo quando os dados não mudaram) e consultar o ranking
+        motor = get_ranking_engine()
+        motor.update(df_todos, start=date_from, end=date_to)
+        ranking = motor.ranking(
+            start=date_from,
+            end=date_to,
+            responsibles=responsaveis or None,
+            weekdays=[DIAS_SEMANA.index(dia) for dia in dias_semana] if dias_semana else None
+        )
         
         # Formatação dos valores numéricos para exibição
-        ranking['POSICAO_FORMATADA'] = ranking['POSICAO'].apply(lambda x: f"{x}º")
-        ranking['MEDIA_DIARIA_FORMATADA'] = ranking['MEDIA_DIARIA'].apply(lambda x: f"{x:.2f}".replace('.', ','))
+        ranking['POSICAO_FORMATADA'] = ranking['POSICAO'].astype(str) + 'º'
+        ranking['MEDIA_DIARIA_FORMATADA'] = ranking['MEDIA_DIARIA'].map('{:.2f}'.format).str.replace('.', ',', regex=False)
         
         # Configuração das colunas para exibição com st.column_config
         colunas = {
@@ -1072,16 +934,15 @@ def mostrar_analises_temporais(df, date_from, date_to):
             st.error("A coluna 'DATA_CONCLUSAO' não foi encontrada nos dados.")
             return
 
-        # Preparar dados
-        df_valido = df.dropna(subset=['DATA_CONCLUSAO']).copy()
-        df_valido['DATA_CONCLUSAO'] = pd.to_datetime(df_valido['DATA_CONCLUSAO'])
+        # Contagens por dia, semana, dia da semana e hora (cubo temporal compartilhado com os slides)
+        cubo = get_temporal_cube(df)
         
-        if df_valido.empty:
+        if cubo.total() == 0:
             st.warning("Não há dados disponíveis para análises temporais.")
             return
 
         # Encontrar a data da primeira conclusão
-        data_primeira_conclusao = df_valido['DATA_CONCLUSAO'].min().date()
+        data_primeira_conclusao = cubo.first_day()
         
         # Ajustar a data inicial para ser a data da primeira conclusão
         if isinstance(date_from, datetime):
@@ -1095,22 +956,9 @@ def mostrar_analises_temporais(df, date_from, date_to):
         if not isinstance(date_to, datetime):
             date_to = datetime.combine(date_to, datetime.min.time())
         
-        # Calcular dias úteis (dias em que houve trabalho) a partir da primeira conclusão
-        dias_uteis_naturais = 0
-        horas_uteis = 0
-        
-        # Calcular dias úteis e horas úteis
-        data_atual = datetime.combine(data_inicio_efetiva, datetime.min.time())
-        while data_atual.date() <= date_to.date():
-            dia_semana = data_atual.weekday()
-            if dia_semana <= 5:  # Segunda a sábado
-                dias_uteis_naturais += 1
-                if dia_semana <= 4:  # Segunda a sexta
-                    horas_uteis += 12
-                else:  # Sábado
-                    horas_uteis += 3
-            # Domingo não conta
-            data_atual += timedelta(days=1)
+        # Calcular dias úteis e horas úteis a partir da primeira conclusão
+        dias_uteis_naturais = business_day_count(data_inicio_efetiva, date_to.date())
+        horas_uteis = business_hours(data_inicio_efetiva, date_to.date())
         
         # Mostrar informações sobre o período com destaque
         st.markdown(f"""
@@ -1153,9 +1001,6 @@ def mostrar_analises_temporais(df, date_from, date_to):
 
         # 1. Análise por Dia
         if tipo_analise == "Análise por Dia":
-            # Agrupar dados por dia para contar conclusões
-            df_diario_original = df_valido.groupby(df_valido['DATA_CONCLUSAO'].dt.date).size().reset_index(name='CONCLUSOES')
-            
             # Criar um DataFrame com todos os dias do período (incluindo dias sem conclusões)
             # Converter para datetime se não for
             if not isinstance(date_from, datetime):
@@ -1176,22 +1021,15 @@ def mostrar_analises_temporais(df, date_from, date_to):
             # Usar a data máxima entre a data mínima fixa e a data escolhida pelo usuário
             date_from_efetiva = max(date_from_dt, data_minima)
             
-            # Gerar lista de todos os dias no período
-            todas_datas = pd.date_range(start=date_from_efetiva, end=date_to_dt, freq='D')
-            df_todos_dias = pd.DataFrame({'DATA_CONCLUSAO': todas_datas.date})
-            
-            # Mesclar com dados originais (preservando todos os dias)
-            df_diario = pd.merge(df_todos_dias, df_diario_original, how='left', on='DATA_CONCLUSAO')
-            
-            # Preencher NaN com 0 (dias sem conclusões)
-            df_diario['CONCLUSOES'] = df_diario['CONCLUSOES'].fillna(0).astype(int)
+            # Conclusões de todos os dias do período (dias sem conclusões com 0)
+            df_diario = cubo.daily(start=date_from_efetiva, end=date_to_dt)
             
             # Média simples (média aritmética diária)
             media_diaria_simples = df_diario['CONCLUSOES'].mean()
             
             # Média ajustada (por dia útil natural a partir da primeira conclusão)
             total_conclusoes = df_diario['CONCLUSOES'].sum()
-            media_diaria_ajustada = round(total_conclusoes / dias_uteis_naturais, 2)
+            media_diaria_ajustada = round(total_conclusoes / max(1, dias_uteis_naturais), 2)
             
             # Calcular linha de tendência
             x = np.arange(len(df_diario))
@@ -1318,25 +1156,8 @@ def mostrar_analises_temporais(df, date_from, date_to):
         
         # 2. Análise por Dia da Semana
         elif tipo_analise == "Análise por Dia da Semana":
-            dias_semana_pt = {
-                'Monday': 'Segunda-feira',
-                'Tuesday': 'Terça-feira',
-                'Wednesday': 'Quarta-feira',
-                'Thursday': 'Quinta-feira',
-                'Friday': 'Sexta-feira',
-                'Saturday': 'Sábado',
-                'Sunday': 'Domingo'
-            }
-            df_valido['DIA_SEMANA'] = df_valido['DATA_CONCLUSAO'].dt.day_name().map(dias_semana_pt)
-            df_dia_semana = df_valido.groupby('DIA_SEMANA').agg({
-                'DATA_CONCLUSAO': 'count',
-                'ID': 'nunique'
-            }).reset_index()
-            df_dia_semana.columns = ['DIA_SEMANA', 'CONCLUSOES', 'PROCESSOS_UNICOS']
-            
-            ordem_dias = ['Segunda-feira', 'Terça-feira', 'Quarta-feira', 'Quinta-feira', 'Sexta-feira', 'Sábado', 'Domingo']
-            df_dia_semana['DIA_ORDEM'] = pd.Categorical(df_dia_semana['DIA_SEMANA'], categories=ordem_dias, ordered=True)
-            df_dia_semana = df_dia_semana.sort_values('DIA_ORDEM')
+            # Conclusões e processos distintos por dia da semana (segunda a domingo)
+            df_dia_semana = cubo.by_weekday()
             
             media_semanal = df_dia_semana['CONCLUSOES'].mean()
             max_valor = df_dia_semana['CONCLUSOES'].max()
@@ -1492,8 +1313,8 @@ def mostrar_analises_temporais(df, date_from, date_to):
 
         # 3. Análise por Hora
         elif tipo_analise == "Análise por Hora":
-            df_valido['HORA'] = df_valido['DATA_CONCLUSAO'].dt.hour
-            df_hora = df_valido.groupby('HORA').size().reset_index(name='CONCLUSOES')
+            # Apenas as horas com conclusões
+            df_hora = cubo.by_hour(fill=False)
             media_hora = df_hora['CONCLUSOES'].mean()
             max_valor = df_hora['CONCLUSOES'].max()
             min_valor = df_hora['CONCLUSOES'].min()
@@ -1667,8 +1488,8 @@ def mostrar_analises_temporais(df, date_from, date_to):
         
         # 4. Análise por Semana
         else:
-            df_valido['SEMANA'] = df_valido['DATA_CONCLUSAO'].dt.strftime('%Y-%V')
-            df_semanal = df_valido.groupby('SEMANA').size().reset_index(name='CONCLUSOES')
+            # Conclusões por semana ISO (YYYY-WW)
+            df_semanal = cubo.weekly()
             media_semanal = df_semanal['CONCLUSOES'].mean()
             max_valor = df_semanal['CONCLUSOES'].max()
             min_valor = df_semanal['CONCLUSOES'].min()
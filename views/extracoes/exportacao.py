@@ -0,0 +1,175 @@
+"""
+Pipeline de exportação de várias categorias para arquivo (CSV, Parquet ou XLSX).
+
+A exportação carregava as categorias uma após a outra com load_merged_data, mantinha todos os
+DataFrames completos em memória, juntava-os com pd.concat e gerava o CSV inteiro como bytes.
+Aqui:
+- as categorias são carregadas em paralelo (ThreadPoolExecutor);
+- as colunas selecionadas são projetadas antes da mescla crm_deal × crm_deal_uf
+  (parâmetro `columns` de load_merged_data), e cada resultado é reduzido às colunas exportadas;
+- cada categoria é gravada em blocos de CHUNK_ROWS linhas num arquivo temporário, na ordem
+  selecionada, e descartada em seguida. O XLSX usa xlsxwriter em modo constant_memory
+  (linha a linha) e o Parquet um grupo de linhas por bloco.
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_DISPONIVEL = True
+except ImportError:
+    PARQUET_DISPONIVEL = False
+
+# Linhas gravadas por bloco
+CHUNK_ROWS = 50_000
+
+# Categorias carregadas ao mesmo tempo
+MAX_WORKERS = 4
+
+# Limite de linhas de uma planilha XLSX (incluindo o cabeçalho)
+XLSX_MAX_ROWS = 1_048_576
+
+COLUNA_CATEGORIA = 'CATEGORIA_EXPORTACAO'
+
+FORMATOS = {
+    'CSV': {'extensao': 'csv', 'mime': 'text/csv'},
+    'XLSX': {'extensao': 'xlsx', 'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'Parquet': {'extensao': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+}
+
+
+def formatos_disponiveis():
+    """Formatos de exportação suportados neste ambiente (Parquet exige pyarrow)."""
+    return [f for f in FORMATOS if f != 'Parquet' or PARQUET_DISPONIVEL]
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        pd.DataFrame(columns=columns).to_csv(self.file, index=False)
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, index=False, header=False)
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    def __init__(self, path, columns):
+        import xlsxwriter
+        self.workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'nan_inf_to_errors': True,
+            'default_date_format': 'dd/mm/yyyy hh:mm',
+        })
+        self.sheet = self.workbook.add_worksheet('Exportação')
+        self.sheet.write_row(0, 0, columns)
+        self.row = 1
+
+    def write(self, chunk):
+        if self.row + len(chunk) > XLSX_MAX_ROWS:
+            raise ValueError(f"O XLSX comporta no máximo {XLSX_MAX_ROWS - 1} linhas; use CSV ou Parquet.")
+        # Valores ausentes viram células vazias; datas com fuso são gravadas no horário local
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for values in chunk.itertuples(index=False, name=None):
+            self.sheet.write_row(self.row, 0, [
+                v.tz_localize(None).to_pydatetime() if isinstance(v, pd.Timestamp) and v.tzinfo
+                else v for v in values
+            ])
+            self.row += 1
+
+    def close(self):
+        self.workbook.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    def write(self, chunk):
+        # Colunas como texto: as categorias podem trazer tipos diferentes na mesma coluna
+        table = pa.Table.from_pandas(chunk.astype('string'), preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is None:
+            pq.write_table(pa.table({c: pa.array([], pa.string()) for c in self.columns}), self.path)
+        else:
+            self.writer.close()
+
+
+_WRITERS = {'CSV': _CsvWriter, 'XLSX': _XlsxWriter, 'Parquet': _ParquetWriter}
+
+
+def exportar_categorias(categorias, date_from, date_to, colunas, formato='CSV', loader=None,
+                        max_workers=MAX_WORKERS, on_categoria=None):
+    """
+    Exporta as categorias para um arquivo temporário, sem montar o conjunto completo em memória.
+
+    Args:
+        categorias (list): IDs das categorias, na ordem em que serão gravadas
+        date_from, date_to (str): Período no formato AAAA-MM-DD
+        colunas (list): Colunas exportadas (colunas ausentes numa categoria ficam vazias)
+        formato (str): 'CSV', 'XLSX' ou 'Parquet'
+        loader (callable, optional): Carregador compatível com load_merged_data
+        max_workers (int): Categorias carregadas em paralelo
+        on_categoria (callable, optional): on_categoria(categoria, linhas) após gravar cada uma
+
+    Returns:
+        dict: caminho (arquivo temporário; o chamador o remove), linhas, colunas,
+        colunas_ausentes (não encontradas em nenhuma categoria) e previa (primeiras linhas)
+    """
+    if formato not in formatos_disponiveis():
+        raise ValueError(f"Formato de exportação indisponível: {formato}")
+    if loader is None:
+        from api.bitrix_connector import load_merged_data as loader
+
+    colunas = list(colunas)
+    if len(categorias) > 1:
+        colunas.append(COLUNA_CATEGORIA)
+
+    def carregar(categoria):
+        df = loader(category_id=categoria, date_from=date_from, date_to=date_to, debug=False, columns=colunas)
+        encontradas = set(df.columns)
+        if len(categorias) > 1 and not df.empty:
+            df[COLUNA_CATEGORIA] = f"Categoria {categoria}"
+        return df.reindex(columns=colunas), encontradas
+
+    fd, caminho = tempfile.mkstemp(suffix='.' + FORMATOS[formato]['extensao'], prefix='exportacao_')
+    os.close(fd)
+    writer = _WRITERS[formato](caminho, colunas)
+    linhas, encontradas, previa = 0, set(), []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(categorias)))) as executor:
+            for categoria, (df, colunas_categoria) in zip(categorias, executor.map(carregar, categorias)):
+                encontradas |= colunas_categoria
+                for inicio in range(0, len(df), CHUNK_ROWS):
+                    writer.write(df.iloc[inicio:inicio + CHUNK_ROWS])
+                if linhas < 10 and not df.empty:
+                    previa.append(df.head(10 - linhas))
+                linhas += len(df)
+                if on_categoria:
+                    on_categoria(categoria, len(df))
+                del df
+    except Exception:
+        writer.close()
+        os.remove(caminho)
+        raise
+    writer.close()
+
+    return {
+        'caminho': caminho,
+        'linhas': linhas,
+        'colunas': colunas,
+        'colunas_ausentes': [c for c in colunas if c not in encontradas and c != COLUNA_CATEGORIA],
+        'previa': pd.concat(previa, ignore_index=True) if previa else pd.DataFrame(columns=colunas),
+    }
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+import time
+import uuid
 from pathlib import Path
 
 # Configurar caminho para utils
@@ -10,6 +12,11 @@ sys.path.append(str(path_root))
 
 # Importar módulos específicos do projeto
 from api.bitrix_connector import load_merged_data
+from views.extracoes.exportacao import formatos_disponiveis, FORMATOS
+from views.extracoes.jobs import get_export_queue, NA_FILA, EXECUTANDO, CONCLUIDO, ERRO
+from utils.animation_utils import update_progress
+from api.table_snapshots import TABLES, available_tables, refresh_snapshot, snapshot_meta
+from utils.query_engine import Query, QueryPlanner, RELATIONS, parse_condition, DEFAULT_LIMIT
 
 # Definir funções de animação localmente
 def display_loading_animation(message="Carregando..."):
@@ -75,7 +82,7 @@ def show_extracoes():
     elif selected == "Exportar CSV":
         mostrar_exportar_csv()
     elif selected == "Consulta Personalizada":
-        st.info("Funcionalidade de consulta personalizada será implementada nas próximas atualizações.")
+        mostrar_consulta_personalizada()
     
     # Rodapé
     st.markdown("---")
@@ -160,9 +167,9 @@ def mostrar_visualizacao_dados():
 
 def mostrar_exportar_csv():
     """
-    Exibe a interface para exportar dados em CSV
+    Exibe a interface para exportar dados em CSV, XLSX ou Parquet
     """
-    st.subheader("Exportar Dados em CSV")
+    st.subheader("Exportar Dados")
     
     # Filtros
     with st.expander("Configurações de Exportação", expanded=True):
@@ -186,63 +193,222 @@ def mostrar_exportar_csv():
             colunas_padrao + ["STAGE_ID", "CATEGORY_ID", "OPPORTUNITY", "CURRENCY_ID"],
             default=colunas_padrao
         )
+        
+        formato = st.radio("Formato:", formatos_disponiveis(), horizontal=True, key="extracao_exportar_formato")
     
-    # Botão para exportar
-    if st.button("Gerar CSV para Exportação", key="btn_exportar", use_container_width=True, type="primary"):
-        # Exibir mensagem de processamento
-        with st.spinner("Gerando arquivo para exportação..."):
+    # Botão para exportar: a exportação roda em segundo plano, fora da sessão
+    if st.button("Gerar Arquivo para Exportação", key="btn_exportar", use_container_width=True, type="primary"):
+        if not categoria:
+            st.warning("Selecione ao menos uma categoria.")
+        else:
             try:
-                # Converter datas para string no formato esperado
-                date_from = data_inicial.strftime("%Y-%m-%d")
-                date_to = data_final.strftime("%Y-%m-%d")
-                
-                # Carregar dados para cada categoria
-                dfs = []
-                for cat in categoria:
-                    df_cat = load_merged_data(
-                        category_id=cat,
-                        date_from=date_from,
-                        date_to=date_to,
-                        debug=False
-                    )
-                    
-                    if not df_cat.empty:
-                        # Adicionar coluna de categoria se múltiplas categorias
-                        if len(categoria) > 1:
-                            df_cat['CATEGORIA_EXPORTACAO'] = f"Categoria {cat}"
-                        
-                        dfs.append(df_cat)
-                
-                if not dfs:
-                    st.warning("Não foram encontrados dados para os filtros selecionados.")
-                else:
-                    # Combinar todos os dataframes
-                    df_final = pd.concat(dfs, ignore_index=True)
-                    
-                    # Selecionar colunas desejadas (se existirem no dataframe)
-                    colunas_exportar = [col for col in colunas_selecionadas if col in df_final.columns]
-                    
-                    # Verificar se há colunas para exportar
-                    if not colunas_exportar:
-                        st.warning("Nenhuma das colunas selecionadas existe nos dados. Exportando todas as colunas disponíveis.")
-                        df_export = df_final
-                    else:
-                        df_export = df_final[colunas_exportar]
-                    
-                    # Exibir prévia
-                    st.subheader("Prévia dos Dados para Exportação")
-                    st.dataframe(df_export.head(10), use_container_width=True)
-                    
-                    # Permitir download dos dados
-                    csv = df_export.to_csv(index=False).encode('utf-8-sig')
-                    st.download_button(
-                        label="Download dos Dados (CSV)",
-                        data=csv,
-                        file_name=f"exportacao_bitrix_{date_from}_{date_to}.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
-                    
-                    st.success(f"Arquivo CSV gerado com sucesso! Total de registros: {len(df_export)}")
+                job_id = get_export_queue().submit(
+                    categoria,
+                    data_inicial.strftime("%Y-%m-%d"),
+                    data_final.strftime("%Y-%m-%d"),
+                    colunas_selecionadas or colunas_padrao,
+                    formato=formato,
+                    owner=dono_exportacoes()
+                )
+                st.success(f"Exportação {job_id} enfileirada. Acompanhe o andamento abaixo; "
+                           "o arquivo continua disponível mesmo se a página for recarregada.")
             except Exception as e:
-                st.error(f"Erro ao gerar arquivo CSV: {str(e)}") 
\ No newline at end of file
+                st.error(f"Erro ao enfileirar a exportação: {str(e)}")
+    
+    mostrar_exportacoes()
+
+def dono_exportacoes():
+    """
+    Identificador do dono das exportações desta sessão (não há login no painel).
+
+    Guardado no parâmetro 'exportacoes' da URL, para que o usuário continue vendo as suas
+    exportações ao recarregar a página, sem ver as das outras sessões.
+    """
+    if 'extracoes_dono' not in st.session_state:
+        st.session_state.extracoes_dono = st.query_params.get('exportacoes') or uuid.uuid4().hex
+    st.query_params['exportacoes'] = st.session_state.extracoes_dono
+    return st.session_state.extracoes_dono
+
+def descrever_exportacao(job):
+    """Linha de descrição de uma exportação (formato, categorias, período e criação)"""
+    p = job['parametros']
+    categorias = ", ".join(str(c) for c in p['categorias'])
+    return (f"**{p['formato']}** · Categorias {categorias} · "
+            f"{p['date_from']} a {p['date_to']} · criada em {job['criado_em']}")
+
+def mostrar_exportacoes():
+    """
+    Lista as exportações recentes da sessão: andamento (atualizado enquanto houver exportações
+    na fila ou em execução), concluídas e com erro, e o download da exportação escolhida
+    """
+    st.markdown("### Exportações")
+    dono = dono_exportacoes()
+    try:
+        jobs = get_export_queue().list(owner=dono)
+    except Exception as e:
+        st.error(f"Erro ao listar exportações: {str(e)}")
+        return
+    
+    if not jobs:
+        st.caption("Nenhuma exportação gerada recentemente.")
+        return
+    
+    # Só as exportações em andamento são atualizadas periodicamente
+    if any(job['situacao'] in (NA_FILA, EXECUTANDO) for job in jobs):
+        acompanhar_exportacoes(dono)
+    
+    for job in jobs:
+        if job['situacao'] in (NA_FILA, EXECUTANDO):
+            continue
+        with st.container(border=True):
+            st.markdown(descrever_exportacao(job))
+            if job['situacao'] == ERRO:
+                st.error(f"Erro: {job['mensagem']}")
+            elif job['situacao'] == CONCLUIDO:
+                st.caption(f"{job['mensagem'] or ''} · disponível até {job['expira_em']}")
+            else:
+                st.caption(job['mensagem'] or job['situacao'].capitalize())
+    
+    # Um único botão de download, para a exportação escolhida (o arquivo é lido só para ela)
+    concluidos = [job for job in jobs
+                  if job['situacao'] == CONCLUIDO and job['arquivo'] and os.path.exists(job['arquivo'])]
+    if concluidos:
+        col_escolha, col_download = st.columns([3, 1])
+        with col_escolha:
+            job = st.selectbox(
+                "Arquivo para download:",
+                concluidos,
+                format_func=lambda j: f"{j['nome_arquivo']} · {j['linhas']} registros · criada em {j['criado_em']}",
+                key="extracoes_download_job"
+            )
+        with col_download:
+            st.markdown("<br>", unsafe_allow_html=True)
+            with open(job['arquivo'], 'rb') as arquivo:
+                st.download_button(
+                    label="Download",
+                    data=arquivo,
+                    file_name=job['nome_arquivo'],
+                    mime=FORMATOS[job['parametros']['formato']]['mime'],
+                    key=f"download_{job['id']}",
+                    use_container_width=True
+                )
+
+@st.fragment(run_every=3)
+def acompanhar_exportacoes(dono):
+    """
+    Progresso das exportações na fila ou em execução, atualizado a cada 3 segundos.
+    Quando todas terminam, a página é recarregada para listar os arquivos gerados.
+    """
+    try:
+        ativos = [job for job in get_export_queue().list(owner=dono)
+                  if job['situacao'] in (NA_FILA, EXECUTANDO)]
+    except Exception as e:
+        st.error(f"Erro ao acompanhar exportações: {str(e)}")
+        return
+    
+    if not ativos:
+        st.rerun()
+    
+    for job in ativos:
+        with st.container(border=True):
+            st.markdown(descrever_exportacao(job))
+            update_progress(st.progress(0.0), job['progresso'], st.empty(), job['mensagem'])
+
+def mostrar_consulta_personalizada():
+    """
+    Consultas ad hoc sobre os snapshots locais das tabelas do Bitrix24 (sem acessar a API)
+    """
+    st.subheader("Consulta Personalizada")
+    st.caption("As consultas rodam sobre cópias locais das tabelas. Atualize um snapshot para "
+               "trazer os dados mais recentes do Bitrix24.")
+    
+    # Situação dos snapshots locais
+    with st.expander("Snapshots locais", expanded=not available_tables()):
+        for alias in TABLES:
+            meta = snapshot_meta(alias)
+            col_nome, col_info, col_botao = st.columns([1, 2, 1])
+            with col_nome:
+                st.markdown(f"**{alias}**")
+            with col_info:
+                if meta:
+                    st.caption(f"{meta['linhas']} linhas · {len(meta['colunas'])} colunas · "
+                               f"atualizado em {meta['atualizado_em']}")
+                else:
+                    st.caption("Sem snapshot local")
+            with col_botao:
+                if st.button("Atualizar", key=f"btn_snapshot_{alias}", use_container_width=True):
+                    with st.spinner(f"Baixando '{alias}' do Bitrix24..."):
+                        try:
+                            refresh_snapshot(alias)
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Erro ao atualizar '{alias}': {str(e)}")
+    
+    tabelas = available_tables()
+    if not tabelas:
+        st.info("Nenhum snapshot local disponível. Atualize ao menos uma tabela acima.")
+        return
+    
+    # Montagem da consulta
+    col_base, col_juncoes = st.columns(2)
+    with col_base:
+        tabela = st.selectbox("Tabela base:", tabelas, key="consulta_tabela")
+    with col_juncoes:
+        relacionadas = [t for t in tabelas if t != tabela and any(t in par for par in RELATIONS)]
+        juncoes = st.multiselect("Juntar com:", relacionadas, key="consulta_juncoes",
+                                 help="Relações: deal.ID = uf.DEAL_ID; uf (ID da família) = cartorio")
+        juncao_externa = st.checkbox("Manter linhas sem correspondência (junção à esquerda)", key="consulta_left")
+    
+    colunas_disponiveis = list(snapshot_meta(tabela)['colunas'])
+    for alias in juncoes:
+        colunas_disponiveis += [f"{alias}.{c}" for c in snapshot_meta(alias)['colunas']]
+    colunas = st.multiselect("Colunas (vazio = todas):", colunas_disponiveis, key="consulta_colunas")
+    
+    filtros = st.text_area(
+        "Filtros (um por linha, combinados com E):",
+        key="consulta_filtros",
+        placeholder="CATEGORY_ID in 32, 34\nDATE_CREATE >= 2024-01-01\nuf.UF_CRM_1735661425423 = PROTOCOLADOS COMPLETOS",
+        help="Operadores: " + ", ".join(["=", "!=", ">=", "<=", ">", "<", "in", "not in", "contains", "is null", "not null"])
+    )
+    
+    col_ordem, col_limite = st.columns(2)
+    with col_ordem:
+        ordem = st.selectbox("Ordenar por:", ["(sem ordenação)"] + colunas_disponiveis, key="consulta_ordem")
+        decrescente = st.checkbox("Decrescente", key="consulta_desc")
+    with col_limite:
+        limite = st.number_input("Limite de linhas:", min_value=1, max_value=1_000_000,
+                                 value=DEFAULT_LIMIT, step=100, key="consulta_limite")
+    
+    if st.button("Executar Consulta", key="btn_consulta", use_container_width=True, type="primary"):
+        try:
+            condicoes = [parse_condition(linha) for linha in filtros.splitlines() if linha.strip()]
+            consulta = Query(
+                table=tabela,
+                columns=colunas,
+                joins=[(alias, 'left' if juncao_externa else 'inner') for alias in juncoes],
+                where=condicoes,
+                order_by=None if ordem == "(sem ordenação)" else ("-" if decrescente else "") + ordem,
+                limit=int(limite)
+            )
+            planejador = QueryPlanner(consulta)
+            inicio = time.time()
+            resultado = planejador.execute()
+            duracao = time.time() - inicio
+        except (ValueError, KeyError, FileNotFoundError) as e:
+            st.error(f"Consulta inválida: {str(e)}")
+            return
+        except Exception as e:
+            st.error(f"Erro ao executar a consulta: {str(e)}")
+            return
+        
+        st.success(f"{len(resultado)} linhas em {duracao * 1000:.0f} ms")
+        with st.expander("Plano da consulta"):
+            st.code(planejador.explain(), language=None)
+        st.dataframe(resultado, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="Download do Resultado (CSV)",
+            data=resultado.to_csv(index=False).encode('utf-8-sig'),
+            file_name=f"consulta_{tabela}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
@@ -0,0 +1,231 @@
+"""
+Fila de exportações em segundo plano para a página de Extrações.
+
+As exportações grandes rodavam dentro do script do Streamlit: bloqueavam a sessão do usuário e
+se perdiam quando o navegador reconectava. Aqui cada exportação vira um job:
+- registrado numa tabela local (SQLite em .cache/export_jobs), que sobrevive a reconexões e
+  reinícios (jobs interrompidos por um reinício voltam para a fila);
+- executado por um pool de no máximo MAX_JOBS threads, de modo que extrações pesadas não
+  concorram sem limite com as páginas interativas;
+- com o arquivo final guardado em disco até expirar (RESULT_TTL_HOURS), listado para download
+  novamente a qualquer momento;
+- de um dono (identificador da sessão que o criou), para que cada usuário veja e baixe apenas as
+  suas exportações.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from views.extracoes.exportacao import exportar_categorias, FORMATOS
+
+JOBS_DIR = Path(os.getenv('EXTRACOES_JOBS_DIR', Path(__file__).parents[2] / '.cache' / 'export_jobs'))
+
+# Exportações executadas ao mesmo tempo
+MAX_JOBS = int(os.getenv('EXTRACOES_MAX_JOBS', 2))
+
+# Horas que o arquivo de uma exportação concluída fica disponível
+RESULT_TTL_HOURS = float(os.getenv('EXTRACOES_RESULT_TTL_HOURS', 24))
+
+# Situações de um job
+NA_FILA = 'na fila'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluído'
+ERRO = 'erro'
+EXPIRADO = 'expirado'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    situacao TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    progresso REAL NOT NULL DEFAULT 0,
+    mensagem TEXT,
+    arquivo TEXT,
+    nome_arquivo TEXT,
+    linhas INTEGER,
+    criado_em TEXT NOT NULL,
+    concluido_em TEXT,
+    expira_em TEXT,
+    dono TEXT
+);
+"""
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _agora():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ExportJobQueue:
+    """
+    Tabela de jobs de exportação e pool de execução.
+
+    Args:
+        directory (Path): Diretório da tabela de jobs e dos arquivos gerados
+        max_jobs (int): Exportações executadas ao mesmo tempo
+        result_ttl_hours (float): Validade dos arquivos gerados
+        exporter (callable): Função compatível com exportacao.exportar_categorias
+    """
+
+    def __init__(self, directory=JOBS_DIR, max_jobs=MAX_JOBS, result_ttl_hours=RESULT_TTL_HOURS,
+                 exporter=exportar_categorias):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / 'jobs.sqlite'
+        self.result_ttl = timedelta(hours=result_ttl_hours)
+        self.exporter = exporter
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_jobs), thread_name_prefix='exportacao')
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            if 'dono' not in [row['name'] for row in conn.execute("PRAGMA table_info(jobs)")]:
+                conn.execute("ALTER TABLE jobs ADD COLUMN dono TEXT")
+        self._retomar_pendentes()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _atualizar(self, job_id, **campos):
+        sets = ', '.join(f"{campo} = ?" for campo in campos)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {sets} WHERE id = ?", (*campos.values(), job_id))
+
+    def _retomar_pendentes(self):
+        """Recoloca na fila os jobs que não terminaram (processo anterior encerrado no meio)."""
+        with self._connect() as conn:
+            pendentes = [row['id'] for row in conn.execute(
+                "SELECT id FROM jobs WHERE situacao IN (?, ?) ORDER BY criado_em, rowid", (NA_FILA, EXECUTANDO)
+            )]
+        for job_id in pendentes:
+            self._atualizar(job_id, situacao=NA_FILA, progresso=0.0, mensagem="Retomado após reinício")
+            self.executor.submit(self._executar, job_id)
+
+    # --- Execução ----------------------------------------------------------------------------
+
+    def submit(self, categorias, date_from, date_to, colunas, formato='CSV', owner=None):
+        """
+        Enfileira uma exportação.
+
+        Args:
+            owner (str, optional): Dono da exportação (ver list)
+
+        Returns:
+            str: ID do job
+        """
+        job_id = uuid.uuid4().hex[:12]
+        parametros = {
+            'categorias': list(categorias), 'date_from': date_from, 'date_to': date_to,
+            'colunas': list(colunas), 'formato': formato,
+        }
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, situacao, parametros, mensagem, criado_em, dono) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, NA_FILA, json.dumps(parametros), "Aguardando na fila", _agora(), owner)
+            )
+        self.executor.submit(self._executar, job_id)
+        return job_id
+
+    def _executar(self, job_id):
+        job = self.get(job_id)
+        if job is None or job['situacao'] != NA_FILA:
+            return
+        p = job['parametros']
+        self._atualizar(job_id, situacao=EXECUTANDO, progresso=0.0, mensagem="Carregando categorias...")
+        concluidas = []
+
+        def on_categoria(categoria, linhas):
+            concluidas.append(categoria)
+            self._atualizar(job_id, progresso=len(concluidas) / len(p['categorias']),
+                            mensagem=f"Categoria {categoria} gravada ({linhas} registros)")
+
+        try:
+            resultado = self.exporter(p['categorias'], p['date_from'], p['date_to'], p['colunas'],
+                                      formato=p['formato'], on_categoria=on_categoria)
+            extensao = FORMATOS[p['formato']]['extensao']
+            destino = self.directory / f"{job_id}.{extensao}"
+            shutil.move(resultado['caminho'], destino)
+            mensagem = f"{resultado['linhas']} registros exportados"
+            if resultado['colunas_ausentes']:
+                mensagem += " (colunas não encontradas: " + ", ".join(resultado['colunas_ausentes']) + ")"
+            self._atualizar(
+                job_id, situacao=CONCLUIDO, progresso=1.0, mensagem=mensagem, arquivo=str(destino),
+                nome_arquivo=f"exportacao_bitrix_{p['date_from']}_{p['date_to']}.{extensao}",
+                linhas=resultado['linhas'], concluido_em=_agora(),
+                expira_em=(datetime.now() + self.result_ttl).strftime('%Y-%m-%d %H:%M:%S')
+            )
+        except Exception as e:
+            print(f"Erro na exportação {job_id}: {e}")
+            self._atualizar(job_id, situacao=ERRO, mensagem=str(e), concluido_em=_agora())
+
+    # --- Consulta ----------------------------------------------------------------------------
+
+    @staticmethod
+    def _job(row):
+        job = dict(row)
+        job['parametros'] = json.loads(job['parametros'])
+        return job
+
+    def get(self, job_id):
+        """Job pelo ID (dicionário com as colunas da tabela), ou None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def list(self, limit=20, owner=None):
+        """
+        Jobs mais recentes (após expirar os arquivos vencidos).
+
+        Args:
+            limit (int): Número máximo de jobs
+            owner (str, optional): Apenas os jobs deste dono (None = todos)
+        """
+        self.expire()
+        where, params = ("WHERE dono = ?", [owner]) if owner is not None else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT * FROM jobs {where} ORDER BY criado_em DESC, rowid DESC LIMIT ?",
+                                params + [int(limit)]).fetchall()
+        return [self._job(row) for row in rows]
+
+    def expire(self):
+        """Remove os arquivos vencidos e marca os jobs como expirados."""
+        with self._connect() as conn:
+            vencidos = conn.execute(
+                "SELECT id, arquivo FROM jobs WHERE situacao = ? AND expira_em <= ?", (CONCLUIDO, _agora())
+            ).fetchall()
+        for row in vencidos:
+            try:
+                if row['arquivo'] and os.path.exists(row['arquivo']):
+                    os.remove(row['arquivo'])
+            except OSError as e:
+                print(f"Erro ao remover exportação expirada {row['id']}: {e}")
+            self._atualizar(row['id'], situacao=EXPIRADO, arquivo=None, mensagem="Arquivo expirado")
+
+
+def get_export_queue():
+    """
+    Retorna a fila de exportações compartilhada pelo processo (criada na primeira chamada).
+
+    Returns:
+        ExportJobQueue: Fila de exportações
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = ExportJobQueue()
+        return _queue
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+import time
 from pathlib import Path
 from api.bitrix_connector import load_merged_data
 from components.metrics import render_metrics_section, render_conclusion_item
@@ -13,7 +14,7 @@ utils_path = os.path.join(Path(__file__).parents[1], 'utils')
 sys.path.insert(0, str(utils_path))
 
 # Agora importa diretamente dos arquivos na pasta utils
-from data_processor import calculate_status_counts
+from utils.status_cube import get_status_cube
 from animation_utils import display_loading_animation, clear_loading_animation
 
 def format_date_br(date):
@@ -50,6 +51,8 @@ def load_data():
                 
                 if not df.empty:
                     st.session_state['home_data'] = df
+                    # Versão dos dados carregados (chave do cubo de status)
+                    st.session_state['home_data_version'] = time.time()
                 else:
                     st.session_state['home_data'] = pd.DataFrame()
                     
@@ -141,8 +144,11 @@ def show_inicio():
         create_section_anchor("metricas_gerais")
         st.subheader("Métricas Gerais")
         
-        # Exibir métricas
-        counts = calculate_status_counts(df)
+        # Exibir métricas (fatia do cubo de status, montado uma vez por versão dos dados)
+        versao_dados = st.session_state.get('home_data_version')
+        counts = get_status_cube(
+            df, data_version=('inicio', versao_dados) if versao_dados is not None else None
+        ).status_counts()
         render_metrics_section(counts)
         
         # Criar âncora e cabeçalho para a seção de últimas conclusões
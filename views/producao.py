@@ -11,7 +11,7 @@ from pathlib import Path
 # Importações internas
 from api.bitrix_connector import load_merged_data, get_higilizacao_fields
 from components.metrics import render_metrics_section
-from components.tables import render_styled_table, create_pendencias_table, create_production_table
+from components.tables import render_styled_table
 from components.filters import date_filter_section, responsible_filter, status_filter
 
 # Obter o caminho absoluto para a pasta utils
@@ -19,7 +19,8 @@ utils_path = os.path.join(Path(__file__).parents[1], 'utils')
 sys.path.insert(0, str(utils_path))
 
 # Agora importa diretamente dos arquivos na pasta utils
-from data_processor import calculate_status_counts, filter_dataframe_by_date, create_responsible_status_table
+from data_processor import filter_dataframe_by_date, create_responsible_status_table
+from utils.status_cube import get_status_cube
 from animation_utils import display_loading_animation, clear_loading_animation, update_progress
 
 def generate_demo_data():
@@ -374,8 +375,9 @@ def show_producao():
                         # Armazenar no estado da sessão
                         st.session_state['filtered_df_cat34'] = filtered_df_cat34
                 
-                # Armazenar dados filtrados na sessão
+                # Armazenar dados filtrados na sessão (a versão identifica o cubo de status desses dados)
                 st.session_state['filtered_df'] = filtered_df
+                st.session_state['filtered_df_version'] = time.time()
                 
                 # Desativar flag de força de recarregamento após uso
                 if 'force_reload' in st.session_state:
@@ -489,44 +491,24 @@ def show_producao():
         
         # Se temos dados carregados, exibi-los
         if loading_state == 'completed' and 'filtered_df' in st.session_state:
-            filtered_df = st.session_state['filtered_df'].copy()
-            
-            # Verificar e corrigir colunas necessárias
-            for field in get_higilizacao_fields().keys():
-                if field not in filtered_df.columns:
-                    filtered_df[field] = None
-            
-            if 'ASSIGNED_BY_NAME' not in filtered_df.columns:
-                filtered_df['ASSIGNED_BY_NAME'] = "Não atribuído"
-            
-            # Aplicar filtros selecionados
-            if 'selected_responsibles' in locals() and selected_responsibles:
-                filtered_df = filtered_df[filtered_df['ASSIGNED_BY_NAME'].isin(selected_responsibles)]
-            
-            if 'selected_status' in locals() and selected_status and 'UF_CRM_HIGILIZACAO_STATUS' in filtered_df.columns:
-                status_filter_condition = filtered_df['UF_CRM_HIGILIZACAO_STATUS'].fillna('PENDENCIA').isin(selected_status)
-                filtered_df = filtered_df[status_filter_condition]
+            # Cubo de status dos dados carregados: as métricas e relatórios abaixo são fatias dele,
+            # com os filtros selecionados (a data vale apenas para os COMPLETOS)
+            dados = st.session_state['filtered_df']
+            versao_dados = st.session_state.get('filtered_df_version')
+            cube = get_status_cube(
+                dados,
+                data_version=('producao', versao_dados) if versao_dados is not None else None
+            )
+            filtros_cubo = {
+                'responsibles': selected_responsibles if 'selected_responsibles' in locals() and selected_responsibles else None,
+                'statuses': selected_status if 'selected_status' in locals() and selected_status else None,
+            }
+            if 'UF_CRM_1741206763' in dados.columns and start_date and end_date:
+                filtros_cubo.update(start=start_date, end=end_date)
             
-            # Aplicar filtro de data APENAS para registros com status COMPLETO
-            if 'UF_CRM_1741206763' in filtered_df.columns:
-                # Converter para datetime
-                date_mask = pd.isna(filtered_df['UF_CRM_1741206763'])
-                filtered_df.loc[~date_mask, 'UF_CRM_1741206763'] = pd.to_datetime(filtered_df.loc[~date_mask, 'UF_CRM_1741206763'])
-                
-                # Criar uma cópia do DataFrame original
-                completos_df = filtered_df[filtered_df['UF_CRM_HIGILIZACAO_STATUS'] == 'COMPLETO'].copy()
-                outros_df = filtered_df[filtered_df['UF_CRM_HIGILIZACAO_STATUS'] != 'COMPLETO'].copy()
-                
-                # Aplicar o filtro de data APENAS nos registros COMPLETOS
-                if start_date and end_date:
-                    date_filter = (
-                        (completos_df['UF_CRM_1741206763'] >= start_date) & 
-                        (completos_df['UF_CRM_1741206763'] <= end_date)
-                    )
-                    completos_df = completos_df[date_filter]
-                
-                # Combinar os DataFrames novamente
-                filtered_df = pd.concat([completos_df, outros_df])
+            # Registros filtrados (usados pelo cruzamento de famílias), recortados com a máscara do cubo
+            linhas_filtradas = cube.row_mask(**filtros_cubo)
+            filtered_df = dados[linhas_filtradas]
             
             # Verificar se temos dados para exibir
             if filtered_df.empty:
@@ -541,7 +523,7 @@ def show_producao():
             
             # Métricas Macro
             st.markdown("## Métricas Macro")
-            counts = calculate_status_counts(filtered_df)
+            counts = cube.status_counts(**filtros_cubo)
             render_metrics_section(counts)
             
             # Criar seletor de relatórios em vez de tabs
@@ -560,11 +542,8 @@ def show_producao():
                 
                 # SOLUÇÃO RADICAL: Criar manualmente a tabela de status por responsável
                 if not filtered_df.empty and 'ASSIGNED_BY_NAME' in filtered_df.columns and 'UF_CRM_HIGILIZACAO_STATUS' in filtered_df.columns:
-                    # Substituir valores nulos no status por 'PENDENCIA'
-                    filtered_df['UF_CRM_HIGILIZACAO_STATUS'] = filtered_df['UF_CRM_HIGILIZACAO_STATUS'].fillna('PENDENCIA')
-                    
-                    # 1. Agrupar por responsável e status e contar ocorrências
-                    status_counts = filtered_df.groupby(['ASSIGNED_BY_NAME', 'UF_CRM_HIGILIZACAO_STATUS']).size().unstack(fill_value=0)
+                    # 1. Contagens por responsável e status (fatia do cubo; status nulos contam como PENDENCIA)
+                    status_counts = cube.status_by_responsible(**filtros_cubo)
                     
                     # 2. Certificar que todas as colunas de status existem
                     for status in ['COMPLETO', 'INCOMPLETO', 'PENDENCIA']:
@@ -600,10 +579,9 @@ def show_producao():
                     
                     # 9. Criar a coluna de barra de progresso
                     if 'COMPLETO' in display_df.columns:
-                        display_df['Progresso'] = display_df.apply(
-                            lambda row: row['COMPLETO'] / total_por_linha[row.name] if total_por_linha[row.name] > 0 else 0, 
-                            axis=1
-                        )
+                        display_df['Progresso'] = (
+                            display_df['COMPLETO'] / total_por_linha.where(total_por_linha > 0)
+                        ).fillna(0)
                     else:
                         display_df['Progresso'] = 0
                     
@@ -666,7 +644,7 @@ def show_producao():
             
             elif relatorio_selecionado == "Pendências por Responsável":
                 st.subheader("Pendências por Responsável")
-                pendencias_df = create_pendencias_table(filtered_df)
+                pendencias_df = cube.field_counts('PENDENCIAS', **filtros_cubo)
                 if not pendencias_df.empty:
                     # Exibir o DataFrame com as configurações de coluna
                     st.dataframe(
@@ -742,7 +720,7 @@ def show_producao():
             
             elif relatorio_selecionado == "Produção Geral":
                 st.subheader("Produção Geral")
-                production_df = create_production_table(filtered_df)
+                production_df = cube.field_counts('SIM', **filtros_cubo)
                 if not production_df.empty:
                     # Exibir o DataFrame com as configurações de coluna
                     st.dataframe(
@@ -813,6 +791,15 @@ def show_producao():
                     with cols[6]:
                         st.markdown(f"<div style='text-align: center; font-weight: bold;'>{production_df['Total'].sum()}</div>", unsafe_allow_html=True)
                     st.markdown("</div>", unsafe_allow_html=True)
+
+                    # Taxa de conclusão por campo (matriz do checklist, restrita aos registros filtrados)
+                    taxas = cube.checklist.field_completion_rates(rows=linhas_filtradas)
+                    cols = st.columns([3, 1, 1, 1, 1, 1, 1])
+                    with cols[0]:
+                        st.markdown("<div style='text-align: left; font-weight: bold;'>% Concluído:</div>", unsafe_allow_html=True)
+                    for col, (campo, taxa) in zip(cols[1:], taxas.items()):
+                        with col:
+                            st.markdown(f"<div style='text-align: center;' title='{campo}'>{taxa:.1f}%</div>", unsafe_allow_html=True)
                 else:
                     st.info("Não há dados suficientes para criar a tabela de produção.")
             
@@ -10,6 +10,14 @@ import traceback
 # Controle de depuração - definir como False em produção
 DEBUG_MODE = False
 
+# Nomes de tabela da entidade 1086 no BI Connector, em ordem de preferência
+TABELAS_RECLAMACOES = [
+    "crm_dynamic_items_1086",
+    "crm_dynamic_1086",
+    "crm_item_1086",
+    "b_crm_dynamic_items_1086",
+]
+
 # Função auxiliar para gerar dados simulados de reclamações
 @st.cache_data(ttl=600) # Cache por 10 minutos para dados simulados
 def _gerar_dados_simulados_reclamacoes():
@@ -105,8 +113,17 @@ def carregar_dados_reclamacoes(force_reload=False, debug=DEBUG_MODE):
             token_display = BITRIX_TOKEN[:5] + "*****" if BITRIX_TOKEN and len(BITRIX_TOKEN) > 5 else "Token não encontrado"
             st.info(f"Tentando conectar ao Bitrix: {BITRIX_URL} com token: {token_display}")
         
-        # URL para a entidade 1086 no Bitrix24
-        url_reclamacoes = f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=crm_dynamic_items_1086"
+        # Resolver o nome da tabela da entidade 1086 (sondagem paralela, cache persistente)
+        from api.endpoint_resolver import resolve_table, invalidate, table_url
+        with st.spinner("Localizando a tabela de reclamações no Bitrix24..."):
+            tabela = resolve_table('reclamacoes', TABELAS_RECLAMACOES, BITRIX_URL, BITRIX_TOKEN)
+        if tabela is None:
+            # Nenhuma sondagem respondeu a tempo: tentar a tabela principal com a carga completa
+            if debug: st.warning("Nenhuma tabela respondeu à sondagem. Tentando a tabela principal...")
+            tabela = TABELAS_RECLAMACOES[0]
+        elif debug:
+            st.info(f"Tabela de reclamações: {tabela}")
+        url_reclamacoes = table_url(BITRIX_URL, BITRIX_TOKEN, tabela)
         
         # Tentar carregar dados
         with st.spinner("Carregando dados de reclamações do Bitrix24..."):
@@ -119,26 +136,12 @@ def carregar_dados_reclamacoes(force_reload=False, debug=DEBUG_MODE):
             df_reclamacoes = load_bitrix_data(url_reclamacoes, filters=filters, show_logs=debug, force_reload=force_reload)
             
             if df_reclamacoes is None or df_reclamacoes.empty:
-                if debug: st.warning("Tentativa 1 falhou. Tentando sem filtros...")
+                if debug: st.warning("Tentativa com filtros falhou. Tentando sem filtros...")
                 df_reclamacoes = load_bitrix_data(url_reclamacoes, filters=None, show_logs=debug, force_reload=force_reload)
             
             if df_reclamacoes is None or df_reclamacoes.empty:
-                if debug: st.warning("Tentativa 2 falhou. Tentando nomes alternativos de tabela...")
-                alternate_urls = [
-                    f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=crm_dynamic_1086",
-                    f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=crm_item_1086",
-                    f"{BITRIX_URL}/bitrix/tools/biconnector/pbi.php?token={BITRIX_TOKEN}&table=b_crm_dynamic_items_1086"
-                ]
-                for url in alternate_urls:
-                    if debug:
-                        url_display = url.replace(BITRIX_TOKEN, token_display)
-                        st.info(f"Tentando URL alternativa: {url_display}")
-                    df_reclamacoes = load_bitrix_data(url, filters=None, show_logs=debug, force_reload=force_reload)
-                    if df_reclamacoes is not None and not df_reclamacoes.empty:
-                        if debug: st.success(f"Conexão bem-sucedida com URL alternativa!")
-                        break
-            
-            if df_reclamacoes is None or df_reclamacoes.empty:
+                # A tabela conhecida deixou de responder: a próxima carga sonda os nomes novamente
+                invalidate('reclamacoes', BITRIX_URL)
                 st.error("❌ Não foi possível conectar à API Bitrix24 para carregar dados de reclamações.")
                 if st.button("Tentar novamente", key="btn_retry_reclamacoes_api"):
                     st.rerun()
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 from .styles import tailwind_container, THEME
+from utils.text_index import get_text_index
 
 def get_status_badge(status):
     """Retorna um badge HTML estilizado para o status."""
@@ -17,6 +18,35 @@ def get_status_badge(status):
     badge_class = f"tw-badge-{color_map.get(status, 'primary')}"
     return f'<span class="tw-badge {badge_class}" style="white-space: nowrap;">{status}</span>'
 
+def buscar_reclamacoes(df, texto, ids=None):
+    """
+    Busca reclamações pela descrição no índice de texto local.
+
+    O índice só é atualizado quando os dados carregados mudam (apenas as descrições novas ou
+    alteradas são regravadas), numa thread em segundo plano; a busca aguarda alguns segundos e,
+    se a indexação ainda estiver em andamento, avisa que os resultados podem estar incompletos.
+
+    Args:
+        df (pandas.DataFrame): Reclamações carregadas
+        texto (str): Texto buscado
+        ids (iterable, optional): IDs que passaram pelos filtros (a busca fica restrita a eles)
+
+    Returns:
+        list: IDs das reclamações encontradas, do mais relevante para o menos relevante
+    """
+    indice = get_text_index('reclamacoes')
+    textos = df[["ID", "DESCRICAO_RECLAMACAO"]].dropna(subset=["ID"])
+    versao = str(int(pd.util.hash_pandas_object(textos.astype(str), index=False).sum()))
+
+    def sincronizar(indice):
+        if indice.get_meta('versao') != versao:
+            indice.upsert(zip(textos["ID"].astype(str), textos["DESCRICAO_RECLAMACAO"]))
+            indice.set_meta('versao', versao)
+
+    if indice.get_meta('versao') != versao and indice.sync_in_background(sincronizar, wait=2):
+        st.info("O índice de busca está sendo atualizado em segundo plano; os resultados podem estar incompletos.")
+    return [chave for chave, _ in indice.search(texto, keys=ids)]
+
 def display_details_section(df):
     """Exibe a seção de filtros e detalhes das reclamações."""
     theme_mode = "dark" if st.session_state.get("dark_mode", False) else "light"
@@ -57,6 +87,10 @@ def display_details_section(df):
                 default=list(origem_options)
             )
         
+        # Busca textual na descrição (sem distinção de acentos, resultados por relevância)
+        busca = st.text_input("Buscar na descrição", key="reclamacoes_busca",
+                              placeholder="Ex.: cobrança duplicada")
+        
         st.markdown('</div>', unsafe_allow_html=True)
         
     # Aplicar filtros
@@ -67,6 +101,16 @@ def display_details_section(df):
         df_filtered = df_filtered[df_filtered["DEPARTAMENTO"].isin(departamento_filter)]
     if origem_filter:
         df_filtered = df_filtered[df_filtered["ORIGEM"].isin(origem_filter)]
+    if busca.strip():
+        try:
+            ids_encontrados = buscar_reclamacoes(df, busca, ids=df_filtered["ID"].dropna().astype(str))
+        except Exception as e:
+            st.error(f"Erro na busca: {e}")
+            ids_encontrados = []
+        posicao = {chave: i for i, chave in enumerate(ids_encontrados)}
+        relevancia = df_filtered["ID"].astype(str).map(posicao)
+        df_filtered = df_filtered[relevancia.notna()].iloc[relevancia.dropna().argsort()]
+        st.caption(f"{len(df_filtered)} reclamações encontradas para \"{busca}\", ordenadas por relevância")
     
     # Mostrar tabela filtrada
     st.markdown("### Reclamações Filtradas")
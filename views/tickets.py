@@ -2,11 +2,13 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import mysql.connector
 from datetime import datetime, timedelta
 import calendar
 import time
 
+from api.tickets_store import get_ticket_queries, DEFAULT_PAGE_SIZE
+from utils.text_index import get_text_index
+
 # Verificar e instalar bibliotecas adicionais se necessário
 try:
     import streamlit_card
@@ -128,67 +130,54 @@ def load_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-def connect_to_db():
-    """Estabelece conexão com o banco de dados MySQL"""
-    try:
-        conn = mysql.connector.connect(
-            host=st.secrets["DB_HOST"],
-            port=int(st.secrets["DB_PORT"]),
-            user=st.secrets["DB_USER"],
-            password=st.secrets["DB_PASSWORD"],
-            database=st.secrets["DB_NAME"]
-        )
-        return conn
-    except Exception as e:
-        st.error(f"Erro ao conectar com o banco de dados: {e}")
-        return None
-
-def get_tickets_data():
-    """Obtém dados dos tickets do banco de dados"""
+def get_tickets_aggregates():
+    """Obtém os agregados dos tickets do snapshot local, sincronizado de forma incremental com o banco"""
     # Mostrar loading animation
     with st.spinner("Carregando dados de tickets..."):
-        conn = connect_to_db()
-        if conn:
-            try:
-                cursor = conn.cursor(dictionary=True)
-                
-                # Query para obter tickets com informações do cliente
-                query = """
-                SELECT t.id, t.message, t.createdAt, t.departament, 
-                       c.nome, c.email, c.telefone, c.idfamilia
-                FROM tickets t
-                LEFT JOIN customers c ON t.customerId = c.id
-                ORDER BY t.createdAt DESC
-                """
-                
-                cursor.execute(query)
-                results = cursor.fetchall()
-                
-                # Converter para DataFrame
-                df = pd.DataFrame(results)
-                
-                # Garantir que createdAt é datetime
-                if 'createdAt' in df.columns:
-                    df['createdAt'] = pd.to_datetime(df['createdAt'])
-                    
-                    # Adicionar colunas para análise de tempo
-                    df['hora'] = df['createdAt'].dt.hour
-                    df['dia_semana'] = df['createdAt'].dt.day_name()
-                    df['dia'] = df['createdAt'].dt.day
-                    df['mes'] = df['createdAt'].dt.month
-                    df['ano'] = df['createdAt'].dt.year
-                
-                cursor.close()
-                conn.close()
-                return df
-            
-            except Exception as e:
-                st.error(f"Erro ao obter dados: {e}")
-                if conn:
-                    conn.close()
-                return pd.DataFrame()
-        else:
-            return pd.DataFrame()
+        try:
+            return get_ticket_queries().aggregates()
+        except Exception as e:
+            st.error(f"Erro ao obter dados: {e}")
+            return None
+
+def formatar_tickets(df_pagina):
+    """Prepara uma página de tickets para exibição (colunas renomeadas, data formatada, mensagem truncada)"""
+    colunas_exibir = ['id', 'nome', 'departament', 'createdAt', 'message']
+    df_exibir = df_pagina[colunas_exibir].rename(columns={
+        'id': 'ID', 
+        'nome': 'Cliente', 
+        'departament': 'Departamento',
+        'createdAt': 'Data Criação',
+        'message': 'Mensagem'
+    })
+    
+    # Formatando a data
+    df_exibir['Data Criação'] = df_exibir['Data Criação'].dt.strftime('%d/%m/%Y %H:%M')
+    
+    # Truncando mensagens muito longas
+    df_exibir['Mensagem'] = df_exibir['Mensagem'].str.slice(0, 50) + '...'
+    return df_exibir
+
+def buscar_tickets(texto, data_corte, departamento):
+    """
+    Busca tickets pela mensagem no índice de texto local.
+
+    Os tickets novos são indexados numa thread em segundo plano; a busca aguarda alguns segundos
+    (o suficiente para a sincronização incremental) e, se a indexação ainda estiver em andamento
+    (ex.: primeira indexação do histórico), avisa que os resultados podem estar incompletos.
+    """
+    queries = get_ticket_queries()
+    indice = get_text_index('tickets')
+    if indice.sync_in_background(queries.sync_search_index, wait=2):
+        st.info("O índice de busca está sendo atualizado em segundo plano; os resultados podem estar incompletos.")
+    return queries.search(indice, texto, start=data_corte, departament=departamento)
+
+def exportar_tickets_csv(data_corte, departamento):
+    """Gera o CSV dos tickets filtrados percorrendo as páginas do banco"""
+    partes = []
+    for i, pagina in enumerate(get_ticket_queries().iter_pages(start=data_corte, departament=departamento)):
+        partes.append(pagina.to_csv(index=False, header=(i == 0)))
+    return ''.join(partes).encode('utf-8')
 
 def card_metric(title, value, description=None, icon=None, color="#4361ee"):
     """Renderiza um cartão de métrica estilizado"""
@@ -237,10 +226,10 @@ def show_tickets():
     # Inicia o contador de tempo para estatísticas de carregamento
     start_time = time.time()
     
-    # Obter dados
-    df = get_tickets_data()
+    # Obter agregados (as mensagens só são carregadas na aba de detalhes)
+    agregados = get_tickets_aggregates()
     
-    if df.empty:
+    if agregados is None or agregados.total == 0:
         st.warning("Não foi possível carregar os dados dos tickets.")
         return
     
@@ -248,26 +237,22 @@ def show_tickets():
     load_time = round(time.time() - start_time, 2)
     
     # Mostrar estatísticas rápidas
-    st.caption(f"✅ Carregados {len(df)} tickets em {load_time} segundos")
+    st.caption(f"✅ Carregados {agregados.total} tickets em {load_time} segundos")
     
     add_vertical_space(1)
     
     # Totais e métricas
-    total_tickets = len(df)
+    total_tickets = agregados.total
     
     # Tickets por departamento
-    tickets_por_depto = df['departament'].value_counts().reset_index()
-    tickets_por_depto.columns = ['Departamento', 'Quantidade']
+    tickets_por_depto = agregados.by_department()
     
     # Tickets dos últimos 7 dias
     hoje = datetime.now()
-    semana_passada = hoje - timedelta(days=7)
-    tickets_semana = df[df['createdAt'] >= semana_passada]
-    total_semana = len(tickets_semana)
+    total_semana = agregados.ultimos_7_dias
     
     # Tickets do dia
-    tickets_hoje = df[df['createdAt'].dt.date == hoje.date()]
-    total_hoje = len(tickets_hoje)
+    total_hoje = agregados.on_day(hoje)
     
     # Layout em colunas para os KPIs com design de cartões modernos
     col1, col2, col3, col4 = st.columns(4)
@@ -336,7 +321,7 @@ def show_tickets():
             dias_ordem = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
             dias_pt = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
             
-            tickets_por_dia = df['dia_semana'].value_counts().reindex(dias_ordem, fill_value=0)
+            tickets_por_dia = agregados.by_weekday().reindex(dias_ordem, fill_value=0)
             tickets_por_dia.index = dias_pt
             
             fig = px.bar(
@@ -379,9 +364,9 @@ def show_tickets():
         
         status_col1, status_col2, status_col3 = st.columns(3)
         
-        dias_unicos = df['dia'].nunique()
+        dias_unicos = agregados.days_of_month()
         media_tickets_dia = round(total_tickets / dias_unicos if dias_unicos > 0 else 0, 1)
-        usuarios_unicos = df['nome'].nunique()
+        usuarios_unicos = agregados.clientes_unicos
         
         with status_col1:
             card_metric("Média Diária", f"{media_tickets_dia}", "Tickets por dia", "trending_up", "#4cc9f0")
@@ -390,7 +375,7 @@ def show_tickets():
             card_metric("Clientes Únicos", f"{usuarios_unicos}", "Total de clientes", "people", "#4895ef")
             
         with status_col3:
-            departamentos_unicos = df['departament'].nunique()
+            departamentos_unicos = len(agregados.departments())
             card_metric("Departamentos", f"{departamentos_unicos}", "Áreas atendidas", "business", "#4361ee")
     
     with tab2:
@@ -401,11 +386,8 @@ def show_tickets():
         
         with time_col1:
             # Gráfico de tickets por hora do dia
-            tickets_por_hora = df['hora'].value_counts().sort_index()
-            
-            # Preencher horas vazias com zeros
-            todas_horas = pd.Series(index=range(24), data=0)
-            tickets_por_hora = tickets_por_hora.add(todas_horas, fill_value=0).sort_index()
+            # Horas vazias já vêm preenchidas com zeros
+            tickets_por_hora = agregados.by_hour()
             
             fig = px.area(
                 x=tickets_por_hora.index, 
@@ -439,7 +421,7 @@ def show_tickets():
             
         with time_col2:
             # Gráfico de tendência mensal
-            tickets_por_mes = df.groupby(['ano', 'mes']).size().reset_index(name='tickets')
+            tickets_por_mes = agregados.by_month()
             
             # Criar label de mês no formato Abr/23
             meses_abrev = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
@@ -490,17 +472,9 @@ def show_tickets():
         
         # Criar DataFrame para o heatmap mesmo se não houver dados
         try:
-            heatmap_data = df.pivot_table(
-                values='id', 
-                index='dia_semana', 
-                columns='hora', 
-                aggfunc='count', 
-                fill_value=0
-            )
-            
-            # Reordenar os dias da semana
-            heatmap_data = heatmap_data.reindex(dias_ordem)
-        except:
+            # Dias da semana já vêm de segunda a domingo
+            heatmap_data = agregados.heatmap().reindex(dias_ordem)
+        except Exception:
             # Criar dataframe vazio se não houver dados suficientes
             heatmap_data = pd.DataFrame(0, index=dias_ordem, columns=range(24))
         
@@ -543,7 +517,7 @@ def show_tickets():
         filter_col1, filter_col2, filter_col3 = st.columns([2,2,1])
         
         with filter_col1:
-            departamentos = ['Todos'] + sorted(df['departament'].unique().tolist())
+            departamentos = ['Todos'] + agregados.departments()
             filtro_depto = st.selectbox('Departamento:', departamentos)
         
         with filter_col2:
@@ -554,34 +528,55 @@ def show_tickets():
             st.markdown("<br>", unsafe_allow_html=True)
             mostrar_todos = st.checkbox('Mostrar todos')
         
+        # Busca textual nas mensagens (índice local, resultados por relevância)
+        busca = st.text_input('Buscar nas mensagens:', key='tickets_busca',
+                              placeholder='Ex.: certidão atrasada')
+        
         # Aplicar filtros
-        df_filtrado = df.copy()
-        if filtro_depto != 'Todos' and not mostrar_todos:
-            df_filtrado = df_filtrado[df_filtrado['departament'] == filtro_depto]
+        departamento = filtro_depto if filtro_depto != 'Todos' and not mostrar_todos else None
+        data_corte = None if mostrar_todos else hoje - timedelta(days=filtro_dias)
+        
+        if busca.strip():
+            try:
+                df_busca = buscar_tickets(busca, data_corte, departamento)
+            except Exception as e:
+                st.error(f"Erro ao buscar tickets: {e}")
+                return
+            st.caption(f"{len(df_busca)} tickets encontrados para \"{busca}\", ordenados por relevância")
+            if not df_busca.empty:
+                st.dataframe(formatar_tickets(df_busca), use_container_width=True, height=400)
+            return
+        
+        # As mensagens só são buscadas no banco quando a tabela é aberta
+        if not st.toggle('Carregar tabela de tickets', key='tickets_detalhes'):
+            st.caption("Ative a tabela para carregar as mensagens dos tickets, em páginas de "
+                       f"{DEFAULT_PAGE_SIZE}.")
+            return
         
-        if not mostrar_todos:
-            data_corte = hoje - timedelta(days=filtro_dias)
-            df_filtrado = df_filtrado[df_filtrado['createdAt'] >= data_corte]
+        # Navegação por páginas: pilha de cursores (createdAt, id), reiniciada quando o filtro muda
+        filtro = (departamento, filtro_dias if data_corte is not None else None)
+        if st.session_state.get('tickets_filtro') != filtro:
+            st.session_state.tickets_filtro = filtro
+            st.session_state.tickets_cursores = [None]
+        cursores = st.session_state.tickets_cursores
+        
+        try:
+            queries = get_ticket_queries()
+            total_filtrado, inicio, fim = queries.count(start=data_corte, departament=departamento)
+            df_pagina, proximo = queries.page(start=data_corte, departament=departamento, before=cursores[-1])
+        except Exception as e:
+            st.error(f"Erro ao obter tickets: {e}")
+            return
         
         # Exibir tabela com estilo moderno
-        if not df_filtrado.empty:
+        if not df_pagina.empty:
             # Mostrar contagem de tickets filtrados
-            st.caption(f"Exibindo {len(df_filtrado)} tickets de um total de {len(df)}")
+            pagina_atual = len(cursores)
+            primeiro = (pagina_atual - 1) * DEFAULT_PAGE_SIZE + 1
+            st.caption(f"Exibindo {primeiro}–{primeiro + len(df_pagina) - 1} de {total_filtrado} tickets "
+                       f"filtrados (total: {total_tickets})")
             
-            colunas_exibir = ['id', 'nome', 'departament', 'createdAt', 'message']
-            df_exibir = df_filtrado[colunas_exibir].rename(columns={
-                'id': 'ID', 
-                'nome': 'Cliente', 
-                'departament': 'Departamento',
-                'createdAt': 'Data Criação',
-                'message': 'Mensagem'
-            })
-            
-            # Formatando a data
-            df_exibir['Data Criação'] = df_exibir['Data Criação'].dt.strftime('%d/%m/%Y %H:%M')
-            
-            # Truncando mensagens muito longas
-            df_exibir['Mensagem'] = df_exibir['Mensagem'].str.slice(0, 50) + '...'
+            df_exibir = formatar_tickets(df_pagina)
             
             # Destacar dados recentes (hoje)
             def highlight_today(val):
@@ -598,23 +593,39 @@ def show_tickets():
             st.dataframe(df_styled, use_container_width=True, height=400)
             st.markdown('</div>', unsafe_allow_html=True)
             
+            # Navegação entre páginas
+            nav_prev, nav_page, nav_next = st.columns([1,2,1])
+            with nav_prev:
+                if st.button("◀ Anterior", disabled=pagina_atual == 1, use_container_width=True):
+                    cursores.pop()
+                    st.rerun()
+            with nav_page:
+                st.caption(f"Página {pagina_atual} de {-(-total_filtrado // DEFAULT_PAGE_SIZE)}")
+            with nav_next:
+                if st.button("Próxima ▶", disabled=proximo is None, use_container_width=True):
+                    cursores.append(proximo)
+                    st.rerun()
+            
             # Linha com estatísticas e botão de exportação
             stat_col, export_col = st.columns([3,1])
             
             with stat_col:
                 # Resumo dos dados filtrados
-                st.caption(f"Período: {df_filtrado['createdAt'].min().strftime('%d/%m/%Y')} até {df_filtrado['createdAt'].max().strftime('%d/%m/%Y')}")
+                st.caption(f"Período: {inicio.strftime('%d/%m/%Y')} até {fim.strftime('%d/%m/%Y')}")
             
             with export_col:
-                # Botão para exportar dados
-                csv = df_filtrado.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Exportar CSV",
-                    data=csv,
-                    file_name=f"tickets_export_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
-                )
+                # O CSV completo só é gerado quando solicitado
+                if st.button("Preparar CSV", use_container_width=True):
+                    st.session_state.tickets_csv = (filtro, exportar_tickets_csv(data_corte, departamento))
+                csv_pronto = st.session_state.get('tickets_csv')
+                if csv_pronto and csv_pronto[0] == filtro:
+                    st.download_button(
+                        label="📥 Exportar CSV",
+                        data=csv_pronto[1],
+                        file_name=f"tickets_export_{datetime.now().strftime('%Y%m%d')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
         else:
             # Mensagem estilizada quando não houver dados
             st.markdown("""